@@ -1,12 +1,23 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.auth.models import Group
-from .models import Patient, Announcement, Drug, DrugInteraction, DoctorProfile
-from .forms import DoctorProfileAdminForm
+from django.utils import timezone
+from .models import Patient, Announcement, Drug, DrugInteraction, DoctorProfile, LabResult, AuditLog, BackgroundJob, CTStudy, TumorSuggestion, CohortSummary, SurvivalModel, ArchivedPatient
+from .forms import DoctorProfileAdminForm, PatientBulkActionForm
+from . import archive, bulk_actions, deletion, jobs
+from .admin_scaling import ScalableChangeListMixin, DoctorIdListFilter
+from .drug_search import search_drugs
 
 # Django admin에서 Group 모델 숨김 (사용하지 않음)
 admin.site.unregister(Group)
 
 
+class ActivePatientRelatedMixin:
+    """환자 관련 모델 관리자 - 삭제 표시된 환자(정리 대기)의 행은 목록/수정 화면에서 제외"""
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).filter(patient__deleted_at__isnull=True)
+
+
 @admin.register(Announcement)
 class AnnouncementAdmin(admin.ModelAdmin):
     """공지사항 관리자"""
@@ -51,14 +62,31 @@ class DrugAdmin(admin.ModelAdmin):
 
     ordering = ['drug_name_kr']
 
+    def get_search_results(self, request, queryset, search_term):
+        """코드/약물명 검색에 효능·부작용·금기 전문 검색 결과를 합침"""
+        queryset, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term:
+            drug_codes = [hit['drug_code'] for hit in search_drugs(search_term, limit=200)]
+            if drug_codes:
+                queryset |= self.model.objects.filter(drug_code__in=drug_codes)
+        return queryset, may_have_duplicates
+
 
 @admin.register(DrugInteraction)
-class DrugInteractionAdmin(admin.ModelAdmin):
+class DrugInteractionAdmin(ActivePatientRelatedMixin, ScalableChangeListMixin, admin.ModelAdmin):
     """약물 상호작용 관리자"""
     list_display = ['patient', 'drug_name', 'side_effect', 'risk_level', 'probability', 'created_at']
     list_filter = ['risk_level', 'created_at']
     search_fields = ['patient__name', 'patient__patient_id', 'drug_name', 'side_effect']
     date_hierarchy = 'created_at'
+    list_select_related = ['patient']
+    autocomplete_fields = ['patient']
+
+    # 대용량 모드 - 변경 목록에 필요한 컬럼만 조회 (__str__ 의 patient.name 포함)
+    changelist_only_fields = [
+        'drug_name', 'side_effect', 'risk_level', 'probability', 'created_at',
+        'patient__patient_id', 'patient__name',
+    ]
 
     fieldsets = (
         ('환자 정보', {
@@ -75,15 +103,248 @@ class DrugInteractionAdmin(admin.ModelAdmin):
     ordering = ['-created_at']
 
 
+@admin.register(LabResult)
+class LabResultAdmin(ActivePatientRelatedMixin, ScalableChangeListMixin, admin.ModelAdmin):
+    """검사 결과 관리자"""
+    list_display = ['patient', 'analyte', 'measured_on', 'value', 'created_at']
+    list_filter = ['analyte']
+    search_fields = ['patient__patient_id', 'patient__name']
+    date_hierarchy = 'measured_on'
+    list_select_related = ['patient']
+    autocomplete_fields = ['patient']
+    ordering = ['-measured_on']
+
+    changelist_only_fields = [
+        'analyte', 'measured_on', 'value', 'created_at',
+        'patient__patient_id', 'patient__name',
+    ]
+
+
+@admin.register(AuditLog)
+class AuditLogAdmin(admin.ModelAdmin):
+    """감사 로그 관리자 - 조회 전용"""
+    list_display = ['changed_at', 'action', 'doctor_id', 'patient_id', 'field_name', 'old_value', 'new_value']
+    list_filter = ['action']
+    search_fields = ['=patient_id', '=doctor_id']
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    """백그라운드 작업 관리자 - 상태/시간 확인 및 재실행"""
+    list_display = ['id', 'name', 'status', 'priority', 'attempts', 'run_at', 'wait_ms', 'duration_ms', 'worker']
+    list_filter = ['status', 'name']
+    search_fields = ['=dedup_key', 'name']
+    readonly_fields = [
+        'name', 'args', 'kwargs', 'dedup_key', 'attempts', 'worker', 'last_error', 'result',
+        'created_at', 'started_at', 'heartbeat_at', 'finished_at', 'wait_ms', 'duration_ms',
+    ]
+    actions = ['retry_jobs']
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description='선택 작업 다시 실행')
+    def retry_jobs(self, request, queryset):
+        updated = queryset.exclude(status='running').update(
+            status='pending', attempts=0, run_at=timezone.now(), last_error='',
+        )
+        self.message_user(request, f'{updated}건을 다시 대기열에 넣었습니다.')
+
+
+@admin.register(CTStudy)
+class CTStudyAdmin(ActivePatientRelatedMixin, admin.ModelAdmin):
+    """CT 검사 관리자 - 변환은 import_dicom_series 명령으로 수행"""
+    list_display = ['patient', 'study_date', 'modality', 'description', 'slice_count', 'rows', 'columns', 'status']
+    list_filter = ['status', 'modality']
+    search_fields = ['patient__patient_id', 'patient__name', '=series_instance_uid']
+    list_select_related = ['patient']
+    autocomplete_fields = ['patient']
+    readonly_fields = [
+        'study_instance_uid', 'series_instance_uid', 'slice_count', 'rows', 'columns',
+        'pixel_spacing_row', 'pixel_spacing_col', 'slice_spacing', 'volume_path', 'status', 'error', 'created_at',
+    ]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(CohortSummary)
+class CohortSummaryAdmin(admin.ModelAdmin):
+    """코호트 요약 조회 - 값이 맞지 않으면 rebuild_cohort_summaries 명령으로 재계산"""
+    list_display = ['dimension', 'value', 'patient_count', 'avg_tumor_size', 'avg_tumor_count', 'avg_afp_current', 'vascular_invasion_count', 'updated_at']
+    list_filter = ['dimension']
+    readonly_fields = [field.name for field in CohortSummary._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(TumorSuggestion)
+class TumorSuggestionAdmin(ActivePatientRelatedMixin, admin.ModelAdmin):
+    """종양 분석 제안 조회 - 승인/반려는 담당 의사가 환자 상세 화면에서 처리"""
+    list_display = ['patient', 'tumor_size', 'tumor_count', 'confidence', 'model_name', 'model_version', 'status', 'reviewed_by', 'created_at']
+    list_filter = ['status', 'model_name', 'source']
+    search_fields = ['patient__patient_id', 'patient__name']
+    list_select_related = ['patient', 'reviewed_by']
+    readonly_fields = [field.name for field in TumorSuggestion._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(SurvivalModel)
+class SurvivalModelAdmin(admin.ModelAdmin):
+    """생존 예측 모델 버전 조회 - 학습/교체는 fit_survival_model 명령으로 처리"""
+    list_display = ['version', 'n_patients', 'n_events', 'log_likelihood', 'iterations', 'converged', 'is_active', 'created_at']
+    list_filter = ['is_active', 'converged']
+    readonly_fields = [field.name for field in SurvivalModel._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedPatient)
+class ArchivedPatientAdmin(admin.ModelAdmin):
+    """보관 환자 조회 및 복원 - 정기 보관은 archive_patients 명령/작업으로 처리"""
+    list_display = ['patient_id', 'name', 'doctor', 'diagnosis_date', 'death_date', 'last_followup_date', 'reason', 'payload_bytes', 'archived_at']
+    list_filter = ['reason']
+    search_fields = ['=patient_id', 'name']
+    list_select_related = ['doctor']
+    readonly_fields = [field.name for field in ArchivedPatient._meta.fields if field.name != 'payload']
+    exclude = ['payload']
+    actions = ['restore_patients']
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('payload')
+
+    @admin.action(description='선택 환자 복원')
+    def restore_patients(self, request, queryset):
+        restored = 0
+        for archived in queryset:
+            try:
+                archive.restore_patient(archived)
+            except archive.ArchiveError as e:
+                self.message_user(request, str(e), level=messages.ERROR)
+                continue
+            restored += 1
+        self.message_user(request, f'{restored}명을 복원했습니다.')
+
+
 @admin.register(Patient)
-class PatientAdmin(admin.ModelAdmin):
+class PatientAdmin(ScalableChangeListMixin, admin.ModelAdmin):
     """환자 관리자 - 담당의 변경 및 CT 이미지 업로드 전용"""
     change_form_template = 'admin/django_1pj/patient/change_form.html'
     list_display = ['patient_id', 'name', 'birth_date', 'gender', 'bclc_stage', 'recurrence_risk', 'doctor', 'updated_at']
     list_filter = ['gender', 'bclc_stage', 'recurrence_risk', 'child_pugh', 'treatment_type', 'doctor']
+    list_select_related = ['doctor']
+    autocomplete_fields = ['doctor']
+
+    # 대용량 모드 - 의사 전체 목록 필터 대신 ID 입력 필터, 필요한 컬럼만 조회
+    scaling_list_filter = ['gender', 'bclc_stage', 'recurrence_risk', 'child_pugh', 'treatment_type', DoctorIdListFilter]
+    changelist_only_fields = [
+        'patient_id', 'name', 'birth_date', 'gender', 'bclc_stage', 'recurrence_risk', 'updated_at',
+        'doctor__doctor_id', 'doctor__doctor_name',
+    ]
     search_fields = ['patient_id', 'name', 'phone']
     date_hierarchy = 'diagnosis_date'
     readonly_fields = ['created_at', 'updated_at']
+    action_form = PatientBulkActionForm
+    actions = [
+        'shift_next_ct_date', 'shift_next_blood_test_date', 'reassign_doctor', 'change_recurrence_risk',
+        'schedule_risk_summary_rebuild', 'archive_selected',
+    ]
+
+    def _report_bulk_result(self, request, summary):
+        self.message_user(request, f"{summary['updated']}건 변경되었습니다. (대상 {summary['matched']}명)")
+
+    def _shift_dates(self, request, queryset, field):
+        days = request.POST.get('days')
+        try:
+            days = int(days)
+        except (TypeError, ValueError):
+            self.message_user(request, '이동 일수를 입력해주세요.', level=messages.ERROR)
+            return
+        try:
+            summary = bulk_actions.shift_follow_up_dates(queryset, days, [field])
+        except bulk_actions.BulkActionError as e:
+            self.message_user(request, str(e), level=messages.ERROR)
+            return
+        self._report_bulk_result(request, summary)
+
+    @admin.action(description='선택 환자의 다음 CT 검사일 이동')
+    def shift_next_ct_date(self, request, queryset):
+        self._shift_dates(request, queryset, 'next_ct_date')
+
+    @admin.action(description='선택 환자의 다음 혈액검사일 이동')
+    def shift_next_blood_test_date(self, request, queryset):
+        self._shift_dates(request, queryset, 'next_blood_test_date')
+
+    @admin.action(description='선택 환자의 담당의 변경')
+    def reassign_doctor(self, request, queryset):
+        doctor_id = (request.POST.get('target_doctor') or '').strip()
+        if not doctor_id:
+            self.message_user(request, '변경할 담당의 ID를 입력해주세요.', level=messages.ERROR)
+            return
+        try:
+            doctor = DoctorProfile.objects.get(doctor_id=doctor_id)
+        except DoctorProfile.DoesNotExist:
+            self.message_user(request, f'담당의를 찾을 수 없습니다: {doctor_id}', level=messages.ERROR)
+            return
+        self._report_bulk_result(request, bulk_actions.reassign_doctor(queryset, doctor))
+
+    @admin.action(description='선택 환자의 재발위험도 변경')
+    def change_recurrence_risk(self, request, queryset):
+        try:
+            summary = bulk_actions.set_status(queryset, 'recurrence_risk', request.POST.get('recurrence_risk'))
+        except bulk_actions.BulkActionError as e:
+            self.message_user(request, str(e), level=messages.ERROR)
+            return
+        self._report_bulk_result(request, summary)
+
+    @admin.action(description='선택 환자의 위험 요약 재계산 (백그라운드)')
+    def schedule_risk_summary_rebuild(self, request, queryset):
+        patient_ids = list(queryset.order_by('pk').values_list('pk', flat=True))
+        job = jobs.enqueue('risk_summary.rebuild', kwargs={'patient_ids': patient_ids}, priority=-1)
+        self.message_user(request, f'{len(patient_ids)}명의 위험 요약 재계산을 예약했습니다. (작업 #{job.pk})')
+
+    def delete_model(self, request, obj):
+        """삭제 표시 후 관련 기록/파일은 백그라운드 정리 작업이 삭제"""
+        deletion.soft_delete_patient(obj)
+
+    def delete_queryset(self, request, queryset):
+        deletion.soft_delete_patients(queryset)
+
+    @admin.action(description='선택 환자 보관')
+    def archive_selected(self, request, queryset):
+        archived = archive.archive_patients(queryset, reason='manual')
+        self.message_user(request, f'{archived}명을 보관했습니다.')
 
     def get_fieldsets(self, request, obj=None):
         """기존 환자는 담당의와 CT만, 새 환자는 전체 정보 입력"""
@@ -131,7 +392,7 @@ class PatientAdmin(admin.ModelAdmin):
                     'fields': ('survival_1year', 'survival_3year', 'survival_5year', 'recurrence_risk')
                 }),
                 ('추적관찰', {
-                    'fields': ('next_ct_date', 'next_blood_test_date')
+                    'fields': ('next_ct_date', 'next_blood_test_date', 'last_followup_date', 'death_date')
                 }),
                 ('CT 이미지', {
                     'fields': ('ct_image',)
@@ -147,7 +408,7 @@ class PatientAdmin(admin.ModelAdmin):
                 'vascular_invasion', 'child_pugh', 'afp_initial', 'afp_current',
                 'treatment_type', 'treatment_start_date', 'survival_1year',
                 'survival_3year', 'survival_5year', 'recurrence_risk',
-                'next_ct_date', 'next_blood_test_date'
+                'next_ct_date', 'next_blood_test_date', 'last_followup_date', 'death_date'
             ]
         return self.readonly_fields
 
@@ -0,0 +1,166 @@
+"""
+관리자 화면 대용량 모드
+환자/약물 상호작용 변경 목록이 수백만 건에서도 빠르게 열리도록
+- 필요한 컬럼만 조회 (select_related + only)
+- 필터 없는 목록은 COUNT(*) 대신 DB 통계의 추정 건수 사용
+- 전체 의사 목록을 그리는 필터 대신 의사 ID 입력 필터 사용
+
+settings.ADMIN_SCALING_MODE 가 False 이면 기본 관리자 동작을 그대로 사용
+"""
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.views.main import PAGE_VAR
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def admin_scaling_enabled():
+    return getattr(settings, 'ADMIN_SCALING_MODE', False)
+
+
+def estimate_table_rows(model, using='default'):
+    """
+    DB 통계에서 테이블 행 수 추정값 조회
+    지원하지 않는 DB 이거나 통계가 없으면 None
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+
+    if connection.vendor == 'mysql':
+        sql = (
+            'SELECT TABLE_ROWS FROM information_schema.TABLES '
+            'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s'
+        )
+    elif connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s'
+    else:
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [table])
+        row = cursor.fetchone()
+
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def _is_unfiltered(queryset, base_queryset=None):
+    """
+    기본 조건 외에 필터가 없는 조회인지
+    기본 조건은 base_queryset (관리자 get_queryset) 의 조건, 없으면 기본 매니저 조건
+    (ActivePatientManager 처럼 기본 매니저가 조건을 붙이면 where 가 비어 있지 않음)
+    """
+    where = queryset.query.where
+    if not where:
+        return True
+    if base_queryset is None:
+        base_queryset = queryset.model._default_manager.all()
+    return where == base_queryset.query.where
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    필터가 없는 전체 목록은 통계 기반 추정 건수 사용
+    (InnoDB 에서 대형 테이블 COUNT(*) 는 전체 인덱스 스캔)
+    추정값에는 정리 대기 중인 삭제 표시 환자도 포함되지만 정리 작업 후 맞춰짐
+    """
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True, base_queryset=None):
+        super().__init__(object_list, per_page, orphans, allow_empty_first_page)
+        self.base_queryset = base_queryset
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if hasattr(queryset, 'query') and _is_unfiltered(queryset, self.base_queryset):
+            estimate = estimate_table_rows(queryset.model, using=queryset.db)
+            if estimate is not None:
+                return estimate
+        return super().count
+
+
+class DoctorIdListFilter(admin.ListFilter):
+    """
+    담당의 ID 입력 필터
+    의사 전체 목록을 렌더링하지 않고 입력한 doctor_id 로만 필터링
+    """
+    title = '담당의 ID'
+    parameter_name = 'doctor_id'
+    template = 'admin/django_1pj/input_filter.html'
+
+    def __init__(self, request, params, model, model_admin):
+        super().__init__(request, params, model, model_admin)
+        self.request = request
+        value = params.pop(self.parameter_name, None)
+        # Django 5 부터 파라미터 값은 리스트로 전달
+        if isinstance(value, list):
+            value = value[-1] if value else None
+        self.value = value or ''
+
+    def has_output(self):
+        return True
+
+    def expected_parameters(self):
+        return [self.parameter_name]
+
+    def queryset(self, request, queryset):
+        if self.value:
+            return queryset.filter(doctor_id=self.value)
+        return queryset
+
+    def choices(self, changelist):
+        # 입력 폼에서 현재 값과 나머지 쿼리스트링(다른 필터, 검색어 q, 정렬 o 포함) 유지용
+        # 같은 이름의 값이 여러 개일 수 있으므로 (이름, 값) 쌍 목록으로 전달
+        # 페이지 번호(p)는 필터가 바뀌면 의미가 없으므로 제외
+        excluded = {self.parameter_name, PAGE_VAR}
+        yield {
+            'value': self.value,
+            'parameter_name': self.parameter_name,
+            'other_params': [
+                (key, value)
+                for key, values in self.request.GET.lists() if key not in excluded
+                for value in values
+            ],
+            'clear_query_string': changelist.get_query_string(remove=[self.parameter_name]),
+        }
+
+
+class ScalableChangeListMixin:
+    """
+    대용량 모드용 ModelAdmin 믹스인
+
+    changelist_only_fields : 변경 목록 조회 시 불러올 컬럼 (select_related 대상 포함)
+    scaling_list_filter    : 대용량 모드에서 사용할 list_filter
+    """
+    changelist_only_fields = None
+    scaling_list_filter = None
+
+    @property
+    def show_full_result_count(self):
+        # 필터 적용 시 "전체 N건" 표시를 위한 추가 COUNT(*) 생략
+        return not admin_scaling_enabled()
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        if admin_scaling_enabled():
+            return EstimatedCountPaginator(
+                queryset, per_page, orphans, allow_empty_first_page, base_queryset=self.get_queryset(request),
+            )
+        return super().get_paginator(request, queryset, per_page, orphans, allow_empty_first_page)
+
+    def get_list_filter(self, request):
+        if admin_scaling_enabled() and self.scaling_list_filter is not None:
+            return self.scaling_list_filter
+        return super().get_list_filter(request)
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if not admin_scaling_enabled() or not self.changelist_only_fields:
+            return queryset
+
+        # 변경 목록에서만 컬럼 제한 (수정 화면은 전체 필드 필요)
+        match = getattr(request, 'resolver_match', None)
+        if match and match.url_name and match.url_name.endswith('_changelist'):
+            queryset = queryset.only(*self.changelist_only_fields)
+        return queryset
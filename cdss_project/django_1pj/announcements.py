@@ -0,0 +1,118 @@
+"""
+공지사항 피드
+활성 공지사항을 캐시에서 제공하고, 공지 저장/삭제 시 공유 버전(versions.ANNOUNCEMENTS)을 올려 캐시를 무효화
+
+- home 화면은 캐시된 목록을 사용하므로 페이지마다 DB 조회가 없음
+- JSON 피드는 버전을 ETag 로 사용 (변경 없으면 304)
+- 열린 화면에는 Server-Sent Events 로 새 공지를 전송 (ASGI 서버에서만)
+  스트림은 공지 목록이 아니라 버전 값만 주기적으로 확인
+  WSGI 에서는 async 스트림이 끝날 때까지 버퍼링되므로 화면이 ETag 피드를 주기 조회
+
+버전은 DataVersion 테이블의 카운터이므로 프로세스별 캐시(LocMemCache)여도
+다른 프로세스의 변경이 versions.CHECK_INTERVAL 이내에 반영됨
+"""
+import asyncio
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+
+from .models import Announcement
+from . import versions
+
+
+CACHE_KEY = 'announcements:active'
+
+# 피드에 노출할 최대 공지 수
+FEED_LIMIT = 20
+
+# SSE 스트림 설정
+STREAM_POLL_SECONDS = 2        # 캐시 버전 확인 주기
+STREAM_HEARTBEAT_SECONDS = 15  # 프록시 연결 유지용 주석 전송 주기
+STREAM_MAX_SECONDS = 300       # 연결 최대 유지 시간 (브라우저가 자동 재연결)
+STREAM_RETRY_MS = 5000
+
+
+def get_feed_version():
+    """현재 피드 버전 문자열 (ETag, SSE 이벤트 ID 로 사용)"""
+    return str(versions.current(versions.ANNOUNCEMENTS))
+
+
+def get_feed_etag(request=None, *args, **kwargs):
+    """condition 데코레이터용 ETag 함수"""
+    return get_feed_version()
+
+
+def _load_active_announcements():
+    rows = (
+        Announcement.objects.filter(is_active=True)
+        .order_by('-created_at')
+        .values('id', 'title', 'content', 'created_at')[:FEED_LIMIT]
+    )
+    return [
+        {
+            'id': row['id'],
+            'title': row['title'],
+            'content': row['content'],
+            'created_at': row['created_at'].isoformat(),
+        }
+        for row in rows
+    ]
+
+
+def get_active_announcements():
+    """
+    활성 공지 목록 (캐시 우선)
+    조회 전에 버전을 읽어 두고 그 버전으로 저장하므로
+    조회 도중 공지가 바뀌면 다음 요청에서 다시 조회됨
+    """
+    version = get_feed_version()
+    cached = cache.get(CACHE_KEY)
+    if cached is not None and cached['version'] == version:
+        return cached['items']
+
+    items = _load_active_announcements()
+    cache.set(CACHE_KEY, {'version': version, 'items': items}, None)
+    return items
+
+
+def invalidate_announcements():
+    """공지 저장/삭제 시 호출 - 커밋 후 공유 버전을 올려 모든 프로세스의 캐시와 ETag 무효화"""
+    versions.bump(versions.ANNOUNCEMENTS)
+
+
+def _sse_event(event, data, event_id=None):
+    lines = []
+    if event_id:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append('data: ' + json.dumps(data, ensure_ascii=False))
+    return '\n'.join(lines) + '\n\n'
+
+
+async def announcement_event_stream(last_version=None):
+    """
+    공지 변경 SSE 스트림
+    버전이 바뀔 때만 목록 전체를 전송, 나머지는 하트비트만 전송
+    """
+    get_version = sync_to_async(get_feed_version)
+    get_items = sync_to_async(get_active_announcements)
+
+    yield f'retry: {STREAM_RETRY_MS}\n\n'
+
+    started = time.monotonic()
+    last_heartbeat = started
+    while time.monotonic() - started < STREAM_MAX_SECONDS:
+        version = await get_version()
+        if version != last_version:
+            items = await get_items()
+            yield _sse_event('announcements', items, event_id=version)
+            last_version = version
+
+        now = time.monotonic()
+        if now - last_heartbeat >= STREAM_HEARTBEAT_SECONDS:
+            yield ': ping\n\n'
+            last_heartbeat = now
+
+        await asyncio.sleep(STREAM_POLL_SECONDS)
@@ -0,0 +1,1060 @@
+"""
+환자 JSON API
+EMR 연동 및 모바일 대시보드용 - 의사 세션으로 인증, 본인 담당 환자만 접근
+
+- ?fields= 로 필요한 컬럼만 조회 (.values() / .only() 로 변환)
+- 커서 기반 페이지네이션 (pk 기준 keyset)
+- 응답 gzip 압축
+"""
+import base64
+import binascii
+import json
+
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Prefetch
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import condition, require_http_methods, require_POST
+
+from .models import Patient, ArchivedPatient, DoctorProfile, DrugInteraction, BackgroundJob, CTUploadSession, CTStudy, TumorSuggestion
+from .patient_updates import (
+    PatientFormError, parse_patient_post, apply_patient_changes, save_patient_changes,
+)
+from . import bulk_actions
+from . import lab_results
+from . import audit
+from . import jobs
+from . import ct_upload
+from . import ct_volume
+from . import ct_render
+from . import exports
+from . import inference
+from . import survival
+from . import similarity
+from . import guidelines
+from .drug_graph import check_regimen
+from .drug_search import search_drugs
+from .drug_typeahead import suggest_drugs
+from .presence import get_roster, is_asgi_request, presence_event_stream
+from .announcements import (
+    get_active_announcements, get_feed_etag, get_feed_version, announcement_event_stream,
+)
+
+
+# API 로 노출하는 환자 필드 (fields 미지정 시 전체)
+PATIENT_API_FIELDS = [
+    'patient_id', 'name', 'birth_date', 'gender', 'phone',
+    'diagnosis_date', 'bclc_stage', 'tumor_size', 'tumor_count', 'vascular_invasion',
+    'child_pugh', 'afp_initial', 'afp_current',
+    'treatment_type', 'treatment_start_date',
+    'survival_1year', 'survival_3year', 'survival_5year', 'recurrence_risk',
+    'next_ct_date', 'next_blood_test_date', 'last_followup_date', 'death_date',
+    'doctor_id', 'ct_image', 'created_at', 'updated_at',
+]
+
+# 약물 상호작용 필드
+INTERACTION_API_FIELDS = [
+    'id', 'drug_name', 'risk_level', 'side_effect', 'probability',
+    'color_code', 'action_plan', 'monitoring', 'created_at',
+]
+
+# 관계 필드 - 요청 시 prefetch
+PATIENT_RELATION_FIELDS = ['drug_interactions']
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+# ============================================
+# JSON API 공통
+# ============================================
+
+def get_session_doctor(request):
+    """세션의 의사 정보 조회 (없으면 None)"""
+    doctor_id = request.session.get('doctor_id')
+    if not doctor_id:
+        return None
+    try:
+        return DoctorProfile.objects.get(doctor_id=doctor_id)
+    except DoctorProfile.DoesNotExist:
+        return None
+
+
+def json_response(data, status=200):
+    return JsonResponse(data, status=status, safe=False, json_dumps_params={'ensure_ascii': False})
+
+
+def json_error(message, status=400):
+    return json_response({'error': message}, status=status)
+
+
+def _load_json_body(request):
+    try:
+        payload = json.loads(request.body or b'{}')
+    except ValueError:
+        raise ValueError('JSON 형식이 올바르지 않습니다.')
+    if not isinstance(payload, dict):
+        raise ValueError('요청 본문은 JSON 객체여야 합니다.')
+    return payload
+
+
+def _parse_fields(raw, allowed, default):
+    """?fields=a,b,c 파싱 - 허용되지 않은 필드는 오류"""
+    if not raw:
+        return list(default)
+    fields = [f.strip() for f in raw.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ValueError(f'지원하지 않는 필드입니다: {", ".join(unknown)}')
+    return fields
+
+
+def _encode_cursor(pk):
+    return base64.urlsafe_b64encode(str(pk).encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        return int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError('cursor 값이 올바르지 않습니다.')
+
+
+def _media_url(name):
+    return f'{settings.MEDIA_URL}{name}' if name else None
+
+
+# ============================================
+# 직렬화
+# ============================================
+
+def _interaction_queryset(interaction_fields):
+    # 정렬/연결용 컬럼은 항상 포함
+    columns = set(interaction_fields) | {'id', 'patient_id', 'probability'}
+    return DrugInteraction.objects.only(*columns).order_by('-probability')
+
+
+def _serialize_row(row, fields):
+    """values() 결과 한 행을 응답 형태로 변환"""
+    data = {field: row[field] for field in fields}
+    if 'ct_image' in data:
+        data['ct_image'] = _media_url(data['ct_image'])
+    return data
+
+
+def _serialize_instance(patient, fields, interaction_fields):
+    """only() 로 조회한 인스턴스를 응답 형태로 변환"""
+    data = {}
+    for field in fields:
+        if field == 'drug_interactions':
+            data[field] = [
+                {f: getattr(item, f) for f in interaction_fields}
+                for item in patient.drug_interactions.all()
+            ]
+        elif field == 'ct_image':
+            data[field] = _media_url(patient.ct_image.name)
+        else:
+            data[field] = getattr(patient, field)
+    return data
+
+
+def _select_patients(queryset, fields, interaction_fields):
+    """
+    요청 필드에 맞춰 조회 방식 결정
+    관계 필드가 없으면 values() 로 모델 생성 없이 조회,
+    있으면 only() + prefetch 로 상호작용을 한 번에 조회
+    """
+    scalar_fields = [f for f in fields if f not in PATIENT_RELATION_FIELDS]
+
+    if len(scalar_fields) == len(fields):
+        rows = queryset.values('pk', *scalar_fields)
+        return rows, lambda row: _serialize_row(row, fields), lambda row: row['pk']
+
+    rows = queryset.only('pk', *scalar_fields).prefetch_related(
+        Prefetch('drug_interactions', queryset=_interaction_queryset(interaction_fields))
+    )
+    return (
+        rows,
+        lambda patient: _serialize_instance(patient, fields, interaction_fields),
+        lambda patient: patient.pk,
+    )
+
+
+def _request_fields(request):
+    fields = _parse_fields(
+        request.GET.get('fields'),
+        PATIENT_API_FIELDS + PATIENT_RELATION_FIELDS,
+        PATIENT_API_FIELDS,
+    )
+    interaction_fields = _parse_fields(
+        request.GET.get('interaction_fields'),
+        INTERACTION_API_FIELDS,
+        INTERACTION_API_FIELDS,
+    )
+    return fields, interaction_fields
+
+
+# ============================================
+# 환자 API
+# ============================================
+
+@gzip_page
+@require_http_methods(['GET', 'POST'])
+def patient_list_api(request):
+    """
+    GET  : 담당 환자 목록 (?fields=, ?cursor=, ?limit=)
+    POST : 환자 등록
+    """
+    doctor_profile = get_session_doctor(request)
+    if doctor_profile is None:
+        return json_error('로그인이 필요합니다.', status=401)
+
+    if request.method == 'POST':
+        return _create_patient(request, doctor_profile)
+
+    try:
+        fields, interaction_fields = _request_fields(request)
+        limit = min(int(request.GET.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+        if limit < 1:
+            raise ValueError('limit 은 1 이상이어야 합니다.')
+        cursor = request.GET.get('cursor')
+        after_pk = _decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return json_error(str(e))
+
+    patients = Patient.objects.filter(doctor=doctor_profile).order_by('pk')
+    if after_pk is not None:
+        patients = patients.filter(pk__gt=after_pk)
+
+    # 다음 페이지 존재 여부 확인을 위해 1건 더 조회
+    rows, serialize, get_pk = _select_patients(patients[:limit + 1], fields, interaction_fields)
+    rows = list(rows)
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+
+    return json_response({
+        'results': [serialize(row) for row in rows],
+        'next_cursor': _encode_cursor(get_pk(rows[-1])) if has_next else None,
+    })
+
+
+def _create_patient(request, doctor_profile):
+    try:
+        payload = _load_json_body(request)
+        cleaned = parse_patient_post(payload)
+        patient_id = str(payload.get('patient_id') or '').strip()
+        if not patient_id:
+            raise PatientFormError('환자번호를 입력해주세요.')
+    except ValueError as e:
+        return json_error(str(e))
+
+    if Patient.all_objects.filter(patient_id=patient_id, deleted_at__isnull=False).exists():
+        return json_error('삭제 처리 중인 환자번호입니다. 잠시 후 다시 시도해주세요.', status=409)
+    if ArchivedPatient.objects.filter(patient_id=patient_id).exists():
+        return json_error('보관된 환자번호입니다. 보관 환자 목록에서 복원해주세요.', status=409)
+    if Patient.objects.filter(patient_id=patient_id).exists():
+        return json_error('이미 등록된 환자번호입니다.', status=409)
+
+    patient = Patient(patient_id=patient_id, doctor=doctor_profile)
+    apply_patient_changes(patient, cleaned)
+    patient.save()
+    audit.record_create(doctor_profile.doctor_id, patient)
+    lab_results.record_new_patient_afp(patient)
+
+    fields, interaction_fields = PATIENT_API_FIELDS, INTERACTION_API_FIELDS
+    return json_response(_serialize_instance(patient, fields, interaction_fields), status=201)
+
+
+@gzip_page
+@require_http_methods(['GET', 'PATCH'])
+def patient_detail_api(request, patient_id):
+    """
+    GET   : 환자 상세 (?fields=)
+    PATCH : 전달된 필드만 수정, 변경된 컬럼만 저장
+    """
+    doctor_profile = get_session_doctor(request)
+    if doctor_profile is None:
+        return json_error('로그인이 필요합니다.', status=401)
+
+    patients = Patient.objects.filter(patient_id=patient_id, doctor=doctor_profile)
+
+    if request.method == 'PATCH':
+        try:
+            patient = patients.get()
+        except Patient.DoesNotExist:
+            return json_error('해당 환자 정보를 찾을 수 없습니다.', status=404)
+        try:
+            cleaned = parse_patient_post(_load_json_body(request), partial=True)
+        except ValueError as e:
+            return json_error(str(e))
+
+        before = audit.snapshot(patient)
+        changed_fields = apply_patient_changes(patient, cleaned)
+        if save_patient_changes(patient, changed_fields):
+            audit.record_update(doctor_profile.doctor_id, patient, before, changed_fields)
+            lab_results.record_patient_afp(patient, changed_fields)
+        return json_response({'patient_id': patient.patient_id, 'changed_fields': changed_fields})
+
+    try:
+        fields, interaction_fields = _request_fields(request)
+    except ValueError as e:
+        return json_error(str(e))
+
+    rows, serialize, _ = _select_patients(patients, fields, interaction_fields)
+    rows = list(rows)
+    if not rows:
+        return json_error('해당 환자 정보를 찾을 수 없습니다.', status=404)
+    return json_response(serialize(rows[0]))
+
+
+# ============================================
+# CT 분할 업로드 API
+# ============================================
+
+@require_POST
+def ct_upload_start_api(request, patient_id):
+    """
+    업로드 세션 시작
+    {"filename": "ct.png", "size": 73400320, "chunk_size": 5242880, "checksum": "<전체 SHA-256, 선택>"}
+    """
+    doctor_profile = get_session_doctor(request)
+    if doctor_profile is None:
+        return json_error('로그인이 필요합니다.', status=401)
+
+    try:
+        patient = Patient.objects.get(patient_id=patient_id, doctor=doctor_profile)
+    except Patient.DoesNotExist:
+        return json_error('해당 환자 정보를 찾을 수 없습니다.', status=404)
+
+    try:
+        payload = _load_json_body(request)
+        session = ct_upload.start_upload(
+            patient, doctor_profile,
+            filename=payload.get('filename'),
+            total_size=payload.get('size'),
+            chunk_size=payload.get('chunk_size'),
+            checksum=payload.get('checksum'),
+        )
+    except ct_upload.UploadError as e:
+        return json_error(str(e), status=e.status)
+    except ValueError as e:
+        return json_error(str(e))
+
+    # 중단된 업로드 정리 예약 (대기 중인 정리 작업이 있으면 그 작업 사용)
+    jobs.enqueue(
+        'ct_uploads.cleanup',
+        dedup_key='ct_uploads.cleanup',
+        delay=ct_upload.UPLOAD_EXPIRE_HOURS * 3600,
+        priority=-10,
+    )
+    return json_response(ct_upload.session_state(session), status=201)
+
+
+def _get_upload_session(request, upload_id):
+    """본인이 시작한 업로드 세션 (응답 오류는 (None, 응답))"""
+    doctor_profile = get_session_doctor(request)
+    if doctor_profile is None:
+        return None, json_error('로그인이 필요합니다.', status=401)
+    session = (
+        CTUploadSession.objects.select_related('patient')
+        .filter(pk=upload_id, doctor=doctor_profile, patient__doctor=doctor_profile, patient__deleted_at__isnull=True)
+        .first()
+    )
+    if session is None:
+        return None, json_error('업로드 세션을 찾을 수 없습니다.', status=404)
+    return session, None
+
+
+@require_http_methods(['GET', 'DELETE'])
+def ct_upload_detail_api(request, upload_id):
+    """
+    GET    : 업로드 상태 (재개 시 missing_chunks 만 다시 전송)
+    DELETE : 업로드 취소
+    """
+    session, error = _get_upload_session(request, upload_id)
+    if error:
+        return error
+
+    if request.method == 'DELETE':
+        try:
+            ct_upload.abort_upload(session)
+        except ct_upload.UploadError as e:
+            return json_error(str(e), status=e.status)
+    return json_response(ct_upload.session_state(session))
+
+
+@require_http_methods(['PUT'])
+def ct_upload_chunk_api(request, upload_id, index):
+    """청크 전송 - 본문은 청크 바이트 그대로, X-Chunk-SHA256 헤더에 청크 해시"""
+    session, error = _get_upload_session(request, upload_id)
+    if error:
+        return error
+
+    try:
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        ct_upload.write_chunk(
+            session, index, request,
+            content_length=content_length,
+            expected_sha256=request.headers.get('X-Chunk-SHA256'),
+        )
+    except ct_upload.UploadError as e:
+        return json_error(str(e), status=e.status)
+    return json_response({'upload_id': str(session.pk), 'index': index})
+
+
+@require_POST
+def ct_upload_complete_api(request, upload_id):
+    """모든 청크 수신 후 합쳐서 환자 CT 이미지로 저장"""
+    session, error = _get_upload_session(request, upload_id)
+    if error:
+        return error
+
+    try:
+        name = ct_upload.complete_upload(session, session.doctor_id)
+    except ct_upload.UploadError as e:
+        return json_error(str(e), status=e.status)
+    return json_response({
+        'upload_id': str(session.pk),
+        'patient_id': session.patient.patient_id,
+        'ct_image': _media_url(name),
+    })
+
+
+# ============================================
+# CT 검사 (DICOM 볼륨) API
+# ============================================
+
+@require_http_methods(['GET'])
+def patient_ct_studies_api(request, patient_id):
+    """담당 환자의 CT 검사 목록"""
+    doctor_profile = get_session_doctor(request)
+    if doctor_profile is None:
+        return json_error('로그인이 필요합니다.', status=401)
+
+    studies = CTStudy.objects.select_related('patient').filter(
+        patient__patient_id=patient_id, patient__doctor=doctor_profile, patient__deleted_at__isnull=True,
+    )
+    return json_response({'results': [ct_volume.study_metadata(study) for study in studies]})
+
+
+def _get_ct_study(request, study_id):
+    """담당 환자의 CT 검사 (응답 오류는 (None, 응답))"""
+    doctor_profile = get_session_doctor(request)
+    if doctor_profile is None:
+        return None, json_error('로그인이 필요합니다.', status=401)
+    study = CTStudy.objects.select_related('patient').filter(
+        pk=study_id, patient__doctor=doctor_profile, patient__deleted_at__isnull=True,
+    ).first()
+    if study is None:
+        return None, json_error('해당 CT 검사를 찾을 수 없습니다.', status=404)
+    return study, None
+
+
+@require_http_methods(['GET'])
+def ct_study_detail_api(request, study_id):
+    """CT 검사 정보 (볼륨 형태, 간격, 단면별 슬라이스 수)"""
+    study, error = _get_ct_study(request, study_id)
+    if error:
+        return error
+    return json_response(ct_volume.study_metadata(study))
+
+
+@require_http_methods(['GET'])
+def ct_slice_raw_api(request, study_id, plane, index):
+    """
+    단면 1장의 HU 값 (int16 little-endian, 행 우선)
+    X-Slice-Shape 헤더로 (높이, 너비) 전달 - 외부 뷰어 연동용
+    """
+    study, error = _get_ct_study(request, study_id)
+    if error:
+        return error
+    try:
+        pixels = ct_volume.get_slice(study, plane, index)
+    except ct_volume.VolumeError as e:
+        return json_error(str(e))
+
+    # 필요한 단면만 연속 배열로 복사하여 전송
+    data = np.ascontiguousarray(pixels, dtype='<i2').tobytes()
+    response = HttpResponse(data, content_type='application/octet-stream')
+    response['X-Slice-Shape'] = f'{pixels.shape[0]},{pixels.shape[1]}'
+    response['X-Pixel-Aspect'] = f'{ct_volume.plane_aspect(study, plane):.6f}'
+    return response
+
+
+@require_http_methods(['GET'])
+def ct_slice_image_api(request, study_id, plane, index):
+    """
+    window/level 적용한 단면 이미지
+    ?preset=liver|arterial|soft_tissue|bone|lung 또는 ?level=&width=, ?format=png|webp
+    """
+    study, error = _get_ct_study(request, study_id)
+    if error:
+        return error
+    try:
+        window = ct_render.resolve_window(
+            request.GET.get('preset'), request.GET.get('level'), request.GET.get('width'),
+        )
+        image_format = request.GET.get('format', ct_render.DEFAULT_FORMAT)
+        data, content_type = ct_render.render_slice(study, plane, index, window, image_format)
+    except ValueError as e:
+        return json_error(str(e))
+
+    response = HttpResponse(data, content_type=content_type)
+    # 같은 볼륨/단면/window 이면 이미지가 바뀌지 않으므로 브라우저 캐시 허용
+    response['Cache-Control'] = 'private, max-age=3600'
+    return response
+
+
+# ============================================
+# 종양 분석 (CT 추론) API
+# ============================================
+
+@require_http_methods(['GET', 'POST'])
+def patient_tumor_suggestions_api(request, patient_id):
+    """
+    GET  : 종양 분석 제안 목록 (?status=pending)
+    POST : 분석 예약 (백그라운드 작업) - 작업 ID 반환
+    """
+    doctor_profile = get_session_doctor(request)
+    if doctor_profile is None:
+        return json_error('로그인이 필요합니다.', status=401)
+    patient = Patient.objects.filter(patient_id=patient_id, doctor=doctor_profile).first()
+    if patient is None:
+        return json_error('해당 환자를 찾을 수 없습니다.', status=404)
+
+    if request.method == 'POST':
+        if not inference.is_model_configured():
+            return json_error('CT 분석 모델이 설정되어 있지 않습니다.', status=503)
+        # 영상이 없으면 재시도해도 실패하므로 예약 전에 확인
+        if not patient.ct_image and not patient.ct_studies.filter(status='ready').exists():
+            return json_error('분석할 CT 영상이 없습니다.', status=422)
+        job = jobs.enqueue(
+            'tumor_analysis.run',
+            kwargs={'patient_id': patient.patient_id, 'doctor_id': doctor_profile.doctor_id},
+            priority=5,
+            dedup_key=f'tumor_analysis.run:{patient.patient_id}',
+        )
+        return json_response({'job_id': job.pk, 'status': job.status}, status=202)
+
+    suggestions = patient.tumor_suggestions.select_related('patient')
+    status = request.GET.get('status')
+    if status:
+        suggestions = suggestions.filter(status=status)
+    return json_response({'results': [inference.suggestion_data(s) for s in suggestions[:50]]})
+
+
+@require_POST
+def tumor_suggestion_review_api(request, suggestion_id):
+    """제안 승인/반려 - 본문 {"decision": "accept" | "reject"}"""
+    doctor_profile = get_session_doctor(request)
+    if doctor_profile is None:
+        return json_error('로그인이 필요합니다.', status=401)
+
+    suggestion = TumorSuggestion.objects.select_related('patient').filter(
+        pk=suggestion_id, patient__doctor=doctor_profile, patient__deleted_at__isnull=True,
+    ).first()
+    if suggestion is None:
+        return json_error('해당 분석 제안을 찾을 수 없습니다.', status=404)
+
+    try:
+        decision = _load_json_body(request).get('decision')
+    except ValueError as e:
+        return json_error(str(e))
+    if decision not in ('accept', 'reject'):
+        return json_error('decision 은 accept 또는 reject 이어야 합니다.')
+
+    try:
+        changed_fields = inference.review_suggestion(suggestion, doctor_profile, decision == 'accept')
+    except inference.InferenceError as e:
+        return json_error(str(e), status=409)
+    suggestion.refresh_from_db()
+    return json_response({**inference.suggestion_data(suggestion), 'changed_fields': changed_fields})
+
+
+# ============================================
+# 생존 분석 API
+# ============================================
+
+@require_http_methods(['GET'])
+def survival_api(request):
+    """
+    Kaplan-Meier 생존 곡선 + log-rank 검정
+    ?group_by=bclc_stage|treatment_type, 코호트 필터: ?bclc_stage=&treatment_type=&child_pugh=&recurrence_risk=
+    """
+    doctor_profile = get_session_doctor(request)
+    if doctor_profile is None:
+        return json_error('로그인이 필요합니다.', status=401)
+
+    filters = {key: value for key, value in request.GET.items() if key != 'group_by'}
+    try:
+        result = survival.compute_survival(request.GET.get('group_by') or None, filters)
+    except survival.SurvivalError as e:
+        return json_error(str(e))
+    return json_response(result)
+
+
+@require_http_methods(['GET'])
+def patient_similar_api(request, patient_id):
+    """유사 환자 k 명과 치료 방식별 요약 (?k=5, 최대 similarity.MAX_K)"""
+    doctor_profile = get_session_doctor(request)
+    if doctor_profile is None:
+        return json_error('로그인이 필요합니다.', status=401)
+    patient = Patient.objects.filter(patient_id=patient_id, doctor=doctor_profile).first()
+    if patient is None:
+        return json_error('해당 환자를 찾을 수 없습니다.', status=404)
+
+    try:
+        k = int(request.GET.get('k', similarity.DEFAULT_K))
+    except ValueError:
+        return json_error('k 는 정수여야 합니다.')
+    return json_response(similarity.similar_patients(patient, k=k, doctor=doctor_profile))
+
+
+@require_http_methods(['GET'])
+def guideline_api(request):
+    """
+    BCLC 가이드라인 권고 (입력 폼에서 값이 바뀔 때마다 호출)
+    ?bclc_stage=&child_pugh=&tumor_size=&tumor_count=&vascular_invasion=true|false
+    """
+    doctor_profile = get_session_doctor(request)
+    if doctor_profile is None:
+        return json_error('로그인이 필요합니다.', status=401)
+
+    try:
+        tumor_size = float(request.GET['tumor_size']) if request.GET.get('tumor_size') else None
+        tumor_count = int(request.GET['tumor_count']) if request.GET.get('tumor_count') else None
+    except ValueError:
+        return json_error('종양 크기/개수는 숫자여야 합니다.')
+    outcome = guidelines.evaluate(
+        request.GET.get('bclc_stage'),
+        request.GET.get('child_pugh'),
+        tumor_size,
+        tumor_count,
+        request.GET.get('vascular_invasion') in ('true', '1', 'on'),
+    )
+    return json_response(outcome)
+
+
+# ============================================
+# 백그라운드 작업 API
+# ============================================
+
+JOB_API_FIELDS = [
+    'id', 'name', 'status', 'attempts', 'result', 'created_at', 'started_at', 'finished_at',
+    'wait_ms', 'duration_ms',
+]
+
+
+@require_POST
+def patient_export_api(request):
+    """담당 환자 CSV 내보내기 예약 - 작업 ID 반환 (대기 중인 내보내기가 있으면 그 작업)"""
+    doctor_profile = get_session_doctor(request)
+    if doctor_profile is None:
+        return json_error('로그인이 필요합니다.', status=401)
+
+    job = jobs.enqueue(
+        'patients.export_csv',
+        kwargs={'doctor_id': doctor_profile.doctor_id},
+        dedup_key=f'patients.export_csv:{doctor_profile.doctor_id}',
+    )
+    # 만료된 내보내기 파일 정리 예약 (대기 중인 정리 작업이 있으면 그 작업 사용)
+    jobs.enqueue(
+        'exports.cleanup',
+        dedup_key='exports.cleanup',
+        delay=exports.EXPORT_EXPIRE_HOURS * 3600,
+        priority=-10,
+    )
+    return json_response({'job_id': job.pk, 'status': job.status}, status=202)
+
+
+@require_http_methods(['GET'])
+def job_status_api(request, job_id):
+    """본인이 예약한 작업 상태 조회"""
+    doctor_profile = get_session_doctor(request)
+    if doctor_profile is None:
+        return json_error('로그인이 필요합니다.', status=401)
+
+    job = (
+        BackgroundJob.objects.filter(pk=job_id, kwargs__doctor_id=doctor_profile.doctor_id)
+        .values(*JOB_API_FIELDS)
+        .first()
+    )
+    if job is None:
+        return json_error('해당 작업을 찾을 수 없습니다.', status=404)
+    if job['status'] == 'succeeded' and isinstance(job['result'], dict) and job['result'].get('file'):
+        job['result'] = {**job['result'], 'url': reverse('api_job_download', args=[job['id']])}
+    return json_response(job)
+
+
+@require_http_methods(['GET'])
+def job_download_api(request, job_id):
+    """본인이 예약한 내보내기 작업의 결과 파일 다운로드 (만료 후 410)"""
+    doctor_profile = get_session_doctor(request)
+    if doctor_profile is None:
+        return json_error('로그인이 필요합니다.', status=401)
+
+    result = (
+        BackgroundJob.objects.filter(
+            pk=job_id, name='patients.export_csv', status='succeeded',
+            kwargs__doctor_id=doctor_profile.doctor_id,
+        )
+        .values_list('result', flat=True)
+        .first()
+    )
+    if not isinstance(result, dict) or not result.get('file'):
+        return json_error('해당 작업을 찾을 수 없습니다.', status=404)
+
+    path = exports.export_path(result['file'])
+    if path is None:
+        return json_error('내보내기 파일이 만료되었습니다. 다시 내보내기를 요청하세요.', status=410)
+    response = FileResponse(open(path, 'rb'), as_attachment=True, filename=result['file'],
+                            content_type='text/csv; charset=utf-8')
+    response['Cache-Control'] = 'private, no-store'
+    return response
+
+
+# ============================================
+# 약물 상호작용 API
+# ============================================
+
+INTERACTION_WRITE_FIELDS = [
+    'drug_name', 'risk_level', 'side_effect', 'probability',
+    'color_code', 'action_plan', 'monitoring',
+]
+
+
+@gzip_page
+@require_http_methods(['GET', 'POST'])
+def patient_interactions_api(request, patient_id):
+    """
+    GET  : 환자의 약물 상호작용 목록 (?fields=)
+    POST : 약물 상호작용 등록
+    """
+    doctor_profile = get_session_doctor(request)
+    if doctor_profile is None:
+        return json_error('로그인이 필요합니다.', status=401)
+
+    try:
+        patient = Patient.objects.only('pk').get(patient_id=patient_id, doctor=doctor_profile)
+    except Patient.DoesNotExist:
+        return json_error('해당 환자 정보를 찾을 수 없습니다.', status=404)
+
+    if request.method == 'POST':
+        try:
+            payload = _load_json_body(request)
+        except ValueError as e:
+            return json_error(str(e))
+
+        interaction = DrugInteraction(
+            patient=patient,
+            **{f: payload[f] for f in INTERACTION_WRITE_FIELDS if f in payload}
+        )
+        try:
+            interaction.full_clean(exclude=['patient'])
+        except ValidationError as e:
+            return json_response({'error': e.message_dict}, status=400)
+        interaction.save()
+        return json_response({f: getattr(interaction, f) for f in INTERACTION_API_FIELDS}, status=201)
+
+    try:
+        fields = _parse_fields(request.GET.get('fields'), INTERACTION_API_FIELDS, INTERACTION_API_FIELDS)
+    except ValueError as e:
+        return json_error(str(e))
+
+    rows = DrugInteraction.objects.filter(patient=patient).order_by('-probability').values(*fields)
+    return json_response({'results': list(rows)})
+
+
+# ============================================
+# 검사 결과 시계열 API
+# ============================================
+
+@gzip_page
+@require_http_methods(['GET', 'POST'])
+def patient_lab_results_api(request, patient_id, analyte):
+    """
+    GET  : 검사 결과 추세 (?start=&end=&points=) - 차트용 다운샘플링 + 추세 통계
+    POST : 검사 결과 추가 {"results": [{"date": "2025-01-02", "value": 12.3}, ...]}
+    """
+    doctor_profile = get_session_doctor(request)
+    if doctor_profile is None:
+        return json_error('로그인이 필요합니다.', status=401)
+    if analyte not in lab_results.ANALYTES:
+        return json_error(f'알 수 없는 검사 항목입니다: {analyte}', status=404)
+
+    try:
+        patient = Patient.objects.only('pk').get(patient_id=patient_id, doctor=doctor_profile)
+    except Patient.DoesNotExist:
+        return json_error('해당 환자 정보를 찾을 수 없습니다.', status=404)
+
+    if request.method == 'POST':
+        try:
+            payload = _load_json_body(request)
+            rows = [(row['date'], row['value']) for row in payload.get('results', [])]
+            created = lab_results.record_results(patient, analyte, rows)
+        except (AttributeError, KeyError, TypeError):
+            return json_error('results 는 {"date", "value"} 목록이어야 합니다.')
+        except ValueError as e:
+            return json_error(str(e))
+        return json_response({'created': len(created)}, status=201)
+
+    try:
+        points = int(request.GET.get('points', lab_results.DEFAULT_CHART_POINTS))
+        if points < 2:
+            raise ValueError
+        trend = lab_results.get_trend(
+            patient.pk, analyte,
+            start=request.GET.get('start') or None,
+            end=request.GET.get('end') or None,
+            max_points=points,
+        )
+    except ValueError as e:
+        return json_error(str(e) or 'points 는 2 이상의 정수여야 합니다.')
+    return json_response(trend)
+
+
+# ============================================
+# 감사 로그 API
+# ============================================
+
+AUDIT_API_FIELDS = [
+    'id', 'action', 'doctor_id', 'patient_id', 'field_name',
+    'old_value', 'new_value', 'changed_at',
+]
+
+
+def _audit_page(request, query, key):
+    """감사 로그 조회 공통 (?limit=, ?cursor=) - id 커서로 이전 기록 조회"""
+    try:
+        limit = min(int(request.GET.get('limit', DEFAULT_PAGE_SIZE)), audit.MAX_QUERY_LIMIT)
+        if limit < 1:
+            raise ValueError('limit 은 1 이상이어야 합니다.')
+        cursor = request.GET.get('cursor')
+        before_id = _decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return json_error(str(e))
+
+    rows = list(query(key, limit=limit + 1, before_id=before_id).values(*AUDIT_API_FIELDS))
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+    return json_response({
+        'results': rows,
+        'next_cursor': _encode_cursor(rows[-1]['id']) if has_next else None,
+    })
+
+
+@gzip_page
+@require_http_methods(['GET'])
+def patient_audit_api(request, patient_id):
+    """담당 환자의 변경 이력 (최신순)"""
+    doctor_profile = get_session_doctor(request)
+    if doctor_profile is None:
+        return json_error('로그인이 필요합니다.', status=401)
+    if not Patient.objects.filter(patient_id=patient_id, doctor=doctor_profile).exists():
+        return json_error('해당 환자 정보를 찾을 수 없습니다.', status=404)
+    return _audit_page(request, audit.entries_for_patient, patient_id)
+
+
+@gzip_page
+@require_http_methods(['GET'])
+def doctor_audit_api(request):
+    """로그인한 의사가 변경한 이력 (최신순, 삭제한 환자 포함)"""
+    doctor_profile = get_session_doctor(request)
+    if doctor_profile is None:
+        return json_error('로그인이 필요합니다.', status=401)
+    return _audit_page(request, audit.entries_for_doctor, doctor_profile.doctor_id)
+
+
+# ============================================
+# 환자 일괄 처리 API
+# ============================================
+
+@require_POST
+def patient_bulk_update_api(request):
+    """
+    담당 환자 일괄 처리 (일정 이동 / 담당의 변경 / 상태 변경)
+
+    요청 예시:
+        {"action": "shift_dates", "days": 7, "fields": ["next_ct_date"],
+         "filter": {"next_ct_date": "2025-11-03"}}
+        {"action": "reassign", "doctor_id": "doc02", "filter": {"patient_ids": ["P001"]}}
+        {"action": "set_status", "field": "recurrence_risk", "value": "high", "filter": {...}}
+    """
+    doctor_profile = get_session_doctor(request)
+    if doctor_profile is None:
+        return json_error('로그인이 필요합니다.', status=401)
+
+    try:
+        payload = _load_json_body(request)
+    except ValueError as e:
+        return json_error(str(e))
+
+    # 본인 담당 환자만 대상
+    patients = Patient.objects.filter(doctor=doctor_profile)
+
+    try:
+        patients = bulk_actions.filter_patients(patients, payload.get('filter'))
+        action = payload.get('action')
+
+        if action == 'shift_dates':
+            try:
+                days = int(payload.get('days'))
+            except (TypeError, ValueError):
+                raise bulk_actions.BulkActionError('days 는 정수여야 합니다.')
+            summary = bulk_actions.shift_follow_up_dates(patients, days, payload.get('fields'))
+
+        elif action == 'reassign':
+            try:
+                new_doctor = DoctorProfile.objects.get(doctor_id=payload.get('doctor_id'))
+            except DoctorProfile.DoesNotExist:
+                raise bulk_actions.BulkActionError('변경할 담당의를 찾을 수 없습니다.')
+            summary = bulk_actions.reassign_doctor(patients, new_doctor)
+
+        elif action == 'set_status':
+            summary = bulk_actions.set_status(patients, payload.get('field'), payload.get('value'))
+
+        else:
+            raise bulk_actions.BulkActionError(f'지원하지 않는 작업입니다: {action}')
+
+    except bulk_actions.BulkActionError as e:
+        return json_error(str(e))
+
+    return json_response(summary)
+
+
+# ============================================
+# 약물 조합 검사 API
+# ============================================
+
+@gzip_page
+@require_http_methods(['GET'])
+def drug_regimen_check_api(request):
+    """
+    처방 조합 상호작용 검사
+    ?codes=SORA,LENVA,... (drug_code 목록)
+    """
+    if get_session_doctor(request) is None:
+        return json_error('로그인이 필요합니다.', status=401)
+
+    codes = [c.strip() for c in request.GET.get('codes', '').split(',') if c.strip()]
+    if not codes:
+        return json_error('codes 를 입력해주세요.')
+
+    return json_response({'codes': codes, 'conflicts': check_regimen(codes)})
+
+
+# ============================================
+# 약물 검색 API
+# ============================================
+
+@gzip_page
+@require_http_methods(['GET'])
+def drug_search_api(request):
+    """
+    약물 정보 전문 검색 (효능/주의사항/부작용/금기)
+    ?q=간성뇌증&limit=20
+    """
+    if get_session_doctor(request) is None:
+        return json_error('로그인이 필요합니다.', status=401)
+
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return json_error('검색어를 입력해주세요.')
+    try:
+        limit = min(max(int(request.GET.get('limit', 20)), 1), 100)
+    except ValueError:
+        return json_error('limit 은 정수여야 합니다.')
+
+    return json_response({'query': query, 'results': search_drugs(query, limit=limit)})
+
+
+@require_http_methods(['GET'])
+def drug_autocomplete_api(request):
+    """
+    약물 자동완성 (약물명/영문명/코드, 초성 검색 지원)
+    ?q=ㅅㄹㅍ&limit=10
+    """
+    if get_session_doctor(request) is None:
+        return json_error('로그인이 필요합니다.', status=401)
+
+    try:
+        limit = max(int(request.GET.get('limit', 10)), 1)
+    except ValueError:
+        return json_error('limit 은 정수여야 합니다.')
+
+    return json_response({'results': suggest_drugs(request.GET.get('q', ''), limit=limit)})
+
+
+# ============================================
+# 공지사항 피드 API
+# ============================================
+
+@require_http_methods(['GET'])
+def announcement_feed_api(request):
+    """활성 공지 목록 (캐시 제공, 변경 없으면 304) - 로그인 확인 후 ETag 비교"""
+    if get_session_doctor(request) is None:
+        return json_error('로그인이 필요합니다.', status=401)
+    return _announcement_feed(request)
+
+
+@condition(etag_func=get_feed_etag)
+def _announcement_feed(request):
+    return json_response({
+        'version': get_feed_version(),
+        'results': get_active_announcements(),
+    })
+
+
+async def announcement_stream_api(request):
+    """
+    공지 변경 Server-Sent Events 스트림
+    ASGI 환경에서 연결당 스레드 없이 동작
+    """
+    if request.method != 'GET':
+        return json_error('GET 요청만 지원합니다.', status=405)
+    if not is_asgi_request(request):
+        return json_error('실시간 스트림은 ASGI 서버에서만 지원합니다.', status=503)
+    if await sync_to_async(get_session_doctor)(request) is None:
+        return json_error('로그인이 필요합니다.', status=401)
+
+    # 재연결 시 브라우저가 마지막 버전을 Last-Event-ID 로 전달
+    last_version = request.headers.get('Last-Event-ID')
+    response = StreamingHttpResponse(
+        announcement_event_stream(last_version),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# ============================================
+# 의사 현황 API
+# ============================================
+
+@require_http_methods(['GET'])
+def doctor_presence_api(request):
+    """상태별 인원수와 의사 목록 (캐시 제공)"""
+    if get_session_doctor(request) is None:
+        return json_error('로그인이 필요합니다.', status=401)
+    return json_response(get_roster())
+
+
+async def doctor_presence_stream_api(request):
+    """의사 상태 변경 Server-Sent Events 스트림 (ASGI 에서 WebSocket 연결이 안 될 때)"""
+    if request.method != 'GET':
+        return json_error('GET 요청만 지원합니다.', status=405)
+    if not is_asgi_request(request):
+        return json_error('실시간 스트림은 ASGI 서버에서만 지원합니다.', status=503)
+    if await sync_to_async(get_session_doctor)(request) is None:
+        return json_error('로그인이 필요합니다.', status=401)
+
+    response = StreamingHttpResponse(presence_event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
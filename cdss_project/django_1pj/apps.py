@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class Django1PjConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "django_1pj"
+
+    def ready(self):
+        # 시그널 등록
+        from . import signals  # noqa: F401
+        # 백그라운드 작업 등록
+        from . import tasks  # noqa: F401
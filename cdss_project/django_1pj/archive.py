@@ -0,0 +1,248 @@
+"""
+환자 보관 (hot/cold 분리)
+사망 후 일정 기간이 지났거나 오래 내원하지 않은 환자를 Patient 와 관련 테이블에서 ArchivedPatient 로 옮겨
+홈 목록/검색/관리자 목록이 다루는 Patient 테이블을 작게 유지
+
+- 기준은 settings.PATIENT_ARCHIVE_POLICY (사망 후 경과일, 미내원 경과일, 배치 크기)
+- 배치 단위로 환자 + 관련 행을 values() 로 읽어 압축 JSON 1건으로 저장하고, 원본은 집합 DELETE
+  (행별 삭제 시그널/CT 볼륨 파일 삭제가 일어나지 않도록 _raw_delete 사용, 코호트 요약은 집합 단위로 차감)
+- 보관 환자는 분석 컬럼을 그대로 가지고 있어 생존 분석/모델 학습/유사 환자 검색에 계속 포함
+- 복원은 원래 pk 그대로 다시 INSERT (auto_now 값 보존을 위해 raw insert), CT 파일은 옮기지 않으므로 그대로 연결됨
+  보관 중 삭제된 의사 등을 가리키는 FK 는 SET_NULL 이면 비우고, CASCADE/PROTECT 이면 복원 거부 (ArchiveError)
+"""
+import datetime
+import json
+import zlib
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, models, router, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import (
+    ArchivedPatient, CTStudy, CTUploadSession, DrugInteraction, LabResult, Patient, PatientRiskSummary,
+    TumorSuggestion,
+)
+from . import audit
+from . import cohort
+
+
+DEFAULT_POLICY = {
+    'deceased_days': 365,
+    'inactive_days': 365 * 3,
+    'batch_size': 500,
+}
+
+# 환자와 함께 옮기는 관련 테이블 - 삭제는 이 순서, 복원은 역순
+# (다른 관련 테이블을 참조하는 모델이 앞에 와야 함: TumorSuggestion -> CTStudy)
+RELATED_MODELS = [TumorSuggestion, CTStudy, CTUploadSession, LabResult, PatientRiskSummary, DrugInteraction]
+
+# ArchivedPatient 에 컬럼으로 남기는 환자 필드 (나머지는 payload 에만 보관)
+ARCHIVED_COLUMNS = [
+    'patient_id', 'name', 'birth_date', 'doctor_id',
+    'diagnosis_date', 'bclc_stage', 'tumor_size', 'tumor_count', 'vascular_invasion', 'child_pugh',
+    'afp_initial', 'afp_current', 'treatment_type', 'recurrence_risk',
+    'survival_1year', 'survival_3year', 'survival_5year', 'last_followup_date', 'death_date', 'ct_image',
+]
+
+COMPRESSION_LEVEL = 6
+
+
+class ArchiveError(ValueError):
+    """보관/복원 오류"""
+
+
+def get_policy():
+    return dict(DEFAULT_POLICY, **getattr(settings, 'PATIENT_ARCHIVE_POLICY', {}))
+
+
+def archive_candidates(policy=None, today=None):
+    """
+    보관 대상 환자
+    - 사망일로부터 deceased_days 경과
+    - 사망 기록 없이 최종 추적일(없으면 마지막 수정일)로부터 inactive_days 경과, 앞으로 예정된 검사 없음
+    """
+    policy = policy or get_policy()
+    today = today or datetime.date.today()
+    deceased = Q(death_date__lte=today - datetime.timedelta(days=policy['deceased_days']))
+
+    cutoff = today - datetime.timedelta(days=policy['inactive_days'])
+    no_schedule = (
+        (Q(next_ct_date__isnull=True) | Q(next_ct_date__lt=today))
+        & (Q(next_blood_test_date__isnull=True) | Q(next_blood_test_date__lt=today))
+    )
+    inactive = (
+        Q(death_date__isnull=True) & no_schedule
+        & (Q(last_followup_date__lte=cutoff) | Q(last_followup_date__isnull=True, updated_at__date__lte=cutoff))
+    )
+    return Patient.objects.filter(deceased | inactive)
+
+
+# ============================================
+# 직렬화
+# ============================================
+
+class _PayloadEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder 는 datetime 을 밀리초로 자르므로 복원 시 값이 달라짐 -> 마이크로초까지 그대로"""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def _encode(data):
+    raw = json.dumps(data, cls=_PayloadEncoder, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return zlib.compress(raw, COMPRESSION_LEVEL), len(raw)
+
+
+def _decode(payload):
+    return json.loads(zlib.decompress(bytes(payload)).decode('utf-8'))
+
+
+def _instance(model, values):
+    """values() 결과(JSON 왕복 후) -> 저장 전 모델 인스턴스"""
+    fields = {field.attname: field for field in model._meta.concrete_fields}
+    return model(**{
+        name: fields[name].to_python(value) if value is not None else None
+        for name, value in values.items()
+        if name in fields
+    })
+
+
+def load_archived(archived):
+    """보관 데이터 조회 -> {'patient': 필드 dict, 'related': {모델 라벨: [행 dict]}}"""
+    return _decode(archived.payload)
+
+
+# ============================================
+# 보관 / 복원
+# ============================================
+
+def _raw_delete(queryset):
+    """행별 시그널/연쇄 삭제 수집 없이 DELETE (관련 행은 호출 쪽에서 먼저 삭제)"""
+    return queryset._raw_delete(queryset.db)
+
+
+def archive_patients(queryset, reason=None, doctor_id=None):
+    """
+    queryset 환자를 보관 테이블로 이동 (한 트랜잭션) - 옮긴 환자 수 반환
+    reason 이 없으면 사망일 유무로 'deceased' / 'inactive'
+    """
+    with transaction.atomic():
+        patients = list(queryset.order_by('pk').select_for_update().values())
+        if not patients:
+            return 0
+        pks = [row['id'] for row in patients]
+
+        related = {pk: {} for pk in pks}
+        for model in RELATED_MODELS:
+            for row in model.objects.filter(patient_id__in=pks).order_by('pk').values():
+                related[row['patient_id']].setdefault(model._meta.label, []).append(row)
+
+        archived = []
+        for row in patients:
+            payload, payload_bytes = _encode({'patient': row, 'related': related[row['id']]})
+            archived.append(ArchivedPatient(
+                original_pk=row['id'],
+                payload=payload,
+                payload_bytes=payload_bytes,
+                related_counts={label: len(rows) for label, rows in related[row['id']].items()},
+                reason=reason or ('deceased' if row['death_date'] else 'inactive'),
+                **{column: row[column] for column in ARCHIVED_COLUMNS},
+            ))
+
+        hot = Patient.objects.filter(pk__in=pks)
+        cohort.adjust_patients(hot, -1)
+        for model in RELATED_MODELS:
+            _raw_delete(model.objects.filter(patient_id__in=pks))
+        _raw_delete(hot)
+        ArchivedPatient.objects.bulk_create(archived)
+
+    audit.record_archive(doctor_id, [row['patient_id'] for row in patients])
+    return len(patients)
+
+
+def _raw_insert(model, objects):
+    """pk/auto_now 값을 그대로 INSERT (loaddata 와 같은 raw 저장, 시그널 없음)"""
+    if not objects:
+        return
+    using = router.db_for_write(model)
+    fields = model._meta.local_concrete_fields
+    batch_size = connections[using].ops.bulk_batch_size(fields, objects) or len(objects)
+    for start in range(0, len(objects), batch_size):
+        model._base_manager._insert(objects[start:start + batch_size], fields=fields, raw=True, using=using)
+
+
+def _resolve_missing_references(model, objects):
+    """
+    보관 중 삭제된 행을 가리키는 FK 처리 (raw INSERT 의 IntegrityError 방지)
+    SET_NULL 이면 원래 삭제 시와 같이 NULL 로, 그 외(CASCADE 등)는 함께 삭제/차단되었을 행이므로 ArchiveError
+    같은 보관 데이터 안의 행(환자, CT 검사)은 먼저 INSERT 되므로 존재하는 것으로 확인됨
+    """
+    for field in model._meta.local_concrete_fields:
+        if not field.is_relation:
+            continue
+        ids = {getattr(obj, field.attname) for obj in objects} - {None}
+        if not ids:
+            continue
+        target = field.target_field
+        existing = set(
+            field.related_model._base_manager.filter(**{f'{target.attname}__in': ids})
+            .values_list(target.attname, flat=True)
+        )
+        missing = ids - existing
+        if not missing:
+            continue
+        if field.remote_field.on_delete is not models.SET_NULL:
+            raise ArchiveError(
+                f'{model._meta.verbose_name}의 {field.verbose_name}'
+                f'({", ".join(str(value) for value in sorted(missing, key=str))})이(가) 삭제되어 복원할 수 없습니다.'
+            )
+        for obj in objects:
+            if getattr(obj, field.attname) in missing:
+                setattr(obj, field.attname, None)
+
+
+def restore_patient(archived, doctor_id=None):
+    """보관 환자를 Patient 와 관련 테이블로 되돌림 - 복원된 Patient 반환"""
+    with transaction.atomic():
+        archived = ArchivedPatient.objects.select_for_update().get(pk=archived.pk)
+        if Patient.all_objects.filter(patient_id=archived.patient_id).exists():
+            raise ArchiveError(f'같은 환자번호({archived.patient_id})의 환자가 이미 등록되어 있습니다.')
+
+        data = _decode(archived.payload)
+        patient = _instance(Patient, data['patient'])
+        _resolve_missing_references(Patient, [patient])
+        _raw_insert(Patient, [patient])
+        for model in reversed(RELATED_MODELS):
+            objects = [_instance(model, row) for row in data['related'].get(model._meta.label, [])]
+            _resolve_missing_references(model, objects)
+            _raw_insert(model, objects)
+
+        restored = Patient.objects.filter(pk=patient.pk)
+        # 홈 목록(수정일순) 맨 위에 오도록
+        restored.update(updated_at=timezone.now())
+        cohort.adjust_patients(restored, 1)
+        archived.delete()
+
+    audit.record_restore(doctor_id, patient.patient_id)
+    return restored.get()
+
+
+def archive_by_policy(policy=None, limit=None):
+    """
+    정책 기준 보관 대상을 배치 단위로 이동 - 옮긴 환자 수 반환
+    배치마다 별도 트랜잭션 (잠금 범위 제한)
+    """
+    policy = policy or get_policy()
+    candidates = archive_candidates(policy)
+    total = 0
+    while limit is None or total < limit:
+        size = policy['batch_size'] if limit is None else min(policy['batch_size'], limit - total)
+        pks = list(candidates.order_by('pk').values_list('pk', flat=True)[:size])
+        if not pks:
+            break
+        total += archive_patients(Patient.objects.filter(pk__in=pks))
+    return total
@@ -0,0 +1,344 @@
+"""
+환자 기록 변경 감사 로그
+요청 처리 중에는 변경 내역을 메모리 큐에 넣기만 하고, 백그라운드 스레드가 모아서 bulk INSERT
+
+- 필드 단위 변경 내역 (의사 ID, 환자번호, 이전 값/새 값)
+- 큐 크기 제한: 큐가 가득 차면 요청 스레드가 직접 쌓인 내역을 저장 (back-pressure, 유실 없음)
+- 저장 실패 시 간격을 늘려 가며 재시도 -> 한 건씩 저장 -> 그래도 실패한 내역은 AUDIT_SPILL_FILE 에 기록
+  (DB 복구 후 replay_audit_spill 명령으로 다시 저장)
+- 프로세스 종료 시(atexit) 남은 내역 저장
+- settings.AUDIT_LOG_ASYNC = False 이면 즉시 저장 (관리 명령/테스트용)
+"""
+import atexit
+import datetime
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models.fields.files import FieldFile
+from django.utils import timezone
+
+from .models import AuditLog
+from .patient_updates import PATIENT_FORM_FIELDS, PATIENT_CHECKBOX_FIELDS
+
+
+logger = logging.getLogger(__name__)
+
+# 감사 대상 환자 필드
+AUDITED_FIELDS = [field for field, _, _, _ in PATIENT_FORM_FIELDS] + PATIENT_CHECKBOX_FIELDS + ['doctor_id', 'ct_image']
+
+# 큐 최대 크기 / 한 번에 저장할 최대 건수 / 저장 주기(초)
+AUDIT_QUEUE_SIZE = 10000
+AUDIT_BATCH_SIZE = 500
+AUDIT_FLUSH_SECONDS = 2.0
+
+# 저장 실패 시 재시도 횟수 / 첫 대기 시간(초, 매번 2배)
+AUDIT_RETRY_ATTEMPTS = 3
+AUDIT_RETRY_BACKOFF = 0.5
+
+# 파일로 보관할 때 기록하는 AuditLog 필드
+SPILL_FIELDS = ['action', 'doctor_id', 'patient_id', 'field_name', 'old_value', 'new_value']
+
+# 조회 API 최대 건수
+MAX_QUERY_LIMIT = 500
+
+
+def _to_text(value):
+    if value is None:
+        return None
+    if isinstance(value, FieldFile):
+        return value.name or None
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def snapshot(patient, fields=None):
+    """변경 전 값 보관 (수정 전에 호출)"""
+    values = {}
+    for field in fields or AUDITED_FIELDS:
+        value = getattr(patient, field)
+        # FieldFile 은 저장 시 같은 객체가 바뀌므로 파일명으로 보관
+        values[field] = value.name if isinstance(value, FieldFile) else value
+    return values
+
+
+# ============================================
+# 저장 (재시도 / 파일 보관)
+# ============================================
+
+_spill_lock = threading.Lock()
+
+
+def spill_path():
+    return Path(getattr(settings, 'AUDIT_SPILL_FILE', Path(settings.BASE_DIR) / 'audit_spill.jsonl'))
+
+
+def _spill(entries):
+    """DB 에 저장하지 못한 내역을 JSON Lines 로 추가 기록"""
+    lines = ''.join(
+        json.dumps({
+            **{field: getattr(entry, field) for field in SPILL_FIELDS},
+            'changed_at': entry.changed_at.isoformat(),
+        }, ensure_ascii=False) + '\n'
+        for entry in entries
+    )
+    path = spill_path()
+    with _spill_lock:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _bulk_create(entries):
+    # 바깥 트랜잭션 안에서 호출되어도 실패가 그 트랜잭션을 깨뜨리지 않도록 savepoint 사용
+    with transaction.atomic():
+        AuditLog.objects.bulk_create(entries)
+
+
+def write_entries(entries, attempts=AUDIT_RETRY_ATTEMPTS, backoff=AUDIT_RETRY_BACKOFF):
+    """
+    내역 저장 - 일시적인 DB 오류는 재시도, 계속 실패하면 한 건씩 저장하고
+    그래도 실패한 내역은 파일에 보관 (유실 없음)
+    반환: DB 에 저장한 건수
+    """
+    for attempt in range(attempts):
+        try:
+            _bulk_create(entries)
+            return len(entries)
+        except Exception:
+            logger.warning('감사 로그 %d건 저장 실패 (%d/%d)', len(entries), attempt + 1, attempts, exc_info=True)
+            # 끊긴 연결은 다음 시도에서 새로 연결 (트랜잭션 안이면 연결 유지)
+            if not connection.in_atomic_block:
+                connection.close()
+            if attempt + 1 < attempts:
+                time.sleep(backoff * 2 ** attempt)
+
+    # 특정 행만 문제인 경우를 위해 한 건씩 저장
+    written = 0
+    failed = []
+    for entry in entries:
+        try:
+            _bulk_create([entry])
+            written += 1
+        except Exception:
+            failed.append(entry)
+    if failed:
+        try:
+            _spill(failed)
+            logger.error('감사 로그 %d건을 %s 에 보관 (replay_audit_spill 로 복구)', len(failed), spill_path())
+        except OSError:
+            # 파일도 쓸 수 없으면 로그에 전체 내역을 남김
+            logger.exception('감사 로그 %d건 보관 실패: %r', len(failed), [
+                {field: getattr(entry, field) for field in SPILL_FIELDS} for entry in failed
+            ])
+    return written
+
+
+def replay_spilled_entries(batch_size=AUDIT_BATCH_SIZE):
+    """
+    보관 파일의 내역을 DB 에 다시 저장 - 저장한 건수 반환
+    파일을 먼저 옮긴 뒤 읽으므로 그사이 새로 보관되는 내역은 새 파일에 기록됨
+    """
+    path = spill_path()
+    replaying = path.with_name(path.name + '.replaying')
+    with _spill_lock:
+        if not replaying.exists():
+            if not path.exists():
+                return 0
+            os.replace(path, replaying)
+
+    count = 0
+    batch = []
+    with open(replaying, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            data = json.loads(line)
+            data['changed_at'] = datetime.datetime.fromisoformat(data['changed_at'])
+            batch.append(AuditLog(**data))
+            if len(batch) >= batch_size:
+                _bulk_create(batch)
+                count += len(batch)
+                batch = []
+    if batch:
+        _bulk_create(batch)
+        count += len(batch)
+    replaying.unlink()
+    return count
+
+
+# ============================================
+# 비동기 기록기
+# ============================================
+
+class AuditWriter:
+    """메모리 큐 + 백그라운드 flush 스레드"""
+
+    def __init__(self, maxsize=AUDIT_QUEUE_SIZE, batch_size=AUDIT_BATCH_SIZE, interval=AUDIT_FLUSH_SECONDS):
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.batch_size = batch_size
+        self.interval = interval
+        self._thread = None
+        self._start_lock = threading.Lock()
+        # 백그라운드 스레드와 요청 스레드의 동시 flush 방지
+        self._flush_lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+                self._thread.start()
+
+    def put(self, entries):
+        """변경 내역 추가 - 큐가 가득 차면 호출한 스레드에서 먼저 저장"""
+        self.start()
+        for entry in entries:
+            while True:
+                try:
+                    self.queue.put_nowait(entry)
+                    break
+                except queue.Full:
+                    self.flush()
+
+    def _drain(self):
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def flush(self):
+        """큐에 쌓인 내역 전체 저장, 저장한 건수 반환"""
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = self._drain()
+                if not batch:
+                    break
+                written += write_entries(batch)
+        return written
+
+    def _run(self):
+        try:
+            while not self._stopping.is_set():
+                self._stopping.wait(self.interval)
+                close_old_connections()
+                self.flush()
+        finally:
+            connection.close()
+
+    def stop(self):
+        """종료 시 호출 - 스레드를 멈추고 남은 내역 저장"""
+        self._stopping.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.interval + 5)
+        self.flush()
+
+
+_writer = AuditWriter()
+atexit.register(_writer.stop)
+
+
+def get_writer():
+    return _writer
+
+
+def _submit(entries):
+    if not entries:
+        return
+    if getattr(settings, 'AUDIT_LOG_ASYNC', True):
+        _writer.put(entries)
+    else:
+        write_entries(entries)
+
+
+# ============================================
+# 기록
+# ============================================
+
+def _entry(action, doctor_id, patient_id, field_name='', old_value=None, new_value=None, changed_at=None):
+    return AuditLog(
+        action=action,
+        doctor_id=doctor_id or '',
+        patient_id=patient_id,
+        field_name=field_name,
+        old_value=_to_text(old_value),
+        new_value=_to_text(new_value),
+        changed_at=changed_at or timezone.now(),
+    )
+
+
+def record_create(doctor_id, patient):
+    """환자 등록 - 값이 있는 필드를 새 값으로 기록"""
+    now = timezone.now()
+    _submit([
+        _entry('create', doctor_id, patient.patient_id, field, None, value, now)
+        for field, value in snapshot(patient).items()
+        if value not in (None, '')
+    ])
+
+
+def record_update(doctor_id, patient, before, changed_fields):
+    """환자 수정 - 바뀐 필드만 이전/새 값 기록"""
+    now = timezone.now()
+    _submit([
+        _entry('update', doctor_id, patient.patient_id, field, before.get(field), getattr(patient, field), now)
+        for field in changed_fields
+    ])
+
+
+def record_delete(doctor_id, patient):
+    """환자 삭제 - 삭제 직전 값을 이전 값으로 기록"""
+    now = timezone.now()
+    entries = [
+        _entry('delete', doctor_id, patient.patient_id, field, value, None, now)
+        for field, value in snapshot(patient).items()
+        if value not in (None, '')
+    ]
+    _submit(entries or [_entry('delete', doctor_id, patient.patient_id, changed_at=now)])
+
+
+def record_archive(doctor_id, patient_ids):
+    """환자 보관 (정책에 의한 일괄 보관은 doctor_id 없음)"""
+    now = timezone.now()
+    _submit([_entry('archive', doctor_id, patient_id, changed_at=now) for patient_id in patient_ids])
+
+
+def record_restore(doctor_id, patient_id):
+    _submit([_entry('restore', doctor_id, patient_id)])
+
+
+# ============================================
+# 조회
+# ============================================
+
+def _query(filters, limit=100, before_id=None):
+    queryset = AuditLog.objects.filter(**filters)
+    if before_id is not None:
+        queryset = queryset.filter(pk__lt=before_id)
+    return queryset.order_by('-pk')[:min(limit, MAX_QUERY_LIMIT)]
+
+
+def entries_for_patient(patient_id, limit=100, before_id=None):
+    """환자별 변경 이력 (최신순, (patient_id, id) 인덱스)"""
+    return _query({'patient_id': patient_id}, limit, before_id)
+
+
+def entries_for_doctor(doctor_id, limit=100, before_id=None):
+    """의사별 변경 이력 (최신순, (doctor_id, id) 인덱스)"""
+    return _query({'doctor_id': doctor_id}, limit, before_id)
@@ -0,0 +1,158 @@
+"""
+환자 일괄 처리
+추적관찰 일정 이동, 담당의 일괄 변경, 상태 일괄 변경을
+환자 한 명씩이 아니라 집합 단위 UPDATE 로 처리
+"""
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import DateField, ExpressionWrapper, F
+from django.utils import timezone
+
+from .models import Patient
+from .cohort import move_patients
+from .survival import invalidate_survival_cache
+
+
+# 이 건수를 넘으면 pk 구간별로 나누어 UPDATE (한 문장의 잠금 범위 제한)
+BULK_UPDATE_CHUNK_SIZE = 5000
+
+# 일정 이동 최대 일수 (날짜 범위를 벗어나는 UPDATE 방지)
+MAX_SHIFT_DAYS = 3650
+
+# 일정 이동이 가능한 날짜 필드
+SHIFTABLE_DATE_FIELDS = ['next_ct_date', 'next_blood_test_date']
+
+# 일괄 변경이 가능한 상태 필드
+BULK_STATUS_FIELDS = ['recurrence_risk', 'treatment_type']
+
+# JSON API 에서 허용하는 필터 조건
+BULK_FILTER_FIELDS = [
+    'next_ct_date', 'next_blood_test_date', 'bclc_stage',
+    'recurrence_risk', 'treatment_type', 'child_pugh',
+]
+
+
+class BulkActionError(ValueError):
+    """일괄 처리 요청 오류"""
+
+
+def _chunked_update(queryset, values, chunk_size):
+    """
+    pk 구간 단위로 UPDATE 실행 후 변경된 행 수 반환
+    호출하는 쪽의 트랜잭션 안에서 실행되어야 함
+    """
+    pks = list(queryset.order_by('pk').values_list('pk', flat=True))
+    updated = 0
+    for start in range(0, len(pks), chunk_size):
+        chunk = pks[start:start + chunk_size]
+        updated += Patient.objects.filter(pk__in=chunk).update(**values)
+    return updated
+
+
+def _run_update(queryset, values, chunk_size=None):
+    """
+    하나의 트랜잭션 안에서 집합 UPDATE 실행
+    대상이 많으면 청크 단위로 나누어 실행
+    """
+    chunk_size = chunk_size or BULK_UPDATE_CHUNK_SIZE
+    values = dict(values, updated_at=timezone.now())
+
+    with transaction.atomic():
+        matched = queryset.count()
+        if matched > chunk_size:
+            updated = _chunked_update(queryset, values, chunk_size)
+        else:
+            updated = queryset.update(**values)
+
+    return {'matched': matched, 'updated': updated}
+
+
+def shift_follow_up_dates(queryset, days, fields=None):
+    """추적관찰 일정을 days 일만큼 이동 (비어 있는 날짜는 그대로 유지)"""
+    fields = fields or ['next_ct_date']
+    if not isinstance(fields, (list, tuple)):
+        raise BulkActionError('fields 는 목록이어야 합니다.')
+    for field in fields:
+        if field not in SHIFTABLE_DATE_FIELDS:
+            raise BulkActionError(f'이동할 수 없는 날짜 필드입니다: {field}')
+
+    if abs(days) > MAX_SHIFT_DAYS:
+        raise BulkActionError(f'이동 일수는 {MAX_SHIFT_DAYS}일 이내여야 합니다.')
+
+    delta = timedelta(days=days)
+    summary = {'matched': 0, 'updated': 0}
+    with transaction.atomic():
+        # 필드별로 값이 있는 행만 이동
+        for field in fields:
+            result = _run_update(
+                queryset.filter(**{f'{field}__isnull': False}),
+                {field: ExpressionWrapper(F(field) + delta, output_field=DateField())},
+            )
+            summary['matched'] = max(summary['matched'], result['matched'])
+            summary['updated'] += result['updated']
+
+    summary.update({'action': 'shift_dates', 'days': days, 'fields': list(fields)})
+    return summary
+
+
+def reassign_doctor(queryset, doctor):
+    """담당의 일괄 변경 (doctor 가 None 이면 담당의 해제)"""
+    with transaction.atomic():
+        # queryset.update() 는 시그널이 없으므로 코호트 요약은 집합 단위로 이동
+        move_patients(queryset, 'doctor', doctor.doctor_id if doctor else '')
+        summary = _run_update(queryset, {'doctor': doctor})
+    summary.update({
+        'action': 'reassign',
+        'doctor_id': doctor.doctor_id if doctor else None,
+    })
+    return summary
+
+
+def set_status(queryset, field, value):
+    """재발위험도, 치료방식 등 상태 필드 일괄 변경"""
+    if field not in BULK_STATUS_FIELDS:
+        raise BulkActionError(f'일괄 변경할 수 없는 필드입니다: {field}')
+
+    choices = dict(Patient._meta.get_field(field).choices)
+    if not isinstance(value, str) or value not in choices:
+        raise BulkActionError(f'유효하지 않은 값입니다: {value}')
+
+    with transaction.atomic():
+        move_patients(queryset, field, value)
+        summary = _run_update(queryset, {field: value})
+        transaction.on_commit(invalidate_survival_cache)
+    summary.update({'action': 'set_status', 'field': field, 'value': value})
+    return summary
+
+
+def filter_patients(queryset, filters):
+    """JSON 요청의 필터 조건을 허용된 필드만 적용"""
+    filters = filters or {}
+    if not isinstance(filters, dict):
+        raise BulkActionError('filter 는 객체여야 합니다.')
+
+    unknown = set(filters) - set(BULK_FILTER_FIELDS) - {'patient_ids'}
+    if unknown:
+        raise BulkActionError(f'지원하지 않는 필터입니다: {", ".join(sorted(unknown))}')
+
+    patient_ids = filters.get('patient_ids')
+    if patient_ids is not None:
+        if not isinstance(patient_ids, list) or not all(isinstance(value, str) for value in patient_ids):
+            raise BulkActionError('patient_ids 는 환자번호 목록이어야 합니다.')
+        queryset = queryset.filter(patient_id__in=patient_ids)
+
+    for field in BULK_FILTER_FIELDS:
+        if field not in filters:
+            continue
+        value = filters[field]
+        if value is not None and not isinstance(value, (str, int, float)):
+            raise BulkActionError(f'{field} 필터 값이 올바르지 않습니다.')
+        try:
+            # 값 변환(날짜 형식 등)은 조회 시점이 아니라 filter() 에서 검사됨
+            queryset = queryset.filter(**{field: value})
+        except (ValidationError, TypeError, ValueError):
+            raise BulkActionError(f'{field} 필터 값이 올바르지 않습니다: {value}')
+
+    return queryset
@@ -0,0 +1,242 @@
+"""
+코호트 통계 요약 (BCLC 병기, Child-Pugh, 치료 방식, 재발 위험도, 담당의별)
+대시보드는 CohortSummary 테이블만 읽고, Patient 전체 GROUP BY 는 재계산 시에만 실행
+
+- 환자 1명 저장/삭제: 시그널에서 이전 값/새 값의 기여분 차이만 F() 증감 UPDATE
+- 일괄 변경(bulk_actions): 대상 환자를 기존 값별로 한 번 집계하여 이전 값 행에서 빼고 새 값 행에 더함
+- 보관/복원(archive): 대상 환자 집합을 기준별로 집계하여 한 번에 빼거나 더함
+- 의사 삭제(담당의 SET_NULL, 시그널 없는 UPDATE): pre_delete 에서 해당 의사 환자를 '미지정' 으로 이동
+- 시그널이 발생하지 않는 작업(queryset.update, bulk_create, 직접 SQL) 후에는
+  manage.py rebuild_cohort_summaries 로 전체 재계산
+
+같은 환자를 동시에 수정할 때 두 저장이 같은 이전 값을 빼지 않도록 수정 전 값은 행 잠금(select_for_update)으로 읽음
+(트랜잭션 안에서 저장할 때만 가능 - save_patient_changes 는 트랜잭션으로 저장,
+ 트랜잭션 없이 save() 하는 경로에서 동시 수정이 겹치면 요약이 어긋날 수 있으므로 rebuild_cohort_summaries 로 재계산)
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from .models import CohortSummary, DoctorProfile, Patient
+
+
+# 집계 기준 -> Patient 컬럼
+DIMENSIONS = {
+    'bclc_stage': 'bclc_stage',
+    'child_pugh': 'child_pugh',
+    'treatment_type': 'treatment_type',
+    'recurrence_risk': 'recurrence_risk',
+    'doctor': 'doctor_id',
+}
+
+# 요약에 영향을 주는 Patient 필드 (save(update_fields=...) 판단용, 필드명 기준)
+TRACKED_FIELDS = {'bclc_stage', 'child_pugh', 'treatment_type', 'recurrence_risk', 'doctor',
+                  'tumor_size', 'tumor_count', 'afp_current', 'vascular_invasion'}
+
+# 기여분 순서
+METRICS = (
+    'patient_count',
+    'tumor_size_sum', 'tumor_size_n',
+    'tumor_count_sum', 'tumor_count_n',
+    'afp_current_sum', 'afp_current_n',
+    'vascular_invasion_count',
+)
+
+# 상태 조회용 컬럼
+STATE_COLUMNS = sorted(set(DIMENSIONS.values()) | {'tumor_size', 'tumor_count', 'afp_current', 'vascular_invasion'})
+
+
+def _metric_aggregates():
+    """METRICS 순서의 집계식 (GROUP BY 재계산/일괄 변경용)"""
+    return {
+        'patient_count': Count('pk'),
+        'tumor_size_sum': Sum('tumor_size'),
+        'tumor_size_n': Count('tumor_size'),
+        'tumor_count_sum': Sum('tumor_count'),
+        'tumor_count_n': Count('tumor_count'),
+        'afp_current_sum': Sum('afp_current'),
+        'afp_current_n': Count('afp_current'),
+        'vascular_invasion_count': Count('pk', filter=Q(vascular_invasion=True)),
+    }
+
+
+def patient_state(patient):
+    """요약 계산에 필요한 환자 값 (인스턴스 기준)"""
+    return {column: getattr(patient, column) for column in STATE_COLUMNS}
+
+
+def load_patient_state(pk, lock=False):
+    """DB 에 저장된 환자 값 (수정 전 상태) - lock=True 면 트랜잭션 끝까지 행 잠금"""
+    queryset = Patient.objects.filter(pk=pk)
+    if lock:
+        queryset = queryset.select_for_update()
+    return queryset.values(*STATE_COLUMNS).first()
+
+
+def _contribution(state):
+    """환자 1명의 기여분 (METRICS 순서)"""
+    tumor_size, tumor_count, afp = state['tumor_size'], state['tumor_count'], state['afp_current']
+    return (
+        1,
+        tumor_size or 0, int(tumor_size is not None),
+        tumor_count or 0, int(tumor_count is not None),
+        afp or 0, int(afp is not None),
+        int(bool(state['vascular_invasion'])),
+    )
+
+
+def _keys(state):
+    return [(dimension, state[column] or '') for dimension, column in DIMENSIONS.items()]
+
+
+# ============================================
+# 증감 반영
+# ============================================
+
+def apply_deltas(deltas):
+    """
+    {(기준, 값): METRICS 순서 증감} 반영
+    행이 없으면 생성 (동시에 생성되면 UPDATE 로 재시도)
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        for (dimension, value), delta in sorted(deltas.items()):
+            if not any(delta):
+                continue
+            changes = {metric: F(metric) + amount for metric, amount in zip(METRICS, delta) if amount}
+            updated = CohortSummary.objects.filter(dimension=dimension, value=value).update(updated_at=now, **changes)
+            if updated:
+                continue
+            try:
+                with transaction.atomic():
+                    CohortSummary.objects.create(dimension=dimension, value=value, **dict(zip(METRICS, delta)))
+            except IntegrityError:
+                CohortSummary.objects.filter(dimension=dimension, value=value).update(updated_at=now, **changes)
+
+
+def _add(deltas, state, sign):
+    contribution = _contribution(state)
+    for key in _keys(state):
+        deltas[key] = [total + sign * amount for total, amount in zip(deltas[key], contribution)]
+
+
+def record_patient_change(old_state, new_state):
+    """환자 저장/삭제 반영 (등록: old_state=None, 삭제: new_state=None)"""
+    if old_state == new_state:
+        return
+    deltas = defaultdict(lambda: [0] * len(METRICS))
+    if old_state is not None:
+        _add(deltas, old_state, -1)
+    if new_state is not None:
+        _add(deltas, new_state, 1)
+    apply_deltas(deltas)
+
+
+def move_patients(queryset, dimension, new_value):
+    """
+    일괄 변경 전에 호출 - 대상 환자를 기존 값별로 집계하여 새 값으로 이동
+    호출하는 쪽의 UPDATE 와 같은 트랜잭션 안에서 실행되어야 함
+    """
+    column = DIMENSIONS[dimension]
+    new_value = new_value or ''
+    rows = queryset.order_by().values(column).annotate(**_metric_aggregates())
+
+    deltas = defaultdict(lambda: [0] * len(METRICS))
+    for row in rows:
+        old_value = row[column] or ''
+        if old_value == new_value:
+            continue
+        amounts = [row[metric] or 0 for metric in METRICS]
+        deltas[(dimension, old_value)] = [a - b for a, b in zip(deltas[(dimension, old_value)], amounts)]
+        deltas[(dimension, new_value)] = [a + b for a, b in zip(deltas[(dimension, new_value)], amounts)]
+    apply_deltas(deltas)
+
+
+def adjust_patients(queryset, sign):
+    """
+    환자 집합 전체를 요약에 더하거나(sign=1) 뺌(sign=-1) - 보관/복원처럼 시그널 없이 행을 옮길 때 사용
+    호출하는 쪽의 트랜잭션 안에서, 뺄 때는 삭제 전에 실행되어야 함
+    """
+    deltas = defaultdict(lambda: [0] * len(METRICS))
+    for dimension, column in DIMENSIONS.items():
+        for row in queryset.order_by().values(column).annotate(**_metric_aggregates()):
+            key = (dimension, row[column] or '')
+            deltas[key] = [total + sign * (row[metric] or 0) for total, metric in zip(deltas[key], METRICS)]
+    apply_deltas(deltas)
+
+
+# ============================================
+# 전체 재계산
+# ============================================
+
+def rebuild_cohort_summaries():
+    """Patient 전체 GROUP BY 로 요약 테이블 재작성 - 기준별 행 수 반환"""
+    counts = {}
+    with transaction.atomic():
+        CohortSummary.objects.all().delete()
+        for dimension, column in DIMENSIONS.items():
+            rows = Patient.objects.order_by().values(column).annotate(**_metric_aggregates())
+            summaries = {}
+            for row in rows:
+                # NULL 과 '' 는 같은 '미입력' 행으로 합침
+                value = row[column] or ''
+                amounts = [row[metric] or 0 for metric in METRICS]
+                if value in summaries:
+                    amounts = [a + b for a, b in zip(summaries[value], amounts)]
+                summaries[value] = amounts
+            CohortSummary.objects.bulk_create([
+                CohortSummary(dimension=dimension, value=value, **dict(zip(METRICS, amounts)))
+                for value, amounts in summaries.items()
+            ])
+            counts[dimension] = len(summaries)
+    return counts
+
+
+# ============================================
+# 조회
+# ============================================
+
+def _value_labels(dimension, values):
+    if dimension == 'doctor':
+        doctor_ids = [value for value in values if value]
+        return dict(DoctorProfile.objects.filter(doctor_id__in=doctor_ids).values_list('doctor_id', 'doctor_name'))
+    return dict(Patient._meta.get_field(DIMENSIONS[dimension]).flatchoices)
+
+
+def dashboard_data():
+    """
+    기준별 요약 목록 (요약 테이블만 조회)
+    {'updated_at', 'groups': [{'dimension', 'label', 'total', 'rows': [{'value', 'label', 'patient_count', 'avg_*', ...}]}]}
+    """
+    summaries = defaultdict(list)
+    updated_at = None
+    for summary in CohortSummary.objects.filter(patient_count__gt=0):
+        summaries[summary.dimension].append(summary)
+        updated_at = max(updated_at or summary.updated_at, summary.updated_at)
+
+    data = []
+    for dimension, label in CohortSummary.DIMENSION_CHOICES:
+        rows = summaries.get(dimension, [])
+        labels = _value_labels(dimension, [row.value for row in rows])
+        total = sum(row.patient_count for row in rows)
+        data.append({
+            'dimension': dimension,
+            'label': label,
+            'total': total,
+            'rows': [
+                {
+                    'value': row.value,
+                    'label': labels.get(row.value, row.value) if row.value else '미입력',
+                    'patient_count': row.patient_count,
+                    'share': round(row.patient_count * 100 / total, 1) if total else 0,
+                    'avg_tumor_size': row.avg_tumor_size,
+                    'avg_tumor_count': row.avg_tumor_count,
+                    'avg_afp_current': row.avg_afp_current,
+                    'vascular_invasion_rate': row.vascular_invasion_rate,
+                }
+                for row in sorted(rows, key=lambda row: -row.patient_count)
+            ],
+        })
+    return {'updated_at': updated_at, 'groups': data}
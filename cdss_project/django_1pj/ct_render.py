@@ -0,0 +1,214 @@
+"""
+CT 단면 렌더링 (HU window/level)
+memmap 볼륨의 HU 값을 window/level 로 8bit 영상으로 변환하여 PNG/WebP 로 인코딩
+
+- 변환은 window 별 65536 칸 조회 테이블(LUT) 한 번 인덱싱으로 처리 (슬라이스 묶음도 한 번에)
+- 결과 이미지는 'ct_renders' 캐시에 (검사, 볼륨 버전, 단면, 번호, 프리셋, 형식) 키로 저장 (LRU)
+- 캐시에 없는 슬라이스를 요청하면 스크롤 방향의 다음 슬라이스까지 묶어서 렌더링하여 미리 저장
+- 캐시를 여러 프로세스가 공유하면 변환 직후 백그라운드 워커에서 axial 전체를 미리 렌더링
+"""
+import io
+from functools import lru_cache
+
+import numpy as np
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from PIL import Image
+
+from . import ct_volume, jobs
+
+
+# (level, width) HU
+WINDOW_PRESETS = {
+    'liver': (60, 160),
+    'arterial': (150, 600),
+    'soft_tissue': (40, 400),
+    'bone': (400, 1800),
+    'lung': (-600, 1500),
+}
+PRESET_LABELS = {
+    'liver': '간',
+    'arterial': '동맥기',
+    'soft_tissue': '연부조직',
+    'bone': '뼈',
+    'lung': '폐',
+}
+DEFAULT_PRESET = 'liver'
+
+IMAGE_FORMATS = {
+    'png': ('PNG', 'image/png', {'optimize': False, 'compress_level': 1}),
+    'webp': ('WEBP', 'image/webp', {'lossless': True, 'quality': 0}),
+}
+DEFAULT_FORMAT = 'png'
+
+# 캐시 미스 시 함께 렌더링할 슬라이스 수
+PREFETCH_SLICES = 8
+
+# 배치 렌더링 묶음 크기 (메모리 사용량 제한)
+BATCH_SLICES = 32
+
+CACHE_ALIAS = 'ct_renders'
+CACHE_TIMEOUT = 60 * 60 * 24
+
+MIN_WINDOW_WIDTH = 1
+MAX_WINDOW_WIDTH = 10000
+
+
+class RenderError(ValueError):
+    """렌더링 요청 오류"""
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def resolve_window(preset=None, level=None, width=None):
+    """
+    프리셋 또는 직접 지정한 level/width -> (이름, level, width)
+    직접 지정 시 이름은 'L{level}W{width}' (캐시 키용)
+    """
+    if level is not None or width is not None:
+        try:
+            level, width = int(level), int(width)
+        except (TypeError, ValueError):
+            raise RenderError('level / width 는 정수여야 합니다.')
+        if not MIN_WINDOW_WIDTH <= width <= MAX_WINDOW_WIDTH:
+            raise RenderError(f'width 는 {MIN_WINDOW_WIDTH} ~ {MAX_WINDOW_WIDTH} 이어야 합니다.')
+        return f'L{level}W{width}', level, width
+
+    preset = preset or DEFAULT_PRESET
+    if preset not in WINDOW_PRESETS:
+        raise RenderError(f'알 수 없는 window 프리셋입니다: {preset} ({", ".join(WINDOW_PRESETS)})')
+    return (preset, *WINDOW_PRESETS[preset])
+
+
+# ============================================
+# window/level 변환
+# ============================================
+
+@lru_cache(maxsize=64)
+def window_lut(level, width):
+    """int16 전체 범위(65536)에 대한 8bit 변환표 - 인덱스는 HU + 32768"""
+    hu = np.arange(-32768, 32768, dtype=np.float32)
+    lower = level - width / 2
+    lut = np.clip((hu - lower) * (255.0 / width), 0, 255)
+    lut = np.rint(lut).astype(np.uint8)
+    lut.flags.writeable = False
+    return lut
+
+
+def apply_window(hu, level, width):
+    """
+    HU 배열(int16, 차원 무관) -> uint8 영상
+    int16 을 uint16 으로 재해석하고 부호 비트를 뒤집으면 HU + 32768 과 같으므로
+    산술 연산 없이 변환표 인덱싱 한 번으로 끝남
+    """
+    hu = np.asarray(hu)
+    if hu.dtype != np.int16:
+        hu = np.clip(hu, -32768, 32767).astype(np.int16)
+    index = hu.view(np.uint16) ^ np.uint16(0x8000)
+    return window_lut(level, width)[index]
+
+
+def encode_image(pixels, image_format=DEFAULT_FORMAT, aspect=1.0):
+    """uint8 2D 배열 -> 이미지 bytes (aspect: 세로/가로 픽셀 비율, reformat 보정)"""
+    pil_format, _, options = IMAGE_FORMATS[image_format]
+    image = Image.fromarray(np.ascontiguousarray(pixels), mode='L')
+    if abs(aspect - 1.0) > 0.01:
+        height = max(1, round(image.height * aspect))
+        image = image.resize((image.width, height), Image.BILINEAR)
+    buffer = io.BytesIO()
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+# ============================================
+# 캐시된 렌더링
+# ============================================
+
+def _cache_key(study, version, plane, index, window_name, image_format):
+    return f'ct:{study.pk}:{version}:{plane}:{index}:{window_name}:{image_format}'
+
+
+def _plane_block(study, plane, start, stop):
+    """단면 방향 기준 [start, stop) 슬라이스 묶음 (N, 높이, 너비) - 가능한 한 뷰로 반환"""
+    volume = ct_volume.open_volume(study)
+    if plane == 'axial':
+        return volume[start:stop]
+    if plane == 'coronal':
+        return np.moveaxis(volume[::-1, start:stop, :], 1, 0)
+    return np.moveaxis(volume[::-1, :, start:stop], 2, 0)
+
+
+def _render_block(study, plane, start, stop, window, image_format, version):
+    """슬라이스 묶음을 한 번에 window 변환 후 각각 인코딩 -> {캐시 키: bytes}"""
+    window_name, level, width = window
+    aspect = ct_volume.plane_aspect(study, plane)
+    block = apply_window(_plane_block(study, plane, start, stop), level, width)
+    return {
+        _cache_key(study, version, plane, start + offset, window_name, image_format): encode_image(pixels, image_format, aspect)
+        for offset, pixels in enumerate(block)
+    }
+
+
+def render_slice(study, plane, index, window, image_format=DEFAULT_FORMAT):
+    """
+    단면 1장 이미지 (bytes, content_type)
+    캐시 미스 시 index 부터 PREFETCH_SLICES 장을 묶어서 렌더링 (스크롤 시 다음 장은 캐시에서 응답)
+    """
+    if image_format not in IMAGE_FORMATS:
+        raise RenderError(f'지원하지 않는 이미지 형식입니다: {image_format}')
+    count = ct_volume.plane_size(study, plane)[0]
+    if not 0 <= index < count:
+        raise RenderError(f'{plane} 슬라이스 번호는 0 ~ {count - 1} 이어야 합니다.')
+
+    content_type = IMAGE_FORMATS[image_format][1]
+    version = ct_volume.volume_version(study)
+    key = _cache_key(study, version, plane, index, window[0], image_format)
+    cache = _cache()
+    data = cache.get(key)
+    if data is not None:
+        return data, content_type
+
+    rendered = _render_block(study, plane, index, min(index + PREFETCH_SLICES, count), window, image_format, version)
+    cache.set_many(rendered, CACHE_TIMEOUT)
+    return rendered[key], content_type
+
+
+def render_series(study, plane='axial', window=None, image_format=DEFAULT_FORMAT):
+    """
+    시리즈 전체 일괄 렌더링 후 캐시에 저장 - 렌더링한 장 수 반환
+    BATCH_SLICES 장씩 나눠 처리하므로 메모리 사용량은 묶음 크기로 제한
+    (캐시를 Redis 등으로 공유하면 백그라운드 워커에서 미리 렌더링 가능)
+    """
+    window = window or resolve_window()
+    version = ct_volume.volume_version(study)
+    count = ct_volume.plane_size(study, plane)[0]
+    cache = _cache()
+    for start in range(0, count, BATCH_SLICES):
+        cache.set_many(
+            _render_block(study, plane, start, min(start + BATCH_SLICES, count), window, image_format, version),
+            CACHE_TIMEOUT,
+        )
+    return count
+
+
+def cache_is_shared():
+    """렌더링 캐시를 다른 프로세스와 공유하는지 (프로세스 메모리 캐시면 워커가 미리 렌더링해도 웹에서 못 씀)"""
+    return not isinstance(_cache(), (LocMemCache, DummyCache))
+
+
+def schedule_prerender(study, plane='axial', preset=None):
+    """
+    변환 직후 호출 - 공유 캐시일 때만 시리즈 전체 미리 렌더링 작업 예약
+    반환: BackgroundJob (예약하지 않으면 None)
+    """
+    if not cache_is_shared():
+        return None
+    return jobs.enqueue(
+        'ct_studies.prerender',
+        args=[study.pk, plane, preset],
+        priority=-5,
+        dedup_key=f'ct_studies.prerender:{study.pk}:{plane}:{preset or DEFAULT_PRESET}',
+    )
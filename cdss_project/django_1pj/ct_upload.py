@@ -0,0 +1,333 @@
+"""
+CT 이미지 분할(청크) 업로드
+큰 CT 파일을 여러 요청으로 나눠 받아 임시 디렉터리에 바로 기록하고, 모두 도착하면 Patient.ct_image 로 합침
+
+- 청크는 <임시 디렉터리>/<세션 ID>/<번호>.part 파일 - 수신 여부는 파일 존재로 판단
+  (연결이 끊기면 GET 으로 받은 청크 목록을 확인하고 빠진 청크만 다시 전송)
+- 청크마다 SHA-256 검증 (X-Chunk-SHA256 헤더), 일치하지 않으면 버림
+- 요청 본문을 메모리에 올리지 않고 블록 단위로 읽으며 해시 계산
+- 이미지 검증은 Pillow 로 헤더만 읽음 (픽셀 디코딩 없음) - 첫 청크 수신 시 바로 확인
+- 완료/취소는 status 조건부 UPDATE 로 선점 (같은 세션을 동시에 완료해도 한 요청만 처리)
+"""
+import hashlib
+import os
+import re
+import shutil
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError
+
+from .models import CTUploadSession
+from . import audit
+
+
+DEFAULT_CHUNK_SIZE = 5 * 1024 * 1024
+MIN_CHUNK_SIZE = 256 * 1024
+MAX_CHUNK_SIZE = 32 * 1024 * 1024
+MAX_UPLOAD_SIZE = 1024 * 1024 * 1024
+
+# 요청 본문 읽기 단위
+READ_BLOCK_SIZE = 64 * 1024
+
+# ImageField 로 저장 가능한 형식
+ALLOWED_IMAGE_FORMATS = {'JPEG', 'PNG'}
+
+# 이 시간 동안 청크가 오지 않은 세션은 정리 대상
+UPLOAD_EXPIRE_HOURS = 24
+
+# 정리 작업 재예약 최소 간격 (초)
+MIN_CLEANUP_INTERVAL = 60 * 60
+
+_SAFE_FILENAME = re.compile(r'[^\w.\-]+')
+
+
+class UploadError(ValueError):
+    """업로드 요청 오류 (status: 응답 HTTP 상태 코드)"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _temp_root():
+    return Path(getattr(settings, 'CT_UPLOAD_TEMP_DIR', Path(settings.BASE_DIR) / 'upload_tmp'))
+
+
+def session_dir(session):
+    return _temp_root() / str(session.pk)
+
+
+def _chunk_path(session, index):
+    return session_dir(session) / f'{index}.part'
+
+
+def _expected_chunk_length(session, index):
+    if index < session.total_chunks - 1:
+        return session.chunk_size
+    return session.total_size - session.chunk_size * (session.total_chunks - 1)
+
+
+def validate_image_header(path):
+    """
+    이미지 헤더만 읽어 형식/크기 확인 (픽셀 데이터는 디코딩하지 않음)
+    반환: (형식, 가로, 세로)
+    """
+    try:
+        with Image.open(path) as image:
+            image_format, (width, height) = image.format, image.size
+    except (UnidentifiedImageError, OSError):
+        raise UploadError('이미지 파일 형식을 확인할 수 없습니다.', status=422)
+
+    if image_format not in ALLOWED_IMAGE_FORMATS:
+        raise UploadError(f'지원하지 않는 이미지 형식입니다: {image_format}', status=422)
+    if Image.MAX_IMAGE_PIXELS and width * height > Image.MAX_IMAGE_PIXELS:
+        raise UploadError('이미지 해상도가 너무 큽니다.', status=422)
+    return image_format, width, height
+
+
+# ============================================
+# 세션
+# ============================================
+
+def start_upload(patient, doctor, filename, total_size, chunk_size=None, checksum=''):
+    """업로드 세션 생성"""
+    try:
+        total_size = int(total_size)
+        chunk_size = int(chunk_size or DEFAULT_CHUNK_SIZE)
+    except (TypeError, ValueError):
+        raise UploadError('size / chunk_size 는 정수여야 합니다.')
+    if not filename:
+        raise UploadError('filename 을 입력해주세요.')
+    if not 0 < total_size <= MAX_UPLOAD_SIZE:
+        raise UploadError(f'파일 크기는 1 ~ {MAX_UPLOAD_SIZE} byte 이어야 합니다.', status=413)
+    if not MIN_CHUNK_SIZE <= chunk_size <= MAX_CHUNK_SIZE:
+        raise UploadError(f'chunk_size 는 {MIN_CHUNK_SIZE} ~ {MAX_CHUNK_SIZE} byte 이어야 합니다.')
+    checksum = (checksum or '').lower()
+    if checksum and not re.fullmatch(r'[0-9a-f]{64}', checksum):
+        raise UploadError('checksum 은 SHA-256 16진수 문자열이어야 합니다.')
+
+    session = CTUploadSession.objects.create(
+        patient=patient,
+        doctor=doctor,
+        filename=os.path.basename(filename)[:255],
+        total_size=total_size,
+        chunk_size=chunk_size,
+        total_chunks=-(-total_size // chunk_size),
+        checksum=checksum,
+    )
+    session_dir(session).mkdir(parents=True, exist_ok=True)
+    return session
+
+
+def received_chunks(session):
+    """수신 완료된 청크 번호 목록"""
+    directory = session_dir(session)
+    if not directory.is_dir():
+        return []
+    return sorted(int(path.stem) for path in directory.glob('*.part'))
+
+
+def session_state(session):
+    """재개용 상태 (받은 청크/남은 청크)"""
+    received = received_chunks(session)
+    received_set = set(received)
+    return {
+        'upload_id': str(session.pk),
+        'patient_id': session.patient.patient_id,
+        'filename': session.filename,
+        'status': session.status,
+        'total_size': session.total_size,
+        'chunk_size': session.chunk_size,
+        'total_chunks': session.total_chunks,
+        'received_chunks': received,
+        'missing_chunks': [i for i in range(session.total_chunks) if i not in received_set],
+    }
+
+
+def _check_uploading(session):
+    if session.status != 'uploading':
+        raise UploadError(f'업로드가 이미 종료되었습니다. ({session.get_status_display()})', status=409)
+
+
+# ============================================
+# 청크 수신
+# ============================================
+
+def write_chunk(session, index, stream, content_length, expected_sha256):
+    """
+    청크 1개 저장
+    stream 을 블록 단위로 읽어 임시 파일에 쓰면서 해시 계산, 검증 후 이름 변경(원자적)
+    같은 청크를 다시 보내면 덮어씀 (재전송 허용)
+    """
+    _check_uploading(session)
+    if not 0 <= index < session.total_chunks:
+        raise UploadError(f'청크 번호는 0 ~ {session.total_chunks - 1} 이어야 합니다.')
+
+    expected_length = _expected_chunk_length(session, index)
+    if content_length != expected_length:
+        raise UploadError(f'{index}번 청크 크기는 {expected_length} byte 이어야 합니다.')
+    expected_sha256 = (expected_sha256 or '').lower()
+    if not expected_sha256:
+        raise UploadError('X-Chunk-SHA256 헤더가 필요합니다.')
+
+    final_path = _chunk_path(session, index)
+    # 같은 청크를 동시에 다시 보내도 서로의 임시 파일을 덮어쓰지 않도록 요청마다 다른 이름
+    temp_path = final_path.with_name(f'{index}.{uuid.uuid4().hex}.tmp')
+    final_path.parent.mkdir(parents=True, exist_ok=True)
+
+    digest = hashlib.sha256()
+    written = 0
+    try:
+        with open(temp_path, 'wb') as out:
+            while written < expected_length:
+                block = stream.read(min(READ_BLOCK_SIZE, expected_length - written))
+                if not block:
+                    break
+                digest.update(block)
+                out.write(block)
+                written += len(block)
+
+        if written != expected_length:
+            raise UploadError(f'{index}번 청크가 끝까지 전송되지 않았습니다. ({written}/{expected_length} byte)')
+        if digest.hexdigest() != expected_sha256:
+            raise UploadError(f'{index}번 청크 체크섬이 일치하지 않습니다.', status=422)
+
+        # 첫 청크에서 이미지 헤더 확인 (잘못된 파일이면 나머지를 받기 전에 중단)
+        if index == 0:
+            validate_image_header(temp_path)
+
+        os.replace(temp_path, final_path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+    # 정리 작업 기준 시각 갱신
+    CTUploadSession.objects.filter(pk=session.pk).update(updated_at=timezone.now())
+    return index
+
+
+# ============================================
+# 완료 / 취소
+# ============================================
+
+def _assemble(session, target_path):
+    """청크를 순서대로 이어 붙이면서 전체 SHA-256 계산"""
+    digest = hashlib.sha256()
+    with open(target_path, 'wb') as out:
+        for index in range(session.total_chunks):
+            with open(_chunk_path(session, index), 'rb') as chunk:
+                while True:
+                    block = chunk.read(READ_BLOCK_SIZE * 16)
+                    if not block:
+                        break
+                    digest.update(block)
+                    out.write(block)
+    return digest.hexdigest()
+
+
+def _claim(session, status):
+    """uploading -> status 조건부 UPDATE 로 세션 선점 (다른 요청이 먼저 선점했으면 409)"""
+    _check_uploading(session)
+    claimed = CTUploadSession.objects.filter(pk=session.pk, status='uploading').update(
+        status=status, updated_at=timezone.now(),
+    )
+    if not claimed:
+        session.refresh_from_db(fields=['status'])
+        raise UploadError(f'업로드가 이미 종료되었습니다. ({session.get_status_display()})', status=409)
+    session.status = status
+
+
+def complete_upload(session, doctor_id):
+    """
+    모든 청크가 도착했으면 합쳐서 Patient.ct_image 로 저장
+    반환: 저장된 파일 경로
+    """
+    _check_uploading(session)
+    state = session_state(session)
+    if state['missing_chunks']:
+        raise UploadError(f"아직 받지 못한 청크가 있습니다: {state['missing_chunks'][:20]}", status=409)
+
+    _claim(session, 'completing')
+    try:
+        name = _finish_upload(session, doctor_id)
+    except BaseException:
+        # 검증 실패 등 - 빠진/잘못된 청크를 다시 보낼 수 있도록 되돌림
+        CTUploadSession.objects.filter(pk=session.pk, status='completing').update(
+            status='uploading', updated_at=timezone.now(),
+        )
+        session.status = 'uploading'
+        raise
+    shutil.rmtree(session_dir(session), ignore_errors=True)
+    return name
+
+
+def _finish_upload(session, doctor_id):
+    """청크 합치기 -> 검증 -> 환자 CT 이미지 저장 (completing 으로 선점한 뒤 호출)"""
+    directory = session_dir(session)
+    assembled_path = directory / 'assembled'
+    checksum = _assemble(session, assembled_path)
+    if session.checksum and checksum != session.checksum:
+        assembled_path.unlink()
+        raise UploadError('전체 파일 체크섬이 일치하지 않습니다. 청크를 다시 전송해주세요.', status=422)
+    validate_image_header(assembled_path)
+
+    patient = session.patient
+    before = audit.snapshot(patient, ['ct_image'])
+    stem, ext = os.path.splitext(session.filename)
+    name = f'{patient.patient_id}_{_SAFE_FILENAME.sub("_", stem)}{ext.lower()}'
+    with open(assembled_path, 'rb') as assembled:
+        patient.ct_image.save(name, File(assembled), save=False)
+    patient.save(update_fields=['ct_image', 'updated_at'])
+    audit.record_update(doctor_id, patient, before, ['ct_image'])
+
+    session.status = 'completed'
+    session.completed_at = timezone.now()
+    session.save(update_fields=['status', 'completed_at', 'updated_at'])
+    return patient.ct_image.name
+
+
+def abort_upload(session):
+    """업로드 취소 - 임시 청크 삭제"""
+    _claim(session, 'aborted')
+    shutil.rmtree(session_dir(session), ignore_errors=True)
+
+
+def cleanup_stale_uploads(max_age_hours=UPLOAD_EXPIRE_HOURS):
+    """
+    오래 멈춘 업로드 세션 취소 및 임시 파일 삭제 - 정리한 세션 수 반환
+    완료 처리 중 워커가 종료되어 completing 으로 남은 세션도 포함
+    """
+    cutoff = timezone.now() - timedelta(hours=max_age_hours)
+    count = 0
+    stale = CTUploadSession.objects.filter(status__in=['uploading', 'completing'], updated_at__lt=cutoff)
+    for session_id in stale.values_list('pk', flat=True).iterator():
+        # 그사이 청크가 도착했거나 완료된 세션은 건너뜀
+        aborted = CTUploadSession.objects.filter(
+            pk=session_id, status__in=['uploading', 'completing'], updated_at__lt=cutoff,
+        ).update(status='aborted', updated_at=timezone.now())
+        if aborted:
+            shutil.rmtree(_temp_root() / str(session_id), ignore_errors=True)
+            count += 1
+    return count
+
+
+def next_cleanup_delay():
+    """
+    남은 업로드 세션이 만료되는 시점까지의 대기 시간(초) - 정리 작업 재예약용
+    남은 세션이 없으면 None (다음 업로드 시작 시 다시 예약)
+    """
+    oldest = (
+        CTUploadSession.objects.filter(status__in=['uploading', 'completing'])
+        .order_by('updated_at')
+        .values_list('updated_at', flat=True)
+        .first()
+    )
+    if oldest is None:
+        return None
+    expires_at = oldest + timedelta(hours=UPLOAD_EXPIRE_HOURS)
+    return max(MIN_CLEANUP_INTERVAL, int((expires_at - timezone.now()).total_seconds()) + 1)
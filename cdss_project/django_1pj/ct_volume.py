@@ -0,0 +1,314 @@
+"""
+CT DICOM 시리즈 -> 메모리 매핑 볼륨
+DICOM 슬라이스 수백 장을 HU(int16) 볼륨 하나(.npy)로 변환하고, 조회는 np.load(mmap_mode='r') 뷰로 처리
+
+- 변환: 헤더만 먼저 읽어 정렬한 뒤, 슬라이스를 한 장씩 디코딩하여 디스크 볼륨에 바로 기록
+  (시리즈 전체를 메모리에 올리지 않음)
+- 조회: axial/coronal/sagittal 단면과 부분 영역은 memmap 슬라이싱 -> 복사 없는 NumPy 뷰
+  실제로 접근한 바이트만 OS 가 디스크에서 읽음
+- 볼륨 파일 위치: settings.CT_VOLUME_DIR/<환자번호>/<series uid>.npy
+"""
+import datetime
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pydicom
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import IntegrityError
+from django.utils.text import get_valid_filename
+from pydicom.errors import InvalidDicomError
+
+from .models import CTStudy
+
+
+VOLUME_DTYPE = np.int16
+HU_MIN, HU_MAX = np.iinfo(VOLUME_DTYPE).min, np.iinfo(VOLUME_DTYPE).max
+
+PLANES = ('axial', 'coronal', 'sagittal')
+
+# 프로세스별로 열어 두는 memmap 수 (파일 핸들/매핑 재사용)
+OPEN_VOLUME_CACHE_SIZE = 16
+
+
+class VolumeError(ValueError):
+    """DICOM 변환/볼륨 조회 오류"""
+
+
+def volume_root():
+    return Path(getattr(settings, 'CT_VOLUME_DIR', Path(settings.BASE_DIR) / 'ct_volumes'))
+
+
+def volume_file(study):
+    return volume_root() / study.volume_path
+
+
+def _path_component(value):
+    """환자번호/series UID 를 경로 한 단계로 쓸 수 있게 정리 ('/', '..' 등으로 볼륨 디렉터리 밖을 가리키지 않도록)"""
+    try:
+        return get_valid_filename(value)
+    except SuspiciousFileOperation:
+        raise VolumeError(f'파일 경로로 사용할 수 없는 값입니다: {value!r}')
+
+
+# ============================================
+# DICOM 시리즈 변환
+# ============================================
+
+def _dicom_files(source):
+    """디렉터리(하위 포함) 또는 파일 경로 목록"""
+    if isinstance(source, (str, Path)) and Path(source).is_dir():
+        return sorted(path for path in Path(source).rglob('*') if path.is_file())
+    return [Path(path) for path in source]
+
+
+def _read_headers(paths):
+    """픽셀 데이터 없이 헤더만 읽기 - (경로, 데이터셋) 목록"""
+    headers = []
+    for path in paths:
+        try:
+            dataset = pydicom.dcmread(path, stop_before_pixels=True)
+        except (InvalidDicomError, OSError):
+            continue
+        if 'Rows' in dataset and 'Columns' in dataset:
+            headers.append((path, dataset))
+    return headers
+
+
+def _slice_position(dataset):
+    """슬라이스 법선 방향의 위치 (ImageOrientationPatient 가 없으면 z 좌표/InstanceNumber)"""
+    position = dataset.get('ImagePositionPatient')
+    orientation = dataset.get('ImageOrientationPatient')
+    if position is not None and orientation is not None:
+        row_cosine = np.array(orientation[:3], dtype=np.float64)
+        col_cosine = np.array(orientation[3:], dtype=np.float64)
+        return float(np.dot(np.cross(row_cosine, col_cosine), np.array(position, dtype=np.float64)))
+    if position is not None:
+        return float(position[2])
+    return float(dataset.get('InstanceNumber', 0))
+
+
+def _parse_date(value):
+    try:
+        return datetime.datetime.strptime(str(value), '%Y%m%d').date()
+    except (TypeError, ValueError):
+        return None
+
+
+def _select_series(headers, series_uid=None):
+    """시리즈 선택 - 지정이 없으면 슬라이스가 가장 많은 시리즈"""
+    series = {}
+    for path, dataset in headers:
+        series.setdefault(str(dataset.get('SeriesInstanceUID', '')), []).append((path, dataset))
+    if not series:
+        raise VolumeError('DICOM 슬라이스를 찾을 수 없습니다.')
+    if series_uid is not None:
+        if series_uid not in series:
+            raise VolumeError(f'시리즈를 찾을 수 없습니다: {series_uid}')
+        return series_uid, series[series_uid]
+    return max(series.items(), key=lambda item: len(item[1]))
+
+
+def ingest_dicom_series(patient, source, series_uid=None):
+    """
+    DICOM 시리즈를 볼륨으로 변환하여 CTStudy 생성/갱신
+    source: DICOM 파일이 있는 디렉터리 또는 파일 경로 목록
+    """
+    uid, slices = _select_series(_read_headers(_dicom_files(source)), series_uid)
+    if not uid:
+        raise VolumeError('SeriesInstanceUID 가 없는 DICOM 입니다.')
+
+    slices.sort(key=lambda item: _slice_position(item[1]))
+    first = slices[0][1]
+    rows, columns = int(first.Rows), int(first.Columns)
+    if any(int(ds.Rows) != rows or int(ds.Columns) != columns for _, ds in slices):
+        raise VolumeError('슬라이스 크기가 서로 다른 시리즈입니다.')
+
+    positions = np.array([_slice_position(ds) for _, ds in slices])
+    spacing = float(np.median(np.diff(positions))) if len(positions) > 1 else None
+    pixel_spacing = first.get('PixelSpacing') or [None, None]
+
+    # 같은 시리즈가 다른 환자에 등록되어 있으면 옮기지 않고 거절 (다른 환자로 잘못 변환 요청한 경우)
+    if CTStudy.objects.filter(series_instance_uid=uid).exclude(patient=patient).exists():
+        raise VolumeError(f'다른 환자에 이미 등록된 시리즈입니다: {uid}')
+
+    try:
+        # 환자까지 조회 조건에 넣어 기존 검사를 다른 환자로 옮기지 않음
+        study, _ = CTStudy.objects.update_or_create(
+            series_instance_uid=uid,
+            patient=patient,
+            defaults={
+                'study_instance_uid': str(first.get('StudyInstanceUID', '')),
+                'study_date': _parse_date(first.get('StudyDate') or first.get('SeriesDate')),
+                'modality': str(first.get('Modality', '')),
+                'description': str(first.get('SeriesDescription', ''))[:200],
+                'slice_count': len(slices),
+                'rows': rows,
+                'columns': columns,
+                'pixel_spacing_row': float(pixel_spacing[0]) if pixel_spacing[0] is not None else None,
+                'pixel_spacing_col': float(pixel_spacing[1]) if pixel_spacing[1] is not None else None,
+                'slice_spacing': abs(spacing) if spacing else None,
+                'volume_path': f'{_path_component(patient.patient_id)}/{_path_component(uid)}.npy',
+                'status': 'processing',
+                'error': '',
+            },
+        )
+    except IntegrityError:
+        # 확인 직후 다른 요청이 같은 시리즈를 다른 환자로 등록한 경우
+        raise VolumeError(f'다른 환자에 이미 등록된 시리즈입니다: {uid}')
+
+    target = volume_file(study)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = target.with_name(target.name + '.tmp')
+    try:
+        volume = np.lib.format.open_memmap(temp_path, mode='w+', dtype=VOLUME_DTYPE, shape=(len(slices), rows, columns))
+        for index, (path, _) in enumerate(slices):
+            # 슬라이스 한 장만 디코딩 -> HU 변환 -> 볼륨에 기록
+            dataset = pydicom.dcmread(path)
+            pixels = dataset.pixel_array
+            slope = float(dataset.get('RescaleSlope', 1) or 1)
+            intercept = float(dataset.get('RescaleIntercept', 0) or 0)
+            if slope == 1 and intercept == 0 and pixels.dtype == VOLUME_DTYPE:
+                volume[index] = pixels
+            else:
+                hu = pixels.astype(np.float32) * slope + intercept
+                np.clip(np.rint(hu), HU_MIN, HU_MAX, out=hu)
+                volume[index] = hu
+        volume.flush()
+        del volume
+        os.replace(temp_path, target)
+    except Exception as e:
+        if temp_path.exists():
+            temp_path.unlink()
+        study.status = 'failed'
+        study.error = str(e)
+        study.save(update_fields=['status', 'error'])
+        raise
+
+    _forget_volume(study.pk)
+    study.status = 'ready'
+    study.save(update_fields=['status'])
+    return study
+
+
+# ============================================
+# 볼륨 조회 (memmap)
+# ============================================
+
+_open_volumes = OrderedDict()
+_open_volumes_lock = threading.Lock()
+
+
+def _forget_volume(study_id):
+    with _open_volumes_lock:
+        _open_volumes.pop(study_id, None)
+
+
+def volume_version(study):
+    """볼륨 파일 버전 (수정 시각 ns) - 다시 변환하면 바뀜, 렌더링 캐시 키에 사용"""
+    if study.status != 'ready' or not study.volume_path:
+        raise VolumeError('CT 볼륨이 아직 준비되지 않았습니다.')
+    try:
+        return volume_file(study).stat().st_mtime_ns
+    except FileNotFoundError:
+        raise VolumeError('CT 볼륨 파일이 없습니다.')
+
+
+def open_volume(study):
+    """
+    읽기 전용 memmap 볼륨 (slices, rows, columns)
+    파일 전체를 읽지 않고 매핑만 하므로 슬라이스 수와 관계없이 바로 반환
+    """
+    path = volume_file(study)
+    # 다른 프로세스가 다시 변환한 경우 새 파일을 매핑하도록 수정 시각까지 비교
+    version = (path, volume_version(study))
+
+    key = study.pk
+    with _open_volumes_lock:
+        cached = _open_volumes.get(key)
+        if cached is not None and cached[0] == version:
+            _open_volumes.move_to_end(key)
+            return cached[1]
+
+    volume = np.load(path, mmap_mode='r')
+    with _open_volumes_lock:
+        _open_volumes[key] = (version, volume)
+        _open_volumes.move_to_end(key)
+        while len(_open_volumes) > OPEN_VOLUME_CACHE_SIZE:
+            _open_volumes.popitem(last=False)
+    return volume
+
+
+def plane_size(study, plane):
+    """단면 방향별 (슬라이스 수, 높이, 너비)"""
+    if plane == 'axial':
+        return study.slice_count, study.rows, study.columns
+    if plane == 'coronal':
+        return study.rows, study.slice_count, study.columns
+    if plane == 'sagittal':
+        return study.columns, study.slice_count, study.rows
+    raise VolumeError(f'지원하지 않는 단면입니다: {plane} ({", ".join(PLANES)})')
+
+
+def get_slice(study, plane, index):
+    """
+    단면 1장 (복사 없는 뷰)
+    - axial   : volume[index]       (연속 메모리)
+    - coronal : volume[:, index, :]
+    - sagittal: volume[:, :, index]
+    coronal/sagittal 은 위쪽이 머리 방향이 되도록 슬라이스 축을 뒤집은 뷰
+    """
+    count = plane_size(study, plane)[0]
+    if not 0 <= index < count:
+        raise VolumeError(f'{plane} 슬라이스 번호는 0 ~ {count - 1} 이어야 합니다.')
+
+    volume = open_volume(study)
+    if plane == 'axial':
+        return volume[index]
+    if plane == 'coronal':
+        return volume[::-1, index, :]
+    return volume[::-1, :, index]
+
+
+def get_region(study, z=None, y=None, x=None):
+    """부분 볼륨 (각 축 (시작, 끝) 범위, 복사 없는 뷰)"""
+    volume = open_volume(study)
+    return volume[slice(*(z or (None,))), slice(*(y or (None,))), slice(*(x or (None,)))]
+
+
+def plane_aspect(study, plane):
+    """화면 표시용 세로/가로 픽셀 비율 (reformat 시 슬라이스 간격 보정)"""
+    row, col, thickness = study.pixel_spacing_row, study.pixel_spacing_col, study.slice_spacing
+    if not (row and col and thickness):
+        return 1.0
+    if plane == 'axial':
+        return row / col
+    if plane == 'coronal':
+        return thickness / col
+    return thickness / row
+
+
+def study_metadata(study):
+    return {
+        'id': study.pk,
+        'patient_id': study.patient.patient_id,
+        'study_date': study.study_date,
+        'modality': study.modality,
+        'description': study.description,
+        'status': study.status,
+        'shape': [study.slice_count, study.rows, study.columns],
+        'spacing_mm': [study.slice_spacing, study.pixel_spacing_row, study.pixel_spacing_col],
+        'planes': {plane: plane_size(study, plane)[0] for plane in PLANES},
+    }
+
+
+def delete_volume(study):
+    """볼륨 파일 삭제 (CTStudy 삭제 시)"""
+    _forget_volume(study.pk)
+    if study.volume_path:
+        path = volume_file(study)
+        if path.exists():
+            path.unlink()
@@ -0,0 +1,128 @@
+"""
+환자 삭제 (soft delete + 백그라운드 정리)
+요청 안에서는 deleted_at 만 설정하여 즉시 모든 조회에서 숨기고,
+관련 행(약물 상호작용, 검사 결과, CT 등)과 미디어 파일은 patients.purge 작업이 청크 단위로 삭제
+
+- 삭제 표시 시점에 코호트 요약 차감, 생존 분석 캐시 무효화, 유사 환자 색인에서 제거
+- 정리 작업은 청크마다 별도 트랜잭션 (잠금 범위 제한), 행별 시그널 없이 집합 DELETE
+- 파일(CT 볼륨, 업로드 임시 청크, CT 이미지)은 해당 행 삭제가 커밋된 뒤 삭제
+  (파일 삭제가 실패해도 DB 는 이미 정리된 상태 - 파일만 남음)
+"""
+import shutil
+
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from .archive import RELATED_MODELS
+from .ct_upload import session_dir
+from .ct_volume import delete_volume
+from .media_gc import _still_referenced
+from .models import CTStudy, CTUploadSession, Patient
+from .similarity import remove_patient_vector
+from .survival import invalidate_survival_cache
+from . import cohort
+from . import jobs
+
+
+PURGE_CHUNK_SIZE = 1000
+PURGE_JOB = 'patients.purge'
+
+
+# ============================================
+# 삭제 표시
+# ============================================
+
+def soft_delete_patients(queryset):
+    """
+    queryset 환자를 삭제 표시하고 정리 작업 예약 - 삭제 표시한 환자 pk 목록 반환
+    정리 작업은 같은 트랜잭션에서 등록되므로 커밋 전에는 실행되지 않음
+    """
+    with transaction.atomic():
+        pks = list(queryset.order_by('pk').select_for_update().values_list('pk', flat=True))
+        if not pks:
+            return []
+        patients = Patient.objects.filter(pk__in=pks)
+        cohort.adjust_patients(patients, -1)
+        now = timezone.now()
+        patients.update(deleted_at=now, updated_at=now)
+        for pk in pks:
+            jobs.enqueue(PURGE_JOB, kwargs={'patient_pk': pk}, priority=-1, dedup_key=f'{PURGE_JOB}:{pk}')
+
+        def forget():
+            for pk in pks:
+                remove_patient_vector(pk)
+            invalidate_survival_cache()
+
+        transaction.on_commit(forget)
+    return pks
+
+
+def soft_delete_patient(patient):
+    """환자 한 명 삭제 표시 (상세/삭제 화면용)"""
+    deleted = soft_delete_patients(Patient.objects.filter(pk=patient.pk))
+    if deleted:
+        patient.deleted_at = timezone.now()
+    return bool(deleted)
+
+
+# ============================================
+# 정리
+# ============================================
+
+def _delete_files(model, rows):
+    """행 삭제 커밋 후 연결된 파일 삭제"""
+    if model is CTStudy:
+        for study in rows:
+            delete_volume(study)
+    elif model is CTUploadSession:
+        for session in rows:
+            shutil.rmtree(session_dir(session), ignore_errors=True)
+
+
+def _purge_related(model, patient_pk, chunk_size):
+    """관련 테이블 한 개를 청크 단위로 삭제 - 삭제한 행 수 반환"""
+    deleted = 0
+    queryset = model.objects.filter(patient_id=patient_pk).order_by('pk')
+    queryset = queryset.only('pk', 'volume_path') if model is CTStudy else queryset.only('pk')
+
+    while True:
+        rows = list(queryset[:chunk_size])
+        if not rows:
+            return deleted
+        with transaction.atomic():
+            chunk = model.objects.filter(pk__in=[row.pk for row in rows])
+            deleted += chunk._raw_delete(chunk.db)
+        _delete_files(model, rows)
+
+
+def purge_patient(patient_pk, chunk_size=PURGE_CHUNK_SIZE):
+    """
+    삭제 표시된 환자의 관련 행과 파일을 삭제한 뒤 환자 행 삭제
+    반환: {모델 라벨: 삭제 행 수} (삭제 표시가 없는 환자면 None)
+    """
+    patient = Patient.all_objects.filter(pk=patient_pk, deleted_at__isnull=False).only('pk', 'ct_image').first()
+    if patient is None:
+        return None
+
+    counts = {}
+    for model in RELATED_MODELS:
+        counts[model._meta.label] = _purge_related(model, patient_pk, chunk_size)
+
+    image = patient.ct_image.name
+    with transaction.atomic():
+        row = Patient.all_objects.filter(pk=patient_pk, deleted_at__isnull=False)
+        counts[Patient._meta.label] = row._raw_delete(row.db)
+
+    # 같은 파일을 다른 환자(보관 환자 포함)가 참조하지 않을 때만 삭제
+    if image and not _still_referenced('ct_images', [image]):
+        default_storage.delete(image)
+    return counts
+
+
+def purge_deleted_patients(chunk_size=PURGE_CHUNK_SIZE):
+    """삭제 표시된 환자 전체 정리 (유실된 정리 작업 복구용) - 정리한 환자 수 반환"""
+    pks = list(Patient.all_objects.filter(deleted_at__isnull=False).order_by('pk').values_list('pk', flat=True))
+    for pk in pks:
+        purge_patient(pk, chunk_size)
+    return len(pks)
@@ -0,0 +1,226 @@
+"""
+약물-약물 상호작용 그래프
+Drug.interactions 자유 텍스트를 drug_code 기준 인접 목록으로 변환하여 메모리에 보관
+- 두 약물 간 상호작용 조회: dict 조회 2회 (O(1))
+- 처방 조합(regimen) 검사: 약물 쌍마다 O(1)
+  (약물 조합 API, 환자 상세 화면, 위험 요약 작업에서 사용)
+
+Drug.interactions 작성 형식 (한 줄에 한 건):
+    약물코드 또는 약물명 | 심각도 | 기전
+    예) LENVA | 주의 | CYP3A4 억제로 혈중 농도 증가
+구분자가 없는 줄은 본문에서 약물명/코드와 심각도 키워드를 찾아 해석
+
+Drug 저장/삭제 시 signals 에서 invalidate_interaction_graph() 호출 -> 다음 조회 때 재구성
+(프로세스별 메모리 캐시 - 다른 프로세스의 변경은 공유 버전(versions.DRUGS)으로 감지)
+"""
+import threading
+from collections import namedtuple
+
+from .models import Drug
+from . import versions
+
+
+# 심각도 (앞에 있을수록 위험)
+SEVERITY_ORDER = ['contraindicated', 'major', 'moderate', 'minor']
+SEVERITY_LABELS = {
+    'contraindicated': '병용금기',
+    'major': '중대',
+    'moderate': '주의',
+    'minor': '경미',
+}
+DEFAULT_SEVERITY = 'moderate'
+
+# 심각도 키워드 (위험한 등급부터 검사)
+SEVERITY_KEYWORDS = [
+    ('contraindicated', ['병용금기', '금기', 'contraindicated', 'contraindication']),
+    ('major', ['중대', '심각', '위험', 'major', 'severe', 'serious']),
+    ('moderate', ['주의', '중등도', 'moderate', 'caution']),
+    ('minor', ['경미', 'minor', 'mild']),
+]
+
+Interaction = namedtuple('Interaction', ['drug_a', 'drug_b', 'severity', 'mechanism', 'source'])
+
+
+def parse_severity(text):
+    """텍스트에서 심각도 추출 (키워드가 없으면 None)"""
+    lowered = text.lower()
+    for severity, keywords in SEVERITY_KEYWORDS:
+        if any(keyword in lowered for keyword in keywords):
+            return severity
+    return None
+
+
+def _severity_rank(severity):
+    return SEVERITY_ORDER.index(severity)
+
+
+class DrugInteractionGraph:
+    """drug_code -> {drug_code: Interaction} 형태의 무방향 그래프"""
+
+    def __init__(self, drugs=()):
+        self.adjacency = {}
+        self.names = {}
+        self._name_index = {}
+
+        drugs = list(drugs)
+        for drug_code, name_kr, name_en, _ in drugs:
+            self.names[drug_code] = name_kr
+            for key in (drug_code, name_kr, name_en):
+                if key:
+                    self._name_index[key.strip().lower()] = drug_code
+
+        # 긴 이름부터 매칭 (부분 문자열 오탐 방지)
+        self._names_by_length = sorted(self._name_index, key=len, reverse=True)
+
+        for drug_code, _, _, interactions in drugs:
+            for line in (interactions or '').splitlines():
+                self._parse_line(drug_code, line.strip())
+
+    # --------------------------------------------
+    # 구성
+    # --------------------------------------------
+
+    def _resolve(self, text):
+        return self._name_index.get(text.strip().lower())
+
+    def resolve_names(self, names):
+        """약물명/코드 목록 -> drug_code 목록 (모르는 이름은 제외)"""
+        codes = (self._resolve(name) for name in names if name)
+        return [code for code in codes if code is not None]
+
+    def _find_mentions(self, line):
+        """구분자 없는 줄에서 언급된 약물 코드 찾기"""
+        lowered = line.lower()
+        found = []
+        for name in self._names_by_length:
+            if name in lowered:
+                code = self._name_index[name]
+                if code not in found:
+                    found.append(code)
+                # 찾은 이름은 지워서 더 짧은 이름이 중복 매칭되지 않게 함
+                lowered = lowered.replace(name, ' ')
+        return found
+
+    def _parse_line(self, source_code, line):
+        if not line:
+            return
+
+        if '|' in line:
+            parts = [p.strip() for p in line.split('|')]
+            target = self._resolve(parts[0])
+            if target is None:
+                return
+            severity = parse_severity(parts[1]) if len(parts) > 1 else None
+            mechanism = parts[2] if len(parts) > 2 else ''
+            self.add(source_code, target, severity or DEFAULT_SEVERITY, mechanism, source_code)
+            return
+
+        severity = parse_severity(line) or DEFAULT_SEVERITY
+        for target in self._find_mentions(line):
+            self.add(source_code, target, severity, line, source_code)
+
+    def add(self, drug_a, drug_b, severity, mechanism='', source=None):
+        """상호작용 추가 - 같은 쌍이 여러 번 기재되면 더 위험한 쪽을 유지"""
+        if drug_a == drug_b:
+            return
+        existing = self.adjacency.get(drug_a, {}).get(drug_b)
+        if existing and _severity_rank(existing.severity) <= _severity_rank(severity):
+            return
+
+        edge = Interaction(drug_a, drug_b, severity, mechanism, source or drug_a)
+        self.adjacency.setdefault(drug_a, {})[drug_b] = edge
+        self.adjacency.setdefault(drug_b, {})[drug_a] = edge
+
+    # --------------------------------------------
+    # 조회
+    # --------------------------------------------
+
+    def check_pair(self, drug_a, drug_b):
+        """두 약물 간 상호작용 (없으면 None)"""
+        return self.adjacency.get(drug_a, {}).get(drug_b)
+
+    def interactions_of(self, drug_code):
+        """한 약물과 상호작용하는 모든 약물"""
+        return list(self.adjacency.get(drug_code, {}).values())
+
+    def check_regimen(self, drug_codes):
+        """
+        처방 조합 내 모든 약물 쌍 검사
+        위험한 순서로 정렬된 상호작용 목록 반환
+        """
+        codes = list(dict.fromkeys(drug_codes))
+        conflicts = []
+        for i, drug_a in enumerate(codes):
+            neighbours = self.adjacency.get(drug_a)
+            if not neighbours:
+                continue
+            for drug_b in codes[i + 1:]:
+                edge = neighbours.get(drug_b)
+                if edge is not None:
+                    conflicts.append(edge)
+        conflicts.sort(key=lambda edge: _severity_rank(edge.severity))
+        return conflicts
+
+    def to_dict(self, edge):
+        return {
+            'drug_a': edge.drug_a,
+            'drug_a_name': self.names.get(edge.drug_a, ''),
+            'drug_b': edge.drug_b,
+            'drug_b_name': self.names.get(edge.drug_b, ''),
+            'severity': edge.severity,
+            'severity_label': SEVERITY_LABELS[edge.severity],
+            'mechanism': edge.mechanism,
+        }
+
+
+# ============================================
+# 프로세스 단위 캐시
+# ============================================
+
+# (그래프, 구성 시점의 versions.DRUGS 버전)
+_graph = None
+_graph_lock = threading.Lock()
+
+
+def build_interaction_graph():
+    """Drug 테이블 전체로 그래프 구성 (필요한 컬럼만 조회)"""
+    drugs = Drug.objects.values_list('drug_code', 'drug_name_kr', 'drug_name_en', 'interactions')
+    return DrugInteractionGraph(drugs.iterator())
+
+
+def get_interaction_graph():
+    """
+    캐시된 그래프 반환 (없거나 다른 프로세스에서 약물 정보가 바뀌었으면 구성)
+    구성 전에 버전을 읽어 두므로 구성 도중 바뀐 내용은 다음 조회에서 반영
+    """
+    global _graph
+    version = versions.current(versions.DRUGS)
+    cached = _graph
+    if cached is None or cached[1] != version:
+        with _graph_lock:
+            if _graph is None or _graph[1] != version:
+                _graph = (build_interaction_graph(), version)
+            cached = _graph
+    return cached[0]
+
+
+def invalidate_interaction_graph():
+    """약물 정보 변경 시 호출 - 다음 조회 때 다시 구성 (다른 프로세스에는 signals 가 versions.bump 로 알림)"""
+    global _graph
+    with _graph_lock:
+        _graph = None
+
+
+def check_regimen(drug_codes):
+    """처방 조합 검사 (뷰/배치 작업용 진입점)"""
+    graph = get_interaction_graph()
+    return [graph.to_dict(edge) for edge in graph.check_regimen(drug_codes)]
+
+
+def check_drug_names(drug_names):
+    """
+    약물명 목록으로 처방 조합 검사 (환자 상세 화면, 위험 요약 작업용)
+    DrugInteraction.drug_name 처럼 코드 대신 이름이 저장된 경우 사용
+    """
+    graph = get_interaction_graph()
+    return [graph.to_dict(edge) for edge in graph.check_regimen(graph.resolve_names(drug_names))]
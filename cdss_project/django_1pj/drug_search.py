@@ -0,0 +1,236 @@
+"""
+약물 정보 전문 검색
+효능/주의사항/부작용/금기 텍스트에 대한 메모리 역색인 + BM25 순위
+
+- 한글은 형태소 분석기 없이 음절 bigram 으로 색인 ("간성뇌증" -> 간성, 성뇌, 뇌증)
+  검색어도 같은 방식으로 분해하므로 조사가 붙은 형태("간성뇌증이")도 매칭
+- 영문/숫자는 소문자 단어 단위 ("hand-foot" -> hand, foot)
+- Drug 저장/삭제 시 해당 약물 문서만 색인에서 교체 (signals)
+- 공유 버전(versions.DRUGS)이 바뀌면 전체 재색인 대신 증분 동기화
+  (updated_at 이 마지막 동기화 시점 이후인 문서만 다시 색인, 없어진 약물 코드는 제거)
+  -> 저장한 프로세스도, 다른 프로세스도 바뀐 문서만 다시 읽음
+"""
+import math
+import re
+import threading
+from collections import Counter
+from datetime import timedelta
+
+from .models import Drug
+from . import versions
+
+
+# 검색 대상 필드와 가중치 (약물명은 가볍게 포함)
+SEARCH_FIELDS = {
+    'drug_name_kr': 2.0,
+    'drug_name_en': 2.0,
+    'efficacy': 1.0,
+    'precautions': 1.0,
+    'common_side_effects': 1.0,
+    'serious_side_effects': 1.0,
+    'contraindications': 1.0,
+}
+
+# BM25 파라미터
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_HANGUL_RUN = re.compile(r'[가-힣]+')
+_WORD_RUN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    """한글 음절 bigram + 영문/숫자 단어 토큰 목록"""
+    if not text:
+        return []
+    text = text.lower()
+    tokens = []
+    for run in _HANGUL_RUN.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    tokens.extend(_WORD_RUN.findall(text))
+    return tokens
+
+
+class DrugSearchIndex:
+    """약물 문서 역색인"""
+
+    def __init__(self):
+        self.postings = {}      # term -> {drug_code: 가중 tf}
+        self.doc_lengths = {}   # drug_code -> 가중 문서 길이
+        self.doc_fields = {}    # drug_code -> {field: set(term)}
+        self.doc_names = {}     # drug_code -> 한글 약물명
+        self.total_length = 0.0
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    # --------------------------------------------
+    # 색인
+    # --------------------------------------------
+
+    def add_document(self, drug_code, fields):
+        """문서 추가 (이미 있으면 교체)"""
+        self.remove_document(drug_code)
+
+        weighted_tf = Counter()
+        field_terms = {}
+        for field, weight in SEARCH_FIELDS.items():
+            tokens = tokenize(fields.get(field))
+            if not tokens:
+                continue
+            field_terms[field] = set(tokens)
+            for term, tf in Counter(tokens).items():
+                weighted_tf[term] += tf * weight
+
+        for term, tf in weighted_tf.items():
+            self.postings.setdefault(term, {})[drug_code] = tf
+
+        length = sum(weighted_tf.values())
+        self.doc_lengths[drug_code] = length
+        self.doc_fields[drug_code] = field_terms
+        self.doc_names[drug_code] = fields.get('drug_name_kr', '')
+        self.total_length += length
+
+    def remove_document(self, drug_code):
+        if drug_code not in self.doc_lengths:
+            return
+        for terms in self.doc_fields[drug_code].values():
+            for term in terms:
+                posting = self.postings.get(term)
+                if posting is None:
+                    continue
+                posting.pop(drug_code, None)
+                if not posting:
+                    del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(drug_code)
+        del self.doc_fields[drug_code]
+        del self.doc_names[drug_code]
+
+    # --------------------------------------------
+    # 검색
+    # --------------------------------------------
+
+    def search(self, query, limit=20):
+        """
+        BM25 점수 순 검색 결과
+        [{'drug_code', 'drug_name_kr', 'score', 'matched_fields'}, ...]
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        doc_count = len(self.doc_lengths)
+        if not terms or not doc_count:
+            return []
+
+        avg_length = self.total_length / doc_count or 1.0
+        scores = Counter()
+        for term in terms:
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+            for drug_code, tf in posting.items():
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[drug_code] / avg_length)
+                scores[drug_code] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        results = []
+        for drug_code, score in scores.most_common(limit):
+            fields = self.doc_fields[drug_code]
+            results.append({
+                'drug_code': drug_code,
+                'drug_name_kr': self.doc_names[drug_code],
+                'score': round(score, 4),
+                'matched_fields': [
+                    field for field, field_terms in fields.items()
+                    if any(term in field_terms for term in terms)
+                ],
+            })
+        return results
+
+
+# ============================================
+# 프로세스 단위 캐시
+# ============================================
+
+_index = None
+# 색인에 반영한 versions.DRUGS 버전과 최신 updated_at
+_index_version = None
+_index_synced_at = None
+# 재색인 중 검색이 dict 를 순회하지 않도록 검색/갱신 모두 잠금
+_index_lock = threading.RLock()
+
+# 증분 동기화 시 updated_at 비교 여유 (저장 후 늦게 커밋된 트랜잭션의 문서도 다시 읽도록)
+SYNC_MARGIN_SECONDS = 60
+
+
+def _document_fields(values):
+    return {field: values.get(field) for field in SEARCH_FIELDS}
+
+
+def _index_rows(index, rows, synced_at=None):
+    """values() 행을 색인에 반영하고 가장 늦은 updated_at 반환"""
+    for values in rows.iterator():
+        index.add_document(values['drug_code'], _document_fields(values))
+        if synced_at is None or values['updated_at'] > synced_at:
+            synced_at = values['updated_at']
+    return synced_at
+
+
+def build_search_index():
+    """Drug 테이블 전체 색인 -> (색인, 최신 updated_at)"""
+    index = DrugSearchIndex()
+    synced_at = _index_rows(index, Drug.objects.values('drug_code', 'updated_at', *SEARCH_FIELDS))
+    return index, synced_at
+
+
+def sync_search_index(index, synced_at):
+    """
+    synced_at 이후 수정된 문서만 다시 색인하고 삭제된 약물 제거 -> 새 기준 updated_at 반환
+    (약물 코드 목록은 PK 만 조회)
+    """
+    codes = set(Drug.objects.values_list('drug_code', flat=True).iterator())
+    for drug_code in set(index.doc_names) - codes:
+        index.remove_document(drug_code)
+
+    rows = Drug.objects.values('drug_code', 'updated_at', *SEARCH_FIELDS)
+    if synced_at is not None:
+        rows = rows.filter(updated_at__gte=synced_at - timedelta(seconds=SYNC_MARGIN_SECONDS))
+    return _index_rows(index, rows, synced_at)
+
+
+def get_search_index():
+    """캐시된 색인 반환 (없으면 전체 색인, 공유 버전이 바뀌었으면 증분 동기화)"""
+    global _index, _index_version, _index_synced_at
+    version = versions.current(versions.DRUGS)
+    index = _index
+    if index is None or _index_version != version:
+        with _index_lock:
+            if _index is None:
+                _index, _index_synced_at = build_search_index()
+                _index_version = version
+            elif _index_version != version:
+                _index_synced_at = sync_search_index(_index, _index_synced_at)
+                _index_version = version
+            index = _index
+    return index
+
+
+def update_drug_document(drug):
+    """약물 저장 시 해당 문서만 재색인 (색인이 아직 없으면 생략)"""
+    with _index_lock:
+        if _index is not None:
+            _index.add_document(drug.drug_code, _document_fields(drug.__dict__))
+
+
+def remove_drug_document(drug_code):
+    with _index_lock:
+        if _index is not None:
+            _index.remove_document(drug_code)
+
+
+def search_drugs(query, limit=20):
+    """약물 전문 검색 (뷰/관리자용 진입점)"""
+    index = get_search_index()
+    with _index_lock:
+        return index.search(query, limit=limit)
@@ -0,0 +1,208 @@
+"""
+약물 자동완성 (prefix trie)
+drug_name_kr / drug_name_en / drug_code 를 메모리 trie 에 올려 키 입력마다 DB 조회 없이 응답
+
+- 한글은 자모 단위로 분해하여 색인 -> 입력 중인 글자("소ㄹ")도 "소라페닙" 에 매칭
+- 초성 검색 지원 ("ㅅㄹㅍ" -> 소라페닙)
+- 각 노드에 상위 k 개 결과를 미리 저장하여 조회는 prefix 길이만큼만 이동
+- Drug 저장/삭제 시 무효화 -> 다음 조회 때 재구성 (signals)
+  다른 프로세스의 변경은 공유 버전(versions.DRUGS)으로 감지
+"""
+import bisect
+import threading
+
+from .models import Drug
+from . import versions
+
+
+# 노드별로 보관하는 최대 결과 수
+TOP_K = 20
+
+CHOSEONG = [
+    'ㄱ', 'ㄲ', 'ㄴ', 'ㄷ', 'ㄸ', 'ㄹ', 'ㅁ', 'ㅂ', 'ㅃ', 'ㅅ',
+    'ㅆ', 'ㅇ', 'ㅈ', 'ㅉ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ',
+]
+JUNGSEONG = [
+    'ㅏ', 'ㅐ', 'ㅑ', 'ㅒ', 'ㅓ', 'ㅔ', 'ㅕ', 'ㅖ', 'ㅗ', 'ㅘ', 'ㅙ',
+    'ㅚ', 'ㅛ', 'ㅜ', 'ㅝ', 'ㅞ', 'ㅟ', 'ㅠ', 'ㅡ', 'ㅢ', 'ㅣ',
+]
+JONGSEONG = [
+    '', 'ㄱ', 'ㄲ', 'ㄳ', 'ㄴ', 'ㄵ', 'ㄶ', 'ㄷ', 'ㄹ', 'ㄺ', 'ㄻ', 'ㄼ', 'ㄽ', 'ㄾ',
+    'ㄿ', 'ㅀ', 'ㅁ', 'ㅂ', 'ㅄ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ',
+]
+
+# 겹모음/겹받침은 입력 순서대로 풀어서 색인 ("과" 입력 중 "고" 단계에서도 매칭)
+COMPOUND_JAMO = {
+    'ㅘ': 'ㅗㅏ', 'ㅙ': 'ㅗㅐ', 'ㅚ': 'ㅗㅣ', 'ㅝ': 'ㅜㅓ', 'ㅞ': 'ㅜㅔ', 'ㅟ': 'ㅜㅣ', 'ㅢ': 'ㅡㅣ',
+    'ㄳ': 'ㄱㅅ', 'ㄵ': 'ㄴㅈ', 'ㄶ': 'ㄴㅎ', 'ㄺ': 'ㄹㄱ', 'ㄻ': 'ㄹㅁ', 'ㄼ': 'ㄹㅂ',
+    'ㄽ': 'ㄹㅅ', 'ㄾ': 'ㄹㅌ', 'ㄿ': 'ㄹㅍ', 'ㅀ': 'ㄹㅎ', 'ㅄ': 'ㅂㅅ',
+}
+
+_CHOSEONG_SET = set(CHOSEONG)
+_HANGUL_BASE = 0xAC00
+_HANGUL_LAST = 0xD7A3
+
+
+def _is_syllable(ch):
+    return _HANGUL_BASE <= ord(ch) <= _HANGUL_LAST
+
+
+def decompose(text):
+    """자모 단위 분해 (공백 제거, 영문 소문자)"""
+    result = []
+    for ch in text.lower():
+        if ch.isspace():
+            continue
+        if _is_syllable(ch):
+            index = ord(ch) - _HANGUL_BASE
+            result.append(CHOSEONG[index // 588])
+            jung = JUNGSEONG[(index % 588) // 28]
+            jong = JONGSEONG[index % 28]
+            result.append(COMPOUND_JAMO.get(jung, jung))
+            result.append(COMPOUND_JAMO.get(jong, jong))
+        else:
+            result.append(COMPOUND_JAMO.get(ch, ch))
+    return ''.join(result)
+
+
+def initials(text):
+    """초성 문자열 (한글이 아닌 글자는 그대로)"""
+    result = []
+    for ch in text.lower():
+        if ch.isspace():
+            continue
+        if _is_syllable(ch):
+            result.append(CHOSEONG[(ord(ch) - _HANGUL_BASE) // 588])
+        else:
+            result.append(ch)
+    return ''.join(result)
+
+
+def is_initials_query(text):
+    stripped = ''.join(text.split())
+    return bool(stripped) and all(ch in _CHOSEONG_SET for ch in stripped)
+
+
+class _Node:
+    __slots__ = ('children', 'top')
+
+    def __init__(self):
+        self.children = {}
+        self.top = []  # (rank, drug_code) 정렬 목록, 최대 TOP_K
+
+
+class PrefixTrie:
+    def __init__(self):
+        self.root = _Node()
+
+    def insert(self, key, rank, drug_code):
+        node = self.root
+        for ch in key:
+            node = node.children.setdefault(ch, _Node())
+            self._push(node, rank, drug_code)
+
+    @staticmethod
+    def _push(node, rank, drug_code):
+        top = node.top
+        for i, (existing_rank, existing_code) in enumerate(top):
+            if existing_code == drug_code:
+                if existing_rank <= rank:
+                    return
+                del top[i]
+                break
+        if len(top) >= TOP_K and rank >= top[-1][0]:
+            return
+        bisect.insort(top, (rank, drug_code))
+        del top[TOP_K:]
+
+    def lookup(self, prefix):
+        node = self.root
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        return node.top
+
+
+class DrugTypeahead:
+    """약물명/코드 자동완성 인덱스"""
+
+    def __init__(self, drugs=()):
+        self.trie = PrefixTrie()
+        self.initials_trie = PrefixTrie()
+        self.drugs = {}
+
+        for drug_code, name_kr, name_en in drugs:
+            self.drugs[drug_code] = {
+                'drug_code': drug_code,
+                'drug_name_kr': name_kr,
+                'drug_name_en': name_en,
+            }
+            # 순위: 짧은 이름 우선, 같은 길이면 가나다 순
+            for key in (name_kr, name_en, drug_code):
+                if not key:
+                    continue
+                rank = (len(key), key.lower())
+                self.trie.insert(decompose(key), rank, drug_code)
+            if name_kr:
+                self.initials_trie.insert(initials(name_kr), (len(name_kr), name_kr), drug_code)
+
+    def suggest(self, query, limit=10):
+        query = (query or '').strip()
+        if not query:
+            return []
+
+        hits = list(self.trie.lookup(decompose(query)))
+        if is_initials_query(query):
+            hits.extend(self.initials_trie.lookup(''.join(query.split())))
+            hits.sort()
+
+        results = []
+        seen = set()
+        for _, drug_code in hits:
+            if drug_code in seen:
+                continue
+            seen.add(drug_code)
+            results.append(self.drugs[drug_code])
+            if len(results) >= limit:
+                break
+        return results
+
+
+# ============================================
+# 프로세스 단위 캐시
+# ============================================
+
+# (trie, 구성 시점의 versions.DRUGS 버전)
+_typeahead = None
+_typeahead_lock = threading.Lock()
+
+
+def build_typeahead():
+    drugs = Drug.objects.values_list('drug_code', 'drug_name_kr', 'drug_name_en')
+    return DrugTypeahead(drugs.iterator())
+
+
+def get_typeahead():
+    """캐시된 trie 반환 (없거나 공유 버전이 바뀌었으면 구성)"""
+    global _typeahead
+    version = versions.current(versions.DRUGS)
+    cached = _typeahead
+    if cached is None or cached[1] != version:
+        with _typeahead_lock:
+            if _typeahead is None or _typeahead[1] != version:
+                _typeahead = (build_typeahead(), version)
+            cached = _typeahead
+    return cached[0]
+
+
+def invalidate_typeahead():
+    """약물 정보 변경 시 호출 - 다음 조회 때 다시 구성"""
+    global _typeahead
+    with _typeahead_lock:
+        _typeahead = None
+
+
+def suggest_drugs(query, limit=10):
+    """약물 자동완성 (뷰용 진입점)"""
+    return get_typeahead().suggest(query, limit=min(limit, TOP_K))
@@ -0,0 +1,97 @@
+"""
+환자 목록 CSV 내보내기 파일
+환자 이름/생년월일/진단 정보가 담기므로 MEDIA_ROOT(인증 없이 제공) 밖 PATIENT_EXPORT_DIR 에 저장하고
+작업을 예약한 의사만 api_job_download 로 받을 수 있음
+
+- 파일명에 임의 토큰을 붙여 경로 추측 불가
+- 임시 파일에 쓴 뒤 rename 하여 작성 중인 파일이 제공되지 않음
+- EXPORT_EXPIRE_HOURS 가 지난 파일은 다운로드 거부, exports.cleanup 작업이 삭제
+"""
+import csv
+import os
+import secrets
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Patient
+
+
+EXPORT_EXPIRE_HOURS = 24
+
+# 환자 목록 내보내기 컬럼
+EXPORT_FIELDS = [
+    'patient_id', 'name', 'birth_date', 'gender',
+    'diagnosis_date', 'bclc_stage', 'tumor_size', 'tumor_count', 'vascular_invasion',
+    'child_pugh', 'afp_initial', 'afp_current',
+    'treatment_type', 'treatment_start_date', 'recurrence_risk',
+    'next_ct_date', 'next_blood_test_date', 'last_followup_date', 'death_date',
+]
+
+
+def export_root():
+    return Path(getattr(settings, 'PATIENT_EXPORT_DIR', Path(settings.BASE_DIR) / 'exports'))
+
+
+def export_path(name):
+    """
+    작업 결과의 파일명 -> 실제 경로 (없거나 만료되었으면 None)
+    파일명은 export_root 바로 아래 이름만 허용 (경로 구분자 불가)
+    """
+    if not name or Path(name).name != name:
+        return None
+    path = export_root() / name
+    try:
+        modified = path.stat().st_mtime
+    except OSError:
+        return None
+    if modified < time.time() - EXPORT_EXPIRE_HOURS * 3600:
+        return None
+    return path
+
+
+def write_patient_export(doctor_id):
+    """담당 환자 목록 CSV 작성 - (파일명, 행 수) 반환"""
+    root = export_root()
+    root.mkdir(parents=True, exist_ok=True)
+    name = f'patients_{timezone.now():%Y%m%d%H%M%S}_{secrets.token_hex(16)}.csv'
+    partial = root / f'.{name}.part'
+
+    rows = Patient.objects.filter(doctor_id=doctor_id).order_by('patient_id').values_list(*EXPORT_FIELDS)
+    count = 0
+    try:
+        # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+        with open(partial, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(EXPORT_FIELDS)
+            for row in rows.iterator(chunk_size=2000):
+                writer.writerow(['' if value is None else value for value in row])
+                count += 1
+        os.replace(partial, root / name)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    return name, count
+
+
+def cleanup_expired_exports(max_age_hours=EXPORT_EXPIRE_HOURS):
+    """만료된 내보내기 파일(중단된 임시 파일 포함) 삭제 - 삭제한 파일 수 반환"""
+    cutoff = time.time() - max_age_hours * 3600
+    count = 0
+    try:
+        entries = list(os.scandir(export_root()))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        if not entry.is_file(follow_symlinks=False):
+            continue
+        try:
+            if entry.stat(follow_symlinks=False).st_mtime >= cutoff:
+                continue
+            os.unlink(entry.path)
+        except OSError:
+            continue
+        count += 1
+    return count
@@ -2,7 +2,8 @@
 Django Admin 폼 정의
 """
 from django import forms
-from .models import DoctorProfile
+from django.contrib.admin.helpers import ActionForm
+from .models import DoctorProfile, Patient
 
 
 class DoctorProfileAdminForm(forms.ModelForm):
@@ -55,3 +56,23 @@ class DoctorProfileAdminForm(forms.ModelForm):
         if commit:
             instance.save()
         return instance
+
+
+class PatientBulkActionForm(ActionForm):
+    """환자 목록 일괄 처리 입력 폼 (관리자 액션 바에 표시)"""
+    days = forms.IntegerField(
+        label='이동 일수',
+        required=False,
+        help_text='음수를 입력하면 앞당깁니다.'
+    )
+    # 의사 전체 목록을 select 로 그리지 않도록 ID 입력 (존재 여부는 액션에서 확인)
+    target_doctor = forms.CharField(
+        label='변경할 담당의 ID',
+        max_length=DoctorProfile._meta.get_field('doctor_id').max_length,
+        required=False
+    )
+    recurrence_risk = forms.ChoiceField(
+        label='재발위험도',
+        choices=[('', '---------')] + Patient._meta.get_field('recurrence_risk').choices,
+        required=False
+    )
@@ -0,0 +1,389 @@
+"""
+BCLC 치료 권고 (가이드라인 규칙 엔진)
+BCLC 병기, Child-Pugh 등급, 종양 부담(개수/크기), 혈관 침범으로 권고 치료 방식과 근거를 반환
+
+- 규칙(RULES)은 모듈 로딩 시 한 번 결정표로 컴파일
+  입력을 축별 구간 번호로 바꾼 뒤 (병기 x Child-Pugh x 종양 부담 x 혈관 침범) 모든 칸의 결과를 미리 계산
+- 환자 1명 평가는 구간 번호 계산 + 표 조회, 여러 명은 numpy 로 구간 번호를 한 번에 계산하여 표를 인덱싱
+- 병기 미입력은 종양 정보로 추정하고, 그 사실을 근거에 남김
+- Child-Pugh 미입력은 A 로 가정해 후보만 계산하되 모두 '대안' 으로 낮추고 경고 (provisional)
+  간기능을 모르는 환자에게 절제/전신 치료를 권고로 표시하지 않으며, 현재 치료의 불일치 판정에서도 제외
+- 전체 환자 일괄 평가는 매일 야간 guidelines.evaluate_cohort 작업으로 실행 (작업이 끝날 때마다 다음 날로 다시 예약)
+- 참고: BCLC 2022 update (Reig et al., J Hepatol 2022) 를 앱의 치료 방식 항목에 맞게 단순화
+"""
+from collections import Counter, namedtuple
+from itertools import product
+
+import numpy as np
+
+from . import jobs
+from .models import Patient
+
+
+# 축별 구간 (0 번은 미입력)
+STAGE_AXIS = ['', '0', 'A', 'B', 'C', 'D']
+CHILD_PUGH_AXIS = ['', 'A', 'B', 'C']
+BURDEN_AXIS = ['unknown', 'very_early', 'single_milan', 'single_large', 'multi_milan', 'up_to_7', 'beyond_7']
+VASCULAR_AXIS = [False, True]
+
+BURDEN_LABELS = {
+    'unknown': '종양 정보 미입력',
+    'very_early': '단일 종양 ≤2cm',
+    'single_milan': '단일 종양 ≤5cm',
+    'single_large': '단일 종양 >5cm',
+    'multi_milan': '2~3개, 각 ≤3cm',
+    'up_to_7': 'up-to-7 기준 이내',
+    'beyond_7': 'up-to-7 기준 초과',
+}
+MILAN_BURDENS = {'very_early', 'single_milan', 'multi_milan'}
+
+# 권고 치료 (Patient.treatment_type 선택지 외 항목은 selectable=False)
+TREATMENT_LABELS = {
+    'surgery': '수술적 절제',
+    'transplant': '간이식',
+    'ablation': '국소 소작술 (RFA)',
+    'tace': 'TACE',
+    'atezolizumab_bevacizumab': '아테졸리주맙 + 베바시주맙',
+    'lenvatinib': '렌바티닙',
+    'sorafenib': '소라페닙',
+    'supportive': '보존적 치료',
+}
+STRENGTH_LABELS = {'recommended': '권고', 'alternative': '대안'}
+
+# when: 축 이름 -> 허용 값 집합 (없는 축은 모든 값 허용), 병기/Child-Pugh 는 추정/가정 후 값 기준
+GuidelineRule = namedtuple('GuidelineRule', ['key', 'when', 'options', 'rationale'])
+
+RULES = [
+    GuidelineRule(
+        'very_early', {'stage': {'0'}, 'child_pugh': {'A'}},
+        [('surgery', 'recommended'), ('ablation', 'recommended')],
+        'BCLC 0 (단일 ≤2cm, 간기능 보존): 절제 또는 소작술',
+    ),
+    GuidelineRule(
+        'early_single', {'stage': {'A'}, 'child_pugh': {'A'}, 'burden': {'very_early', 'single_milan', 'single_large', 'unknown'}},
+        [('surgery', 'recommended'), ('ablation', 'alternative')],
+        'BCLC A 단일 종양, Child-Pugh A: 절제 우선 (문맥압 항진이 없을 때)',
+    ),
+    GuidelineRule(
+        'early_multi', {'stage': {'A'}, 'child_pugh': {'A', 'B'}, 'burden': {'multi_milan'}},
+        [('ablation', 'recommended'), ('tace', 'alternative')],
+        'BCLC A 다발성 (≤3개, 각 ≤3cm): 이식 불가 시 소작술',
+    ),
+    GuidelineRule(
+        'early_child_b', {'stage': {'0', 'A'}, 'child_pugh': {'B'}, 'burden': {'very_early', 'single_milan', 'single_large', 'unknown'}},
+        [('ablation', 'recommended'), ('tace', 'alternative')],
+        '초기 병기이나 Child-Pugh B: 절제보다 소작술/TACE',
+    ),
+    GuidelineRule(
+        'transplant_milan', {'stage': {'0', 'A', 'B', 'D'}, 'burden': MILAN_BURDENS, 'vascular': {False}},
+        [('transplant', 'recommended')],
+        'Milan 기준 이내 (혈관 침범 없음): 간이식 적응증 평가',
+    ),
+    GuidelineRule(
+        'intermediate', {'stage': {'B'}, 'child_pugh': {'A', 'B'}, 'burden': set(BURDEN_AXIS) - {'beyond_7'}},
+        [('tace', 'recommended')],
+        'BCLC B (간기능 보존, 국한된 다발성 종양): TACE',
+    ),
+    GuidelineRule(
+        'intermediate_extended', {'stage': {'B'}, 'child_pugh': {'A'}, 'burden': {'up_to_7'}},
+        [('transplant', 'alternative')],
+        'up-to-7 기준 이내: 병기 하향 후 확대 기준 간이식 고려',
+    ),
+    GuidelineRule(
+        'intermediate_diffuse', {'stage': {'B'}, 'child_pugh': {'A'}, 'burden': {'beyond_7'}},
+        [('atezolizumab_bevacizumab', 'recommended'), ('lenvatinib', 'recommended'), ('tace', 'alternative')],
+        'BCLC B 광범위 종양 (up-to-7 초과): 전신 치료 우선',
+    ),
+    GuidelineRule(
+        'advanced', {'stage': {'C'}, 'child_pugh': {'A'}},
+        [('atezolizumab_bevacizumab', 'recommended'), ('lenvatinib', 'alternative'), ('sorafenib', 'alternative')],
+        'BCLC C, Child-Pugh A: 1차 면역항암 병용, 금기 시 렌바티닙/소라페닙',
+    ),
+    GuidelineRule(
+        'intermediate_diffuse_child_b', {'stage': {'B'}, 'child_pugh': {'B'}, 'burden': {'beyond_7'}},
+        [('tace', 'alternative'), ('supportive', 'alternative')],
+        'BCLC B 광범위 종양 + Child-Pugh B: 선택된 환자에서 TACE, 그 외 보존적 치료',
+    ),
+    GuidelineRule(
+        'advanced_child_b', {'stage': {'C'}, 'child_pugh': {'B'}},
+        [('sorafenib', 'alternative'), ('supportive', 'alternative')],
+        'BCLC C + Child-Pugh B: 선택된 환자에서만 소라페닙',
+    ),
+    GuidelineRule(
+        'terminal', {'stage': {'D'}},
+        [('supportive', 'recommended')],
+        'BCLC D: 보존적 치료',
+    ),
+    GuidelineRule(
+        'liver_failure', {'stage': {'0', 'A', 'B', 'C'}, 'child_pugh': {'C'}},
+        [('supportive', 'recommended')],
+        'Child-Pugh C: 간기능 불량으로 적극적 치료 제한 (이식 적응증 제외)',
+    ),
+]
+
+_STRENGTH_ORDER = {'recommended': 0, 'alternative': 1}
+
+
+# ============================================
+# 입력 구간화
+# ============================================
+
+def burden_category(tumor_size, tumor_count):
+    """종양 부담 구간 (최대 종양 크기 cm, 개수)"""
+    if tumor_size is None or tumor_count is None or tumor_count < 1:
+        return 'unknown'
+    if tumor_count == 1:
+        if tumor_size <= 2:
+            return 'very_early'
+        return 'single_milan' if tumor_size <= 5 else 'single_large'
+    if tumor_count <= 3 and tumor_size <= 3:
+        return 'multi_milan'
+    return 'up_to_7' if tumor_size + tumor_count <= 7 else 'beyond_7'
+
+
+def _burden_indices(tumor_size, tumor_count):
+    """burden_category 의 배열 버전 (NaN 은 미입력)"""
+    size = np.asarray(tumor_size, dtype=np.float64)
+    count = np.asarray(tumor_count, dtype=np.float64)
+    conditions = [
+        np.isnan(size) | np.isnan(count) | (count < 1),
+        (count == 1) & (size <= 2),
+        (count == 1) & (size <= 5),
+        count == 1,
+        (count <= 3) & (size <= 3),
+        size + count <= 7,
+    ]
+    names = ['unknown', 'very_early', 'single_milan', 'single_large', 'multi_milan', 'up_to_7']
+    with np.errstate(invalid='ignore'):
+        return np.select(conditions, [BURDEN_AXIS.index(name) for name in names], BURDEN_AXIS.index('beyond_7'))
+
+
+def _derive_stage(child_pugh, burden, vascular):
+    """병기 미입력 시 종양 정보로 추정 (추정 불가면 '')"""
+    if child_pugh == 'C':
+        return 'D'
+    if vascular:
+        return 'C'
+    if burden == 'unknown':
+        return ''
+    if burden == 'very_early' and child_pugh in ('A', ''):
+        return '0'
+    if burden in ('very_early', 'single_milan', 'single_large', 'multi_milan'):
+        return 'A'
+    return 'B'
+
+
+# ============================================
+# 컴파일
+# ============================================
+
+def _evaluate_cell(stage, child_pugh, burden, vascular):
+    """결정표 한 칸 계산 (컴파일 시에만 호출)"""
+    rationale, warnings = [], []
+    effective_stage = stage
+    if not stage:
+        effective_stage = _derive_stage(child_pugh, burden, vascular)
+        if effective_stage:
+            rationale.append(f'BCLC 병기 미입력: 종양/간기능 정보로 {effective_stage} 추정')
+        else:
+            warnings.append('BCLC 병기와 종양 정보가 없어 권고를 계산할 수 없습니다.')
+    effective_child_pugh = child_pugh or 'A'
+    provisional = not child_pugh and bool(effective_stage)
+    if provisional:
+        warnings.append('Child-Pugh 등급 미입력: 간기능 확인 전까지 권고 없이 대안만 표시합니다 (A 가정).')
+
+    if stage and vascular and stage in ('0', 'A', 'B'):
+        warnings.append('혈관 침범이 있으나 병기가 C 미만입니다. 병기를 확인하세요.')
+    if stage == '0' and burden not in ('very_early', 'unknown'):
+        warnings.append(f'BCLC 0 기준(단일 ≤2cm)과 종양 정보({BURDEN_LABELS[burden]})가 다릅니다.')
+    if stage and stage != 'D' and child_pugh == 'C':
+        warnings.append('Child-Pugh C 는 BCLC D 에 해당합니다.')
+
+    values = {'stage': effective_stage, 'child_pugh': effective_child_pugh, 'burden': burden, 'vascular': vascular}
+    options = {}
+    matched = []
+    for rule in RULES:
+        if not all(values[axis] in allowed for axis, allowed in rule.when.items()):
+            continue
+        if rule.rationale not in rationale:
+            rationale.append(rule.rationale)
+        matched.append(rule.key)
+        for treatment, strength in rule.options:
+            if provisional:
+                strength = 'alternative'
+            current = options.get(treatment)
+            if current is None or _STRENGTH_ORDER[strength] < _STRENGTH_ORDER[current]:
+                options[treatment] = strength
+
+    if effective_stage and not options:
+        warnings.append('입력된 병기와 종양/간기능 정보에 맞는 권고가 없습니다. 병기를 확인하세요.')
+
+    selectable = {value for value, _ in Patient._meta.get_field('treatment_type').flatchoices}
+    return {
+        'stage': effective_stage,
+        'stage_derived': not stage and bool(effective_stage),
+        'provisional': provisional,
+        'burden': burden,
+        'burden_label': BURDEN_LABELS[burden],
+        'rules': tuple(matched),
+        'options': tuple(
+            {
+                'treatment': treatment,
+                'label': TREATMENT_LABELS[treatment],
+                'strength': strength,
+                'strength_label': STRENGTH_LABELS[strength],
+                'selectable': treatment in selectable,
+            }
+            for treatment, strength in sorted(options.items(), key=lambda item: _STRENGTH_ORDER[item[1]])
+        ),
+        'rationale': tuple(rationale),
+        'warnings': tuple(warnings),
+    }
+
+
+def compile_rules():
+    """
+    (병기, Child-Pugh, 종양 부담, 혈관 침범) 모든 조합의 결과를 계산
+    반환: (결과 번호 배열, 결과 목록) - 같은 결과는 한 번만 보관
+    """
+    shape = (len(STAGE_AXIS), len(CHILD_PUGH_AXIS), len(BURDEN_AXIS), len(VASCULAR_AXIS))
+    table = np.empty(shape, dtype=np.int16)
+    outcomes, outcome_index = [], {}
+    for cell in product(*(range(size) for size in shape)):
+        stage, child_pugh, burden, vascular = (
+            axis[index] for axis, index in zip((STAGE_AXIS, CHILD_PUGH_AXIS, BURDEN_AXIS, VASCULAR_AXIS), cell)
+        )
+        outcome = _evaluate_cell(stage, child_pugh, burden, vascular)
+        key = repr(outcome)
+        if key not in outcome_index:
+            outcome_index[key] = len(outcomes)
+            outcomes.append(outcome)
+        table[cell] = outcome_index[key]
+    return table, outcomes
+
+
+DECISION_TABLE, OUTCOMES = compile_rules()
+
+EVALUATION_COLUMNS = ['bclc_stage', 'child_pugh', 'tumor_size', 'tumor_count', 'vascular_invasion']
+
+_STAGE_INDEX = {value: index for index, value in enumerate(STAGE_AXIS)}
+_CHILD_PUGH_INDEX = {value: index for index, value in enumerate(CHILD_PUGH_AXIS)}
+
+
+# ============================================
+# 평가
+# ============================================
+
+def evaluate(bclc_stage=None, child_pugh=None, tumor_size=None, tumor_count=None, vascular_invasion=False):
+    """입력값 1건 평가 -> 결과 dict (공유 객체이므로 수정하지 말 것)"""
+    cell = (
+        _STAGE_INDEX.get(bclc_stage or '', 0),
+        _CHILD_PUGH_INDEX.get(child_pugh or '', 0),
+        BURDEN_AXIS.index(burden_category(tumor_size, tumor_count)),
+        int(bool(vascular_invasion)),
+    )
+    return OUTCOMES[DECISION_TABLE[cell]]
+
+
+def evaluate_patient(patient):
+    """환자 1명 평가 + 현재 치료 방식의 권고 일치 여부"""
+    outcome = evaluate(patient.bclc_stage, patient.child_pugh, patient.tumor_size,
+                       patient.tumor_count, patient.vascular_invasion)
+    return dict(outcome, current=_concordance(outcome, patient.treatment_type))
+
+
+def _concordance(outcome, treatment_type):
+    """
+    현재 치료 방식이 권고/대안에 포함되는지 ('recommended' / 'alternative' / 'discordant' / None)
+    Child-Pugh 미입력(provisional) 결과는 판정하지 않음
+    """
+    if not treatment_type or not outcome['options'] or outcome['provisional']:
+        return None
+    for option in outcome['options']:
+        if option['treatment'] == treatment_type:
+            return option['strength']
+    return 'discordant'
+
+
+def _lookup(values, index):
+    """코드 목록 -> 축 번호 배열 (없는 코드/미입력은 0)"""
+    return np.fromiter((index.get(value or '', 0) for value in values), dtype=np.intp, count=len(values))
+
+
+def evaluate_rows(rows, offset=0):
+    """
+    행 목록 -> 결과 번호 배열 (행의 offset 번째부터 EVALUATION_COLUMNS 순서)
+    구간 계산과 표 조회를 배열 단위로 처리
+    """
+    if not rows:
+        return np.empty(0, dtype=np.int16)
+    # zip(*rows) 는 행 수만큼 인자를 풀어 느림 - 열별로 추출
+    stages, child_pughs, sizes, counts, vascular = (
+        [row[offset + column] for row in rows] for column in range(len(EVALUATION_COLUMNS))
+    )
+    return DECISION_TABLE[
+        _lookup(stages, _STAGE_INDEX),
+        _lookup(child_pughs, _CHILD_PUGH_INDEX),
+        _burden_indices(np.array(sizes, dtype=np.float64), np.array(counts, dtype=np.float64)),
+        np.array(vascular, dtype=bool).astype(np.intp),
+    ]
+
+
+def evaluate_queryset(queryset=None, chunk_size=5000):
+    """
+    환자 집합 일괄 평가 (야간 점검용)
+    반환: {'patients', 'by_option', 'by_concordance', 'warnings', 'discordant': [환자 ID 목록]}
+    """
+    queryset = (queryset if queryset is not None else Patient.objects.all()).order_by('pk')
+    columns = ['patient_id', 'treatment_type', *EVALUATION_COLUMNS]
+    by_option, by_concordance, warnings = Counter(), Counter(), Counter()
+    discordant = []
+    total = 0
+    last_pk = 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last_pk).values_list('pk', *columns)[:chunk_size])
+        if not rows:
+            break
+        last_pk = rows[-1][0]
+        total += len(rows)
+        indices = evaluate_rows(rows, offset=3)
+        # 결과 번호별로 묶어 권고/경고 집계는 결과 종류 수만큼만 반복
+        outcome_ids, counts = np.unique(indices, return_counts=True)
+        for outcome_id, count in zip(outcome_ids.tolist(), counts.tolist()):
+            outcome = OUTCOMES[outcome_id]
+            for option in outcome['options']:
+                if option['strength'] == 'recommended':
+                    by_option[option['treatment']] += count
+            for warning in outcome['warnings']:
+                warnings[warning] += count
+        for row, outcome_id in zip(rows, indices.tolist()):
+            concordance = _concordance(OUTCOMES[outcome_id], row[2])
+            by_concordance[concordance or 'unknown'] += 1
+            if concordance == 'discordant':
+                discordant.append(row[1])
+
+    return {
+        'patients': total,
+        'by_option': dict(by_option.most_common()),
+        'by_concordance': dict(by_concordance),
+        'warnings': dict(warnings.most_common()),
+        'discordant': discordant,
+    }
+
+
+# ============================================
+# 야간 일괄 평가 작업
+# ============================================
+
+EVALUATION_JOB = 'guidelines.evaluate_cohort'
+NIGHTLY_EVALUATION_HOUR = 4
+
+
+def schedule_evaluation():
+    """다음 야간 시각에 전체 환자 일괄 평가 작업 예약 (이미 예약되어 있으면 그 작업 반환)"""
+    return jobs.enqueue(
+        EVALUATION_JOB,
+        run_at=jobs.next_daily_run(NIGHTLY_EVALUATION_HOUR),
+        priority=-5,
+        dedup_key=f'{EVALUATION_JOB}:nightly',
+    )
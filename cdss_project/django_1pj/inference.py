@@ -0,0 +1,376 @@
+"""
+CT 종양 분석 추론 (CPU)
+CT 영상에서 종양 크기/개수를 추정하여 TumorSuggestion(검토 대기)으로 저장 -> 의사가 승인하면 환자 정보에 반영
+
+- 모델은 settings.TUMOR_MODEL_BACKEND 로 지정 (load() / predict_batch() 구현 클래스)
+  프로세스마다 한 번만 로드하여 재사용 (get_service)
+  설정이 없으면 분석 비활성 - DummyTumorModel 은 테스트/벤치마크에서만 직접 사용 (환자 데이터에 반영 불가)
+- 동시에 들어온 요청을 마이크로 배치로 묶어 한 번에 추론 (MicroBatcher)
+  배치가 max_batch_size 에 차거나, 첫 요청 후 max_latency_ms 가 지나면 바로 실행
+  -> 요청이 적을 때 지연 시간 상한 보장, 많을 때 배치 효율
+- 배치 실행 스레드를 여러 개 두면 NumPy 연산(GIL 해제) 동안 다른 배치도 병렬 실행
+  프로세스 단위 확장은 run_jobs --processes (프로세스마다 모델 1개)
+"""
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from PIL import Image
+
+from .models import TumorSuggestion
+from .patient_updates import apply_patient_changes, save_patient_changes
+from . import audit
+from . import ct_render
+from . import ct_volume
+
+
+# 모델 입력 크기 (정사각형, 픽셀)
+MODEL_INPUT_SIZE = 256
+
+DEFAULT_MAX_BATCH_SIZE = 16
+DEFAULT_MAX_LATENCY_MS = 10
+DEFAULT_BATCH_WORKERS = 2
+
+# CT 검사 1건에서 분석할 최대 axial 슬라이스 수 (균등 간격 선택)
+MAX_SLICES_PER_STUDY = 32
+
+# 입력 영상 window (연부조직)
+INPUT_WINDOW = ct_render.WINDOW_PRESETS['soft_tissue']
+
+# 픽셀 간격 정보가 없는 영상(ct_image)의 기본 mm/픽셀
+DEFAULT_MM_PER_PIXEL = 0.7
+
+
+class InferenceError(ValueError):
+    """분석 요청 오류"""
+
+
+class ModelNotConfigured(InferenceError):
+    """TUMOR_MODEL_BACKEND 미설정 (또는 테스트용 모델 지정)"""
+
+
+# ============================================
+# 모델
+# ============================================
+
+DUMMY_BACKEND = 'django_1pj.inference.DummyTumorModel'
+
+
+class DummyTumorModel:
+    """
+    테스트/벤치마크용 모델 (학습된 가중치 없음) - 임상 데이터로 쓰면 안 됨
+    밝은 영역을 종양 후보로 보고 크기/개수를 결정적으로 계산하고,
+    실제 모델과 비슷한 CPU 부하를 위해 고정 난수 가중치 행렬곱(특징 추출)을 수행
+    """
+    name = 'dummy-tumor'
+    version = '1'
+
+    LESION_THRESHOLD = 0.75
+    FEATURE_DIM = 256
+
+    def load(self):
+        rng = np.random.default_rng(0)
+        pixels = MODEL_INPUT_SIZE * MODEL_INPUT_SIZE
+        self.weights = (rng.standard_normal((pixels, self.FEATURE_DIM)) / np.sqrt(pixels)).astype(np.float32)
+        self.head = rng.standard_normal(self.FEATURE_DIM).astype(np.float32) / np.sqrt(self.FEATURE_DIM)
+
+    def predict_batch(self, images):
+        """
+        images: (N, H, W) float32, 0~1
+        반환: 영상별 {'diameter_px', 'count', 'confidence'}
+        """
+        batch = images.shape[0]
+        features = np.maximum(images.reshape(batch, -1) @ self.weights, 0)
+        confidence = 1 / (1 + np.exp(-(features @ self.head)))
+
+        mask = images > self.LESION_THRESHOLD
+        area = mask.sum(axis=(1, 2))
+        diameter = 2 * np.sqrt(area / np.pi)
+        # 행 방향으로 후보 영역이 시작되는 지점 수를 개수 근사치로 사용
+        starts = (mask[:, :, 1:] & ~mask[:, :, :-1]).sum(axis=(1, 2))
+        count = np.minimum(np.ceil(starts / MODEL_INPUT_SIZE), 10).astype(int)
+
+        return [
+            {'diameter_px': float(diameter[i]), 'count': int(count[i]), 'confidence': float(confidence[i])}
+            for i in range(batch)
+        ]
+
+
+def model_backend():
+    """설정된 실제 모델 경로 (없거나 테스트용 모델이면 None)"""
+    backend = getattr(settings, 'TUMOR_MODEL_BACKEND', None)
+    return backend if backend and backend != DUMMY_BACKEND else None
+
+
+def is_model_configured():
+    return model_backend() is not None
+
+
+def load_model(backend=None):
+    """
+    모델 로드 - backend 를 지정하지 않으면 settings.TUMOR_MODEL_BACKEND
+    (테스트용 DummyTumorModel 은 benchmark_inference/테스트에서 backend 로 직접 지정할 때만 허용)
+    """
+    backend = backend or model_backend()
+    if backend is None:
+        raise ModelNotConfigured('CT 분석 모델이 설정되어 있지 않습니다. (TUMOR_MODEL_BACKEND)')
+    model = import_string(backend)()
+    model.load()
+    return model
+
+
+# ============================================
+# 마이크로 배치
+# ============================================
+
+class _Request:
+    __slots__ = ('image', 'future', 'enqueued')
+
+    def __init__(self, image):
+        self.image = image
+        self.future = Future()
+        self.enqueued = time.monotonic()
+
+
+class MicroBatcher:
+    """
+    요청 큐 + 배치 실행 스레드
+    submit() 은 Future 를 바로 반환하고, 실행 스레드가 요청을 모아 model.predict_batch() 호출
+    """
+
+    def __init__(self, model, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_latency_ms=DEFAULT_MAX_LATENCY_MS, workers=DEFAULT_BATCH_WORKERS):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000
+        self.queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self._threads = [
+            threading.Thread(target=self._run, name=f'inference-{i}', daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, image):
+        request = _Request(image)
+        self.queue.put(request)
+        return request.future
+
+    def predict(self, images, timeout=None):
+        """영상 목록 추론 (다른 요청과 같은 배치로 묶일 수 있음)"""
+        futures = [self.submit(image) for image in images]
+        return [future.result(timeout) for future in futures]
+
+    def _collect(self, first):
+        """첫 요청 도착 후 최대 max_latency 동안 배치를 채움"""
+        batch = [first]
+        deadline = first.enqueued + self.max_latency
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                request = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                # 종료 신호는 다른 실행 스레드를 위해 되돌려 놓음
+                self.queue.put(None)
+                break
+            batch.append(request)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self.queue.get()
+            if first is None:
+                # 종료 신호는 다른 실행 스레드를 위해 되돌려 놓음
+                self.queue.put(None)
+                return
+            batch = self._collect(first)
+            batch = [request for request in batch if request.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                outputs = self.model.predict_batch(np.stack([request.image for request in batch]))
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+            for request, output in zip(batch, outputs):
+                request.future.set_result(output)
+            with self._stats_lock:
+                self.batches += 1
+                self.items += len(batch)
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'batches': self.batches,
+                'items': self.items,
+                'avg_batch_size': round(self.items / self.batches, 2) if self.batches else 0,
+            }
+
+    def close(self):
+        self.queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_service():
+    """프로세스 공용 배처 (첫 호출 시 모델 로드, 모델 미설정이면 ModelNotConfigured)"""
+    global _service
+    if not is_model_configured():
+        raise ModelNotConfigured('CT 분석 모델이 설정되어 있지 않습니다. (TUMOR_MODEL_BACKEND)')
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = MicroBatcher(
+                    load_model(),
+                    max_batch_size=getattr(settings, 'INFERENCE_MAX_BATCH_SIZE', DEFAULT_MAX_BATCH_SIZE),
+                    max_latency_ms=getattr(settings, 'INFERENCE_MAX_LATENCY_MS', DEFAULT_MAX_LATENCY_MS),
+                    workers=getattr(settings, 'INFERENCE_BATCH_WORKERS', DEFAULT_BATCH_WORKERS),
+                )
+                atexit.register(_service.close)
+    return _service
+
+
+# ============================================
+# 입력 준비
+# ============================================
+
+def prepare_image(pixels, mm_per_pixel):
+    """
+    uint8 2D 영상 -> 모델 입력 (MODEL_INPUT_SIZE 정사각형, float32 0~1) 과 입력 픽셀당 mm
+    긴 변 기준으로 축소/확대 (가로세로 비율 유지, 나머지는 0 으로 채움)
+    """
+    height, width = pixels.shape
+    scale = MODEL_INPUT_SIZE / max(height, width)
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    resized = np.asarray(Image.fromarray(np.ascontiguousarray(pixels), mode='L').resize(size, Image.BILINEAR))
+
+    image = np.zeros((MODEL_INPUT_SIZE, MODEL_INPUT_SIZE), dtype=np.float32)
+    image[:resized.shape[0], :resized.shape[1]] = resized * np.float32(1 / 255)
+    return image, mm_per_pixel / scale
+
+
+def _study_inputs(study):
+    """CT 볼륨에서 axial 슬라이스를 균등 간격으로 골라 입력 생성"""
+    volume = ct_volume.open_volume(study)
+    indices = np.unique(np.linspace(0, study.slice_count - 1, min(study.slice_count, MAX_SLICES_PER_STUDY)).round().astype(int))
+    # 선택한 슬라이스만 읽어 한 번에 window 변환
+    block = ct_render.apply_window(volume[indices], *INPUT_WINDOW)
+    mm_per_pixel = study.pixel_spacing_col or DEFAULT_MM_PER_PIXEL
+    return [prepare_image(pixels, mm_per_pixel) for pixels in block]
+
+
+def _ct_image_inputs(patient):
+    with patient.ct_image.open('rb') as f, Image.open(f) as image:
+        pixels = np.asarray(image.convert('L'))
+    return [prepare_image(pixels, DEFAULT_MM_PER_PIXEL)]
+
+
+# ============================================
+# 분석 / 검토
+# ============================================
+
+def analyze_patient(patient, study=None):
+    """
+    최근 CT 검사(없으면 ct_image) 분석 -> TumorSuggestion(검토 대기) 생성
+    슬라이스별 결과 중 가장 큰 직경과 가장 많은 개수를 제안값으로 사용
+    """
+    if study is None:
+        study = patient.ct_studies.filter(status='ready').order_by('-study_date', '-pk').first()
+    if study is not None:
+        inputs, source = _study_inputs(study), 'ct_study'
+    elif patient.ct_image:
+        inputs, source = _ct_image_inputs(patient), 'ct_image'
+    else:
+        raise InferenceError('분석할 CT 영상이 없습니다.')
+
+    service = get_service()
+    started = time.perf_counter()
+    outputs = service.predict([image for image, _ in inputs])
+    elapsed_ms = int((time.perf_counter() - started) * 1000)
+
+    sizes_cm = [output['diameter_px'] * mm / 10 for output, (_, mm) in zip(outputs, inputs)]
+    return TumorSuggestion.objects.create(
+        patient=patient,
+        study=study,
+        source=source,
+        model_name=getattr(service.model, 'name', type(service.model).__name__),
+        model_version=str(getattr(service.model, 'version', '')),
+        tumor_size=round(max(sizes_cm), 1),
+        tumor_count=max(output['count'] for output in outputs),
+        confidence=round(float(np.mean([output['confidence'] for output in outputs])), 3),
+        analyzed_images=len(inputs),
+        inference_ms=elapsed_ms,
+    )
+
+
+def review_suggestion(suggestion, doctor, accept):
+    """
+    제안 승인/반려
+    승인 시 환자 tumor_size / tumor_count 에 반영하고 감사 로그 기록
+    반환: 환자 정보에서 바뀐 필드 목록
+    """
+    with transaction.atomic():
+        suggestion = (
+            TumorSuggestion.objects.select_for_update().select_related('patient')
+            .filter(pk=suggestion.pk, patient__deleted_at__isnull=True).first()
+        )
+        # 검토 화면을 연 뒤 환자가 삭제 표시된 경우 (정리 작업 전까지 제안 행은 남아 있음)
+        if suggestion is None:
+            raise InferenceError('삭제된 환자의 분석 제안입니다.')
+        if suggestion.status != 'pending':
+            raise InferenceError(f'이미 검토된 제안입니다. ({suggestion.get_status_display()})')
+
+        changed_fields = []
+        if accept:
+            if suggestion.model_name == DummyTumorModel.name:
+                raise InferenceError('테스트용 모델의 분석 결과는 환자 정보에 반영할 수 없습니다.')
+            patient = suggestion.patient
+            before = audit.snapshot(patient, ['tumor_size', 'tumor_count'])
+            changed_fields = apply_patient_changes(patient, {
+                'tumor_size': suggestion.tumor_size,
+                'tumor_count': suggestion.tumor_count,
+            })
+            save_patient_changes(patient, changed_fields)
+            audit.record_update(doctor.doctor_id, patient, before, changed_fields)
+
+        suggestion.status = 'accepted' if accept else 'rejected'
+        suggestion.reviewed_by = doctor
+        suggestion.reviewed_at = timezone.now()
+        suggestion.save(update_fields=['status', 'reviewed_by', 'reviewed_at'])
+    return changed_fields
+
+
+def suggestion_data(suggestion):
+    return {
+        'id': suggestion.pk,
+        'patient_id': suggestion.patient.patient_id,
+        'study_id': suggestion.study_id,
+        'source': suggestion.source,
+        'model': f'{suggestion.model_name} {suggestion.model_version}'.strip(),
+        'tumor_size': suggestion.tumor_size,
+        'tumor_count': suggestion.tumor_count,
+        'confidence': suggestion.confidence,
+        'analyzed_images': suggestion.analyzed_images,
+        'inference_ms': suggestion.inference_ms,
+        'status': suggestion.status,
+        'reviewed_by': suggestion.reviewed_by_id,
+        'reviewed_at': suggestion.reviewed_at,
+        'created_at': suggestion.created_at,
+    }
@@ -0,0 +1,322 @@
+"""
+백그라운드 작업 큐 (DB 기반)
+요청 처리 중 오래 걸리는 작업을 BackgroundJob 테이블에 등록하고
+manage.py run_jobs 워커가 스레드/프로세스 풀에서 실행
+
+- 우선순위 (priority 큰 순) -> 실행 예정 시각 -> 등록 순
+- 중복 방지 키: 같은 키로 대기 중인 작업이 있으면 새로 등록하지 않음
+- 예약 실행: run_at / delay
+- 실패 시 지수 백오프로 재시도, max_attempts 초과 시 failed
+- 실행중 작업은 워커가 생존 신호(heartbeat_at)를 주기적으로 갱신, 끊기면 다시 대기 상태로
+- 작업별 대기 시간/실행 시간(ms) 기록
+
+작업 함수는 @register('이름') 으로 등록 (tasks.py, 앱 로딩 시 import)
+인자는 JSON 으로 저장되므로 모델 인스턴스 대신 ID 를 전달
+"""
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+import django
+from django.db import close_old_connections, connections, transaction
+from django.db.models import Avg, Count, F, Max, Q
+from django.utils import timezone
+
+from .models import BackgroundJob
+
+
+logger = logging.getLogger(__name__)
+
+JOB_REGISTRY = {}
+
+DEFAULT_MAX_ATTEMPTS = 3
+
+# 재시도 대기 시간 (초) = RETRY_BASE_SECONDS * 2^(시도 횟수 - 1)
+RETRY_BASE_SECONDS = 10
+
+# 워커는 실행중인 작업의 생존 신호(heartbeat_at)를 이 주기(초)로 갱신
+HEARTBEAT_SECONDS = 30
+
+# 생존 신호가 이 시간(초) 이상 끊긴 작업은 워커 비정상 종료로 보고 다시 대기 상태로
+# (오래 걸리는 작업도 워커가 살아 있으면 계속 갱신되므로 회수되지 않음)
+STALE_JOB_SECONDS = HEARTBEAT_SECONDS * 10
+
+# 동시에 다른 워커가 같은 작업을 가져가면 다음 후보로 재시도
+CLAIM_RETRIES = 5
+
+MAX_ERROR_LENGTH = 5000
+
+
+class JobError(Exception):
+    """작업 등록/실행 오류"""
+
+
+def register(name):
+    """작업 함수 등록 데코레이터"""
+    def decorator(func):
+        if name in JOB_REGISTRY and JOB_REGISTRY[name] is not func:
+            raise JobError(f'이미 등록된 작업명입니다: {name}')
+        JOB_REGISTRY[name] = func
+        return func
+    return decorator
+
+
+# ============================================
+# 등록
+# ============================================
+
+def enqueue(name, args=(), kwargs=None, priority=0, dedup_key=None,
+            run_at=None, delay=None, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    작업 등록 - BackgroundJob 반환
+    dedup_key 가 같은 대기 작업이 있으면 그 작업을 반환 (우선순위는 높은 쪽으로 올림)
+    """
+    if name not in JOB_REGISTRY:
+        raise JobError(f'등록되지 않은 작업입니다: {name}')
+
+    if run_at is None:
+        run_at = timezone.now()
+        if delay:
+            run_at += timedelta(seconds=delay)
+
+    with transaction.atomic():
+        if dedup_key:
+            existing = (
+                BackgroundJob.objects.select_for_update()
+                .filter(dedup_key=dedup_key, status='pending')
+                .first()
+            )
+            if existing is not None:
+                if priority > existing.priority:
+                    existing.priority = priority
+                    existing.save(update_fields=['priority'])
+                return existing
+
+        return BackgroundJob.objects.create(
+            name=name,
+            args=list(args),
+            kwargs=kwargs or {},
+            priority=priority,
+            dedup_key=dedup_key,
+            run_at=run_at,
+            max_attempts=max_attempts,
+        )
+
+
+def next_daily_run(hour, now=None):
+    """다음 정기 실행 시각 (현지 시간 hour 시 정각, 이미 지났으면 다음 날)"""
+    now = now or timezone.now()
+    if timezone.is_aware(now):
+        now = timezone.localtime(now)
+    run_at = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if run_at <= now:
+        run_at += timedelta(days=1)
+    return run_at
+
+
+# ============================================
+# 실행
+# ============================================
+
+def claim_next(worker_id):
+    """
+    실행할 작업 1건 선점 - 선점한 작업 ID 반환 (없으면 None)
+    status='pending' 조건부 UPDATE 로 선점하므로 여러 워커가 동시에 실행해도 중복 실행 없음
+    """
+    now = timezone.now()
+    for _ in range(CLAIM_RETRIES):
+        job_id = (
+            BackgroundJob.objects.filter(status='pending', run_at__lte=now)
+            .order_by('-priority', 'run_at', 'id')
+            .values_list('id', flat=True)
+            .first()
+        )
+        if job_id is None:
+            return None
+        claimed = BackgroundJob.objects.filter(pk=job_id, status='pending').update(
+            status='running',
+            worker=worker_id,
+            started_at=now,
+            heartbeat_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return job_id
+    return None
+
+
+def _json_safe(value):
+    try:
+        json.dumps(value)
+        return value
+    except (TypeError, ValueError):
+        return repr(value)
+
+
+def _elapsed_ms(start, end):
+    return max(0, int((end - start).total_seconds() * 1000))
+
+
+def execute_job(job_id):
+    """
+    선점한 작업 실행 후 결과/시간 기록 (스레드/프로세스 풀에서 호출)
+    반환: 최종 상태
+    """
+    close_old_connections()
+    try:
+        job = BackgroundJob.objects.get(pk=job_id)
+        func = JOB_REGISTRY.get(job.name)
+        # 실행 가능 시각부터 워커가 가져갈 때까지의 대기 시간
+        job.wait_ms = _elapsed_ms(job.run_at, job.started_at)
+
+        started = time.perf_counter()
+        try:
+            if func is None:
+                raise JobError(f'등록되지 않은 작업입니다: {job.name}')
+            result = func(*job.args, **job.kwargs)
+        except Exception:
+            job.last_error = traceback.format_exc()[-MAX_ERROR_LENGTH:]
+            if job.attempts < job.max_attempts:
+                job.status = 'pending'
+                job.run_at = timezone.now() + timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (job.attempts - 1))
+            else:
+                job.status = 'failed'
+            logger.warning('작업 실패: %s #%s (%d/%d)', job.name, job.pk, job.attempts, job.max_attempts)
+        else:
+            job.status = 'succeeded'
+            job.result = _json_safe(result)
+            job.last_error = ''
+
+        job.duration_ms = int((time.perf_counter() - started) * 1000)
+        job.finished_at = timezone.now()
+        job.save(update_fields=[
+            'status', 'result', 'last_error', 'run_at', 'finished_at', 'wait_ms', 'duration_ms',
+        ])
+        return job.status
+    finally:
+        close_old_connections()
+
+
+def send_heartbeat(worker_id, job_ids):
+    """실행중인 작업의 생존 신호 갱신 - 이 워커가 선점한 작업만"""
+    if not job_ids:
+        return 0
+    return BackgroundJob.objects.filter(pk__in=job_ids, status='running', worker=worker_id).update(
+        heartbeat_at=timezone.now(),
+    )
+
+
+def recover_stale_jobs(stale_seconds=STALE_JOB_SECONDS):
+    """생존 신호가 끊겨 실행중으로 남은 작업(워커 비정상 종료)을 다시 대기 상태로"""
+    cutoff = timezone.now() - timedelta(seconds=stale_seconds)
+    return BackgroundJob.objects.filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff),
+        status='running',
+    ).update(status='pending', worker='', heartbeat_at=None)
+
+
+class JobRunner:
+    """
+    작업 워커
+    - use_processes=False: 스레드 풀 (DB/IO 위주 작업)
+    - use_processes=True : 프로세스 풀 (CPU 위주 작업, spawn 후 django.setup())
+    """
+
+    def __init__(self, workers=4, use_processes=False, poll_interval=1.0, worker_id=None,
+                 heartbeat_interval=HEARTBEAT_SECONDS):
+        self.workers = workers
+        self.use_processes = use_processes
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}'
+        self.stop_event = threading.Event()
+
+    def _executor(self):
+        if self.use_processes:
+            return ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup,
+            )
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='job')
+
+    def _recover(self):
+        recovered = recover_stale_jobs()
+        if recovered:
+            logger.warning('생존 신호가 끊긴 작업 %d건을 대기 상태로 되돌림', recovered)
+
+    def stop(self):
+        """새 작업 선점 중단 - 실행 중인 작업은 끝까지 실행"""
+        self.stop_event.set()
+
+    def run(self, once=False):
+        """
+        작업 실행 루프
+        once=True 이면 지금 실행 가능한 작업을 모두 처리한 뒤 종료
+        반환: 처리한 작업 수
+        """
+        self._recover()
+        last_heartbeat = time.monotonic()
+
+        processed = 0
+        # future -> 작업 ID (생존 신호 갱신용)
+        in_flight = {}
+        with self._executor() as executor:
+            while True:
+                while not self.stop_event.is_set() and len(in_flight) < self.workers:
+                    job_id = claim_next(self.worker_id)
+                    if job_id is None:
+                        break
+                    in_flight[executor.submit(execute_job, job_id)] = job_id
+
+                # 실행중 작업의 생존 신호 갱신 + 다른 워커가 남긴 작업 회수
+                if time.monotonic() - last_heartbeat >= self.heartbeat_interval:
+                    send_heartbeat(self.worker_id, list(in_flight.values()))
+                    self._recover()
+                    last_heartbeat = time.monotonic()
+
+                if not in_flight:
+                    if once or self.stop_event.is_set():
+                        break
+                    self.stop_event.wait(self.poll_interval)
+                    continue
+
+                done, _ = wait(in_flight, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del in_flight[future]
+                    processed += 1
+                    try:
+                        future.result()
+                    except Exception:
+                        logger.exception('작업 실행 중 워커 오류')
+
+        connections.close_all()
+        return processed
+
+
+# ============================================
+# 통계
+# ============================================
+
+def job_metrics(since=None):
+    """작업명/상태별 건수와 평균/최대 대기·실행 시간(ms)"""
+    queryset = BackgroundJob.objects.all()
+    if since is not None:
+        queryset = queryset.filter(created_at__gte=since)
+    return list(
+        queryset.order_by('name', 'status')
+        .values('name', 'status')
+        .annotate(
+            count=Count('id'),
+            avg_wait_ms=Avg('wait_ms'),
+            avg_duration_ms=Avg('duration_ms'),
+            max_duration_ms=Max('duration_ms'),
+        )
+    )
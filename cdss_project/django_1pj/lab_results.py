@@ -0,0 +1,239 @@
+"""
+검사 결과 시계열 (AFP, 간기능 검사)
+LabResult 좁은 테이블에 추가만 하고, 조회는 (환자, 항목, 검사일) 인덱스로 구간 스캔
+
+- 구간 조회 결과는 NumPy 배열 (검사일: datetime64[D], 결과값: float64)
+- 차트용 다운샘플링은 서버에서 구간별 최소/최대값을 남기는 방식 (급등 지점 보존)
+- 추세 통계(기울기, AFP 배가 시간)는 배열 연산으로 계산
+
+Patient.afp_current 가 수정되면 그 값을 AFP 시계열에 추가하여 이력이 남도록 함
+(등록 시에는 afp_initial 도 진단일 값으로 추가)
+"""
+import datetime
+
+import numpy as np
+from django.db import transaction
+
+from .models import LabResult
+
+
+ANALYTES = dict(LabResult.ANALYTE_CHOICES)
+
+# 차트 기본/최대 점 수
+DEFAULT_CHART_POINTS = 200
+MAX_CHART_POINTS = 2000
+
+# 추세 계산에 사용할 최소 측정 수
+MIN_TREND_POINTS = 2
+
+_DAY = np.timedelta64(1, 'D')
+
+
+class LabResultError(ValueError):
+    """검사 결과 입력 오류"""
+
+
+def _to_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    try:
+        return datetime.date.fromisoformat(str(value))
+    except ValueError:
+        raise LabResultError(f'검사일 형식이 올바르지 않습니다: {value}')
+
+
+def _check_analyte(analyte):
+    if analyte not in ANALYTES:
+        raise LabResultError(f'알 수 없는 검사 항목입니다: {analyte}')
+
+
+# ============================================
+# 기록
+# ============================================
+
+def record_results(patient, analyte, rows):
+    """
+    검사 결과 일괄 추가
+    rows: [(검사일, 결과값), ...] - 한 번의 INSERT 로 저장
+    """
+    _check_analyte(analyte)
+    objects = []
+    for measured_on, value in rows:
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            raise LabResultError(f'결과값이 숫자가 아닙니다: {value}')
+        objects.append(LabResult(
+            patient=patient,
+            analyte=analyte,
+            measured_on=_to_date(measured_on),
+            value=value,
+        ))
+    with transaction.atomic():
+        return LabResult.objects.bulk_create(objects)
+
+
+def record_result(patient, analyte, value, measured_on=None):
+    """검사 결과 1건 추가 (검사일 생략 시 오늘)"""
+    return record_results(patient, analyte, [(measured_on or datetime.date.today(), value)])[0]
+
+
+def record_patient_afp(patient, changed_fields=None):
+    """
+    환자 정보 저장 후 호출 - afp_current 가 바뀌었으면 AFP 시계열에 추가
+    같은 날 이미 같은 값이 기록되어 있으면 생략
+    """
+    if patient.afp_current is None:
+        return None
+    if changed_fields is not None and 'afp_current' not in changed_fields:
+        return None
+
+    today = datetime.date.today()
+    exists = LabResult.objects.filter(
+        patient=patient, analyte='afp', measured_on=today, value=patient.afp_current,
+    ).exists()
+    if exists:
+        return None
+    return record_result(patient, 'afp', patient.afp_current, today)
+
+
+def record_new_patient_afp(patient):
+    """
+    환자 등록 후 호출 - 기존 환자를 옮긴 마이그레이션(0009)과 같은 형태로 기록
+    초기 AFP 는 진단일, 최근 AFP 는 등록일 값으로 추가
+    """
+    rows = []
+    if patient.afp_initial is not None and patient.diagnosis_date is not None:
+        rows.append((patient.diagnosis_date, patient.afp_initial))
+    if patient.afp_current is not None:
+        rows.append((datetime.date.today(), patient.afp_current))
+    if not rows:
+        return []
+    return record_results(patient, 'afp', rows)
+
+
+# ============================================
+# 조회
+# ============================================
+
+def get_series(patient_id, analyte, start=None, end=None):
+    """
+    (검사일 배열, 결과값 배열) - 검사일 오름차순
+    필요한 두 컬럼만 조회하여 바로 배열로 변환
+    """
+    _check_analyte(analyte)
+    queryset = LabResult.objects.filter(patient_id=patient_id, analyte=analyte)
+    if start is not None:
+        queryset = queryset.filter(measured_on__gte=_to_date(start))
+    if end is not None:
+        queryset = queryset.filter(measured_on__lte=_to_date(end))
+
+    rows = list(queryset.order_by('measured_on', 'id').values_list('measured_on', 'value'))
+    if not rows:
+        return np.empty(0, dtype='datetime64[D]'), np.empty(0, dtype=np.float64)
+
+    dates = np.array([row[0] for row in rows], dtype='datetime64[D]')
+    values = np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows))
+    return dates, values
+
+
+def downsample(dates, values, max_points=DEFAULT_CHART_POINTS):
+    """
+    차트용 다운샘플링
+    max_points // 2 개 구간으로 나누고 구간마다 최소/최대값 지점을 남김
+    (평균으로 뭉개지 않으므로 AFP 급등 같은 이상값이 차트에서 사라지지 않음)
+    """
+    count = len(values)
+    if count <= max_points:
+        return dates, values
+
+    buckets = max(1, max_points // 2)
+    bucket_ids = np.arange(count) * buckets // count
+
+    # 구간 -> 값 순으로 정렬하면 구간별 첫 원소가 최소, 마지막 원소가 최대
+    order = np.lexsort((values, bucket_ids))
+    sorted_buckets = bucket_ids[order]
+    starts = np.searchsorted(sorted_buckets, np.arange(buckets), side='left')
+    ends = np.searchsorted(sorted_buckets, np.arange(buckets), side='right') - 1
+
+    keep = np.unique(np.concatenate([order[starts], order[ends], [0, count - 1]]))
+    return dates[keep], values[keep]
+
+
+# ============================================
+# 추세 통계
+# ============================================
+
+def trend_statistics(dates, values):
+    """
+    추세 통계 (측정 2회 미만이면 None)
+    - slope_per_month: 선형 회귀 기울기 (단위/30일)
+    - doubling_days: 로그 선형 회귀로 구한 배가 시간 (증가 추세일 때만, 양수 값만 사용)
+    """
+    if len(values) < MIN_TREND_POINTS:
+        return None
+
+    days = (dates - dates[0]) / _DAY
+    days = days.astype(np.float64)
+    span_days = float(days[-1])
+
+    stats = {
+        'count': int(len(values)),
+        'first_date': str(dates[0]),
+        'last_date': str(dates[-1]),
+        'span_days': span_days,
+        'latest': float(values[-1]),
+        'min': float(values.min()),
+        'max': float(values.max()),
+        'mean': float(values.mean()),
+        'change_percent': None,
+        'slope_per_month': None,
+        'doubling_days': None,
+        'halving_days': None,
+    }
+    if values[0]:
+        stats['change_percent'] = round(float((values[-1] - values[0]) / values[0] * 100), 2)
+
+    # 검사일이 모두 같으면 기울기를 정의할 수 없음
+    centered_days = days - days.mean()
+    denominator = float(np.dot(centered_days, centered_days))
+    if denominator == 0:
+        return stats
+
+    slope = float(np.dot(centered_days, values - values.mean())) / denominator
+    stats['slope_per_month'] = round(slope * 30, 4)
+
+    positive = values > 0
+    if np.count_nonzero(positive) >= MIN_TREND_POINTS:
+        log_days = days[positive]
+        log_values = np.log(values[positive])
+        centered_log_days = log_days - log_days.mean()
+        log_denominator = float(np.dot(centered_log_days, centered_log_days))
+        if log_denominator:
+            rate = float(np.dot(centered_log_days, log_values - log_values.mean())) / log_denominator
+            if rate > 0:
+                stats['doubling_days'] = round(float(np.log(2)) / rate, 1)
+            elif rate < 0:
+                stats['halving_days'] = round(float(np.log(2)) / -rate, 1)
+
+    return stats
+
+
+def get_trend(patient_id, analyte, start=None, end=None, max_points=DEFAULT_CHART_POINTS):
+    """
+    차트 데이터 + 추세 통계 (뷰/API용 진입점)
+    통계는 다운샘플링 전 전체 구간으로 계산
+    """
+    dates, values = get_series(patient_id, analyte, start, end)
+    chart_dates, chart_values = downsample(dates, values, min(max_points, MAX_CHART_POINTS))
+    return {
+        'analyte': analyte,
+        'label': ANALYTES[analyte],
+        'points': [
+            {'date': str(date), 'value': float(value)}
+            for date, value in zip(chart_dates, chart_values)
+        ],
+        'stats': trend_statistics(dates, values),
+    }
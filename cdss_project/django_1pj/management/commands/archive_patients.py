@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from django_1pj.archive import ArchiveError, archive_by_policy, archive_candidates, get_policy, restore_patient
+from django_1pj.models import ArchivedPatient
+
+
+class Command(BaseCommand):
+    help = '보관 정책(PATIENT_ARCHIVE_POLICY) 대상 환자를 보관 테이블로 이동 (--restore 로 한 명 복원)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='대상 환자 수만 출력')
+        parser.add_argument('--limit', type=int, help='이번 실행에서 보관할 최대 환자 수')
+        parser.add_argument('--batch-size', type=int, help='한 트랜잭션에서 옮길 환자 수')
+        parser.add_argument('--restore', metavar='PATIENT_ID', help='보관 환자 복원 (환자번호)')
+
+    def handle(self, *args, **options):
+        if options['restore']:
+            self._restore(options['restore'])
+            return
+
+        policy = get_policy()
+        if options['batch_size']:
+            policy['batch_size'] = options['batch_size']
+
+        if options['dry_run']:
+            candidates = archive_candidates(policy)
+            deceased = candidates.filter(death_date__isnull=False).count()
+            total = candidates.count()
+            self.stdout.write(
+                f'보관 대상: {total}명 (사망 {deceased}명, 장기 미내원 {total - deceased}명) - '
+                f"사망 후 {policy['deceased_days']}일, 미내원 {policy['inactive_days']}일 기준"
+            )
+            return
+
+        started = time.perf_counter()
+        archived = archive_by_policy(policy, limit=options['limit'])
+        self.stdout.write(self.style.SUCCESS(
+            f'보관 완료: {archived}명 ({time.perf_counter() - started:.2f}s)'
+        ))
+
+    def _restore(self, patient_id):
+        try:
+            archived = ArchivedPatient.objects.get(patient_id=patient_id)
+        except ArchivedPatient.DoesNotExist:
+            raise CommandError(f'보관 환자를 찾을 수 없습니다: {patient_id}')
+        try:
+            patient = restore_patient(archived)
+        except ArchiveError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f'복원 완료: {patient.patient_id} {patient.name}'))
@@ -0,0 +1,67 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from django_1pj.inference import DUMMY_BACKEND, MODEL_INPUT_SIZE, MicroBatcher, load_model, model_backend
+
+
+class Command(BaseCommand):
+    help = '종양 분석 추론 처리량/지연 시간 측정 (배치 없음 vs 마이크로 배치, 모델 미설정 시 테스트용 모델)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=512, help='전체 요청 수')
+        parser.add_argument('--concurrency', type=int, default=16, help='동시 요청 수 (클라이언트 스레드)')
+        parser.add_argument('--batch-size', type=int, default=16, help='최대 배치 크기')
+        parser.add_argument('--max-latency-ms', type=float, default=10, help='배치 대기 시간 상한 (ms)')
+        parser.add_argument('--workers', type=int, default=2, help='배치 실행 스레드 수')
+
+    def _measure(self, model, images, concurrency, batch_size, max_latency_ms, workers):
+        batcher = MicroBatcher(model, max_batch_size=batch_size, max_latency_ms=max_latency_ms, workers=workers)
+
+        def call(image):
+            started = time.perf_counter()
+            batcher.submit(image).result()
+            return time.perf_counter() - started
+
+        # 모델/스레드 준비 (측정 제외)
+        batcher.predict(images[:batch_size])
+        batcher.batches = batcher.items = 0
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as clients:
+            latencies = np.array(list(clients.map(call, images))) * 1000
+        elapsed = time.perf_counter() - started
+        stats = batcher.stats()
+        batcher.close()
+
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        return {
+            'throughput': len(images) / elapsed,
+            'p50': p50, 'p95': p95, 'p99': p99,
+            'avg_batch_size': stats['avg_batch_size'],
+        }
+
+    def handle(self, *args, **options):
+        # 난수 입력만 사용하므로 모델이 설정되지 않았으면 테스트용 모델로 측정
+        model = load_model(model_backend() or DUMMY_BACKEND)
+        rng = np.random.default_rng(1)
+        images = list(rng.random((options['requests'], MODEL_INPUT_SIZE, MODEL_INPUT_SIZE), dtype=np.float32))
+        self.stdout.write(
+            f"모델: {getattr(model, 'name', type(model).__name__)} {getattr(model, 'version', '')}, "
+            f"요청 {options['requests']}건, 동시 {options['concurrency']}"
+        )
+
+        scenarios = [
+            ('배치 없음', 1, 0, options['workers']),
+            (f"마이크로 배치 (최대 {options['batch_size']}, {options['max_latency_ms']:g}ms)",
+             options['batch_size'], options['max_latency_ms'], options['workers']),
+        ]
+        for label, batch_size, max_latency_ms, workers in scenarios:
+            result = self._measure(model, images, options['concurrency'], batch_size, max_latency_ms, workers)
+            self.stdout.write(
+                f"{label:<32} {result['throughput']:8.1f} 건/초  "
+                f"p50 {result['p50']:6.1f}ms  p95 {result['p95']:6.1f}ms  p99 {result['p99']:6.1f}ms  "
+                f"평균 배치 {result['avg_batch_size']}"
+            )
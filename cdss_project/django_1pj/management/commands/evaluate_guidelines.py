@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from django_1pj.guidelines import TREATMENT_LABELS, evaluate_queryset
+
+
+CONCORDANCE_LABELS = {
+    'recommended': '권고 치료',
+    'alternative': '대안 치료',
+    'discordant': '권고와 다름',
+    'unknown': '치료/간기능 미입력, 권고 없음',
+}
+
+
+class Command(BaseCommand):
+    help = '전체 환자 BCLC 가이드라인 일괄 평가 (야간 점검용, 권고와 다른 치료 중인 환자 목록)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000, help='조회 청크 크기')
+        parser.add_argument('--list', action='store_true', help='권고와 다른 치료 중인 환자 ID 출력')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        summary = evaluate_queryset(chunk_size=options['chunk_size'])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(f"평가 환자: {summary['patients']}명 ({elapsed:.2f}s)")
+        self.stdout.write('치료 방식 일치')
+        for key, label in CONCORDANCE_LABELS.items():
+            self.stdout.write(f"  {label:<16} {summary['by_concordance'].get(key, 0)}명")
+        self.stdout.write('권고 치료별 환자 수')
+        for treatment, count in summary['by_option'].items():
+            self.stdout.write(f'  {TREATMENT_LABELS[treatment]:<16} {count}명')
+        if summary['warnings']:
+            self.stdout.write('입력 확인 필요')
+            for warning, count in summary['warnings'].items():
+                self.stdout.write(f'  {count:>6}명  {warning}')
+
+        if options['list']:
+            for patient_id in summary['discordant']:
+                self.stdout.write(patient_id)
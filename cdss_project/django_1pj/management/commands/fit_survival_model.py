@@ -0,0 +1,72 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from django_1pj.survival_model import (
+    DEFAULT_CHUNK_SIZE, DEFAULT_MAX_ITER, DEFAULT_PENALTY, DEFAULT_TOLERANCE,
+    CoxPredictor, SurvivalModelError, feature_names, fit_cox, save_model, schedule_scoring, score_patients,
+    stream_training_data,
+)
+
+
+class Command(BaseCommand):
+    help = 'Cox 비례위험 생존 모델 학습 후 새 버전으로 저장 (--score 로 환자 1/3/5년 생존율 갱신)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='조회/계산 청크 크기')
+        parser.add_argument('--max-iter', type=int, default=DEFAULT_MAX_ITER, help='Newton-Raphson 최대 반복 횟수')
+        parser.add_argument('--tol', type=float, default=DEFAULT_TOLERANCE, help='수렴 기준 (로그우도 상대 변화)')
+        parser.add_argument('--penalty', type=float, default=DEFAULT_PENALTY, help='L2 벌점 (표준화 변수 기준)')
+        parser.add_argument('--no-activate', action='store_true', help='저장만 하고 사용 중 모델은 유지')
+        parser.add_argument('--dry-run', action='store_true', help='학습 결과만 출력하고 저장하지 않음')
+        parser.add_argument('--score', action='store_true', help='학습한 모델로 전체 환자 예측 생존율 갱신')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        features, durations, events = stream_training_data(chunk_size=options['chunk_size'])
+        loaded = time.perf_counter()
+        self.stdout.write(f'학습 데이터: {len(durations)}명, 사망 {int(events.sum())}명 ({loaded - started:.2f}s)')
+
+        try:
+            result = fit_cox(
+                features, durations, events,
+                penalty=options['penalty'], max_iter=options['max_iter'], tol=options['tol'],
+                chunk_size=options['chunk_size'],
+            )
+        except (SurvivalModelError, np.linalg.LinAlgError) as e:
+            raise CommandError(f'모델 학습 실패: {e}')
+        fitted = time.perf_counter()
+
+        self.stdout.write(
+            f"반복 {result['iterations']}회, 수렴 {'예' if result['converged'] else '아니오'}, "
+            f"로그우도 {result['null_log_likelihood']:.2f} -> {result['log_likelihood']:.2f} "
+            f"({fitted - loaded:.2f}s)"
+        )
+        self.stdout.write(f"{'변수':<28}{'계수':>10}{'HR(단위당)':>12}{'SE':>10}")
+        for name, beta, se, scale in zip(feature_names(), result['coefficients'],
+                                         result['standard_errors'], result['scales']):
+            # 표준화 계수 -> 원 단위 위험비
+            if np.isnan(se):
+                self.stdout.write(f"{name:<28}{'-':>10}{'-':>12}{'-':>10}  (값 변화 없음, 제외)")
+                continue
+            self.stdout.write(f'{name:<28}{beta:>10.4f}{np.exp(beta / scale):>12.3f}{se:>10.4f}')
+
+        if not result['converged']:
+            self.stdout.write(self.style.WARNING('최대 반복 횟수 안에 수렴하지 않았습니다.'))
+        if options['dry_run']:
+            self.stdout.write('dry-run: 저장하지 않음')
+            return
+
+        model = save_model(result, activate=not options['no_activate'])
+        self.stdout.write(self.style.SUCCESS(f'저장: {model}{" (사용 중)" if model.is_active else ""}'))
+
+        if options['score']:
+            updated = score_patients(chunk_size=options['chunk_size'], predictor=CoxPredictor(model))
+            self.stdout.write(self.style.SUCCESS(
+                f'예측 생존율 갱신: {updated}명 ({time.perf_counter() - fitted:.2f}s)'
+            ))
+        if model.is_active:
+            # --score 로 바로 갱신하지 않았으면 워커에서 전체 예측, 이후 매일 야간 갱신
+            job = schedule_scoring(immediately=not options['score'])
+            self.stdout.write(f'예측 작업 예약: #{job.pk} ({job.run_at:%Y-%m-%d %H:%M})')
@@ -0,0 +1,61 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from django_1pj.media_gc import (
+    DEFAULT_BATCH_SIZE, DEFAULT_CHUNK_SIZE, DEFAULT_GRACE_HOURS, MEDIA_REFERENCES, collect_garbage,
+    quarantine_root,
+)
+
+
+class Command(BaseCommand):
+    help = 'DB 에서 참조하지 않는 미디어 파일(ct_images, doctor_profiles) 삭제 또는 격리'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='삭제하지 않고 대상과 용량만 출력')
+        parser.add_argument('--quarantine', action='store_true', help='삭제 대신 MEDIA_QUARANTINE_DIR 로 이동')
+        parser.add_argument('--grace-hours', type=float, default=DEFAULT_GRACE_HOURS,
+                            help='이 시간 안에 수정된 파일은 건너뜀')
+        parser.add_argument('--dir', action='append', choices=sorted(MEDIA_REFERENCES), dest='directories',
+                            help='대상 디렉터리 (여러 번 지정 가능, 기본: 전체)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='참조 경로 조회 청크 크기')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='파일 확인 배치 크기')
+        parser.add_argument('--list', action='store_true', help='정리 대상 파일 경로 출력')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        on_orphan = None
+        if options['list']:
+            on_orphan = lambda name, size: self.stdout.write(f'  {name} ({filesizeformat(size)})')  # noqa: E731
+
+        report = collect_garbage(
+            directories=options['directories'],
+            grace_hours=options['grace_hours'],
+            dry_run=options['dry_run'],
+            quarantine=options['quarantine'],
+            chunk_size=options['chunk_size'],
+            batch_size=options['batch_size'],
+            on_orphan=on_orphan,
+        )
+
+        reclaimed = 0
+        for directory, stats in report.items():
+            self.stdout.write(
+                f"{directory:<16} 파일 {stats['files']}개 ({filesizeformat(stats['bytes'])}), "
+                f"유예 {stats['recent']}개, 참조 없음 {stats['orphans']}개 ({filesizeformat(stats['orphan_bytes'])})"
+            )
+            if stats['errors']:
+                self.stdout.write(self.style.WARNING(f"  처리 실패 {stats['errors']}개"))
+            reclaimed += stats['reclaimed_bytes']
+
+        elapsed = time.perf_counter() - started
+        if options['dry_run']:
+            total = sum(stats['orphan_bytes'] for stats in report.values())
+            self.stdout.write(f'dry-run: 정리 시 확보 용량 {filesizeformat(total)} ({elapsed:.2f}s)')
+        elif options['quarantine']:
+            self.stdout.write(self.style.SUCCESS(
+                f'격리 완료: {filesizeformat(reclaimed)} -> {quarantine_root()} ({elapsed:.2f}s)'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'삭제 완료: {filesizeformat(reclaimed)} 확보 ({elapsed:.2f}s)'))
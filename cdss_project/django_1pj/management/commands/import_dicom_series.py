@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from django_1pj import jobs
+from django_1pj.ct_render import schedule_prerender
+from django_1pj.ct_volume import VolumeError, ingest_dicom_series
+from django_1pj.models import Patient
+
+
+class Command(BaseCommand):
+    help = 'DICOM 시리즈 디렉터리를 CT 볼륨(메모리 매핑 .npy)으로 변환하여 환자에 등록'
+
+    def add_arguments(self, parser):
+        parser.add_argument('patient_id', help='환자번호')
+        parser.add_argument('source', help='DICOM 파일이 있는 디렉터리')
+        parser.add_argument('--series', help='변환할 SeriesInstanceUID (기본: 슬라이스가 가장 많은 시리즈)')
+        parser.add_argument('--background', action='store_true', help='백그라운드 작업으로 예약 (run_jobs 워커가 처리)')
+
+    def handle(self, *args, **options):
+        try:
+            patient = Patient.objects.get(patient_id=options['patient_id'])
+        except Patient.DoesNotExist:
+            raise CommandError(f"환자를 찾을 수 없습니다: {options['patient_id']}")
+
+        if options['background']:
+            job = jobs.enqueue(
+                'ct_studies.ingest',
+                args=[patient.patient_id, options['source'], options['series']],
+                dedup_key=f"ct_studies.ingest:{patient.patient_id}:{options['source']}",
+            )
+            self.stdout.write(self.style.SUCCESS(f'변환 작업을 예약했습니다. (작업 #{job.pk})'))
+            return
+
+        try:
+            study = ingest_dicom_series(patient, options['source'], options['series'])
+        except VolumeError as e:
+            raise CommandError(str(e))
+        schedule_prerender(study)
+        self.stdout.write(self.style.SUCCESS(
+            f'CT 검사 #{study.pk} 등록: {study.slice_count} x {study.rows} x {study.columns}'
+        ))
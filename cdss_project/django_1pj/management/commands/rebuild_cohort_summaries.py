@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from django_1pj.cohort import rebuild_cohort_summaries
+
+
+class Command(BaseCommand):
+    help = '코호트 요약 테이블 전체 재계산 (시그널 없이 환자 데이터를 변경한 뒤 실행)'
+
+    def handle(self, *args, **options):
+        counts = rebuild_cohort_summaries()
+        for dimension, count in counts.items():
+            self.stdout.write(f'{dimension:<16} {count}행')
+        self.stdout.write(self.style.SUCCESS('코호트 요약 재계산 완료'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from django_1pj.audit import replay_spilled_entries, spill_path
+
+
+class Command(BaseCommand):
+    help = 'DB 오류로 파일에 보관된 감사 로그를 다시 저장 (AUDIT_SPILL_FILE)'
+
+    def handle(self, *args, **options):
+        count = replay_spilled_entries()
+        self.stdout.write(self.style.SUCCESS(f'{spill_path()} 에서 감사 로그 {count}건 저장 완료'))
@@ -0,0 +1,51 @@
+import logging
+import signal
+
+from django.core.management.base import BaseCommand
+
+from django_1pj.guidelines import schedule_evaluation
+from django_1pj.jobs import JobRunner, job_metrics
+
+
+class Command(BaseCommand):
+    help = '백그라운드 작업 워커 실행 (BackgroundJob 큐 처리)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='동시 실행 작업 수')
+        parser.add_argument('--processes', action='store_true', help='스레드 대신 프로세스 풀 사용 (CPU 위주 작업)')
+        parser.add_argument('--poll', type=float, default=1.0, help='대기 작업 확인 주기 (초)')
+        parser.add_argument('--once', action='store_true', help='실행 가능한 작업을 모두 처리한 뒤 종료')
+        parser.add_argument('--stats', action='store_true', help='작업 통계만 출력')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            for row in job_metrics():
+                self.stdout.write(
+                    f"{row['name']:<30} {row['status']:<10} {row['count']:>6}건  "
+                    f"대기 평균 {row['avg_wait_ms'] or 0:.0f}ms  "
+                    f"실행 평균 {row['avg_duration_ms'] or 0:.0f}ms / 최대 {row['max_duration_ms'] or 0}ms"
+                )
+            return
+
+        logging.basicConfig(level=logging.INFO)
+        runner = JobRunner(
+            workers=options['workers'],
+            use_processes=options['processes'],
+            poll_interval=options['poll'],
+        )
+
+        # 종료 신호를 받으면 새 작업 선점을 멈추고 실행 중인 작업만 마무리
+        def _stop(signum, frame):
+            self.stdout.write('종료 신호 수신 - 실행 중인 작업 완료 후 종료합니다.')
+            runner.stop()
+
+        signal.signal(signal.SIGTERM, _stop)
+        signal.signal(signal.SIGINT, _stop)
+
+        # 야간 정기 작업 예약 (이후에는 작업이 끝날 때마다 다음 날로 다시 예약, 대기 중이면 중복 등록 안 됨)
+        schedule_evaluation()
+
+        mode = '프로세스' if options['processes'] else '스레드'
+        self.stdout.write(f'작업 워커 시작 ({runner.worker_id}, {mode} {options["workers"]}개)')
+        processed = runner.run(once=options['once'])
+        self.stdout.write(self.style.SUCCESS(f'처리한 작업: {processed}건'))
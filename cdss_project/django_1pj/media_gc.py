@@ -0,0 +1,198 @@
+"""
+참조 없는 미디어 파일 정리 (gc_media 명령)
+관리자에서 이미지를 교체하거나 환자를 삭제하면 이전 파일이 MEDIA_ROOT 에 남음
+
+- DB 의 참조 경로를 청크 단위로 읽어 8바이트 해시 정렬 배열로 보관 (경로 문자열 set 보다 훨씬 작음)
+- 미디어 디렉터리는 scandir 로 순회하며 파일 배치마다 searchsorted 로 참조 여부 확인
+  -> 메모리는 참조 수 x 8바이트 + 배치 크기로 제한, 파일 목록 전체를 만들지 않음
+- 해시 충돌은 "참조됨"으로만 판정되므로 파일이 남을 뿐 잘못 삭제되지 않음
+- 유예 기간보다 최근에 수정된 파일은 건너뜀 (업로드 완료 직전 파일, 참조 목록 생성 이후 저장된 파일)
+- 삭제/격리 직전에 배치 단위로 DB 를 다시 조회하여 그사이 참조된 파일은 제외
+"""
+import hashlib
+import os
+import shutil
+import time
+from array import array
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+from .models import ArchivedPatient, DoctorProfile, Patient
+
+
+DEFAULT_GRACE_HOURS = 24
+DEFAULT_CHUNK_SIZE = 5000
+DEFAULT_BATCH_SIZE = 1000
+
+# 미디어 디렉터리(upload_to) -> 이 디렉터리의 파일을 참조하는 (매니저, 컬럼)
+# 환자는 삭제 표시된 환자(정리 작업이 직접 파일 삭제)와 보관 환자까지 포함
+MEDIA_REFERENCES = {
+    'ct_images': [
+        (Patient.all_objects, 'ct_image'),
+        (ArchivedPatient.objects, 'ct_image'),
+    ],
+    'doctor_profiles': [
+        (DoctorProfile.objects, 'profile_image'),
+    ],
+}
+
+
+def media_root():
+    return Path(settings.MEDIA_ROOT)
+
+
+def quarantine_root():
+    return Path(getattr(settings, 'MEDIA_QUARANTINE_DIR', Path(settings.BASE_DIR) / 'media_quarantine'))
+
+
+def _path_key(name):
+    """MEDIA_ROOT 기준 상대 경로(/ 구분) -> 부호 없는 64비트 해시"""
+    digest = hashlib.blake2b(name.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+# ============================================
+# 참조 경로
+# ============================================
+
+def _referenced_names(directory, chunk_size):
+    for manager, column in MEDIA_REFERENCES[directory]:
+        names = (
+            manager.exclude(**{f'{column}__isnull': True}).exclude(**{column: ''})
+            .order_by().values_list(column, flat=True)
+        )
+        yield from names.iterator(chunk_size=chunk_size)
+
+
+def referenced_keys(directories, chunk_size=DEFAULT_CHUNK_SIZE):
+    """참조 경로 해시 정렬 배열 (np.uint64, 중복 제거)"""
+    keys = array('Q')
+    for directory in directories:
+        for name in _referenced_names(directory, chunk_size):
+            keys.append(_path_key(name))
+    return np.unique(np.frombuffer(keys, dtype=np.uint64)) if keys else np.empty(0, dtype=np.uint64)
+
+
+def _still_referenced(directory, names):
+    """삭제 직전 재확인 - names 중 현재 DB 에서 참조 중인 경로"""
+    referenced = set()
+    for manager, column in MEDIA_REFERENCES[directory]:
+        referenced.update(manager.filter(**{f'{column}__in': names}).values_list(column, flat=True))
+    return referenced
+
+
+# ============================================
+# 순회
+# ============================================
+
+def _walk_files(root, relative):
+    """
+    root/relative 아래 파일 (상대 경로, 크기, 수정 시각) - 재귀 대신 디렉터리 스택 사용
+    심볼릭 링크는 따라가지 않음
+    """
+    stack = [relative]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(root / current) as entries:
+                for entry in entries:
+                    name = f'{current}/{entry.name}'
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(name)
+                    elif entry.is_file(follow_symlinks=False):
+                        stat = entry.stat(follow_symlinks=False)
+                        yield name, stat.st_size, stat.st_mtime
+        except FileNotFoundError:
+            continue
+
+
+def _batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _is_referenced(keys, names):
+    """정렬 해시 배열에 포함 여부 (배치 단위 벡터 연산)"""
+    if not len(keys):
+        return np.zeros(len(names), dtype=bool)
+    candidates = np.fromiter((_path_key(name) for name in names), dtype=np.uint64, count=len(names))
+    positions = np.minimum(np.searchsorted(keys, candidates), len(keys) - 1)
+    return keys[positions] == candidates
+
+
+# ============================================
+# 정리
+# ============================================
+
+def _remove(root, name, quarantine):
+    source = root / name
+    if quarantine is None:
+        source.unlink()
+        return
+    target = quarantine / name
+    target.parent.mkdir(parents=True, exist_ok=True)
+    shutil.move(source, target)
+
+
+def collect_garbage(directories=None, grace_hours=DEFAULT_GRACE_HOURS, dry_run=False, quarantine=False,
+                    chunk_size=DEFAULT_CHUNK_SIZE, batch_size=DEFAULT_BATCH_SIZE, on_orphan=None):
+    """
+    참조 없는 미디어 파일 삭제 (quarantine=True 면 MEDIA_QUARANTINE_DIR 로 이동)
+    on_orphan(경로, 크기) 는 정리 대상 파일마다 호출 (dry-run 목록 출력용)
+    반환: 디렉터리별 {'files', 'bytes', 'recent', 'orphans', 'orphan_bytes', 'removed', 'reclaimed_bytes', 'errors'}
+    """
+    directories = list(directories or MEDIA_REFERENCES)
+    root = media_root()
+    target = quarantine_root() if quarantine else None
+    cutoff = time.time() - grace_hours * 3600
+
+    report = {}
+    for directory in directories:
+        keys = referenced_keys([directory], chunk_size)
+        stats = dict.fromkeys(
+            ['files', 'bytes', 'recent', 'orphans', 'orphan_bytes', 'removed', 'reclaimed_bytes', 'errors'], 0,
+        )
+        for batch in _batches(_walk_files(root, directory), batch_size):
+            stats['files'] += len(batch)
+            stats['bytes'] += sum(size for _, size, _ in batch)
+
+            referenced = _is_referenced(keys, [name for name, _, _ in batch])
+            orphans = []
+            for (name, size, mtime), is_referenced in zip(batch, referenced):
+                if is_referenced:
+                    continue
+                if mtime > cutoff:
+                    stats['recent'] += 1
+                    continue
+                orphans.append((name, size))
+            if not orphans:
+                continue
+
+            # 참조 목록을 만든 뒤 새로 연결된 파일 제외
+            current = _still_referenced(directory, [name for name, _ in orphans])
+            for name, size in orphans:
+                if name in current:
+                    continue
+                stats['orphans'] += 1
+                stats['orphan_bytes'] += size
+                if on_orphan is not None:
+                    on_orphan(name, size)
+                if dry_run:
+                    continue
+                try:
+                    _remove(root, name, target)
+                except OSError:
+                    stats['errors'] += 1
+                    continue
+                stats['removed'] += 1
+                stats['reclaimed_bytes'] += size
+        report[directory] = stats
+    return report
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_1pj", "0005_alter_doctorprofile_password"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="druginteraction",
+            name="created_at",
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name="patient",
+            name="diagnosis_date",
+            field=models.DateField(
+                blank=True, db_index=True, null=True, verbose_name="진단일"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="patient",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
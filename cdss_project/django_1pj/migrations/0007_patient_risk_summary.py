@@ -0,0 +1,98 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_risk_summaries(apps, schema_editor):
+    """기존 약물 상호작용 데이터로 위험 요약 생성"""
+    DrugInteraction = apps.get_model("django_1pj", "DrugInteraction")
+    PatientRiskSummary = apps.get_model("django_1pj", "PatientRiskSummary")
+
+    summaries = {}
+    rows = DrugInteraction.objects.order_by("patient_id", "-probability").values_list(
+        "patient_id", "risk_level", "drug_name", "side_effect", "probability"
+    )
+    for patient_id, risk_level, drug_name, side_effect, probability in rows.iterator():
+        summary = summaries.get(patient_id)
+        if summary is None:
+            # 정렬상 환자별 첫 행이 최고위험 항목
+            summary = summaries[patient_id] = PatientRiskSummary(
+                patient_id=patient_id,
+                top_drug_name=drug_name,
+                top_side_effect=side_effect,
+                top_probability=probability,
+            )
+        field = f"{risk_level}_count"
+        if hasattr(summary, field):
+            setattr(summary, field, getattr(summary, field) + 1)
+
+    PatientRiskSummary.objects.bulk_create(summaries.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_1pj", "0006_admin_scaling_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PatientRiskSummary",
+            fields=[
+                (
+                    "patient",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="risk_summary",
+                        serialize=False,
+                        to="django_1pj.patient",
+                        verbose_name="환자",
+                    ),
+                ),
+                (
+                    "high_count",
+                    models.PositiveIntegerField(default=0, verbose_name="고위험 건수"),
+                ),
+                (
+                    "medium_count",
+                    models.PositiveIntegerField(default=0, verbose_name="중위험 건수"),
+                ),
+                (
+                    "low_count",
+                    models.PositiveIntegerField(default=0, verbose_name="저위험 건수"),
+                ),
+                (
+                    "top_drug_name",
+                    models.CharField(
+                        blank=True, max_length=200, verbose_name="최고위험 약물명"
+                    ),
+                ),
+                (
+                    "top_side_effect",
+                    models.CharField(
+                        blank=True, max_length=200, verbose_name="최고위험 부작용"
+                    ),
+                ),
+                (
+                    "top_probability",
+                    models.IntegerField(
+                        blank=True, null=True, verbose_name="최고위험 발생 확률(%)"
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "환자 위험 요약",
+                "verbose_name_plural": "환자 위험 요약",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="druginteraction",
+            index=models.Index(
+                fields=["patient", "-probability"], name="druginter_patient_prob_idx"
+            ),
+        ),
+        migrations.RunPython(build_risk_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_1pj", "0007_patient_risk_summary"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="drug",
+            name="interactions",
+            field=models.TextField(
+                blank=True,
+                help_text="한 줄에 한 건: 약물코드 또는 약물명 | 심각도(금기/중대/주의/경미) | 기전",
+                verbose_name="약물 상호작용",
+            ),
+        ),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def seed_afp_results(apps, schema_editor):
+    """기존 환자의 초기/최근 AFP 를 시계열 첫 기록으로 옮김"""
+    Patient = apps.get_model("django_1pj", "Patient")
+    LabResult = apps.get_model("django_1pj", "LabResult")
+
+    results = []
+    rows = Patient.objects.values_list(
+        "pk", "diagnosis_date", "afp_initial", "afp_current", "updated_at"
+    )
+    for (
+        patient_id,
+        diagnosis_date,
+        afp_initial,
+        afp_current,
+        updated_at,
+    ) in rows.iterator():
+        if afp_initial is not None and diagnosis_date is not None:
+            results.append(
+                LabResult(
+                    patient_id=patient_id,
+                    analyte="afp",
+                    measured_on=diagnosis_date,
+                    value=afp_initial,
+                )
+            )
+        if afp_current is not None:
+            results.append(
+                LabResult(
+                    patient_id=patient_id,
+                    analyte="afp",
+                    measured_on=updated_at.date(),
+                    value=afp_current,
+                )
+            )
+
+    LabResult.objects.bulk_create(results, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_1pj", "0008_alter_drug_interactions_help_text"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LabResult",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "analyte",
+                    models.CharField(
+                        choices=[
+                            ("afp", "AFP (ng/mL)"),
+                            ("pivka2", "PIVKA-II (mAU/mL)"),
+                            ("ast", "AST (U/L)"),
+                            ("alt", "ALT (U/L)"),
+                            ("bilirubin", "총 빌리루빈 (mg/dL)"),
+                            ("albumin", "알부민 (g/dL)"),
+                            ("inr", "PT-INR"),
+                            ("platelet", "혈소판 (10³/µL)"),
+                        ],
+                        max_length=20,
+                        verbose_name="검사 항목",
+                    ),
+                ),
+                ("measured_on", models.DateField(verbose_name="검사일")),
+                ("value", models.FloatField(verbose_name="결과값")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "patient",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="lab_results",
+                        to="django_1pj.patient",
+                        verbose_name="환자",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "검사 결과",
+                "verbose_name_plural": "검사 결과",
+                "ordering": ["patient", "analyte", "measured_on"],
+                "indexes": [
+                    models.Index(
+                        fields=["patient", "analyte", "measured_on"],
+                        name="labresult_series_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(seed_afp_results, migrations.RunPython.noop),
+    ]
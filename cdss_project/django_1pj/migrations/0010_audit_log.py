@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_1pj", "0009_lab_results"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuditLog",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[
+                            ("create", "등록"),
+                            ("update", "수정"),
+                            ("delete", "삭제"),
+                        ],
+                        max_length=10,
+                        verbose_name="작업",
+                    ),
+                ),
+                (
+                    "doctor_id",
+                    models.CharField(max_length=50, verbose_name="변경한 의사 ID"),
+                ),
+                (
+                    "patient_id",
+                    models.CharField(max_length=20, verbose_name="환자번호"),
+                ),
+                (
+                    "field_name",
+                    models.CharField(blank=True, max_length=50, verbose_name="필드"),
+                ),
+                (
+                    "old_value",
+                    models.TextField(blank=True, null=True, verbose_name="이전 값"),
+                ),
+                (
+                    "new_value",
+                    models.TextField(blank=True, null=True, verbose_name="새 값"),
+                ),
+                ("changed_at", models.DateTimeField(verbose_name="변경 시각")),
+            ],
+            options={
+                "verbose_name": "감사 로그",
+                "verbose_name_plural": "감사 로그",
+                "ordering": ["-id"],
+                "indexes": [
+                    models.Index(
+                        fields=["patient_id", "-id"], name="auditlog_patient_idx"
+                    ),
+                    models.Index(
+                        fields=["doctor_id", "-id"], name="auditlog_doctor_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,125 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_1pj", "0010_audit_log"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BackgroundJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, verbose_name="작업명")),
+                (
+                    "args",
+                    models.JSONField(blank=True, default=list, verbose_name="인자"),
+                ),
+                (
+                    "kwargs",
+                    models.JSONField(
+                        blank=True, default=dict, verbose_name="키워드 인자"
+                    ),
+                ),
+                ("priority", models.IntegerField(default=0, verbose_name="우선순위")),
+                (
+                    "dedup_key",
+                    models.CharField(
+                        blank=True,
+                        db_index=True,
+                        max_length=200,
+                        null=True,
+                        verbose_name="중복 방지 키",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "대기"),
+                            ("running", "실행중"),
+                            ("succeeded", "완료"),
+                            ("failed", "실패"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                        verbose_name="상태",
+                    ),
+                ),
+                ("run_at", models.DateTimeField(verbose_name="실행 예정 시각")),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(default=0, verbose_name="시도 횟수"),
+                ),
+                (
+                    "max_attempts",
+                    models.PositiveIntegerField(
+                        default=3, verbose_name="최대 시도 횟수"
+                    ),
+                ),
+                (
+                    "worker",
+                    models.CharField(blank=True, max_length=100, verbose_name="워커"),
+                ),
+                (
+                    "last_error",
+                    models.TextField(blank=True, verbose_name="마지막 오류"),
+                ),
+                (
+                    "result",
+                    models.JSONField(blank=True, null=True, verbose_name="결과"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="등록일시"),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="시작일시"
+                    ),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="종료일시"
+                    ),
+                ),
+                (
+                    "wait_ms",
+                    models.PositiveIntegerField(
+                        blank=True, null=True, verbose_name="대기 시간(ms)"
+                    ),
+                ),
+                (
+                    "duration_ms",
+                    models.PositiveIntegerField(
+                        blank=True, null=True, verbose_name="실행 시간(ms)"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "백그라운드 작업",
+                "verbose_name_plural": "백그라운드 작업",
+                "ordering": ["-id"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "-priority", "run_at"],
+                        name="backgroundjob_queue_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:18
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_1pj", "0011_background_jobs"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CTUploadSession",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("filename", models.CharField(max_length=255, verbose_name="파일명")),
+                ("total_size", models.BigIntegerField(verbose_name="전체 크기(byte)")),
+                (
+                    "chunk_size",
+                    models.PositiveIntegerField(verbose_name="청크 크기(byte)"),
+                ),
+                ("total_chunks", models.PositiveIntegerField(verbose_name="청크 수")),
+                (
+                    "checksum",
+                    models.CharField(
+                        blank=True, max_length=64, verbose_name="전체 파일 SHA-256"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("uploading", "업로드중"),
+                            ("completed", "완료"),
+                            ("aborted", "취소"),
+                        ],
+                        default="uploading",
+                        max_length=10,
+                        verbose_name="상태",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="시작일시"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, db_index=True, verbose_name="최근 수신일시"
+                    ),
+                ),
+                (
+                    "completed_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="완료일시"
+                    ),
+                ),
+                (
+                    "doctor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ct_uploads",
+                        to="django_1pj.doctorprofile",
+                        verbose_name="업로드한 의사",
+                    ),
+                ),
+                (
+                    "patient",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ct_uploads",
+                        to="django_1pj.patient",
+                        verbose_name="환자",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "CT 업로드 세션",
+                "verbose_name_plural": "CT 업로드 세션",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,116 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_1pj", "0012_ct_upload_session"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CTStudy",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "study_instance_uid",
+                    models.CharField(
+                        blank=True, max_length=64, verbose_name="Study Instance UID"
+                    ),
+                ),
+                (
+                    "series_instance_uid",
+                    models.CharField(
+                        max_length=64, unique=True, verbose_name="Series Instance UID"
+                    ),
+                ),
+                (
+                    "study_date",
+                    models.DateField(blank=True, null=True, verbose_name="검사일"),
+                ),
+                (
+                    "modality",
+                    models.CharField(blank=True, max_length=16, verbose_name="장비"),
+                ),
+                (
+                    "description",
+                    models.CharField(
+                        blank=True, max_length=200, verbose_name="시리즈 설명"
+                    ),
+                ),
+                (
+                    "slice_count",
+                    models.PositiveIntegerField(default=0, verbose_name="슬라이스 수"),
+                ),
+                ("rows", models.PositiveIntegerField(default=0, verbose_name="행")),
+                ("columns", models.PositiveIntegerField(default=0, verbose_name="열")),
+                (
+                    "pixel_spacing_row",
+                    models.FloatField(
+                        blank=True, null=True, verbose_name="행 간격(mm)"
+                    ),
+                ),
+                (
+                    "pixel_spacing_col",
+                    models.FloatField(
+                        blank=True, null=True, verbose_name="열 간격(mm)"
+                    ),
+                ),
+                (
+                    "slice_spacing",
+                    models.FloatField(
+                        blank=True, null=True, verbose_name="슬라이스 간격(mm)"
+                    ),
+                ),
+                (
+                    "volume_path",
+                    models.CharField(
+                        blank=True, max_length=255, verbose_name="볼륨 파일"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("processing", "변환중"),
+                            ("ready", "완료"),
+                            ("failed", "실패"),
+                        ],
+                        default="processing",
+                        max_length=10,
+                        verbose_name="상태",
+                    ),
+                ),
+                ("error", models.TextField(blank=True, verbose_name="오류")),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="등록일시"),
+                ),
+                (
+                    "patient",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ct_studies",
+                        to="django_1pj.patient",
+                        verbose_name="환자",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "CT 검사",
+                "verbose_name_plural": "CT 검사",
+                "ordering": ["-study_date", "-created_at"],
+            },
+        ),
+    ]
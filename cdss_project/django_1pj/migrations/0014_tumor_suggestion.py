@@ -0,0 +1,114 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_1pj", "0013_ct_study"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TumorSuggestion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("source", models.CharField(max_length=20, verbose_name="분석 영상")),
+                ("model_name", models.CharField(max_length=100, verbose_name="모델")),
+                (
+                    "model_version",
+                    models.CharField(
+                        blank=True, max_length=50, verbose_name="모델 버전"
+                    ),
+                ),
+                ("tumor_size", models.FloatField(verbose_name="제안 종양 크기(cm)")),
+                ("tumor_count", models.IntegerField(verbose_name="제안 종양 개수")),
+                ("confidence", models.FloatField(verbose_name="신뢰도")),
+                (
+                    "analyzed_images",
+                    models.PositiveIntegerField(default=1, verbose_name="분석 영상 수"),
+                ),
+                (
+                    "inference_ms",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="분석 시간(ms)"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "검토 대기"),
+                            ("accepted", "승인"),
+                            ("rejected", "반려"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                        verbose_name="상태",
+                    ),
+                ),
+                (
+                    "reviewed_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="검토일시"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="분석일시"),
+                ),
+                (
+                    "patient",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tumor_suggestions",
+                        to="django_1pj.patient",
+                        verbose_name="환자",
+                    ),
+                ),
+                (
+                    "reviewed_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="django_1pj.doctorprofile",
+                        verbose_name="검토 의사",
+                    ),
+                ),
+                (
+                    "study",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="tumor_suggestions",
+                        to="django_1pj.ctstudy",
+                        verbose_name="CT 검사",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "종양 분석 제안",
+                "verbose_name_plural": "종양 분석 제안",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["patient", "status"],
+                        name="tumorsugg_patient_status_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,131 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:30
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def seed_cohort_summaries(apps, schema_editor):
+    """기존 환자로 코호트 요약 초기 집계"""
+    Patient = apps.get_model("django_1pj", "Patient")
+    CohortSummary = apps.get_model("django_1pj", "CohortSummary")
+
+    dimensions = {
+        "bclc_stage": "bclc_stage",
+        "child_pugh": "child_pugh",
+        "treatment_type": "treatment_type",
+        "recurrence_risk": "recurrence_risk",
+        "doctor": "doctor_id",
+    }
+    aggregates = {
+        "patient_count": Count("pk"),
+        "tumor_size_sum": Sum("tumor_size"),
+        "tumor_size_n": Count("tumor_size"),
+        "tumor_count_sum": Sum("tumor_count"),
+        "tumor_count_n": Count("tumor_count"),
+        "afp_current_sum": Sum("afp_current"),
+        "afp_current_n": Count("afp_current"),
+        "vascular_invasion_count": Count("pk", filter=Q(vascular_invasion=True)),
+    }
+
+    summaries = {}
+    for dimension, column in dimensions.items():
+        rows = Patient.objects.order_by().values(column).annotate(**aggregates)
+        for row in rows:
+            key = (dimension, row[column] or "")
+            totals = summaries.setdefault(key, dict.fromkeys(aggregates, 0))
+            for metric in aggregates:
+                totals[metric] += row[metric] or 0
+
+    CohortSummary.objects.bulk_create(
+        [
+            CohortSummary(dimension=dimension, value=value, **totals)
+            for (dimension, value), totals in summaries.items()
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_1pj", "0014_tumor_suggestion"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CohortSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "dimension",
+                    models.CharField(
+                        choices=[
+                            ("bclc_stage", "BCLC 병기"),
+                            ("child_pugh", "Child-Pugh 등급"),
+                            ("treatment_type", "치료 방식"),
+                            ("recurrence_risk", "재발 위험도"),
+                            ("doctor", "담당의"),
+                        ],
+                        max_length=20,
+                        verbose_name="집계 기준",
+                    ),
+                ),
+                (
+                    "value",
+                    models.CharField(blank=True, max_length=50, verbose_name="값"),
+                ),
+                (
+                    "patient_count",
+                    models.IntegerField(default=0, verbose_name="환자 수"),
+                ),
+                (
+                    "tumor_size_sum",
+                    models.FloatField(default=0, verbose_name="종양 크기 합계"),
+                ),
+                (
+                    "tumor_size_n",
+                    models.IntegerField(default=0, verbose_name="종양 크기 입력 수"),
+                ),
+                (
+                    "tumor_count_sum",
+                    models.IntegerField(default=0, verbose_name="종양 개수 합계"),
+                ),
+                (
+                    "tumor_count_n",
+                    models.IntegerField(default=0, verbose_name="종양 개수 입력 수"),
+                ),
+                (
+                    "afp_current_sum",
+                    models.FloatField(default=0, verbose_name="최근 AFP 합계"),
+                ),
+                (
+                    "afp_current_n",
+                    models.IntegerField(default=0, verbose_name="최근 AFP 입력 수"),
+                ),
+                (
+                    "vascular_invasion_count",
+                    models.IntegerField(default=0, verbose_name="혈관 침범 환자 수"),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "코호트 요약",
+                "verbose_name_plural": "코호트 요약",
+                "ordering": ["dimension", "value"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("dimension", "value"),
+                        name="cohortsummary_dimension_value_uniq",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(seed_cohort_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_1pj", "0015_cohort_summary"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="patient",
+            name="death_date",
+            field=models.DateField(blank=True, null=True, verbose_name="사망일"),
+        ),
+        migrations.AddField(
+            model_name="patient",
+            name="last_followup_date",
+            field=models.DateField(blank=True, null=True, verbose_name="최종 추적일"),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_1pj", "0016_patient_followup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SurvivalModel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "version",
+                    models.PositiveIntegerField(unique=True, verbose_name="버전"),
+                ),
+                ("feature_names", models.JSONField(verbose_name="변수 목록")),
+                ("coefficients", models.JSONField(verbose_name="계수")),
+                ("fill_values", models.JSONField(verbose_name="결측 대체값")),
+                ("means", models.JSONField(verbose_name="변수 평균")),
+                ("scales", models.JSONField(verbose_name="변수 표준편차")),
+                ("baseline_hazard", models.JSONField(verbose_name="기저 누적위험")),
+                (
+                    "n_patients",
+                    models.PositiveIntegerField(verbose_name="학습 환자 수"),
+                ),
+                ("n_events", models.PositiveIntegerField(verbose_name="사건 수")),
+                ("log_likelihood", models.FloatField(verbose_name="로그 부분우도")),
+                (
+                    "null_log_likelihood",
+                    models.FloatField(verbose_name="귀무 로그 부분우도"),
+                ),
+                ("iterations", models.PositiveIntegerField(verbose_name="반복 횟수")),
+                (
+                    "converged",
+                    models.BooleanField(default=False, verbose_name="수렴 여부"),
+                ),
+                ("penalty", models.FloatField(default=0, verbose_name="L2 벌점")),
+                (
+                    "is_active",
+                    models.BooleanField(
+                        db_index=True, default=False, verbose_name="사용 중"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="학습일시"),
+                ),
+            ],
+            options={
+                "verbose_name": "생존 예측 모델",
+                "verbose_name_plural": "생존 예측 모델",
+                "ordering": ["-version"],
+            },
+        ),
+    ]
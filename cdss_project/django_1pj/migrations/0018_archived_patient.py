@@ -0,0 +1,188 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_1pj", "0017_survival_model"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="auditlog",
+            name="action",
+            field=models.CharField(
+                choices=[
+                    ("create", "등록"),
+                    ("update", "수정"),
+                    ("delete", "삭제"),
+                    ("archive", "보관"),
+                    ("restore", "복원"),
+                ],
+                max_length=10,
+                verbose_name="작업",
+            ),
+        ),
+        migrations.CreateModel(
+            name="ArchivedPatient",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "original_pk",
+                    models.BigIntegerField(
+                        unique=True, verbose_name="원래 환자 ID(pk)"
+                    ),
+                ),
+                (
+                    "patient_id",
+                    models.CharField(
+                        max_length=20, unique=True, verbose_name="환자번호"
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, verbose_name="이름")),
+                ("birth_date", models.DateField(verbose_name="생년월일")),
+                (
+                    "diagnosis_date",
+                    models.DateField(blank=True, null=True, verbose_name="진단일"),
+                ),
+                (
+                    "bclc_stage",
+                    models.CharField(
+                        blank=True, max_length=10, null=True, verbose_name="BCLC 병기"
+                    ),
+                ),
+                (
+                    "tumor_size",
+                    models.FloatField(
+                        blank=True, null=True, verbose_name="종양크기(cm)"
+                    ),
+                ),
+                (
+                    "tumor_count",
+                    models.IntegerField(blank=True, null=True, verbose_name="종양개수"),
+                ),
+                (
+                    "vascular_invasion",
+                    models.BooleanField(default=False, verbose_name="혈관침범"),
+                ),
+                (
+                    "child_pugh",
+                    models.CharField(
+                        blank=True,
+                        max_length=1,
+                        null=True,
+                        verbose_name="Child-Pugh 등급",
+                    ),
+                ),
+                (
+                    "afp_initial",
+                    models.FloatField(
+                        blank=True, null=True, verbose_name="초기 AFP(ng/mL)"
+                    ),
+                ),
+                (
+                    "afp_current",
+                    models.FloatField(
+                        blank=True, null=True, verbose_name="최근 AFP(ng/mL)"
+                    ),
+                ),
+                (
+                    "treatment_type",
+                    models.CharField(
+                        blank=True, max_length=50, null=True, verbose_name="치료방식"
+                    ),
+                ),
+                (
+                    "recurrence_risk",
+                    models.CharField(
+                        blank=True, max_length=10, null=True, verbose_name="재발위험도"
+                    ),
+                ),
+                (
+                    "survival_1year",
+                    models.FloatField(
+                        blank=True, null=True, verbose_name="1년 생존율(%)"
+                    ),
+                ),
+                (
+                    "survival_3year",
+                    models.FloatField(
+                        blank=True, null=True, verbose_name="3년 생존율(%)"
+                    ),
+                ),
+                (
+                    "survival_5year",
+                    models.FloatField(
+                        blank=True, null=True, verbose_name="5년 생존율(%)"
+                    ),
+                ),
+                (
+                    "last_followup_date",
+                    models.DateField(blank=True, null=True, verbose_name="최종 추적일"),
+                ),
+                (
+                    "death_date",
+                    models.DateField(blank=True, null=True, verbose_name="사망일"),
+                ),
+                ("payload", models.BinaryField(verbose_name="보관 데이터")),
+                (
+                    "payload_bytes",
+                    models.PositiveIntegerField(default=0, verbose_name="압축 전 크기"),
+                ),
+                (
+                    "related_counts",
+                    models.JSONField(default=dict, verbose_name="관련 기록 수"),
+                ),
+                (
+                    "reason",
+                    models.CharField(
+                        choices=[
+                            ("deceased", "사망 후 보관 기간 경과"),
+                            ("inactive", "장기 미내원"),
+                            ("manual", "수동 보관"),
+                        ],
+                        max_length=10,
+                        verbose_name="보관 사유",
+                    ),
+                ),
+                (
+                    "archived_at",
+                    models.DateTimeField(
+                        auto_now_add=True, db_index=True, verbose_name="보관일시"
+                    ),
+                ),
+                (
+                    "doctor",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="archived_patients",
+                        to="django_1pj.doctorprofile",
+                        verbose_name="담당의",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "보관 환자",
+                "verbose_name_plural": "보관 환자",
+                "ordering": ["-archived_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["doctor", "-archived_at"], name="archived_doctor_idx"
+                    )
+                ],
+            },
+        ),
+    ]
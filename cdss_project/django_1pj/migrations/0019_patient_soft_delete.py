@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_1pj", "0018_archived_patient"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="patient",
+            name="deleted_at",
+            field=models.DateTimeField(
+                blank=True, db_index=True, null=True, verbose_name="삭제 요청일시"
+            ),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:59
+
+import json
+import zlib
+
+from django.db import migrations, models
+
+
+def backfill_ct_image(apps, schema_editor):
+    """기존 보관 환자의 CT 이미지 경로를 보관 데이터에서 채움"""
+    ArchivedPatient = apps.get_model("django_1pj", "ArchivedPatient")
+
+    updated = []
+    for archived in ArchivedPatient.objects.only("pk", "payload").iterator(chunk_size=500):
+        data = json.loads(zlib.decompress(bytes(archived.payload)).decode("utf-8"))
+        archived.ct_image = data["patient"].get("ct_image") or None
+        if archived.ct_image:
+            updated.append(archived)
+        if len(updated) >= 500:
+            ArchivedPatient.objects.bulk_update(updated, ["ct_image"])
+            updated = []
+    ArchivedPatient.objects.bulk_update(updated, ["ct_image"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_1pj", "0019_patient_soft_delete"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivedpatient",
+            name="ct_image",
+            field=models.CharField(
+                blank=True, max_length=100, null=True, verbose_name="CT 이미지 경로"
+            ),
+        ),
+        migrations.RunPython(backfill_ct_image, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_1pj", "0021_data_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="patientrisksummary",
+            name="regimen_conflict_count",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="약물 간 상호작용 건수"
+            ),
+        ),
+        migrations.AddField(
+            model_name="patientrisksummary",
+            name="regimen_top_severity",
+            field=models.CharField(
+                blank=True, max_length=20, verbose_name="약물 간 상호작용 최고 심각도"
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_1pj", "0022_risk_summary_regimen"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="backgroundjob",
+            name="heartbeat_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="생존 신호 일시"
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_1pj", "0023_backgroundjob_heartbeat"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="ctuploadsession",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("uploading", "업로드중"),
+                    ("completing", "완료 처리중"),
+                    ("completed", "완료"),
+                    ("aborted", "취소"),
+                ],
+                default="uploading",
+                max_length=10,
+                verbose_name="상태",
+            ),
+        ),
+    ]
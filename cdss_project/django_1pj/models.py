@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth.hashers import make_password, check_password
 
@@ -59,6 +61,13 @@ class Announcement(models.Model):
         return self.title
 
 
+class ActivePatientManager(models.Manager):
+    """삭제 표시(deleted_at)된 환자를 제외하는 기본 매니저 - 관련 행은 백그라운드 정리 작업이 삭제"""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Patient(models.Model):
     """환자 기본 정보 모델"""
     patient_id = models.CharField(max_length=20, unique=True, verbose_name="환자번호")
@@ -68,7 +77,7 @@ class Patient(models.Model):
     phone = models.CharField(max_length=20, verbose_name="전화번호", blank=True)
 
     # 간암 진단 정보
-    diagnosis_date = models.DateField(verbose_name="진단일", null=True, blank=True)
+    diagnosis_date = models.DateField(verbose_name="진단일", null=True, blank=True, db_index=True)
     bclc_stage = models.CharField(
         max_length=10,
         choices=[
@@ -138,6 +147,10 @@ class Patient(models.Model):
     next_ct_date = models.DateField(verbose_name="다음 CT 검사일", null=True, blank=True)
     next_blood_test_date = models.DateField(verbose_name="다음 혈액검사일", null=True, blank=True)
 
+    # 생존 분석 (추적 결과)
+    last_followup_date = models.DateField(verbose_name="최종 추적일", null=True, blank=True)
+    death_date = models.DateField(verbose_name="사망일", null=True, blank=True)
+
     # 담당의
     doctor = models.ForeignKey(DoctorProfile, on_delete=models.SET_NULL, null=True, verbose_name="담당의")
 
@@ -145,7 +158,12 @@ class Patient(models.Model):
     ct_image = models.ImageField(upload_to='ct_images/', verbose_name="간암 CT 이미지", blank=True, null=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    # 삭제 요청 시각 - 설정되면 모든 조회에서 제외되고 정리 작업이 관련 행/파일과 함께 삭제
+    deleted_at = models.DateTimeField(null=True, blank=True, db_index=True, verbose_name="삭제 요청일시")
+
+    objects = ActivePatientManager()
+    all_objects = models.Manager()  # 삭제 표시된 환자 포함 (정리 작업, 환자번호 중복 확인)
 
     class Meta:
         verbose_name = "환자"
@@ -188,7 +206,11 @@ class Drug(models.Model):
     contraindications = models.TextField(verbose_name="금기사항", blank=True)
 
     # 상호작용
-    interactions = models.TextField(verbose_name="약물 상호작용", blank=True)
+    interactions = models.TextField(
+        verbose_name="약물 상호작용",
+        blank=True,
+        help_text="한 줄에 한 건: 약물코드 또는 약물명 | 심각도(금기/중대/주의/경미) | 기전"
+    )
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -220,12 +242,441 @@ class DrugInteraction(models.Model):
     color_code = models.CharField(max_length=20, verbose_name="색상코드", help_text="예: red, yellow, green")
     action_plan = models.TextField(verbose_name="조치 계획", blank=True)
     monitoring = models.TextField(verbose_name="모니터링 항목", blank=True, help_text="관찰해야 할 증상이나 검사 항목")
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     class Meta:
         verbose_name = "약물 상호작용"
         verbose_name_plural = "약물 상호작용"
         ordering = ['-probability']
+        indexes = [
+            # 환자 상세 화면 - 환자별 발생 확률 순 조회
+            models.Index(fields=['patient', '-probability'], name='druginter_patient_prob_idx'),
+        ]
 
     def __str__(self):
         return f"{self.patient.name} - {self.drug_name} ({self.side_effect})"
+
+
+class PatientRiskSummary(models.Model):
+    """환자별 약물 부작용 위험 요약 (DrugInteraction 저장/삭제 시 갱신)"""
+    patient = models.OneToOneField(
+        Patient, on_delete=models.CASCADE, primary_key=True,
+        related_name="risk_summary", verbose_name="환자"
+    )
+    high_count = models.PositiveIntegerField(default=0, verbose_name="고위험 건수")
+    medium_count = models.PositiveIntegerField(default=0, verbose_name="중위험 건수")
+    low_count = models.PositiveIntegerField(default=0, verbose_name="저위험 건수")
+    top_drug_name = models.CharField(max_length=200, blank=True, verbose_name="최고위험 약물명")
+    top_side_effect = models.CharField(max_length=200, blank=True, verbose_name="최고위험 부작용")
+    top_probability = models.IntegerField(null=True, blank=True, verbose_name="최고위험 발생 확률(%)")
+    regimen_conflict_count = models.PositiveIntegerField(default=0, verbose_name="약물 간 상호작용 건수")
+    regimen_top_severity = models.CharField(max_length=20, blank=True, verbose_name="약물 간 상호작용 최고 심각도")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "환자 위험 요약"
+        verbose_name_plural = "환자 위험 요약"
+
+    def __str__(self):
+        return f"{self.patient_id} - 고위험 {self.high_count}건"
+
+    @property
+    def total_count(self):
+        return self.high_count + self.medium_count + self.low_count
+
+
+class CohortSummary(models.Model):
+    """
+    코호트 요약 (집계 기준별 값마다 1행)
+    Patient 저장/삭제 시 증감분만 반영 - 평균은 합계/건수로 계산
+    """
+    DIMENSION_CHOICES = [
+        ('bclc_stage', 'BCLC 병기'),
+        ('child_pugh', 'Child-Pugh 등급'),
+        ('treatment_type', '치료 방식'),
+        ('recurrence_risk', '재발 위험도'),
+        ('doctor', '담당의'),
+    ]
+
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES, verbose_name="집계 기준")
+    value = models.CharField(max_length=50, blank=True, verbose_name="값")  # 미입력은 ''
+    patient_count = models.IntegerField(default=0, verbose_name="환자 수")
+    tumor_size_sum = models.FloatField(default=0, verbose_name="종양 크기 합계")
+    tumor_size_n = models.IntegerField(default=0, verbose_name="종양 크기 입력 수")
+    tumor_count_sum = models.IntegerField(default=0, verbose_name="종양 개수 합계")
+    tumor_count_n = models.IntegerField(default=0, verbose_name="종양 개수 입력 수")
+    afp_current_sum = models.FloatField(default=0, verbose_name="최근 AFP 합계")
+    afp_current_n = models.IntegerField(default=0, verbose_name="최근 AFP 입력 수")
+    vascular_invasion_count = models.IntegerField(default=0, verbose_name="혈관 침범 환자 수")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "코호트 요약"
+        verbose_name_plural = "코호트 요약"
+        ordering = ['dimension', 'value']
+        constraints = [
+            models.UniqueConstraint(fields=['dimension', 'value'], name='cohortsummary_dimension_value_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.dimension}={self.value or '-'} ({self.patient_count}명)"
+
+    @staticmethod
+    def _average(total, n):
+        return round(total / n, 2) if n else None
+
+    @property
+    def avg_tumor_size(self):
+        return self._average(self.tumor_size_sum, self.tumor_size_n)
+
+    @property
+    def avg_tumor_count(self):
+        return self._average(self.tumor_count_sum, self.tumor_count_n)
+
+    @property
+    def avg_afp_current(self):
+        return self._average(self.afp_current_sum, self.afp_current_n)
+
+    @property
+    def vascular_invasion_rate(self):
+        return round(self.vascular_invasion_count * 100 / self.patient_count, 1) if self.patient_count else None
+
+
+class LabResult(models.Model):
+    """
+    검사 결과 시계열 (AFP, 간기능 검사)
+    추가만 하는 좁은 테이블 - (환자, 항목, 검사일) 인덱스로 구간 조회
+    """
+    ANALYTE_CHOICES = [
+        ('afp', 'AFP (ng/mL)'),
+        ('pivka2', 'PIVKA-II (mAU/mL)'),
+        ('ast', 'AST (U/L)'),
+        ('alt', 'ALT (U/L)'),
+        ('bilirubin', '총 빌리루빈 (mg/dL)'),
+        ('albumin', '알부민 (g/dL)'),
+        ('inr', 'PT-INR'),
+        ('platelet', '혈소판 (10³/µL)'),
+    ]
+
+    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name="lab_results", verbose_name="환자")
+    analyte = models.CharField(max_length=20, choices=ANALYTE_CHOICES, verbose_name="검사 항목")
+    measured_on = models.DateField(verbose_name="검사일")
+    value = models.FloatField(verbose_name="결과값")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "검사 결과"
+        verbose_name_plural = "검사 결과"
+        ordering = ['patient', 'analyte', 'measured_on']
+        indexes = [
+            models.Index(fields=['patient', 'analyte', 'measured_on'], name='labresult_series_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.patient_id} {self.analyte} {self.measured_on}: {self.value}"
+
+
+class AuditLog(models.Model):
+    """
+    환자 기록 변경 감사 로그 (추가 전용)
+    필드 단위 변경 1건 = 1행, 환자/의사가 삭제되어도 남도록 FK 대신 ID 문자열로 보관
+    """
+    ACTION_CHOICES = [
+        ('create', '등록'),
+        ('update', '수정'),
+        ('delete', '삭제'),
+        ('archive', '보관'),
+        ('restore', '복원'),
+    ]
+
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES, verbose_name="작업")
+    doctor_id = models.CharField(max_length=50, verbose_name="변경한 의사 ID")
+    patient_id = models.CharField(max_length=20, verbose_name="환자번호")
+    field_name = models.CharField(max_length=50, blank=True, verbose_name="필드")
+    old_value = models.TextField(null=True, blank=True, verbose_name="이전 값")
+    new_value = models.TextField(null=True, blank=True, verbose_name="새 값")
+    changed_at = models.DateTimeField(verbose_name="변경 시각")
+
+    class Meta:
+        verbose_name = "감사 로그"
+        verbose_name_plural = "감사 로그"
+        # 기록 순서(id) 기준 최신순 - 환자별/의사별 조회 후 id 커서로 이어서 조회
+        ordering = ['-id']
+        indexes = [
+            models.Index(fields=['patient_id', '-id'], name='auditlog_patient_idx'),
+            models.Index(fields=['doctor_id', '-id'], name='auditlog_doctor_idx'),
+        ]
+
+    def __str__(self):
+        return f"[{self.get_action_display()}] {self.patient_id} {self.field_name} by {self.doctor_id}"
+
+
+class BackgroundJob(models.Model):
+    """
+    백그라운드 작업 큐 (DB 기반, 별도 브로커 없음)
+    manage.py run_jobs 워커가 우선순위/예약 시각 순으로 가져가 실행
+    """
+    STATUS_CHOICES = [
+        ('pending', '대기'),
+        ('running', '실행중'),
+        ('succeeded', '완료'),
+        ('failed', '실패'),
+    ]
+
+    name = models.CharField(max_length=100, verbose_name="작업명")
+    args = models.JSONField(default=list, blank=True, verbose_name="인자")
+    kwargs = models.JSONField(default=dict, blank=True, verbose_name="키워드 인자")
+    priority = models.IntegerField(default=0, verbose_name="우선순위")  # 클수록 먼저 실행
+    dedup_key = models.CharField(max_length=200, null=True, blank=True, db_index=True, verbose_name="중복 방지 키")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name="상태")
+    run_at = models.DateTimeField(verbose_name="실행 예정 시각")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="시도 횟수")
+    max_attempts = models.PositiveIntegerField(default=3, verbose_name="최대 시도 횟수")
+    worker = models.CharField(max_length=100, blank=True, verbose_name="워커")
+    last_error = models.TextField(blank=True, verbose_name="마지막 오류")
+    result = models.JSONField(null=True, blank=True, verbose_name="결과")
+
+    # 시간 측정
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="등록일시")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="시작일시")
+    # 실행중 작업의 생존 신호 - 워커가 주기적으로 갱신, 끊기면 다른 워커가 회수
+    heartbeat_at = models.DateTimeField(null=True, blank=True, verbose_name="생존 신호 일시")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="종료일시")
+    wait_ms = models.PositiveIntegerField(null=True, blank=True, verbose_name="대기 시간(ms)")
+    duration_ms = models.PositiveIntegerField(null=True, blank=True, verbose_name="실행 시간(ms)")
+
+    class Meta:
+        verbose_name = "백그라운드 작업"
+        verbose_name_plural = "백그라운드 작업"
+        ordering = ['-id']
+        indexes = [
+            models.Index(fields=['status', '-priority', 'run_at'], name='backgroundjob_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.get_status_display()})"
+
+
+class CTUploadSession(models.Model):
+    """
+    CT 이미지 분할 업로드 세션
+    청크는 임시 디렉터리(settings.CT_UPLOAD_TEMP_DIR/<id>/)에 파일로 저장, 완료 시 Patient.ct_image 로 합침
+    """
+    STATUS_CHOICES = [
+        ('uploading', '업로드중'),
+        ('completing', '완료 처리중'),
+        ('completed', '완료'),
+        ('aborted', '취소'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name="ct_uploads", verbose_name="환자")
+    doctor = models.ForeignKey(DoctorProfile, on_delete=models.CASCADE, related_name="ct_uploads", verbose_name="업로드한 의사")
+    filename = models.CharField(max_length=255, verbose_name="파일명")
+    total_size = models.BigIntegerField(verbose_name="전체 크기(byte)")
+    chunk_size = models.PositiveIntegerField(verbose_name="청크 크기(byte)")
+    total_chunks = models.PositiveIntegerField(verbose_name="청크 수")
+    checksum = models.CharField(max_length=64, blank=True, verbose_name="전체 파일 SHA-256")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='uploading', verbose_name="상태")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="시작일시")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name="최근 수신일시")
+    completed_at = models.DateTimeField(null=True, blank=True, verbose_name="완료일시")
+
+    class Meta:
+        verbose_name = "CT 업로드 세션"
+        verbose_name_plural = "CT 업로드 세션"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.patient_id} {self.filename} ({self.get_status_display()})"
+
+
+class CTStudy(models.Model):
+    """
+    CT 검사 (DICOM 시리즈 1개)
+    슬라이스 전체를 HU(int16) 볼륨 하나로 합쳐 .npy 파일로 저장 -> 메모리 매핑으로 필요한 부분만 읽음
+    볼륨 배열 형태: (슬라이스, 행, 열), 슬라이스는 환자 위치 기준 정렬
+    """
+    STATUS_CHOICES = [
+        ('processing', '변환중'),
+        ('ready', '완료'),
+        ('failed', '실패'),
+    ]
+
+    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name="ct_studies", verbose_name="환자")
+    study_instance_uid = models.CharField(max_length=64, blank=True, verbose_name="Study Instance UID")
+    series_instance_uid = models.CharField(max_length=64, unique=True, verbose_name="Series Instance UID")
+    study_date = models.DateField(null=True, blank=True, verbose_name="검사일")
+    modality = models.CharField(max_length=16, blank=True, verbose_name="장비")
+    description = models.CharField(max_length=200, blank=True, verbose_name="시리즈 설명")
+
+    # 볼륨 형태 및 간격 (mm)
+    slice_count = models.PositiveIntegerField(default=0, verbose_name="슬라이스 수")
+    rows = models.PositiveIntegerField(default=0, verbose_name="행")
+    columns = models.PositiveIntegerField(default=0, verbose_name="열")
+    pixel_spacing_row = models.FloatField(null=True, blank=True, verbose_name="행 간격(mm)")
+    pixel_spacing_col = models.FloatField(null=True, blank=True, verbose_name="열 간격(mm)")
+    slice_spacing = models.FloatField(null=True, blank=True, verbose_name="슬라이스 간격(mm)")
+
+    volume_path = models.CharField(max_length=255, blank=True, verbose_name="볼륨 파일")  # CT_VOLUME_DIR 기준 상대 경로
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='processing', verbose_name="상태")
+    error = models.TextField(blank=True, verbose_name="오류")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="등록일시")
+
+    class Meta:
+        verbose_name = "CT 검사"
+        verbose_name_plural = "CT 검사"
+        ordering = ['-study_date', '-created_at']
+
+    def __str__(self):
+        return f"{self.patient_id} {self.study_date or ''} {self.description} ({self.slice_count} slices)"
+
+
+class TumorSuggestion(models.Model):
+    """
+    CT 영상 분석 결과 (종양 크기/개수 제안)
+    의사가 검토 후 승인하면 Patient.tumor_size / tumor_count 에 반영
+    """
+    STATUS_CHOICES = [
+        ('pending', '검토 대기'),
+        ('accepted', '승인'),
+        ('rejected', '반려'),
+    ]
+
+    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name="tumor_suggestions", verbose_name="환자")
+    study = models.ForeignKey(CTStudy, on_delete=models.SET_NULL, null=True, blank=True, related_name="tumor_suggestions", verbose_name="CT 검사")
+    source = models.CharField(max_length=20, verbose_name="분석 영상")  # ct_study / ct_image
+    model_name = models.CharField(max_length=100, verbose_name="모델")
+    model_version = models.CharField(max_length=50, blank=True, verbose_name="모델 버전")
+
+    tumor_size = models.FloatField(verbose_name="제안 종양 크기(cm)")
+    tumor_count = models.IntegerField(verbose_name="제안 종양 개수")
+    confidence = models.FloatField(verbose_name="신뢰도")
+    analyzed_images = models.PositiveIntegerField(default=1, verbose_name="분석 영상 수")
+    inference_ms = models.PositiveIntegerField(default=0, verbose_name="분석 시간(ms)")
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name="상태")
+    reviewed_by = models.ForeignKey(DoctorProfile, on_delete=models.SET_NULL, null=True, blank=True, related_name="+", verbose_name="검토 의사")
+    reviewed_at = models.DateTimeField(null=True, blank=True, verbose_name="검토일시")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="분석일시")
+
+    class Meta:
+        verbose_name = "종양 분석 제안"
+        verbose_name_plural = "종양 분석 제안"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['patient', 'status'], name='tumorsugg_patient_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.patient_id} {self.tumor_size}cm x {self.tumor_count} ({self.get_status_display()})"
+
+
+class SurvivalModel(models.Model):
+    """
+    Cox 비례위험 모델 (fit_survival_model 명령으로 학습, 버전별 보관)
+    계수는 표준화된 변수 기준 - 예측 시 같은 평균/표준편차로 변환
+    """
+    version = models.PositiveIntegerField(unique=True, verbose_name="버전")
+    feature_names = models.JSONField(verbose_name="변수 목록")
+    coefficients = models.JSONField(verbose_name="계수")
+    fill_values = models.JSONField(verbose_name="결측 대체값")
+    means = models.JSONField(verbose_name="변수 평균")
+    scales = models.JSONField(verbose_name="변수 표준편차")
+    baseline_hazard = models.JSONField(verbose_name="기저 누적위험")  # {'time': [...], 'cumhaz': [...]}
+
+    n_patients = models.PositiveIntegerField(verbose_name="학습 환자 수")
+    n_events = models.PositiveIntegerField(verbose_name="사건 수")
+    log_likelihood = models.FloatField(verbose_name="로그 부분우도")
+    null_log_likelihood = models.FloatField(verbose_name="귀무 로그 부분우도")
+    iterations = models.PositiveIntegerField(verbose_name="반복 횟수")
+    converged = models.BooleanField(default=False, verbose_name="수렴 여부")
+    penalty = models.FloatField(default=0, verbose_name="L2 벌점")
+
+    is_active = models.BooleanField(default=False, db_index=True, verbose_name="사용 중")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="학습일시")
+
+    class Meta:
+        verbose_name = "생존 예측 모델"
+        verbose_name_plural = "생존 예측 모델"
+        ordering = ['-version']
+
+    def __str__(self):
+        return f"Cox v{self.version} (n={self.n_patients}, 사건 {self.n_events})"
+
+
+class ArchivedPatient(models.Model):
+    """
+    보관(cold) 환자 - archive_patients 명령이 비활성 환자를 Patient 테이블에서 옮겨 둠
+    분석(생존 분석, 모델 학습, 유사 환자)에 쓰는 컬럼은 Patient 와 같은 이름으로 두고,
+    전체 기록(환자 행 + 관련 테이블 행)은 압축 JSON 으로 보관하여 그대로 복원
+    """
+    REASON_CHOICES = [
+        ('deceased', '사망 후 보관 기간 경과'),
+        ('inactive', '장기 미내원'),
+        ('manual', '수동 보관'),
+    ]
+
+    original_pk = models.BigIntegerField(unique=True, verbose_name="원래 환자 ID(pk)")
+    patient_id = models.CharField(max_length=20, unique=True, verbose_name="환자번호")
+    name = models.CharField(max_length=100, verbose_name="이름")
+    birth_date = models.DateField(verbose_name="생년월일")
+    doctor = models.ForeignKey(
+        DoctorProfile, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name="archived_patients", verbose_name="담당의",
+    )
+
+    # 분석용 컬럼 (Patient 와 같은 이름)
+    diagnosis_date = models.DateField(null=True, blank=True, verbose_name="진단일")
+    bclc_stage = models.CharField(max_length=10, null=True, blank=True, verbose_name="BCLC 병기")
+    tumor_size = models.FloatField(null=True, blank=True, verbose_name="종양크기(cm)")
+    tumor_count = models.IntegerField(null=True, blank=True, verbose_name="종양개수")
+    vascular_invasion = models.BooleanField(default=False, verbose_name="혈관침범")
+    child_pugh = models.CharField(max_length=1, null=True, blank=True, verbose_name="Child-Pugh 등급")
+    afp_initial = models.FloatField(null=True, blank=True, verbose_name="초기 AFP(ng/mL)")
+    afp_current = models.FloatField(null=True, blank=True, verbose_name="최근 AFP(ng/mL)")
+    treatment_type = models.CharField(max_length=50, null=True, blank=True, verbose_name="치료방식")
+    recurrence_risk = models.CharField(max_length=10, null=True, blank=True, verbose_name="재발위험도")
+    survival_1year = models.FloatField(null=True, blank=True, verbose_name="1년 생존율(%)")
+    survival_3year = models.FloatField(null=True, blank=True, verbose_name="3년 생존율(%)")
+    survival_5year = models.FloatField(null=True, blank=True, verbose_name="5년 생존율(%)")
+    last_followup_date = models.DateField(null=True, blank=True, verbose_name="최종 추적일")
+    death_date = models.DateField(null=True, blank=True, verbose_name="사망일")
+    # CT 이미지 파일은 옮기지 않음 - gc_media 가 참조 중인 파일로 인식하도록 경로를 컬럼으로 유지
+    ct_image = models.CharField(max_length=100, null=True, blank=True, verbose_name="CT 이미지 경로")
+
+    # 전체 기록 (zlib 압축 JSON: {'patient': {...}, 'related': {모델: [행...]}})
+    payload = models.BinaryField(verbose_name="보관 데이터")
+    payload_bytes = models.PositiveIntegerField(default=0, verbose_name="압축 전 크기")
+    related_counts = models.JSONField(default=dict, verbose_name="관련 기록 수")
+
+    reason = models.CharField(max_length=10, choices=REASON_CHOICES, verbose_name="보관 사유")
+    archived_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name="보관일시")
+
+    class Meta:
+        verbose_name = "보관 환자"
+        verbose_name_plural = "보관 환자"
+        ordering = ['-archived_at']
+        indexes = [
+            models.Index(fields=['doctor', '-archived_at'], name='archived_doctor_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.patient_id} - {self.name} (보관)"
+
+
+class DataVersion(models.Model):
+    """
+    프로세스 간 공유 데이터 버전 (versions.bump / versions.current)
+    프로세스별 메모리 캐시가 다른 프로세스의 변경을 알 수 있도록 변경 시 1씩 증가
+    """
+    key = models.CharField(max_length=50, primary_key=True, verbose_name="데이터 키")
+    version = models.PositiveBigIntegerField(default=0, verbose_name="버전")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="수정일시")
+
+    class Meta:
+        verbose_name = "데이터 버전"
+        verbose_name_plural = "데이터 버전"
+
+    def __str__(self):
+        return f"{self.key} v{self.version}"
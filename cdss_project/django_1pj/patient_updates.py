@@ -0,0 +1,165 @@
+"""
+환자 입력 폼 처리
+POST 데이터를 한 번만 타입 변환하고, 기존 환자 정보와 비교하여
+실제로 변경된 컬럼만 저장 (update_fields)
+"""
+import math
+
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+from .models import Patient
+
+
+class PatientFormError(ValueError):
+    """환자 입력값 변환 오류"""
+
+
+# 빈 값 처리 방식
+REQUIRED = 'required'  # 필수 입력
+KEEP = 'keep'          # 빈 값이면 기존 값 유지
+CLEAR = 'clear'        # 빈 값이면 '' 로 저장
+
+
+def _to_text(value):
+    return value.strip()
+
+
+def _to_date(value):
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError(value)
+    return parsed
+
+
+def _to_float(value):
+    parsed = float(value)
+    # nan / inf 는 DB 에 저장할 수 없음
+    if not math.isfinite(parsed):
+        raise ValueError(value)
+    return parsed
+
+
+def _to_int(value):
+    return int(value)
+
+
+# (필드명, 변환 함수, 빈 값 처리 방식, 오류 메시지용 이름)
+PATIENT_FORM_FIELDS = [
+    # 기본 정보
+    ('name', _to_text, REQUIRED, '이름'),
+    ('birth_date', _to_date, REQUIRED, '생년월일'),
+    ('gender', _to_text, REQUIRED, '성별'),
+    ('phone', _to_text, CLEAR, '전화번호'),
+
+    # 진단 정보
+    ('diagnosis_date', _to_date, KEEP, '진단일'),
+    ('bclc_stage', _to_text, CLEAR, 'BCLC 병기'),
+    ('tumor_size', _to_float, KEEP, '종양 크기'),
+    ('tumor_count', _to_int, KEEP, '종양 개수'),
+    ('child_pugh', _to_text, CLEAR, 'Child-Pugh 등급'),
+
+    # 바이오마커
+    ('afp_initial', _to_float, KEEP, '초기 AFP'),
+    ('afp_current', _to_float, KEEP, '최근 AFP'),
+
+    # 치료 정보
+    ('treatment_type', _to_text, CLEAR, '치료 방식'),
+    ('treatment_start_date', _to_date, KEEP, '치료 시작일'),
+    ('recurrence_risk', _to_text, CLEAR, '재발 위험도'),
+
+    # 추적관찰
+    ('next_ct_date', _to_date, KEEP, '다음 CT 검사일'),
+    ('next_blood_test_date', _to_date, KEEP, '다음 혈액검사일'),
+    ('last_followup_date', _to_date, KEEP, '최종 추적일'),
+    ('death_date', _to_date, KEEP, '사망일'),
+]
+
+# 체크박스 필드 (체크 해제 시 값이 전송되지 않음)
+PATIENT_CHECKBOX_FIELDS = ['vascular_invasion']
+
+
+def _check_text(field, value):
+    """선택지/길이 검사 (MySQL strict 모드에서 DataError 가 나지 않도록 저장 전에 확인)"""
+    model_field = Patient._meta.get_field(field)
+    if model_field.choices and value not in {choice for choice, _ in model_field.flatchoices}:
+        raise ValueError(value)
+    if model_field.max_length and len(value) > model_field.max_length:
+        raise ValueError(value)
+    return value
+
+
+def parse_patient_post(post, partial=False):
+    """
+    환자 폼 POST 데이터(또는 JSON 객체)를 모델 필드 타입으로 변환
+    빈 값 유지(KEEP) 필드는 입력이 없으면 결과에서 제외
+    partial=True 이면 전달된 필드만 변환 (API 부분 수정용)
+    """
+    cleaned = {}
+
+    for field, convert, mode, label in PATIENT_FORM_FIELDS:
+        if partial and field not in post:
+            continue
+
+        raw = post.get(field)
+        raw = '' if raw is None else str(raw).strip()
+        if not raw:
+            if mode == REQUIRED:
+                raise PatientFormError(f'{label}을(를) 입력해주세요.')
+            if mode == CLEAR:
+                cleaned[field] = ''
+            continue
+
+        try:
+            value = convert(raw)
+            if convert is _to_text:
+                value = _check_text(field, value)
+            cleaned[field] = value
+        except ValueError:
+            raise PatientFormError(f'{label} 값이 올바르지 않습니다: {raw}')
+
+    for field in PATIENT_CHECKBOX_FIELDS:
+        if partial and field not in post:
+            continue
+        # 폼은 'on', JSON 은 true 로 전달
+        cleaned[field] = post.get(field) in ('on', True)
+
+    return cleaned
+
+
+def _is_same(current, new):
+    """NULL 과 빈 문자열은 같은 값으로 취급"""
+    if current in (None, '') and new in (None, ''):
+        return True
+    return current == new
+
+
+def apply_patient_changes(patient, cleaned):
+    """
+    변환된 값을 환자 인스턴스에 반영하고 실제로 바뀐 필드명 목록 반환
+    """
+    changed_fields = []
+    for field, value in cleaned.items():
+        if _is_same(getattr(patient, field), value):
+            continue
+        setattr(patient, field, value)
+        changed_fields.append(field)
+    return changed_fields
+
+
+def save_patient_changes(patient, changed_fields):
+    """
+    변경된 컬럼만 UPDATE
+    변경 사항이 없으면 쿼리를 실행하지 않고 False 반환
+    """
+    if not changed_fields:
+        return False
+
+    # auto_now 필드는 update_fields 에 포함되어야 갱신됨
+    # 트랜잭션 안에서 저장하여 코호트 요약용 수정 전 값을 행 잠금으로 읽음 (signals)
+    with transaction.atomic():
+        patient.save(update_fields=list(changed_fields) + ['updated_at'])
+    return True
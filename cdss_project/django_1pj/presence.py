@@ -0,0 +1,247 @@
+"""
+의사 상태(진료중/진료외/휴무) 실시간 현황
+상태 변경 -> pub/sub 브로커 -> 구독 중인 WebSocket / SSE 클라이언트
+
+- 브로커는 settings.PRESENCE_BROKER_BACKEND 로 교체 가능
+  기본 InProcessBroker 는 같은 프로세스 안의 구독자에게만 전달하므로
+  여러 프로세스로 운영할 때는 publish/subscribe/unsubscribe 를 구현한
+  외부 브로커(Redis pub/sub 등) 백엔드로 교체
+- 상태별 인원수/의사 목록(roster)은 캐시에 보관하고 공유 버전(versions.DOCTORS)으로 무효화
+  (프로세스별 캐시여도 다른 프로세스의 변경이 versions.CHECK_INTERVAL 이내에 반영됨)
+- WebSocket/SSE 는 ASGI 서버에서만 제공 - WSGI 는 StreamingHttpResponse 의 async 반복자를
+  끝까지 모은 뒤 전송하므로 스트림이 전달되지 않고 스레드만 점유함 (화면은 roster API 주기 조회)
+"""
+import asyncio
+import json
+import threading
+import time
+from http.cookies import SimpleCookie
+from importlib import import_module
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils.module_loading import import_string
+
+from .models import DoctorProfile
+from . import versions
+
+
+ROSTER_CACHE_KEY = 'presence:roster'
+DOCTOR_STATUSES = [choice for choice, _ in DoctorProfile._meta.get_field('doctor_status').choices]
+
+# 구독자별 대기 메시지 수 (넘치면 오래된 메시지부터 버림)
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# 스트림 하트비트 주기 (초)
+HEARTBEAT_SECONDS = 15
+
+# SSE 연결 최대 유지 시간 (초) - 끝나면 브라우저가 retry 간격 후 자동 재연결
+STREAM_MAX_SECONDS = 300
+STREAM_RETRY_MS = 5000
+
+
+def is_asgi_request(request):
+    """ASGI 서버로 들어온 요청인지 (WSGI 에서는 SSE/WebSocket 을 쓰지 않음)"""
+    return hasattr(request, 'scope')
+
+
+# ============================================
+# 브로커
+# ============================================
+
+class Subscription:
+    """구독자 한 명 - 구독한 이벤트 루프의 asyncio.Queue 로 메시지 수신"""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def offer(self, message):
+        # 이벤트 루프 스레드에서 실행
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout=None):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class InProcessBroker:
+    """프로세스 내 pub/sub - 동기 뷰 스레드에서도 publish 가능"""
+
+    def __init__(self):
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        subscription = Subscription(asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, message):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, message)
+            except RuntimeError:
+                # 루프가 이미 종료된 구독자
+                self.unsubscribe(subscription)
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscriptions)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                backend = getattr(settings, 'PRESENCE_BROKER_BACKEND', 'django_1pj.presence.InProcessBroker')
+                _broker = import_string(backend)()
+    return _broker
+
+
+# ============================================
+# 현황 (roster)
+# ============================================
+
+def _load_roster():
+    counts = {status: 0 for status in DOCTOR_STATUSES}
+    for row in DoctorProfile.objects.order_by().values('doctor_status').annotate(n=Count('doctor_id')):
+        counts[row['doctor_status']] = row['n']
+
+    doctors = list(
+        DoctorProfile.objects.order_by('doctor_name')
+        .values('doctor_id', 'doctor_name', 'doctor_status')
+    )
+    return {'counts': counts, 'doctors': doctors}
+
+
+def get_roster():
+    """상태별 인원수와 의사 목록 (캐시 우선, 공유 버전이 바뀌었으면 다시 조회)"""
+    version = versions.current(versions.DOCTORS)
+    cached = cache.get(ROSTER_CACHE_KEY)
+    if cached is not None and cached['version'] == version:
+        return cached['roster']
+    roster = _load_roster()
+    cache.set(ROSTER_CACHE_KEY, {'version': version, 'roster': roster}, None)
+    return roster
+
+
+def invalidate_roster():
+    """의사 추가/삭제/상태 변경 시 호출 - 커밋 후 공유 버전 증가"""
+    versions.bump(versions.DOCTORS)
+
+
+def publish_status_change(doctor):
+    """상태 변경 알림 - 구독자에게 전송 (커밋 후 호출되어야 최신 현황이 조회됨)"""
+    roster = get_roster()
+    get_broker().publish({
+        'type': 'status',
+        'doctor_id': doctor.doctor_id,
+        'doctor_name': doctor.doctor_name,
+        'status': doctor.doctor_status,
+        'counts': roster['counts'],
+    })
+
+
+# ============================================
+# SSE 스트림
+# ============================================
+
+def _sse_event(event, data):
+    return f'event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n'
+
+
+async def presence_event_stream():
+    """처음에 전체 현황, 이후 상태 변경 이벤트 전송 (STREAM_MAX_SECONDS 후 종료)"""
+    broker = get_broker()
+    subscription = broker.subscribe()
+    try:
+        yield f'retry: {STREAM_RETRY_MS}\n\n'
+        roster = await sync_to_async(get_roster)()
+        yield _sse_event('roster', roster)
+        deadline = time.monotonic() + STREAM_MAX_SECONDS
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                message = await subscription.get(timeout=min(HEARTBEAT_SECONDS, remaining))
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+                continue
+            yield _sse_event(message['type'], message)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+# ============================================
+# WebSocket (ASGI)
+# ============================================
+
+def _session_doctor_id(scope):
+    """WebSocket 요청의 세션 쿠키로 로그인한 의사 ID 확인"""
+    cookies = SimpleCookie()
+    for name, value in scope.get('headers', []):
+        if name == b'cookie':
+            cookies.load(value.decode('latin-1'))
+
+    morsel = cookies.get(settings.SESSION_COOKIE_NAME)
+    if morsel is None:
+        return None
+    session = import_module(settings.SESSION_ENGINE).SessionStore(morsel.value)
+    doctor_id = session.get('doctor_id')
+    if doctor_id and DoctorProfile.objects.filter(doctor_id=doctor_id).exists():
+        return doctor_id
+    return None
+
+
+async def presence_websocket(scope, receive, send):
+    """
+    /ws/presence/ WebSocket 처리
+    연결 시 전체 현황을 보내고, 이후 상태 변경 메시지를 전달 (수신 전용)
+    """
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+
+    doctor_id = await sync_to_async(_session_doctor_id)(scope)
+    if doctor_id is None:
+        await send({'type': 'websocket.close', 'code': 4401})
+        return
+
+    await send({'type': 'websocket.accept'})
+
+    broker = get_broker()
+    subscription = broker.subscribe()
+
+    async def forward():
+        roster = await sync_to_async(get_roster)()
+        await send({'type': 'websocket.send', 'text': json.dumps({'type': 'roster', **roster}, ensure_ascii=False)})
+        while True:
+            payload = await subscription.get()
+            await send({'type': 'websocket.send', 'text': json.dumps(payload, ensure_ascii=False)})
+
+    forward_task = asyncio.create_task(forward())
+    try:
+        while True:
+            message = await receive()
+            if message['type'] == 'websocket.disconnect':
+                break
+    finally:
+        forward_task.cancel()
+        broker.unsubscribe(subscription)
@@ -0,0 +1,72 @@
+"""
+환자별 약물 부작용 위험 요약
+DrugInteraction 이 저장/삭제될 때 해당 환자의 요약 한 행만 다시 계산하여
+환자 상세 화면에서는 요약 테이블 한 행만 읽도록 함
+
+복용 약물 간 상호작용(약물 상호작용 그래프)도 함께 집계
+약물 마스터가 바뀌면 signals 가 risk_summary.rebuild 작업을 예약하여 다시 계산
+"""
+from django.db.models import Count
+
+from .drug_graph import check_drug_names
+from .models import DrugInteraction, PatientRiskSummary
+
+
+def compute_risk_summary(patient_id):
+    """위험도별 건수, 최고위험 항목, 복용 약물 간 상호작용 계산 (집계 1회 + 인덱스 조회 1회 + 약물명 조회 1회)"""
+    counts = dict(
+        DrugInteraction.objects.filter(patient_id=patient_id)
+        .order_by()
+        .values_list('risk_level')
+        .annotate(n=Count('id'))
+    )
+    # (patient, -probability) 인덱스로 첫 행만 조회
+    top = (
+        DrugInteraction.objects.filter(patient_id=patient_id)
+        .order_by('-probability')
+        .values('drug_name', 'side_effect', 'probability')
+        .first()
+    )
+    drug_names = (
+        DrugInteraction.objects.filter(patient_id=patient_id)
+        .order_by().values_list('drug_name', flat=True).distinct()
+    )
+    conflicts = check_drug_names(drug_names)
+    return {
+        'high_count': counts.get('high', 0),
+        'medium_count': counts.get('medium', 0),
+        'low_count': counts.get('low', 0),
+        'top_drug_name': top['drug_name'] if top else '',
+        'top_side_effect': top['side_effect'] if top else '',
+        'top_probability': top['probability'] if top else None,
+        # 위험한 순서로 정렬되어 있으므로 첫 항목이 최고 심각도
+        'regimen_conflict_count': len(conflicts),
+        'regimen_top_severity': conflicts[0]['severity'] if conflicts else '',
+    }
+
+
+def refresh_risk_summary(patient_id):
+    """환자 한 명의 위험 요약 갱신"""
+    summary, _ = PatientRiskSummary.objects.update_or_create(
+        patient_id=patient_id,
+        defaults=compute_risk_summary(patient_id),
+    )
+    return summary
+
+
+def rebuild_risk_summaries(patient_ids=None):
+    """
+    위험 요약 전체 재계산
+    bulk_create / queryset.update() 처럼 시그널이 발생하지 않는 일괄 작업 후 호출
+    """
+    if patient_ids is None:
+        patient_ids = (
+            DrugInteraction.objects.filter(patient__deleted_at__isnull=True).order_by()
+            .values_list('patient_id', flat=True)
+            .distinct()
+        )
+    count = 0
+    for patient_id in patient_ids.iterator() if hasattr(patient_ids, 'iterator') else patient_ids:
+        refresh_risk_summary(patient_id)
+        count += 1
+    return count
@@ -0,0 +1,171 @@
+"""
+모델 시그널 처리
+"""
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.db import connection, transaction
+from django.dispatch import receiver
+
+from .models import Announcement, CTStudy, DoctorProfile, Drug, DrugInteraction, Patient
+from .announcements import invalidate_announcements
+from .presence import invalidate_roster, publish_status_change
+from .risk_summary import refresh_risk_summary
+from .drug_graph import invalidate_interaction_graph
+from .drug_search import update_drug_document, remove_drug_document
+from .drug_typeahead import invalidate_typeahead
+from .ct_volume import delete_volume
+from . import cohort
+from . import jobs
+from . import versions
+from .survival import SURVIVAL_FIELDS, invalidate_survival_cache
+from .survival_model import SOURCE_COLUMNS as PREDICTION_FIELDS, refresh_patient_survival
+from .similarity import SOURCE_COLUMNS as SIMILARITY_FIELDS, update_patient_vector, remove_patient_vector
+
+
+def _is_patient_cascade(origin):
+    """환자(또는 환자 queryset) 삭제로 인한 CASCADE 삭제인지 확인"""
+    return isinstance(origin, Patient) or getattr(origin, 'model', None) is Patient
+
+
+@receiver(post_save, sender=DrugInteraction)
+def refresh_risk_summary_on_save(sender, instance, **kwargs):
+    """약물 상호작용 저장 시 환자 위험 요약 갱신"""
+    refresh_risk_summary(instance.patient_id)
+
+
+@receiver(post_delete, sender=DrugInteraction)
+def refresh_risk_summary_on_delete(sender, instance, origin=None, **kwargs):
+    """약물 상호작용 삭제 시 환자 위험 요약 갱신"""
+    # 환자가 삭제되면 요약도 함께 삭제되므로 갱신 생략
+    if _is_patient_cascade(origin):
+        return
+    refresh_risk_summary(instance.patient_id)
+
+
+# 약물 마스터 변경 후 위험 요약(약물 간 상호작용) 재계산 - 연속 수정은 대기 중인 작업 하나로 합침
+RISK_SUMMARY_REBUILD_DELAY = 300
+
+
+def _schedule_risk_summary_rebuild():
+    transaction.on_commit(lambda: jobs.enqueue(
+        'risk_summary.rebuild', priority=-1, delay=RISK_SUMMARY_REBUILD_DELAY,
+        dedup_key='risk_summary.rebuild:drugs',
+    ))
+
+
+@receiver(post_save, sender=Drug)
+def update_drug_indexes_on_save(sender, instance, **kwargs):
+    """약물 정보 저장 시 메모리 인덱스 갱신 (다른 프로세스는 공유 버전으로 감지)"""
+    versions.bump(versions.DRUGS)
+    invalidate_interaction_graph()
+    invalidate_typeahead()
+    # 롤백된 변경이 색인에 남지 않도록 커밋 후 반영
+    transaction.on_commit(lambda: update_drug_document(instance))
+    _schedule_risk_summary_rebuild()
+
+
+@receiver(post_delete, sender=Drug)
+def update_drug_indexes_on_delete(sender, instance, **kwargs):
+    """약물 정보 삭제 시 메모리 인덱스 갱신 (다른 프로세스는 공유 버전으로 감지)"""
+    versions.bump(versions.DRUGS)
+    invalidate_interaction_graph()
+    invalidate_typeahead()
+    transaction.on_commit(lambda: remove_drug_document(instance.drug_code))
+    _schedule_risk_summary_rebuild()
+
+
+@receiver([post_save, post_delete], sender=Announcement)
+def invalidate_announcement_feed(sender, instance, **kwargs):
+    """공지사항 변경 시 피드 캐시 무효화"""
+    invalidate_announcements()
+
+
+@receiver(post_save, sender=DoctorProfile)
+def broadcast_doctor_status(sender, instance, created, update_fields=None, **kwargs):
+    """의사 상태 변경 시 커밋 후 현황 구독자에게 전송 (마지막 로그인 갱신 등은 제외)"""
+    if update_fields is not None and 'doctor_status' not in update_fields:
+        return
+    invalidate_roster()
+    transaction.on_commit(lambda: publish_status_change(instance))
+
+
+@receiver(post_delete, sender=DoctorProfile)
+def invalidate_roster_on_delete(sender, instance, **kwargs):
+    """의사 삭제 시 현황 목록 갱신"""
+    invalidate_roster()
+
+
+@receiver(post_delete, sender=CTStudy)
+def delete_ct_volume(sender, instance, **kwargs):
+    """CT 검사 삭제 시 볼륨 파일 삭제 (환자 삭제로 인한 CASCADE 포함)"""
+    delete_volume(instance)
+
+
+@receiver(pre_save, sender=Patient)
+def load_cohort_state(sender, instance, update_fields=None, **kwargs):
+    """환자 수정 전 값 보관 (요약에 영향을 주는 필드가 바뀔 수 있을 때만 조회)"""
+    if update_fields is not None and not cohort.TRACKED_FIELDS.intersection(update_fields):
+        return
+    if instance._state.adding:
+        instance._cohort_previous = None
+    else:
+        # 트랜잭션 안이면 행을 잠가 동시 수정이 같은 이전 값을 빼지 않도록 함
+        instance._cohort_previous = cohort.load_patient_state(instance.pk, lock=connection.in_atomic_block)
+
+
+@receiver(post_save, sender=Patient)
+def update_cohort_summary_on_save(sender, instance, **kwargs):
+    """환자 등록/수정 시 코호트 요약 증감"""
+    if not hasattr(instance, '_cohort_previous'):
+        return
+    previous = instance.__dict__.pop('_cohort_previous')
+    cohort.record_patient_change(previous, cohort.patient_state(instance))
+
+
+@receiver(post_delete, sender=Patient)
+def update_cohort_summary_on_delete(sender, instance, **kwargs):
+    """환자 삭제 시 코호트 요약에서 차감"""
+    cohort.record_patient_change(cohort.patient_state(instance), None)
+
+
+@receiver(pre_delete, sender=DoctorProfile)
+def move_cohort_doctor_on_delete(sender, instance, **kwargs):
+    """
+    의사 삭제 시 담당 환자를 담당의 '미지정' 요약으로 이동
+    (Patient.doctor SET_NULL 은 시그널 없는 UPDATE - 삭제와 같은 트랜잭션에서 실행됨)
+    """
+    cohort.move_patients(Patient.objects.filter(doctor=instance), 'doctor', '')
+
+
+@receiver(post_save, sender=Patient)
+def invalidate_survival_on_save(sender, instance, update_fields=None, **kwargs):
+    """진단일/추적 결과/코호트 필드가 바뀌면 생존 분석 캐시 무효화 (커밋 후)"""
+    if update_fields is not None and not SURVIVAL_FIELDS.intersection(update_fields):
+        return
+    transaction.on_commit(invalidate_survival_cache)
+
+
+@receiver(post_delete, sender=Patient)
+def invalidate_survival_on_delete(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_survival_cache)
+
+
+@receiver(post_save, sender=Patient)
+def refresh_survival_prediction_on_save(sender, instance, update_fields=None, **kwargs):
+    """예측 변수가 바뀌면 사용 중 Cox 모델로 1/3/5년 생존율 다시 계산 (커밋 후)"""
+    if update_fields is not None and not set(PREDICTION_FIELDS).intersection(update_fields):
+        return
+    transaction.on_commit(lambda: refresh_patient_survival(instance))
+
+
+@receiver(post_save, sender=Patient)
+def update_similarity_on_save(sender, instance, update_fields=None, **kwargs):
+    """유사 환자 색인에서 해당 환자 벡터만 교체 (커밋 후)"""
+    if update_fields is not None and not set(SIMILARITY_FIELDS).intersection(update_fields):
+        return
+    transaction.on_commit(lambda: update_patient_vector(instance))
+
+
+@receiver(post_delete, sender=Patient)
+def update_similarity_on_delete(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: remove_patient_vector(pk))
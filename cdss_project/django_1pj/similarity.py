@@ -0,0 +1,320 @@
+"""
+유사 환자 검색 (k-NN)
+임상 정보(BCLC 병기, Child-Pugh, 종양 크기/개수, 혈관 침범, AFP, 진단 시 나이)를 0~1 범위로 정규화한
+벡터를 float32 배열 하나에 모아 두고, 블록 단위 brute force 로 가까운 환자 k 명을 찾음
+
+- 변수별 가중치는 벡터에 미리 곱해 두어 조회는 단순 유클리드 거리 (블록마다 argpartition 으로 후보 k 개만 유지)
+- 결측값은 NaN 으로 저장하고 한쪽만 결측이면 고정 차이(MISSING_DIFF), 양쪽 모두 결측이면 차이 0 으로 취급
+- 환자 저장/삭제 시 해당 행만 교체 (signals), 다른 프로세스에서 바뀐 환자는 조회 시 updated_at 기준으로 동기화
+- 삭제된 행은 빈 칸으로 두었다가 일정 비율을 넘으면 배열을 압축
+- 보관 환자(ArchivedPatient)도 원래 pk 로 함께 색인 (치료 결과가 확정된 사례라 비교 가치가 큼)
+"""
+import math
+import threading
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.utils import timezone
+
+from .models import ArchivedPatient, Patient
+
+
+# 변수별 가중치 (정규화 후 값 범위 0~1 기준)
+FEATURE_WEIGHTS = {
+    'bclc_stage': 2.0,
+    'child_pugh': 1.0,
+    'tumor_size': 1.5,
+    'tumor_count': 1.0,
+    'vascular_invasion': 1.5,
+    'log_afp': 1.0,
+    'age': 0.5,
+}
+
+SOURCE_COLUMNS = ['bclc_stage', 'child_pugh', 'tumor_size', 'tumor_count', 'vascular_invasion',
+                  'afp_initial', 'afp_current', 'birth_date', 'diagnosis_date']
+
+BCLC_ORDER = {'0': 0.0, 'A': 0.25, 'B': 0.5, 'C': 0.75, 'D': 1.0}
+CHILD_PUGH_ORDER = {'A': 0.0, 'B': 0.5, 'C': 1.0}
+
+# 결측 변수의 (가중치 적용 전) 거리 기여분 - 값 범위의 절반
+MISSING_DIFF = 0.5
+
+# 유사도(%) 환산 기준 거리 - 모든 변수가 끝에서 끝까지 다른 경우
+MAX_DISTANCE = math.sqrt(sum(FEATURE_WEIGHTS.values()))
+
+DEFAULT_K = 5
+MAX_K = 50
+
+# 한 번에 거리를 계산하는 행 수 (임시 배열 크기 제한)
+SEARCH_BLOCK_SIZE = 65536
+
+# 다른 프로세스 변경분 동기화 간격(초)과 updated_at 여유 시간
+SYNC_INTERVAL = 5
+SYNC_OVERLAP = timedelta(seconds=5)
+
+# 빈 칸 비율이 이 값을 넘으면 압축
+COMPACT_RATIO = 0.25
+
+_WEIGHTS = np.sqrt(np.array(list(FEATURE_WEIGHTS.values()), dtype=np.float32))
+_MISSING = (_WEIGHTS * MISSING_DIFF).astype(np.float32)
+
+
+def encode(values):
+    """SOURCE_COLUMNS 값 dict -> 가중 특징 벡터 (float32, 결측 NaN)"""
+    afp = values['afp_initial'] if values['afp_initial'] is not None else values['afp_current']
+    birth, diagnosis = values['birth_date'], values['diagnosis_date']
+    age = (diagnosis - birth).days / 365.25 if birth and diagnosis else None
+
+    features = [
+        BCLC_ORDER.get(values['bclc_stage'], math.nan),
+        CHILD_PUGH_ORDER.get(values['child_pugh'], math.nan),
+        min(math.log1p(values['tumor_size']) / math.log1p(15), 1.0) if values['tumor_size'] is not None else math.nan,
+        min(max(values['tumor_count'] - 1, 0) / 4, 1.0) if values['tumor_count'] is not None else math.nan,
+        1.0 if values['vascular_invasion'] else 0.0,
+        min(math.log10(max(afp, 0) + 1) / 5, 1.0) if afp is not None else math.nan,
+        min(max(age - 20, 0) / 70, 1.0) if age is not None else math.nan,
+    ]
+    return np.array(features, dtype=np.float32) * _WEIGHTS
+
+
+class SimilarityIndex:
+    """환자 특징 벡터 배열 (행 번호 <-> Patient pk)"""
+
+    def __init__(self, capacity=1024):
+        self.vectors = np.full((capacity, len(FEATURE_WEIGHTS)), np.nan, dtype=np.float32)
+        self.pks = np.full(capacity, -1, dtype=np.int64)
+        self.rows = {}          # pk -> 행 번호
+        self.size = 0           # 사용한 행 수 (빈 칸 포함)
+        self.synced_at = None   # 이 시각 이후 수정된 환자만 동기화
+        self.checked_at = 0.0   # 마지막 동기화 확인 (monotonic)
+
+    def __len__(self):
+        return len(self.rows)
+
+    # --------------------------------------------
+    # 색인
+    # --------------------------------------------
+
+    def _grow(self, needed):
+        capacity = len(self.pks)
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2)
+        vectors = np.full((capacity, self.vectors.shape[1]), np.nan, dtype=np.float32)
+        vectors[:self.size] = self.vectors[:self.size]
+        pks = np.full(capacity, -1, dtype=np.int64)
+        pks[:self.size] = self.pks[:self.size]
+        self.vectors, self.pks = vectors, pks
+
+    def upsert(self, pk, vector):
+        row = self.rows.get(pk)
+        if row is None:
+            self._grow(self.size + 1)
+            row = self.size
+            self.size += 1
+            self.rows[pk] = row
+            self.pks[row] = pk
+        self.vectors[row] = vector
+
+    def remove(self, pk):
+        row = self.rows.pop(pk, None)
+        if row is None:
+            return
+        self.pks[row] = -1
+        self.vectors[row] = np.nan
+        if self.size - len(self.rows) > COMPACT_RATIO * self.size:
+            self.compact()
+
+    def compact(self):
+        """빈 칸 제거 (행 번호 재배정)"""
+        keep = np.flatnonzero(self.pks[:self.size] >= 0)
+        self.vectors[:len(keep)] = self.vectors[keep]
+        self.pks[:len(keep)] = self.pks[keep]
+        self.vectors[len(keep):self.size] = np.nan
+        self.pks[len(keep):self.size] = -1
+        self.size = len(keep)
+        self.rows = {int(pk): row for row, pk in enumerate(self.pks[:self.size])}
+
+    def load(self, queryset, pk_field='pk', chunk_size=5000):
+        """queryset 환자를 색인에 반영 (values 로 청크 조회, 모델 인스턴스 생성 없음)"""
+        count = 0
+        for values in queryset.order_by().values(pk_field, *SOURCE_COLUMNS).iterator(chunk_size=chunk_size):
+            self.upsert(values[pk_field], encode(values))
+            count += 1
+        return count
+
+    # --------------------------------------------
+    # 검색
+    # --------------------------------------------
+
+    def search(self, vector, k=DEFAULT_K, exclude=()):
+        """가까운 행 k 개 (pk, 거리) 목록 - 거리 오름차순"""
+        excluded = {self.rows[pk] for pk in exclude if pk in self.rows}
+        wanted = k + len(excluded)
+        query_missing = np.isnan(vector)
+        query = np.where(query_missing, 0, vector)
+        candidates, distances = [], []
+        for start in range(0, self.size, SEARCH_BLOCK_SIZE):
+            block = self.vectors[start:start + SEARCH_BLOCK_SIZE][:self.size - start]
+            diff = block - query
+            if query_missing.any():
+                diff[:, query_missing] = np.where(np.isnan(diff[:, query_missing]), 0, _MISSING[query_missing])
+            diff = np.where(np.isnan(diff), _MISSING, diff)
+            squared = np.einsum('ij,ij->i', diff, diff)
+            # 빈 칸은 제외
+            squared[self.pks[start:start + len(block)] < 0] = np.inf
+            if len(squared) > wanted:
+                top = np.argpartition(squared, wanted)[:wanted]
+            else:
+                top = np.arange(len(squared))
+            candidates.append(top + start)
+            distances.append(squared[top])
+        if not candidates:
+            return []
+
+        candidates, distances = np.concatenate(candidates), np.concatenate(distances)
+        order = np.argsort(distances, kind='stable')
+        results = []
+        for index in order:
+            row = int(candidates[index])
+            if row in excluded or not np.isfinite(distances[index]):
+                continue
+            results.append((int(self.pks[row]), math.sqrt(float(distances[index]))))
+            if len(results) == k:
+                break
+        return results
+
+
+# ============================================
+# 프로세스 단위 색인
+# ============================================
+
+_index = None
+_index_lock = threading.RLock()
+
+
+def build_similarity_index():
+    """Patient + ArchivedPatient 전체 색인 (보관 환자는 원래 pk 사용)"""
+    started = timezone.now()
+    index = SimilarityIndex(capacity=max(Patient.objects.count() + ArchivedPatient.objects.count(), 1024))
+    index.load(Patient.objects.all())
+    index.load(ArchivedPatient.objects.all(), pk_field='original_pk')
+    index.synced_at = started
+    index.checked_at = time.monotonic()
+    return index
+
+
+def _sync(index):
+    """다른 프로세스에서 등록/수정된 환자 반영 (삭제는 검색 결과 조회 시 걸러짐)"""
+    if time.monotonic() - index.checked_at < SYNC_INTERVAL:
+        return
+    started = timezone.now()
+    index.load(Patient.objects.filter(updated_at__gte=index.synced_at - SYNC_OVERLAP))
+    index.synced_at = started
+    index.checked_at = time.monotonic()
+
+
+def get_similarity_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = build_similarity_index()
+        else:
+            _sync(_index)
+        return _index
+
+
+def update_patient_vector(patient):
+    """환자 저장 시 해당 행만 교체 (색인이 아직 없으면 생략)"""
+    with _index_lock:
+        if _index is not None:
+            _index.upsert(patient.pk, encode({column: getattr(patient, column) for column in SOURCE_COLUMNS}))
+
+
+def remove_patient_vector(pk):
+    with _index_lock:
+        if _index is not None:
+            _index.remove(pk)
+
+
+# ============================================
+# 조회
+# ============================================
+
+def _outcome(row):
+    """사망 여부와 관찰 기간(일)"""
+    diagnosis, death, followup = row['diagnosis_date'], row['death_date'], row['last_followup_date']
+    end = death or followup
+    return {
+        'deceased': death is not None,
+        'followup_days': (end - diagnosis).days if diagnosis and end else None,
+    }
+
+
+def similar_patients(patient, k=DEFAULT_K, doctor=None):
+    """
+    유사 환자 k 명과 치료 방식별 요약
+    doctor 의 담당 환자가 아니면 환자 ID/이름 없이 임상 정보만 반환
+    반환: {'results': [...], 'treatments': [{'treatment_type', 'label', 'count', 'deceased'}]}
+    """
+    k = max(1, min(int(k), MAX_K))
+    vector = encode({column: getattr(patient, column) for column in SOURCE_COLUMNS})
+    index = get_similarity_index()
+    with _index_lock:
+        # 다른 프로세스에서 삭제된 환자가 섞일 수 있으므로 여유 있게 조회
+        matches = index.search(vector, k=k * 2, exclude=[patient.pk])
+
+    columns = [
+        'patient_id', 'name', 'doctor_id', 'bclc_stage', 'child_pugh', 'tumor_size', 'tumor_count',
+        'vascular_invasion', 'afp_current', 'treatment_type', 'recurrence_risk',
+        'diagnosis_date', 'death_date', 'last_followup_date',
+    ]
+    pks = [pk for pk, _ in matches]
+    rows = {row['pk']: dict(row, archived=False) for row in Patient.objects.filter(pk__in=pks).values('pk', *columns)}
+    missing = [pk for pk in pks if pk not in rows]
+    if missing:
+        for row in ArchivedPatient.objects.filter(original_pk__in=missing).values('original_pk', *columns):
+            rows[row['original_pk']] = dict(row, archived=True)
+    treatment_labels = dict(Patient._meta.get_field('treatment_type').flatchoices)
+    stage_labels = dict(Patient._meta.get_field('bclc_stage').flatchoices)
+
+    results, treatments = [], {}
+    for pk, distance in matches:
+        row = rows.get(pk)
+        if row is None:
+            continue
+        own = doctor is not None and row['doctor_id'] == doctor.doctor_id
+        outcome = _outcome(row)
+        results.append({
+            'patient_id': row['patient_id'] if own else None,
+            'name': row['name'] if own else None,
+            'archived': row['archived'],
+            'similarity': round(max(0.0, 1 - distance / MAX_DISTANCE) * 100, 1),
+            'bclc_stage': row['bclc_stage'],
+            'bclc_stage_label': stage_labels.get(row['bclc_stage'], '-'),
+            'child_pugh': row['child_pugh'],
+            'tumor_size': row['tumor_size'],
+            'tumor_count': row['tumor_count'],
+            'vascular_invasion': row['vascular_invasion'],
+            'afp_current': row['afp_current'],
+            'treatment_type': row['treatment_type'],
+            'treatment_label': treatment_labels.get(row['treatment_type'], '미입력'),
+            'recurrence_risk': row['recurrence_risk'],
+            **outcome,
+        })
+        summary = treatments.setdefault(row['treatment_type'] or '', {
+            'treatment_type': row['treatment_type'],
+            'label': treatment_labels.get(row['treatment_type'], '미입력'),
+            'count': 0,
+            'deceased': 0,
+        })
+        summary['count'] += 1
+        summary['deceased'] += int(outcome['deceased'])
+        if len(results) == k:
+            break
+
+    return {
+        'results': results,
+        'treatments': sorted(treatments.values(), key=lambda item: -item['count']),
+    }
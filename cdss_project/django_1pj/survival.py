@@ -0,0 +1,304 @@
+"""
+관찰 생존 분석 (Kaplan-Meier, log-rank)
+진단일부터 사망일(사건) 또는 최종 추적일(중도 절단)까지의 기간으로 BCLC 병기/치료 방식별 생존 곡선 계산
+환자 정보의 survival_1year/3year/5year 예측값 평균과 함께 반환
+
+- 기간 정렬은 한 번만 하고, 같은 시점의 사건/절단 수는 np.unique + reduceat, 위험 집합은 누적합으로 계산
+  (시점별 반복문 없음, 그룹별 곡선은 정렬된 배열을 마스크로 나눠 재정렬 없이 계산)
+- log-rank 는 (시점 x 그룹) 사건/절단 행렬을 bincount 로 만들어 관측-기대 차이와 공분산을 한 번에 계산
+- 결과는 (필터, 그룹 기준, 데이터 버전) 키로 캐시
+  생존 관련 필드가 바뀌면 버전을 올려 이전 결과를 무효화 (signals / bulk_actions)
+  버전은 DB 공유 카운터(versions.SURVIVAL)라 다른 프로세스도 versions.CHECK_INTERVAL 이내에 반영
+"""
+import math
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import ArchivedPatient, Patient
+from . import versions
+
+
+# 곡선을 나눌 수 있는 기준
+GROUP_FIELDS = ['bclc_stage', 'treatment_type']
+
+# 코호트 필터로 허용하는 필드
+FILTER_FIELDS = ['bclc_stage', 'treatment_type', 'child_pugh', 'recurrence_risk']
+
+# 바뀌면 캐시를 무효화하는 필드 (save(update_fields=...) 판단용)
+SURVIVAL_FIELDS = {
+    'diagnosis_date', 'last_followup_date', 'death_date',
+    'survival_1year', 'survival_3year', 'survival_5year',
+} | set(FILTER_FIELDS)
+
+# 예측값과 비교할 시점 (일)
+LANDMARKS = {'1year': 365, '3year': 365 * 3, '5year': 365 * 5}
+
+# 신뢰구간 (95%)
+Z_95 = 1.959964
+
+CACHE_TIMEOUT = 60 * 60
+
+
+class SurvivalError(ValueError):
+    """생존 분석 요청 오류"""
+
+
+# ============================================
+# 캐시
+# ============================================
+
+def _data_version():
+    return versions.current(versions.SURVIVAL)
+
+
+def invalidate_survival_cache():
+    """생존 관련 데이터 변경 시 호출 - 공유 버전을 올려 모든 프로세스의 이전 결과를 무효화 (커밋 후)"""
+    versions.bump(versions.SURVIVAL)
+
+
+# ============================================
+# 추정
+# ============================================
+
+def kaplan_meier(durations, events, presorted=False):
+    """
+    Kaplan-Meier 추정 (Greenwood 분산, log-log 95% 신뢰구간)
+    durations: 기간(일), events: 사건 여부 (1 사망, 0 중도 절단)
+    반환: 사건이 있는 시점별 배열 dict + 요약값
+    """
+    durations = np.asarray(durations)
+    events = np.asarray(events, dtype=np.int64)
+    if not presorted:
+        order = np.argsort(durations, kind='stable')
+        durations, events = durations[order], events[order]
+
+    n = len(durations)
+    if n == 0:
+        return None
+
+    times, starts, counts = np.unique(durations, return_index=True, return_counts=True)
+    deaths = np.add.reduceat(events, starts)
+    # 각 시점 직전까지 빠져나간 인원을 빼면 위험 집합 크기
+    at_risk = n - np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        survival = np.cumprod(1.0 - deaths / at_risk)
+        greenwood = np.cumsum(deaths / (at_risk * (at_risk - deaths)))
+        log_survival = np.log(survival)
+        se = np.sqrt(greenwood) / np.abs(log_survival)
+        lower = survival ** np.exp(Z_95 * se)
+        upper = survival ** np.exp(-Z_95 * se)
+    lower = np.nan_to_num(lower, nan=0.0)
+    upper = np.nan_to_num(upper, nan=1.0)
+
+    # 곡선은 생존율이 바뀌는 (사건이 있는) 시점만 반환
+    mask = deaths > 0
+    event_times, event_survival = times[mask], survival[mask]
+
+    below_half = np.flatnonzero(event_survival <= 0.5)
+    last_time = int(times[-1])
+    survival_at = {}
+    for label, day in LANDMARKS.items():
+        if day > last_time:
+            survival_at[label] = None
+            continue
+        index = np.searchsorted(event_times, day, side='right') - 1
+        survival_at[label] = round(float(event_survival[index]), 4) if index >= 0 else 1.0
+
+    return {
+        'n': int(n),
+        'events': int(deaths.sum()),
+        'median_days': int(event_times[below_half[0]]) if len(below_half) else None,
+        'max_followup_days': last_time,
+        'survival_at': survival_at,
+        'curve': {
+            'time': event_times.tolist(),
+            'survival': np.round(event_survival, 4).tolist(),
+            'lower': np.round(lower[mask], 4).tolist(),
+            'upper': np.round(upper[mask], 4).tolist(),
+            'at_risk': at_risk[mask].tolist(),
+            'events': deaths[mask].tolist(),
+        },
+    }
+
+
+def _chi2_sf(x, df):
+    """카이제곱 분포 상위 확률 (정수 자유도)"""
+    if x <= 0:
+        return 1.0
+    half = x / 2
+    if df % 2 == 0:
+        term, total = 1.0, 1.0
+        for i in range(1, df // 2):
+            term *= half / i
+            total += term
+        return min(1.0, math.exp(-half) * total)
+    total = math.erfc(math.sqrt(half))
+    for i in range(1, (df - 1) // 2 + 1):
+        total += math.exp((i - 0.5) * math.log(half) - half - math.lgamma(i + 0.5))
+    return min(1.0, total)
+
+
+def logrank_test(durations, events, groups):
+    """
+    k 그룹 log-rank 검정
+    groups: 그룹 번호 (0 ~ k-1) 배열
+    반환: {'chi2', 'df', 'p_value', 'observed', 'expected'}
+    """
+    durations = np.asarray(durations)
+    events = np.asarray(events, dtype=np.float64)
+    groups = np.asarray(groups)
+    k = int(groups.max()) + 1 if len(groups) else 0
+    if k < 2:
+        return None
+
+    times, time_index = np.unique(durations, return_inverse=True)
+    cells = time_index * k + groups
+    size = len(times) * k
+    deaths = np.bincount(cells, weights=events, minlength=size).reshape(-1, k)
+    removed = np.bincount(cells, minlength=size).reshape(-1, k)
+    # 그룹별 위험 집합: 전체 인원 - 이전 시점까지 빠져나간 인원
+    at_risk = removed.sum(axis=0) - (np.cumsum(removed, axis=0) - removed)
+
+    total_deaths = deaths.sum(axis=1)
+    total_at_risk = at_risk.sum(axis=1)
+    valid = (total_deaths > 0) & (total_at_risk > 1)
+    d, n, n_g, d_g = total_deaths[valid], total_at_risk[valid], at_risk[valid], deaths[valid]
+
+    expected = (n_g * (d / n)[:, None]).sum(axis=0)
+    observed = d_g.sum(axis=0)
+    # 초기하분포 공분산: d (n-d) / (n^2 (n-1)) * n_g (n δ_gh - n_h)
+    weight = d * (n - d) / (n * n * (n - 1))
+    covariance = (
+        np.diag((weight[:, None] * n_g * n[:, None]).sum(axis=0))
+        - (weight[:, None, None] * n_g[:, :, None] * n_g[:, None, :]).sum(axis=0)
+    )
+
+    diff = (observed - expected)[:-1]
+    try:
+        chi2 = float(diff @ np.linalg.solve(covariance[:-1, :-1], diff))
+    except np.linalg.LinAlgError:
+        return None
+    df = k - 1
+    return {
+        'chi2': round(chi2, 4),
+        'df': df,
+        'p_value': _chi2_sf(chi2, df),
+        'observed': observed.tolist(),
+        'expected': np.round(expected, 3).tolist(),
+    }
+
+
+# ============================================
+# 코호트
+# ============================================
+
+def _clean_filters(filters):
+    cleaned = {}
+    for field, value in (filters or {}).items():
+        if field not in FILTER_FIELDS:
+            raise SurvivalError(f'지원하지 않는 필터입니다: {field}')
+        if value not in (None, ''):
+            cleaned[field] = value
+    return cleaned
+
+
+def _ordinals(dates):
+    """date 목록 -> 일 단위 정수 배열 (None 은 -1, datetime64 변환보다 빠름)"""
+    return np.fromiter((-1 if day is None else day.toordinal() for day in dates), dtype=np.int64, count=len(dates))
+
+
+def _load_cohort(filters, group_by):
+    """(기간, 사건, 그룹 값, 예측 생존율) 배열 - 진단일과 종료일이 있는 환자만"""
+    columns = ['diagnosis_date', 'death_date', 'last_followup_date',
+               'survival_1year', 'survival_3year', 'survival_5year']
+    if group_by:
+        columns.append(group_by)
+    # 보관 환자도 같은 컬럼을 가지고 있어 함께 집계 (사망 환자가 주로 보관되므로 빠지면 생존율이 과대 추정됨)
+    rows = []
+    for model in (Patient, ArchivedPatient):
+        rows += (
+            model.objects.filter(diagnosis_date__isnull=False)
+            .filter(Q(death_date__isnull=False) | Q(last_followup_date__isnull=False))
+            .filter(**filters)
+            .order_by()
+            .values_list(*columns)
+        )
+    if not rows:
+        return None
+
+    values = list(zip(*rows))
+    diagnosis, death, followup = (_ordinals(column) for column in values[:3])
+
+    events = death >= 0
+    durations = np.where(events, death, followup) - diagnosis
+    estimates = np.array(values[3:6], dtype=np.float64).T
+    groups = np.array([value or '' for value in values[6]], dtype=object) if group_by else None
+
+    # 종료일이 진단일보다 이른 잘못된 입력은 제외
+    valid = (durations >= 0) & ((death >= 0) | (followup >= 0))
+    if not valid.any():
+        return None
+    return durations[valid], events[valid], groups[valid] if groups is not None else None, estimates[valid]
+
+
+def _estimate_means(estimates):
+    """환자 정보의 예측 생존율(%) 평균 -> 비율"""
+    result = {}
+    for column, label in enumerate(LANDMARKS):
+        values = estimates[:, column]
+        values = values[~np.isnan(values)]
+        result[label] = round(float(values.mean()) / 100, 4) if len(values) else None
+    return result
+
+
+def compute_survival(group_by=None, filters=None):
+    """
+    코호트 생존 곡선 (그룹별) + log-rank 검정
+    group_by: None / 'bclc_stage' / 'treatment_type', filters: FILTER_FIELDS 조건
+    """
+    if group_by and group_by not in GROUP_FIELDS:
+        raise SurvivalError(f'그룹 기준은 {", ".join(GROUP_FIELDS)} 중 하나여야 합니다.')
+    filters = _clean_filters(filters)
+
+    key = 'survival:{}:{}:{}'.format(
+        _data_version(), group_by or '-', '&'.join(f'{k}={v}' for k, v in sorted(filters.items())),
+    )
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    result = {'group_by': group_by, 'filters': filters, 'groups': [], 'logrank': None}
+    cohort = _load_cohort(filters, group_by)
+    if cohort is not None:
+        durations, events, groups, estimates = cohort
+        # 한 번만 정렬 - 그룹별 곡선은 정렬된 배열에서 마스크로 추출
+        order = np.argsort(durations, kind='stable')
+        durations, events, estimates = durations[order], events[order], estimates[order]
+
+        if group_by:
+            groups = groups[order]
+            keys, group_index = np.unique(groups, return_inverse=True)
+            labels = dict(Patient._meta.get_field(group_by).flatchoices)
+        else:
+            keys, group_index, labels = np.array(['']), np.zeros(len(durations), dtype=np.int64), {}
+
+        for index, value in enumerate(keys):
+            mask = group_index == index
+            estimate = kaplan_meier(durations[mask], events[mask], presorted=True)
+            if estimate is None:
+                continue
+            estimate.update({
+                'key': str(value),
+                'label': labels.get(value, value) if value else ('미입력' if group_by else '전체'),
+                'estimated': _estimate_means(estimates[mask]),
+            })
+            result['groups'].append(estimate)
+
+        if group_by and len(keys) > 1:
+            result['logrank'] = logrank_test(durations, events, group_index)
+
+    cache.set(key, result, CACHE_TIMEOUT)
+    return result
@@ -0,0 +1,408 @@
+"""
+Cox 비례위험 모델 학습/예측
+환자 임상 정보(BCLC 병기, Child-Pugh, 종양 크기/개수, 혈관 침범, AFP, 치료 방식)로 설계 행렬을 만들고
+Newton-Raphson 으로 부분우도를 최대화 (동률은 Breslow 근사)
+
+- 설계 행렬: values_list().iterator(chunk_size) 로 청크 단위 조회하여 바로 float 배열로 변환
+  (모델 인스턴스를 만들지 않음, 메모리는 환자 수 x 변수 수)
+- 반복 계산: 기간 오름차순 정렬 후 위험 집합 합계(exp(η), exp(η)x, exp(η)xxᵀ)를 뒤에서부터 누적
+  xxᵀ 누적은 청크 단위로 처리하여 (청크 x p x p) 메모리만 사용
+- 학습 결과는 SurvivalModel 에 버전별로 저장 (계수, 표준화 값, 결측 대체값, 기저 누적위험)
+- 예측: S(t|x) = exp(-H0(t) · exp(β·z)) - 1/3/5년 생존율을 Patient.survival_*year 에 기록
+  (환자 등록/예측 변수 수정 시 시그널에서 1명, 모델 교체 시와 매일 야간에 survival_model.score 작업으로 전체)
+"""
+
+import numpy as np
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Max, Q
+
+from .models import ArchivedPatient, Patient, SurvivalModel
+from .survival import LANDMARKS, _ordinals, invalidate_survival_cache
+from . import jobs
+
+
+# 설계 행렬 변수 (범주형은 기준 범주 제외한 지시 변수 + 미입력 지시 변수)
+CATEGORICAL_FEATURES = {
+    'bclc_stage': ['A', 'B', 'C', 'D'],                               # 기준: 0
+    'child_pugh': ['B', 'C'],                                          # 기준: A
+    'treatment_type': ['transplant', 'tace', 'sorafenib', 'lenvatinib'],  # 기준: surgery
+}
+NUMERIC_FEATURES = ['tumor_size', 'tumor_count', 'log_afp']
+BOOLEAN_FEATURES = ['vascular_invasion']
+
+SOURCE_COLUMNS = ['bclc_stage', 'child_pugh', 'treatment_type', 'tumor_size', 'tumor_count',
+                  'vascular_invasion', 'afp_initial', 'afp_current']
+OUTCOME_COLUMNS = ['diagnosis_date', 'death_date', 'last_followup_date']
+
+DEFAULT_CHUNK_SIZE = 5000
+DEFAULT_MAX_ITER = 30
+DEFAULT_TOLERANCE = 1e-9
+DEFAULT_PENALTY = 1e-4
+
+# 저장할 기저 누적위험 최대 점 수 (균등 간격으로 추림)
+BASELINE_POINTS = 400
+
+# 예측기 캐시 - 키에 모델 (pk, version) 을 넣어 다른 프로세스에서 모델을 바꿔도 다음 조회부터 새 모델 사용
+PREDICTOR_CACHE_PREFIX = 'survival_model:predictor'
+PREDICTOR_CACHE_TIMEOUT = 24 * 3600
+
+# 전체 환자 예측 작업 / 야간 실행 시각 (시그널 없이 바뀐 환자 정보 반영 - 일괄 변경, 보관 복원 등)
+SCORE_JOB = 'survival_model.score'
+NIGHTLY_SCORE_HOUR = 3
+
+
+class SurvivalModelError(ValueError):
+    """모델 학습/예측 오류"""
+
+
+def feature_names():
+    names = []
+    for field, levels in CATEGORICAL_FEATURES.items():
+        names += [f'{field}={level}' for level in levels] + [f'{field}=missing']
+    return names + NUMERIC_FEATURES + BOOLEAN_FEATURES
+
+
+# ============================================
+# 설계 행렬
+# ============================================
+
+def _encode_rows(rows):
+    """values_list 행(SOURCE_COLUMNS 순서) -> 원 변수 배열 (수치형 결측은 NaN)"""
+    columns = dict(zip(SOURCE_COLUMNS, zip(*rows)))
+    blocks = []
+    for field, levels in CATEGORICAL_FEATURES.items():
+        values = np.array([value or '' for value in columns[field]], dtype=object)
+        blocks += [(values == level) for level in levels] + [(values == '')]
+
+    tumor_size = np.array(columns['tumor_size'], dtype=np.float64)
+    tumor_count = np.array(columns['tumor_count'], dtype=np.float64)
+    afp = np.array(columns['afp_initial'], dtype=np.float64)
+    # 진단 시 AFP 가 없으면 최근 값 사용
+    afp = np.where(np.isnan(afp), np.array(columns['afp_current'], dtype=np.float64), afp)
+    with np.errstate(invalid='ignore'):
+        log_afp = np.log1p(np.clip(afp, 0, None))
+    blocks += [tumor_size, np.clip(tumor_count, 0, 10), log_afp]
+    blocks.append(np.array(columns['vascular_invasion'], dtype=bool))
+    return np.column_stack(blocks).astype(np.float64)
+
+
+def stream_training_data(queryset=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    학습 데이터 (원 변수 행렬, 기간(일), 사건 여부)
+    진단일과 종료일(사망일 또는 최종 추적일)이 있는 환자만 청크 단위로 읽어 변환
+    queryset 을 지정하지 않으면 보관 환자(ArchivedPatient)까지 포함
+    """
+    querysets = [queryset] if queryset is not None else [Patient.objects.all(), ArchivedPatient.objects.all()]
+
+    features, durations, events = [], [], []
+    chunk = []
+    for queryset in querysets:
+        rows = (
+            queryset.filter(diagnosis_date__isnull=False)
+            .filter(Q(death_date__isnull=False) | Q(last_followup_date__isnull=False))
+            .order_by()
+            .values_list(*OUTCOME_COLUMNS, *SOURCE_COLUMNS)
+        )
+        for row in rows.iterator(chunk_size=chunk_size):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                _append_chunk(chunk, features, durations, events)
+                chunk = []
+    if chunk:
+        _append_chunk(chunk, features, durations, events)
+
+    if not features:
+        return np.empty((0, len(feature_names()))), np.empty(0, dtype=np.int64), np.empty(0, dtype=bool)
+    return np.concatenate(features), np.concatenate(durations), np.concatenate(events)
+
+
+def _append_chunk(rows, features, durations, events):
+    outcome = list(zip(*(row[:3] for row in rows)))
+    diagnosis, death, followup = (_ordinals(column) for column in outcome)
+    event = death >= 0
+    duration = np.where(event, death, followup) - diagnosis
+    valid = duration >= 0
+
+    features.append(_encode_rows([row[3:] for row in rows])[valid])
+    durations.append(duration[valid])
+    events.append(event[valid])
+
+
+# ============================================
+# 학습
+# ============================================
+
+def _risk_set_sums(z, weights, group_starts, chunk_size):
+    """
+    기간 오름차순 정렬된 데이터에서 동률 그룹 시작 위치별 위험 집합 합계
+    S0 = Σ w, S1 = Σ w z, S2 = Σ w z zᵀ (해당 시점 이후 전체)
+    S2 는 뒤에서부터 청크 단위로 누적하여 (청크 x p x p) 크기만 메모리에 유지
+    """
+    n, p = z.shape
+    # 뒤에서부터 누적합 (역순 cumsum)
+    s0_all = np.cumsum(weights[::-1])[::-1]
+    s1_all = np.cumsum((weights[:, None] * z)[::-1], axis=0)[::-1]
+    s0, s1 = s0_all[group_starts], s1_all[group_starts]
+
+    s2 = np.empty((len(group_starts), p, p))
+    carry = np.zeros((p, p))
+    boundaries = np.append(np.arange(0, n, chunk_size), n)
+    for end_index in range(len(boundaries) - 1, 0, -1):
+        start, stop = boundaries[end_index - 1], boundaries[end_index]
+        block_z, block_w = z[start:stop], weights[start:stop]
+        outer = block_w[:, None, None] * block_z[:, :, None] * block_z[:, None, :]
+        cumulative = np.cumsum(outer[::-1], axis=0)[::-1] + carry
+        carry = cumulative[0]
+        in_block = (group_starts >= start) & (group_starts < stop)
+        s2[in_block] = cumulative[group_starts[in_block] - start]
+    return s0, s1, s2
+
+
+def fit_cox(features, durations, events, penalty=DEFAULT_PENALTY, max_iter=DEFAULT_MAX_ITER,
+            tol=DEFAULT_TOLERANCE, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Cox PH Newton-Raphson (Breslow 동률 처리, L2 벌점으로 희소 범주의 발산 방지)
+    features: 원 변수 행렬 (NaN 은 평균으로 대체)
+    반환: 학습 결과 dict
+    """
+    n, p = features.shape
+    if n == 0 or not events.any():
+        raise SurvivalModelError('사건(사망)이 있는 학습 데이터가 없습니다.')
+
+    observed = ~np.isnan(features)
+    fill_values = np.nansum(features, axis=0) / np.maximum(observed.sum(axis=0), 1)
+    x = np.where(np.isnan(features), fill_values, features)
+    means = x.mean(axis=0)
+    scales = x.std(axis=0)
+    # 값이 하나뿐인 변수(예: 학습 데이터에 없는 범주)는 계수 0 으로 고정하고 학습에서 제외
+    varying = scales > 0
+    scales[~varying] = 1.0
+    z = ((x - means) / scales)[:, varying]
+    p = z.shape[1]
+
+    order = np.argsort(durations, kind='stable')
+    z, durations, events = z[order], durations[order], events[order].astype(np.float64)
+    times, group_starts, group_index = np.unique(durations, return_index=True, return_inverse=True)
+    # 동률 그룹별 사건 수와 사건 환자의 변수 합
+    group_deaths = np.bincount(group_index, weights=events, minlength=len(times))
+    event_z_sum = (events[:, None] * z).sum(axis=0)
+    has_event = group_deaths > 0
+    event_starts, deaths = group_starts[has_event], group_deaths[has_event]
+
+    def evaluate(beta):
+        eta = z @ beta
+        shift = eta.max()
+        weights = np.exp(eta - shift)
+        s0, s1, s2 = _risk_set_sums(z, weights, event_starts, chunk_size)
+        mean_z = s1 / s0[:, None]
+        log_likelihood = float(events @ eta - deaths @ (np.log(s0) + shift)) - 0.5 * penalty * beta @ beta
+        gradient = event_z_sum - deaths @ mean_z - penalty * beta
+        information = (
+            np.einsum('g,gij->ij', deaths / s0, s2)
+            - np.einsum('g,gi,gj->ij', deaths, mean_z, mean_z)
+            + penalty * np.eye(p)
+        )
+        return log_likelihood, gradient, information
+
+    beta = np.zeros(p)
+    log_likelihood, gradient, information = evaluate(beta)
+    null_log_likelihood = log_likelihood
+    converged = False
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        step = np.linalg.solve(information, gradient)
+        # 우도가 감소하면 step 을 절반씩 줄임
+        for _ in range(20):
+            candidate = beta + step
+            new_log_likelihood, new_gradient, new_information = evaluate(candidate)
+            if new_log_likelihood >= log_likelihood - 1e-12:
+                break
+            step /= 2
+        beta = candidate
+        improvement = new_log_likelihood - log_likelihood
+        log_likelihood, gradient, information = new_log_likelihood, new_gradient, new_information
+        if abs(improvement) < tol * (abs(log_likelihood) + 1):
+            converged = True
+            break
+
+    # Breslow 기저 누적위험 (표준화 변수 기준)
+    weights = np.exp(z @ beta)
+    s0 = np.cumsum(weights[::-1])[::-1][event_starts]
+    cumhaz = np.cumsum(deaths / s0)
+    event_times = times[has_event]
+    if len(event_times) > BASELINE_POINTS:
+        keep = np.unique(np.linspace(0, len(event_times) - 1, BASELINE_POINTS).round().astype(int))
+        event_times, cumhaz = event_times[keep], cumhaz[keep]
+
+    coefficients = np.zeros(len(varying))
+    coefficients[varying] = beta
+    standard_errors = np.full(len(varying), np.nan)
+    standard_errors[varying] = np.sqrt(np.diag(np.linalg.inv(information)))
+    return {
+        'coefficients': coefficients,
+        'standard_errors': standard_errors,
+        'fill_values': fill_values,
+        'means': means,
+        'scales': scales,
+        'baseline_time': event_times,
+        'baseline_cumhaz': cumhaz,
+        'n_patients': int(n),
+        'n_events': int(events.sum()),
+        'log_likelihood': float(log_likelihood),
+        'null_log_likelihood': float(null_log_likelihood),
+        'iterations': iterations,
+        'converged': converged,
+        'penalty': penalty,
+    }
+
+
+def save_model(result, activate=True):
+    """학습 결과를 새 버전으로 저장 (activate=True 이면 사용 중 모델로 교체)"""
+    with transaction.atomic():
+        version = (SurvivalModel.objects.select_for_update().aggregate(v=Max('version'))['v'] or 0) + 1
+        if activate:
+            SurvivalModel.objects.filter(is_active=True).update(is_active=False)
+        model = SurvivalModel.objects.create(
+            version=version,
+            feature_names=feature_names(),
+            coefficients=result['coefficients'].tolist(),
+            fill_values=result['fill_values'].tolist(),
+            means=result['means'].tolist(),
+            scales=result['scales'].tolist(),
+            baseline_hazard={
+                'time': result['baseline_time'].tolist(),
+                'cumhaz': result['baseline_cumhaz'].tolist(),
+            },
+            n_patients=result['n_patients'],
+            n_events=result['n_events'],
+            log_likelihood=result['log_likelihood'],
+            null_log_likelihood=result['null_log_likelihood'],
+            iterations=result['iterations'],
+            converged=result['converged'],
+            penalty=result['penalty'],
+            is_active=activate,
+        )
+    return model
+
+
+# ============================================
+# 예측
+# ============================================
+
+class CoxPredictor:
+    """저장된 모델의 배열 형태 (예측 시 JSON 변환 반복 방지)"""
+
+    def __init__(self, model):
+        if model.feature_names != feature_names():
+            raise SurvivalModelError(f'현재 변수 구성과 다른 모델입니다: v{model.version}')
+        self.version = model.version
+        self.beta = np.array(model.coefficients)
+        self.fill_values = np.array(model.fill_values)
+        self.means = np.array(model.means)
+        self.scales = np.array(model.scales)
+        self.baseline_time = np.array(model.baseline_hazard['time'])
+        self.baseline_cumhaz = np.array(model.baseline_hazard['cumhaz'])
+
+    def baseline_at(self, days):
+        index = np.searchsorted(self.baseline_time, days, side='right') - 1
+        return np.where(index >= 0, self.baseline_cumhaz[np.maximum(index, 0)], 0.0)
+
+    def survival(self, features, days_list=LANDMARKS.values()):
+        """원 변수 행렬 -> (환자 수 x 시점 수) 생존 확률"""
+        x = np.where(np.isnan(features), self.fill_values, features)
+        risk = np.exp(((x - self.means) / self.scales) @ self.beta)
+        baseline = self.baseline_at(np.array(list(days_list)))
+        return np.exp(-risk[:, None] * baseline[None, :])
+
+
+def active_predictor():
+    """
+    사용 중 모델 (캐시) - 없으면 None
+    매번 is_active 인덱스로 (pk, version) 만 조회하고, 계수 배열은 그 키로 캐시
+    """
+    active = SurvivalModel.objects.filter(is_active=True).values_list('pk', 'version').first()
+    if active is None:
+        return None
+    key = f'{PREDICTOR_CACHE_PREFIX}:{active[0]}:{active[1]}'
+    predictor = cache.get(key)
+    if predictor is None:
+        model = SurvivalModel.objects.filter(pk=active[0]).first()
+        if model is None:
+            return None
+        predictor = CoxPredictor(model)
+        cache.set(key, predictor, PREDICTOR_CACHE_TIMEOUT)
+    return predictor
+
+
+def predict_patient(patient, predictor=None):
+    """환자 1명의 1/3/5년 생존율(%) - 모델이 없으면 None"""
+    predictor = predictor or active_predictor()
+    if predictor is None:
+        return None
+    row = [getattr(patient, column) for column in SOURCE_COLUMNS]
+    survival = predictor.survival(_encode_rows([row]))[0]
+    return {label: round(float(value) * 100, 1) for label, value in zip(LANDMARKS, survival)}
+
+
+def refresh_patient_survival(patient, predictor=None):
+    """
+    환자 1명의 예측 생존율을 다시 계산하여 저장 (등록/예측 변수 수정 후 시그널에서 호출)
+    사용 중 모델이 없으면 건너뜀 - 반환: 예측값 dict 또는 None
+    """
+    prediction = predict_patient(patient, predictor)
+    if prediction is None:
+        return None
+    values = {f'survival_{label}': value for label, value in prediction.items()}
+    # 시그널 없이 해당 컬럼만 UPDATE (저장 시그널이 다시 호출되지 않도록)
+    Patient.objects.filter(pk=patient.pk).update(**values)
+    for field, value in values.items():
+        setattr(patient, field, value)
+    invalidate_survival_cache()
+    return prediction
+
+
+def score_patients(queryset=None, chunk_size=DEFAULT_CHUNK_SIZE, predictor=None):
+    """
+    사용 중 모델로 survival_1year/3year/5year 일괄 갱신 - 갱신한 환자 수 반환
+    청크 단위로 읽어 한 번에 예측하고 UPDATE executemany 로 기록
+    (bulk_update 의 CASE WHEN 식 생성보다 빠름, 시그널 없음 -> 생존 분석 캐시 직접 무효화)
+    """
+    predictor = predictor or active_predictor()
+    if predictor is None:
+        raise SurvivalModelError('사용 중인 생존 예측 모델이 없습니다. fit_survival_model 을 먼저 실행하세요.')
+
+    queryset = (queryset if queryset is not None else Patient.objects.all()).order_by('pk')
+    quote = connection.ops.quote_name
+    columns = [Patient._meta.get_field(f'survival_{label}').column for label in LANDMARKS]
+    sql = 'UPDATE {} SET {} WHERE {} = %s'.format(
+        quote(Patient._meta.db_table),
+        ', '.join(f'{quote(column)} = %s' for column in columns),
+        quote(Patient._meta.pk.column),
+    )
+    updated = 0
+    last_pk = 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last_pk).values_list('pk', *SOURCE_COLUMNS)[:chunk_size])
+        if not rows:
+            break
+        last_pk = rows[-1][0]
+        survival = np.round(predictor.survival(_encode_rows([row[1:] for row in rows])) * 100, 1)
+        params = [(*values, row[0]) for row, values in zip(rows, survival.tolist())]
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, params)
+        updated += len(params)
+
+    invalidate_survival_cache()
+    return updated
+
+
+def schedule_scoring(immediately=False):
+    """
+    전체 환자 예측 작업 예약
+    - immediately=False: 다음 야간 시각 (작업이 끝날 때마다 다음 날로 다시 예약)
+    - immediately=True : 바로 실행 (새 모델 사용 시작 시)
+    """
+    if immediately:
+        return jobs.enqueue(SCORE_JOB, priority=-1, dedup_key=f'{SCORE_JOB}:now')
+    return jobs.enqueue(SCORE_JOB, run_at=jobs.next_daily_run(NIGHTLY_SCORE_HOUR), priority=-5, dedup_key=f'{SCORE_JOB}:nightly')
@@ -0,0 +1,124 @@
+"""
+백그라운드 작업 정의 (jobs.register)
+앱 로딩 시 import 되어 웹 프로세스와 run_jobs 워커 양쪽에 등록됨
+"""
+from .archive import archive_by_policy
+from .cohort import rebuild_cohort_summaries
+from .ct_upload import cleanup_stale_uploads, next_cleanup_delay
+from .ct_render import render_series, resolve_window, schedule_prerender
+from .ct_volume import ingest_dicom_series
+from .deletion import purge_deleted_patients, purge_patient
+from .exports import cleanup_expired_exports, write_patient_export
+from .guidelines import evaluate_queryset, schedule_evaluation
+from .inference import analyze_patient
+from .jobs import enqueue, register
+from .models import CTStudy, Patient
+from .risk_summary import refresh_risk_summary, rebuild_risk_summaries
+from .survival_model import active_predictor, schedule_scoring, score_patients
+
+
+@register('risk_summary.refresh')
+def refresh_risk_summary_job(patient_id):
+    """환자 한 명의 약물 부작용 위험 요약 재계산"""
+    summary = refresh_risk_summary(patient_id)
+    return {'patient_id': patient_id, 'total_count': summary.total_count}
+
+
+@register('risk_summary.rebuild')
+def rebuild_risk_summaries_job(patient_ids=None):
+    """위험 요약 일괄 재계산 (patient_ids 가 없으면 전체)"""
+    return {'count': rebuild_risk_summaries(patient_ids)}
+
+
+@register('patients.export_csv')
+def export_patients_csv(doctor_id):
+    """담당 환자 목록 CSV 내보내기 - 파일명 반환 (api_job_download 로 제공)"""
+    name, count = write_patient_export(doctor_id)
+    return {'file': name, 'rows': count}
+
+
+@register('exports.cleanup')
+def cleanup_expired_exports_job():
+    """만료된 환자 목록 내보내기 파일 삭제"""
+    return {'removed': cleanup_expired_exports()}
+
+
+@register('ct_uploads.cleanup')
+def cleanup_stale_uploads_job():
+    """멈춘 CT 분할 업로드 세션의 임시 청크 정리 - 남은 세션이 있으면 만료 시점에 다시 실행되도록 예약"""
+    aborted = cleanup_stale_uploads()
+    delay = next_cleanup_delay()
+    if delay is not None:
+        enqueue('ct_uploads.cleanup', dedup_key='ct_uploads.cleanup', delay=delay, priority=-10)
+    return {'aborted': aborted, 'next_delay': delay}
+
+
+@register('ct_studies.ingest')
+def ingest_dicom_series_job(patient_id, source, series_uid=None):
+    """DICOM 시리즈 디렉터리를 CT 볼륨으로 변환 후 미리 렌더링 예약"""
+    patient = Patient.objects.get(patient_id=patient_id)
+    study = ingest_dicom_series(patient, source, series_uid)
+    schedule_prerender(study)
+    return {'study_id': study.pk, 'slice_count': study.slice_count}
+
+
+@register('ct_studies.prerender')
+def prerender_ct_series_job(study_id, plane='axial', preset=None):
+    """시리즈 전체를 window 프리셋으로 미리 렌더링 (공유 캐시 사용 시 유효)"""
+    study = CTStudy.objects.get(pk=study_id)
+    return {'rendered': render_series(study, plane, resolve_window(preset))}
+
+
+@register('tumor_analysis.run')
+def tumor_analysis_job(patient_id, doctor_id=None):
+    """CT 영상 종양 분석 -> 검토 대기 제안 생성 (같은 워커의 동시 작업은 한 배치로 추론)"""
+    patient = Patient.objects.get(patient_id=patient_id)
+    suggestion = analyze_patient(patient)
+    return {
+        'suggestion_id': suggestion.pk,
+        'tumor_size': suggestion.tumor_size,
+        'tumor_count': suggestion.tumor_count,
+        'inference_ms': suggestion.inference_ms,
+    }
+
+
+@register('cohort_summary.rebuild')
+def rebuild_cohort_summaries_job():
+    """코호트 요약 테이블 전체 재계산"""
+    return rebuild_cohort_summaries()
+
+
+@register('survival_model.score')
+def score_survival_job():
+    """사용 중 Cox 모델로 전체 환자 1/3/5년 예측 생존율 갱신 후 다음 야간 실행 예약"""
+    predictor = active_predictor()
+    if predictor is None:
+        # 모델을 사용하기 시작하면 fit_survival_model 이 다시 예약
+        return {'updated': 0}
+    updated = score_patients(predictor=predictor)
+    schedule_scoring()
+    return {'updated': updated, 'version': predictor.version}
+
+
+@register('guidelines.evaluate_cohort')
+def evaluate_guidelines_job():
+    """전체 환자 BCLC 가이드라인 일괄 평가 (권고와 다른 치료 중인 환자 수 집계) - 끝나면 다음 야간 실행 예약"""
+    summary = evaluate_queryset()
+    summary['discordant_count'] = len(summary['discordant'])
+    summary['discordant'] = summary['discordant'][:200]
+    schedule_evaluation()
+    return summary
+
+
+@register('patients.archive')
+def archive_patients_job(limit=None):
+    """보관 정책(PATIENT_ARCHIVE_POLICY) 대상 환자를 보관 테이블로 이동"""
+    return {'archived': archive_by_policy(limit=limit)}
+
+
+@register('patients.purge')
+def purge_patients_job(patient_pk=None):
+    """삭제 표시된 환자의 관련 행/파일 정리 (patient_pk 가 없으면 삭제 표시된 환자 전체)"""
+    if patient_pk is None:
+        return {'purged': purge_deleted_patients()}
+    return {'patient_pk': patient_pk, 'deleted': purge_patient(patient_pk)}
@@ -0,0 +1,57 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..admin_scaling import EstimatedCountPaginator, _is_unfiltered
+from ..models import DrugInteraction, Patient
+from .utils import create_doctor, create_patient
+
+
+@override_settings(ADMIN_SCALING_MODE=True, AUDIT_LOG_ASYNC=False)
+class AdminScalingTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        self.client.force_login(self.admin, backend='django.contrib.auth.backends.ModelBackend')
+        create_patient('P1', create_doctor(), bclc_stage='B')
+        create_patient('P2', create_doctor('doc2'), bclc_stage='C')
+        self.url = reverse('admin:django_1pj_patient_changelist')
+
+    def test_manager_base_filter_counts_as_unfiltered(self):
+        self.assertTrue(_is_unfiltered(Patient.objects.all()))
+        self.assertTrue(_is_unfiltered(Patient.objects.select_related('doctor').only('name').order_by('-pk')))
+        self.assertFalse(_is_unfiltered(Patient.objects.filter(doctor_id='doc1')))
+        self.assertTrue(_is_unfiltered(DrugInteraction.objects.all()))
+
+    def test_estimate_only_for_unfiltered_list(self):
+        with mock.patch('django_1pj.admin_scaling.estimate_table_rows', return_value=1000):
+            self.assertEqual(EstimatedCountPaginator(Patient.objects.order_by('pk'), 10).count, 1000)
+            self.assertEqual(EstimatedCountPaginator(Patient.objects.filter(bclc_stage='B').order_by('pk'), 10).count, 1)
+        # 통계를 지원하지 않는 DB 는 COUNT(*)
+        self.assertEqual(EstimatedCountPaginator(Patient.objects.order_by('pk'), 10).count, 2)
+
+    def test_doctor_filter_replaces_doctor_list(self):
+        response = self.client.get(self.url, {'doctor_id': 'doc1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'placeholder="의사 ID 입력"')
+        self.assertEqual([p.patient_id for p in response.context['cl'].result_list], ['P1'])
+
+    def test_doctor_filter_keeps_other_parameters(self):
+        response = self.client.get(self.url, {'q': '환자', 'o': '1', 'bclc_stage__exact': 'B', 'doctor_id': 'doc1', 'p': '1'})
+        self.assertEqual(response.status_code, 200)
+        form = response.content.decode().split('placeholder="의사 ID 입력"')[0].rsplit('<form method="get"', 1)[1]
+        self.assertIn('<input type="hidden" name="q" value="환자">', form)
+        self.assertIn('<input type="hidden" name="o" value="1">', form)
+        self.assertIn('<input type="hidden" name="bclc_stage__exact" value="B">', form)
+        hidden = form.split('<input type="text"')[0]
+        self.assertNotIn('name="doctor_id"', hidden)
+        self.assertNotIn('name="p"', hidden)
+        self.assertNotIn("['", form)
+
+    def test_admin_base_filter_counts_as_unfiltered(self):
+        # 관련 모델 관리자는 삭제 표시 환자 행을 제외하지만 필터 없는 목록은 추정 건수 사용
+        url = reverse('admin:django_1pj_druginteraction_changelist')
+        with mock.patch('django_1pj.admin_scaling.estimate_table_rows', return_value=1000):
+            self.assertEqual(self.client.get(url).context['cl'].paginator.count, 1000)
+            self.assertEqual(self.client.get(url, {'risk_level__exact': 'high'}).context['cl'].paginator.count, 0)
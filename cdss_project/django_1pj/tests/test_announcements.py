@@ -0,0 +1,55 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from .. import versions
+from ..announcements import get_active_announcements, get_feed_version
+from ..models import Announcement
+from .utils import create_doctor, login
+
+
+class AnnouncementFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        versions._checked.clear()
+        self.addCleanup(cache.clear)
+        with self.captureOnCommitCallbacks(execute=True):
+            Announcement.objects.create(title='점검', content='서버 점검', is_active=True)
+            Announcement.objects.create(title='지난 공지', content='-', is_active=False)
+
+    def test_only_active_announcements(self):
+        self.assertEqual([item['title'] for item in get_active_announcements()], ['점검'])
+
+    def test_save_changes_version_after_commit(self):
+        version = get_feed_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            Announcement.objects.create(title='신규', content='-', is_active=True)
+            # 커밋 전에는 버전 유지
+            self.assertEqual(get_feed_version(), version)
+        self.assertNotEqual(get_feed_version(), version)
+        self.assertEqual([item['title'] for item in get_active_announcements()], ['신규', '점검'])
+
+    def test_change_from_other_process_invalidates_local_cache(self):
+        get_active_announcements()
+        # 다른 프로세스: 이 프로세스의 캐시는 그대로, 공유 버전만 증가
+        Announcement.objects.filter(title='점검').update(title='점검 연기')
+        versions._increment(versions.ANNOUNCEMENTS)
+        self.assertEqual([item['title'] for item in get_active_announcements()], ['점검 연기'])
+
+    def test_feed_etag(self):
+        url = reverse('api_announcement_feed')
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+        create_doctor()
+        login(self.client)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['version'], get_feed_version())
+        etag = response['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Announcement.objects.filter(title='점검').delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [])
@@ -0,0 +1,92 @@
+import gzip
+import json
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import DrugInteraction, LabResult, Patient
+from .utils import create_doctor, create_patient, login
+
+
+def _json(response):
+    body = response.content
+    if response.get('Content-Encoding') == 'gzip':
+        body = gzip.decompress(body)
+    return json.loads(body)
+
+
+@override_settings(AUDIT_LOG_ASYNC=False)
+class PatientApiTests(TestCase):
+    def setUp(self):
+        self.doctor = create_doctor()
+        for i in range(5):
+            patient = create_patient(f'P{i}', self.doctor, tumor_size=float(i))
+            for probability in (30, 80):
+                DrugInteraction.objects.create(
+                    patient=patient, drug_name=f'약{probability}', risk_level='medium', side_effect='부작용',
+                    probability=probability, color_code='yellow',
+                )
+        create_patient('X1', create_doctor('doc2'))
+        self.url = reverse('api_patient_list')
+        login(self.client)
+
+    def test_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_sparse_fieldset(self):
+        data = _json(self.client.get(self.url, {'fields': 'patient_id,tumor_size'}))
+        self.assertEqual(data['results'][0], {'patient_id': 'P0', 'tumor_size': 0.0})
+        # 다른 의사의 환자는 포함되지 않음
+        self.assertEqual([row['patient_id'] for row in data['results']], ['P0', 'P1', 'P2', 'P3', 'P4'])
+
+    def test_unknown_field_is_rejected(self):
+        self.assertEqual(self.client.get(self.url, {'fields': 'patient_id,password'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'limit': '0'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'cursor': '!!'}).status_code, 400)
+
+    def test_cursor_pagination(self):
+        seen = []
+        params = {'fields': 'patient_id', 'limit': 2}
+        while True:
+            data = _json(self.client.get(self.url, params))
+            seen += [row['patient_id'] for row in data['results']]
+            if not data['next_cursor']:
+                break
+            params['cursor'] = data['next_cursor']
+        self.assertEqual(seen, ['P0', 'P1', 'P2', 'P3', 'P4'])
+
+    def test_interactions_are_prefetched(self):
+        # 세션/의사 조회 + 환자 + 상호작용 (환자 수와 무관)
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url, {'fields': 'patient_id,drug_interactions',
+                                                  'interaction_fields': 'drug_name,probability'})
+        rows = _json(response)['results']
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['drug_interactions'], [
+            {'drug_name': '약80', 'probability': 80}, {'drug_name': '약30', 'probability': 30},
+        ])
+
+    def test_gzip_when_accepted(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.get('Content-Encoding'), 'gzip')
+        self.assertEqual(len(_json(response)['results']), 5)
+
+    def test_detail_hides_other_doctors_patient(self):
+        self.assertEqual(self.client.get(reverse('api_patient_detail', args=['X1'])).status_code, 404)
+        data = _json(self.client.get(reverse('api_patient_detail', args=['P1']), {'fields': 'name'}))
+        self.assertEqual(data, {'name': '환자'})
+
+    def test_create(self):
+        payload = {'patient_id': 'N1', 'name': '신규', 'birth_date': '1970-05-05', 'gender': 'F',
+                   'diagnosis_date': '2024-01-01', 'afp_initial': 12.5}
+        response = self.client.post(self.url, json.dumps(payload), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        patient = Patient.objects.get(patient_id='N1')
+        self.assertEqual(patient.doctor_id, 'doc1')
+        self.assertTrue(LabResult.objects.filter(patient=patient, analyte='afp', value=12.5).exists())
+
+        response = self.client.post(self.url, json.dumps(payload), content_type='application/json')
+        self.assertEqual(response.status_code, 409)
+        response = self.client.post(self.url, '[1]', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
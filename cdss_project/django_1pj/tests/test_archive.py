@@ -0,0 +1,73 @@
+import datetime
+import json
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..archive import archive_patients, restore_patient
+from ..models import ArchivedPatient, LabResult, Patient, TumorSuggestion
+from .utils import create_doctor, create_patient, login
+
+
+@override_settings(AUDIT_LOG_ASYNC=False)
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.doctor = create_doctor()
+        self.patient = create_patient(
+            'P1', self.doctor, bclc_stage='B', child_pugh='A', tumor_size=4.5, tumor_count=2,
+            afp_current=120.5, death_date=datetime.date(2021, 6, 1),
+        )
+        LabResult.objects.create(patient=self.patient, analyte='afp', measured_on=datetime.date(2021, 1, 1), value=80)
+        TumorSuggestion.objects.create(
+            patient=self.patient, source='ct_image', model_name='real-model',
+            tumor_size=4.5, tumor_count=2, confidence=0.8, status='accepted', reviewed_by=self.doctor,
+        )
+
+    def _snapshot(self, pk):
+        patient = Patient.objects.filter(pk=pk).values().get()
+        patient.pop('updated_at')
+        return (
+            patient,
+            list(LabResult.objects.filter(patient_id=pk).values().order_by('pk')),
+            list(TumorSuggestion.objects.filter(patient_id=pk).values().order_by('pk')),
+        )
+
+    def test_round_trip(self):
+        before = self._snapshot(self.patient.pk)
+        self.assertEqual(archive_patients(Patient.objects.filter(pk=self.patient.pk), reason='manual'), 1)
+
+        self.assertFalse(Patient.all_objects.filter(pk=self.patient.pk).exists())
+        self.assertFalse(LabResult.objects.filter(patient_id=self.patient.pk).exists())
+        archived = ArchivedPatient.objects.get(patient_id='P1')
+        self.assertEqual(archived.original_pk, self.patient.pk)
+        self.assertEqual(archived.tumor_size, 4.5)
+
+        restored = restore_patient(archived)
+        self.assertEqual(restored.pk, self.patient.pk)
+        self.assertEqual(self._snapshot(self.patient.pk), before)
+        self.assertFalse(ArchivedPatient.objects.filter(patient_id='P1').exists())
+
+    def test_restore_after_doctor_deleted(self):
+        archive_patients(Patient.objects.filter(pk=self.patient.pk), reason='manual')
+        self.doctor.delete()
+        restored = restore_patient(ArchivedPatient.objects.get(patient_id='P1'))
+        self.assertIsNone(restored.doctor_id)
+        self.assertEqual(list(restored.tumor_suggestions.values_list('reviewed_by_id', flat=True)), [None])
+
+    def test_create_rejects_archived_patient_id(self):
+        archive_patients(Patient.objects.filter(pk=self.patient.pk), reason='manual')
+        login(self.client)
+
+        payload = {'patient_id': 'P1', 'name': '신규', 'birth_date': '1970-05-05', 'gender': 'F',
+                   'diagnosis_date': '2024-01-01'}
+        response = self.client.post(reverse('api_patient_list'), json.dumps(payload), content_type='application/json')
+        self.assertEqual(response.status_code, 409)
+
+        form = {'patient_id': 'P1', 'name': '신규', 'birth_date': '1970-05-05', 'gender': 'F'}
+        response = self.client.post(reverse('patient_add'), form, follow=True)
+        self.assertContains(response, '보관된 환자번호입니다.')
+
+        self.assertFalse(Patient.all_objects.filter(patient_id='P1').exists())
+        # 보관 기록은 그대로 두고 복원 가능
+        restore_patient(ArchivedPatient.objects.get(patient_id='P1'))
+        self.assertTrue(Patient.objects.filter(patient_id='P1').exists())
@@ -0,0 +1,92 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+
+from .. import audit
+from ..models import AuditLog
+from .utils import create_doctor, create_patient
+
+
+class AuditWriteTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.spill_file = Path(tmp.name) / 'audit_spill.jsonl'
+        settings_override = override_settings(AUDIT_SPILL_FILE=self.spill_file)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        sleep = mock.patch.object(audit.time, 'sleep')
+        self.sleep = sleep.start()
+        self.addCleanup(sleep.stop)
+
+    def _entries(self, count):
+        return [audit._entry('update', 'doc1', f'P{i}', 'tumor_size', i, i + 1) for i in range(count)]
+
+    def test_transient_failure_is_retried(self):
+        real_bulk_create = audit._bulk_create
+        calls = []
+
+        def flaky(entries):
+            calls.append(len(entries))
+            if len(calls) == 1:
+                raise DatabaseError('connection lost')
+            real_bulk_create(entries)
+
+        with mock.patch.object(audit, '_bulk_create', side_effect=flaky), self.assertLogs(audit.logger, 'WARNING'):
+            self.assertEqual(audit.write_entries(self._entries(3)), 3)
+        self.assertEqual(calls, [3, 3])
+        self.assertEqual(AuditLog.objects.count(), 3)
+        self.assertFalse(self.spill_file.exists())
+
+    def test_bad_rows_are_spilled_and_replayed(self):
+        real_bulk_create = audit._bulk_create
+
+        def reject_p1(entries):
+            if any(entry.patient_id == 'P1' for entry in entries):
+                raise DatabaseError('bad row')
+            real_bulk_create(entries)
+
+        with mock.patch.object(audit, '_bulk_create', side_effect=reject_p1), self.assertLogs(audit.logger) as logs:
+            self.assertEqual(audit.write_entries(self._entries(3)), 2)
+        self.assertIn('ERROR', [record.levelname for record in logs.records])
+        self.assertEqual(self.sleep.call_count, audit.AUDIT_RETRY_ATTEMPTS - 1)
+        self.assertEqual(len(self.spill_file.read_text(encoding='utf-8').splitlines()), 1)
+
+        self.assertEqual(audit.replay_spilled_entries(), 1)
+        self.assertFalse(self.spill_file.exists())
+        replayed = AuditLog.objects.get(patient_id='P1')
+        self.assertEqual((replayed.old_value, replayed.new_value), ('1', '2'))
+        self.assertEqual(audit.replay_spilled_entries(), 0)
+
+    def test_full_queue_flushes_in_caller(self):
+        writer = audit.AuditWriter(maxsize=2, batch_size=2, interval=60)
+        writer.start = lambda: None
+        writer.put(self._entries(5))
+        self.assertEqual(AuditLog.objects.count(), 4)
+        self.assertEqual(writer.flush(), 1)
+        self.assertEqual(AuditLog.objects.count(), 5)
+
+
+@override_settings(AUDIT_LOG_ASYNC=False)
+class AuditRecordTests(TestCase):
+    def test_update_records_changed_fields_only(self):
+        patient = create_patient('P1', create_doctor(), tumor_size=3.0)
+        before = audit.snapshot(patient)
+        patient.tumor_size = 4.5
+        audit.record_update('doc1', patient, before, ['tumor_size'])
+        entry = audit.entries_for_patient('P1').get()
+        self.assertEqual(
+            (entry.action, entry.field_name, entry.old_value, entry.new_value),
+            ('update', 'tumor_size', '3.0', '4.5'),
+        )
+        self.assertEqual(list(audit.entries_for_doctor('doc1')), [entry])
+
+    def test_create_skips_empty_fields(self):
+        patient = create_patient('P1', create_doctor())
+        audit.record_create('doc1', patient)
+        fields = set(AuditLog.objects.values_list('field_name', flat=True))
+        self.assertIn('name', fields)
+        self.assertNotIn('ct_image', fields)
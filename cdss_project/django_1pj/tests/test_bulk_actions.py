@@ -0,0 +1,119 @@
+import datetime
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..bulk_actions import BulkActionError, filter_patients, reassign_doctor, set_status, shift_follow_up_dates
+from ..models import CohortSummary, Patient
+from .utils import create_doctor, create_patient, login
+
+
+@override_settings(AUDIT_LOG_ASYNC=False)
+class BulkActionTests(TestCase):
+    def setUp(self):
+        self.doctor = create_doctor()
+        self.other = create_doctor('doc2')
+        create_patient('P1', self.doctor, next_ct_date=datetime.date(2025, 1, 10), recurrence_risk='low')
+        create_patient('P2', self.doctor, next_ct_date=None, recurrence_risk='low')
+        create_patient('P3', self.other, next_ct_date=datetime.date(2025, 1, 10))
+
+    def test_shift_skips_empty_dates(self):
+        summary = shift_follow_up_dates(Patient.objects.filter(doctor=self.doctor), 7)
+        self.assertEqual(summary['updated'], 1)
+        self.assertEqual(Patient.objects.get(patient_id='P1').next_ct_date, datetime.date(2025, 1, 17))
+        self.assertIsNone(Patient.objects.get(patient_id='P2').next_ct_date)
+        self.assertEqual(Patient.objects.get(patient_id='P3').next_ct_date, datetime.date(2025, 1, 10))
+
+    def test_shift_rejects_bad_fields_and_days(self):
+        queryset = Patient.objects.all()
+        for fields in [['name'], 'next_ct_date', {'next_ct_date': 1}]:
+            with self.subTest(fields=fields), self.assertRaises(BulkActionError):
+                shift_follow_up_dates(queryset, 1, fields)
+        with self.assertRaises(BulkActionError):
+            shift_follow_up_dates(queryset, 10 ** 9)
+
+    def test_reassign_moves_cohort_counts(self):
+        summary = reassign_doctor(Patient.objects.filter(patient_id__in=['P1', 'P2']), self.other)
+        self.assertEqual(summary['updated'], 2)
+        self.assertEqual(Patient.objects.filter(doctor=self.other).count(), 3)
+        counts = dict(CohortSummary.objects.filter(dimension='doctor').values_list('value', 'patient_count'))
+        self.assertEqual(counts.get('doc2'), 3)
+        self.assertFalse(counts.get('doc1'))
+
+    def test_set_status_validates_value(self):
+        with self.assertRaises(BulkActionError):
+            set_status(Patient.objects.all(), 'recurrence_risk', 'extreme')
+        with self.assertRaises(BulkActionError):
+            set_status(Patient.objects.all(), 'recurrence_risk', ['high'])
+        with self.assertRaises(BulkActionError):
+            set_status(Patient.objects.all(), 'name', 'x')
+        set_status(Patient.objects.filter(doctor=self.doctor), 'recurrence_risk', 'high')
+        self.assertEqual(Patient.objects.filter(recurrence_risk='high').count(), 2)
+
+    def test_filter_rejects_malformed_conditions(self):
+        for filters in [['P1'], 'P1', {'name': 'x'}, {'patient_ids': 'P1'}, {'patient_ids': [{'a': 1}]},
+                        {'next_ct_date': 'x'}, {'next_ct_date': ['2025-01-10']}, {'bclc_stage': {'a': 1}}]:
+            with self.subTest(filters=filters), self.assertRaises(BulkActionError):
+                filter_patients(Patient.objects.all(), filters)
+        self.assertEqual(filter_patients(Patient.objects.all(), {'next_ct_date': '2025-01-10'}).count(), 2)
+
+
+@override_settings(AUDIT_LOG_ASYNC=False)
+class BulkUpdateApiTests(TestCase):
+    def setUp(self):
+        self.doctor = create_doctor()
+        create_doctor('doc2')
+        create_patient('P1', self.doctor, next_ct_date=datetime.date(2025, 1, 10))
+        create_patient('P9', create_doctor('doc3'), next_ct_date=datetime.date(2025, 1, 10))
+        login(self.client)
+
+    def _post(self, payload):
+        return self.client.post(reverse('api_patient_bulk_update'), json.dumps(payload), content_type='application/json')
+
+    def test_only_own_patients_are_updated(self):
+        response = self._post({'action': 'shift_dates', 'days': 3, 'filter': {'next_ct_date': '2025-01-10'}})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['updated'], 1)
+        self.assertEqual(Patient.objects.get(patient_id='P9').next_ct_date, datetime.date(2025, 1, 10))
+
+    def test_malformed_requests_are_client_errors(self):
+        for payload in [
+            {'action': 'shift_dates', 'days': 1, 'filter': ['P1']},
+            {'action': 'shift_dates', 'days': 1, 'filter': {'next_ct_date': 'x'}},
+            {'action': 'shift_dates', 'days': 1, 'filter': {'next_ct_date': [1]}},
+            {'action': 'shift_dates', 'days': 'x'},
+            {'action': 'shift_dates', 'days': 1, 'fields': 5},
+            {'action': 'reassign', 'doctor_id': 'nobody'},
+            {'action': 'set_status', 'field': 'recurrence_risk', 'value': ['high']},
+            {'action': 'drop'},
+        ]:
+            with self.subTest(payload=payload):
+                self.assertEqual(self._post(payload).status_code, 400)
+
+    def test_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self._post({'action': 'shift_dates', 'days': 1}).status_code, 401)
+
+
+@override_settings(AUDIT_LOG_ASYNC=False)
+class AdminBulkActionTests(TestCase):
+    def setUp(self):
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        self.client.force_login(admin_user, backend='django.contrib.auth.backends.ModelBackend')
+        self.patient = create_patient('P1', create_doctor())
+        create_doctor('doc2')
+        self.url = reverse('admin:django_1pj_patient_changelist')
+
+    def test_action_form_does_not_list_doctors(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, 'name="target_doctor"')
+        self.assertNotContains(response, '<select name="target_doctor"')
+
+    def test_reassign_by_doctor_id(self):
+        post = {'action': 'reassign_doctor', '_selected_action': [self.patient.pk], 'index': 0}
+        self.client.post(self.url, dict(post, target_doctor='nobody'))
+        self.assertEqual(Patient.objects.get(pk=self.patient.pk).doctor_id, 'doc1')
+        self.client.post(self.url, dict(post, target_doctor=' doc2 '))
+        self.assertEqual(Patient.objects.get(pk=self.patient.pk).doctor_id, 'doc2')
@@ -0,0 +1,76 @@
+from django.test import TestCase, override_settings
+
+from .. import bulk_actions, cohort
+from ..deletion import soft_delete_patient
+from ..models import CohortSummary, DoctorProfile, Patient
+from .utils import create_doctor, create_patient
+
+
+def summary_rows():
+    """요약 테이블 (환자가 있는 행만) - {(기준, 값): METRICS 값}"""
+    return {
+        (row[0], row[1]): tuple(round(value, 6) for value in row[2:])
+        for row in CohortSummary.objects.filter(patient_count__gt=0).values_list('dimension', 'value', *cohort.METRICS)
+    }
+
+
+@override_settings(AUDIT_LOG_ASYNC=False)
+class CohortDeltaTests(TestCase):
+    def setUp(self):
+        self.doctor = create_doctor()
+        self.other = create_doctor('doc2')
+        create_patient('P1', self.doctor, bclc_stage='A', child_pugh='A', tumor_size=2.0, afp_current=10.0)
+        create_patient('P2', self.doctor, bclc_stage='B', tumor_size=5.5, tumor_count=2, vascular_invasion=True)
+        create_patient('P3', self.other, bclc_stage='A', treatment_type='tace', recurrence_risk='high')
+
+    def assertMatchesRebuild(self):
+        incremental = summary_rows()
+        cohort.rebuild_cohort_summaries()
+        self.assertEqual(incremental, summary_rows())
+
+    def test_create_is_counted(self):
+        rows = summary_rows()
+        self.assertEqual(rows[('bclc_stage', 'A')][:3], (2, 2.0, 1))
+        self.assertEqual(rows[('doctor', 'doc1')][0], 2)
+        self.assertMatchesRebuild()
+
+    def test_save_moves_contribution(self):
+        patient = Patient.objects.get(patient_id='P1')
+        patient.bclc_stage = 'C'
+        patient.tumor_size = 4.0
+        patient.save()
+        rows = summary_rows()
+        self.assertEqual(rows[('bclc_stage', 'A')][:2], (1, 0.0))
+        self.assertEqual(rows[('bclc_stage', 'C')][:2], (1, 4.0))
+        self.assertMatchesRebuild()
+
+    def test_untracked_update_fields_are_skipped(self):
+        before = summary_rows()
+        patient = Patient.objects.get(patient_id='P1')
+        patient.name = '다른 이름'
+        with self.assertNumQueries(1):
+            patient.save(update_fields=['name'])
+        self.assertEqual(before, summary_rows())
+
+    def test_bulk_actions_move_groups(self):
+        bulk_actions.set_status(Patient.objects.filter(bclc_stage='A'), 'recurrence_risk', 'low')
+        bulk_actions.reassign_doctor(Patient.objects.filter(patient_id='P2'), self.other)
+        rows = summary_rows()
+        self.assertEqual(rows[('recurrence_risk', 'low')][0], 2)
+        self.assertEqual(rows[('doctor', 'doc2')][0], 2)
+        self.assertMatchesRebuild()
+
+    def test_soft_delete_and_doctor_delete(self):
+        soft_delete_patient(Patient.objects.get(patient_id='P2'))
+        DoctorProfile.objects.filter(pk='doc2').delete()
+        rows = summary_rows()
+        self.assertNotIn(('bclc_stage', 'B'), rows)
+        self.assertEqual(rows[('doctor', '')][0], 1)
+        self.assertMatchesRebuild()
+
+    def test_dashboard_labels(self):
+        groups = {group['dimension']: group for group in cohort.dashboard_data()['groups']}
+        stage_rows = {row['value']: row for row in groups['bclc_stage']['rows']}
+        self.assertEqual(groups['bclc_stage']['total'], 3)
+        self.assertEqual(stage_rows['A']['label'], 'Stage A (Early)')
+        self.assertEqual(stage_rows['B']['vascular_invasion_rate'], 100.0)
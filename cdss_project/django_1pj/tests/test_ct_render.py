@@ -0,0 +1,81 @@
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from .. import ct_render, ct_volume
+from ..ct_render import RenderError
+from ..models import BackgroundJob, CTStudy
+from .utils import create_doctor, create_patient
+
+
+class WindowTests(TestCase):
+    def test_apply_window(self):
+        hu = np.array([-1000, -20, 60, 140, 3000], dtype=np.int16)
+        self.assertEqual(ct_render.apply_window(hu, 60, 160).tolist(), [0, 0, 128, 255, 255])
+        # int16 이 아닌 입력은 범위를 잘라서 변환
+        wide = np.array([-40000, 40000], dtype=np.int32)
+        self.assertEqual(ct_render.apply_window(wide, 0, 100).tolist(), [0, 255])
+
+    def test_resolve_window(self):
+        self.assertEqual(ct_render.resolve_window(), ('liver', 60, 160))
+        self.assertEqual(ct_render.resolve_window('bone'), ('bone', 400, 1800))
+        self.assertEqual(ct_render.resolve_window(level='50', width='350'), ('L50W350', 50, 350))
+        for kwargs in ({'preset': 'brain'}, {'level': 0, 'width': 0}, {'level': 'a', 'width': 1}):
+            with self.assertRaises(RenderError):
+                ct_render.resolve_window(**kwargs)
+
+
+class RenderCacheTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, ignore_errors=True)
+        settings_override = override_settings(CT_VOLUME_DIR=tmp)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        caches[ct_render.CACHE_ALIAS].clear()
+        self.addCleanup(caches[ct_render.CACHE_ALIAS].clear)
+
+        patient = create_patient('P1', create_doctor())
+        self.study = CTStudy.objects.create(
+            patient=patient, series_instance_uid='1.2.3', slice_count=12, rows=8, columns=6,
+            volume_path='P1/1.2.3.npy', status='ready',
+        )
+        Path(tmp, 'P1').mkdir()
+        volume = np.linspace(-200, 300, 12 * 8 * 6).astype(np.int16).reshape(12, 8, 6)
+        np.save(Path(tmp, self.study.volume_path), volume)
+        self.window = ct_render.resolve_window()
+
+    def test_miss_prefetches_following_slices(self):
+        with mock.patch.object(ct_render, 'encode_image', wraps=ct_render.encode_image) as encode:
+            data, content_type = ct_render.render_slice(self.study, 'axial', 2, self.window)
+            self.assertEqual(encode.call_count, ct_render.PREFETCH_SLICES)
+            self.assertEqual(content_type, 'image/png')
+            self.assertTrue(data.startswith(b'\x89PNG'))
+            # 미리 렌더링된 다음 슬라이스는 캐시에서 응답
+            ct_render.render_slice(self.study, 'axial', 3, self.window)
+            self.assertEqual(encode.call_count, ct_render.PREFETCH_SLICES)
+
+    def test_invalid_requests(self):
+        with self.assertRaises(RenderError):
+            ct_render.render_slice(self.study, 'axial', 12, self.window)
+        with self.assertRaises(RenderError):
+            ct_render.render_slice(self.study, 'axial', 0, self.window, 'gif')
+
+    def test_render_series(self):
+        self.assertEqual(ct_render.render_series(self.study, 'coronal'), 8)
+        version = ct_volume.volume_version(self.study)
+        key = ct_render._cache_key(self.study, version, 'coronal', 7, 'liver', 'png')
+        self.assertIsNotNone(caches[ct_render.CACHE_ALIAS].get(key))
+
+    def test_prerender_is_scheduled_only_for_shared_cache(self):
+        self.assertIsNone(ct_render.schedule_prerender(self.study))
+        with mock.patch.object(ct_render, 'cache_is_shared', return_value=True):
+            job = ct_render.schedule_prerender(self.study)
+            self.assertEqual(ct_render.schedule_prerender(self.study).pk, job.pk)
+        self.assertEqual((job.name, job.args), ('ct_studies.prerender', [self.study.pk, 'axial', None]))
+        self.assertEqual(BackgroundJob.objects.count(), 1)
@@ -0,0 +1,164 @@
+import hashlib
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+import numpy as np
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from .. import ct_upload, tasks
+from ..ct_upload import UploadError
+from ..models import BackgroundJob, CTUploadSession, Patient
+from .utils import create_doctor, create_patient, login
+
+
+def _png_bytes(size=400):
+    # 압축되지 않는 잡음 이미지 - 최소 청크 크기보다 커서 여러 청크로 나뉨
+    pixels = np.random.default_rng(0).integers(0, 256, (size, size, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+@override_settings(AUDIT_LOG_ASYNC=False)
+class ChunkedUploadTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.data = _png_bytes()
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        settings_override = override_settings(CT_UPLOAD_TEMP_DIR=f'{self.tmp}/upload', MEDIA_ROOT=f'{self.tmp}/media')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.doctor = create_doctor()
+        self.patient = create_patient('P1', self.doctor)
+        self.chunk_size = ct_upload.MIN_CHUNK_SIZE
+
+    def _start(self, checksum=''):
+        return ct_upload.start_upload(
+            self.patient, self.doctor, 'scan.png', len(self.data), self.chunk_size, checksum,
+        )
+
+    def _chunk(self, index):
+        return self.data[index * self.chunk_size:(index + 1) * self.chunk_size]
+
+    def _write(self, session, index, body=None):
+        body = self._chunk(index) if body is None else body
+        return ct_upload.write_chunk(session, index, io.BytesIO(body), len(body), _sha256(body))
+
+    def _write_all(self, session):
+        for index in range(session.total_chunks):
+            self._write(session, index)
+
+    def test_upload_via_api(self):
+        login(self.client)
+        response = self.client.post(
+            reverse('api_ct_upload_start', args=['P1']),
+            {'filename': 'scan.png', 'size': len(self.data), 'chunk_size': self.chunk_size,
+             'checksum': _sha256(self.data)},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+        state = response.json()
+        self.assertGreater(state['total_chunks'], 1)
+
+        for index in state['missing_chunks']:
+            body = self._chunk(index)
+            response = self.client.generic(
+                'PUT', reverse('api_ct_upload_chunk', args=[state['upload_id'], index]), body,
+                content_type='application/octet-stream', HTTP_X_CHUNK_SHA256=_sha256(body),
+            )
+            self.assertEqual(response.status_code, 200)
+
+        response = self.client.post(reverse('api_ct_upload_complete', args=[state['upload_id']]))
+        self.assertEqual(response.status_code, 200)
+        patient = Patient.objects.get(pk=self.patient.pk)
+        with patient.ct_image.open('rb') as f:
+            self.assertEqual(f.read(), self.data)
+        self.assertEqual(CTUploadSession.objects.get().status, 'completed')
+
+    def test_bad_chunk_is_rejected(self):
+        session = self._start()
+        body = self._chunk(0)
+        with self.assertRaises(UploadError) as cm:
+            ct_upload.write_chunk(session, 0, io.BytesIO(body), len(body), '0' * 64)
+        self.assertEqual(cm.exception.status, 422)
+        self.assertEqual(ct_upload.received_chunks(session), [])
+        # 이미지가 아닌 첫 청크는 바로 거절
+        with self.assertRaises(UploadError):
+            self._write(session, 0, b'x' * self.chunk_size)
+
+    def test_concurrent_chunk_writes_use_separate_temp_files(self):
+        session = self._start()
+        temp_paths = []
+        real_replace = ct_upload.os.replace
+
+        def record_replace(src, dst):
+            temp_paths.append(src)
+            real_replace(src, dst)
+
+        with mock.patch.object(ct_upload.os, 'replace', side_effect=record_replace):
+            self._write(session, 1)
+            self._write(session, 1)
+        self.assertEqual(len(set(temp_paths)), 2)
+        self.assertEqual(ct_upload.received_chunks(session), [1])
+
+    def test_second_completion_is_rejected(self):
+        session = self._start()
+        self._write_all(session)
+        stale_copy = CTUploadSession.objects.get(pk=session.pk)
+
+        ct_upload.complete_upload(session, 'doc1')
+        with self.assertRaises(UploadError) as cm:
+            ct_upload.complete_upload(stale_copy, 'doc1')
+        self.assertEqual(cm.exception.status, 409)
+        self.assertEqual(CTUploadSession.objects.get(pk=session.pk).status, 'completed')
+
+    def test_failed_completion_can_be_retried(self):
+        session = self._start(checksum='0' * 64)
+        self._write_all(session)
+        with self.assertRaises(UploadError):
+            ct_upload.complete_upload(session, 'doc1')
+        self.assertEqual(CTUploadSession.objects.get(pk=session.pk).status, 'uploading')
+        self.assertEqual(session.status, 'uploading')
+
+    def test_abort_during_completion_is_rejected(self):
+        session = self._start()
+        CTUploadSession.objects.filter(pk=session.pk).update(status='completing')
+        with self.assertRaises(UploadError) as cm:
+            ct_upload.abort_upload(session)
+        self.assertEqual(cm.exception.status, 409)
+
+    def test_cleanup_job_reschedules_itself(self):
+        stale = self._start()
+        fresh = self._start()
+        self._write(stale, 0)
+        old = timezone.now() - timedelta(hours=ct_upload.UPLOAD_EXPIRE_HOURS + 1)
+        CTUploadSession.objects.filter(pk=stale.pk).update(updated_at=old)
+
+        result = tasks.cleanup_stale_uploads_job()
+        self.assertEqual(result['aborted'], 1)
+        self.assertFalse(ct_upload.session_dir(stale).exists())
+        self.assertEqual(CTUploadSession.objects.get(pk=fresh.pk).status, 'uploading')
+
+        # 남은 세션이 만료되는 시점에 다시 정리
+        job = BackgroundJob.objects.get(name='ct_uploads.cleanup', status='pending')
+        expires_at = CTUploadSession.objects.get(pk=fresh.pk).updated_at + timedelta(hours=ct_upload.UPLOAD_EXPIRE_HOURS)
+        self.assertAlmostEqual(job.run_at.timestamp(), expires_at.timestamp(), delta=5)
+
+        CTUploadSession.objects.filter(pk=fresh.pk).update(status='completed')
+        BackgroundJob.objects.all().delete()
+        self.assertIsNone(tasks.cleanup_stale_uploads_job()['next_delay'])
+        self.assertFalse(BackgroundJob.objects.exists())
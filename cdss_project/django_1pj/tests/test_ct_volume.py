@@ -0,0 +1,110 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from django.test import TestCase, override_settings
+from pydicom.dataset import Dataset, FileMetaDataset
+from pydicom.uid import CTImageStorage, ExplicitVRLittleEndian, generate_uid
+
+from .. import ct_volume
+from ..ct_volume import VolumeError
+from ..models import CTStudy
+from .utils import create_doctor, create_patient
+
+
+SERIES_UID = '1.2.826.0.1.3680043.8.498.1'
+
+
+def write_series(directory, volume, series_uid=SERIES_UID, slope=1.0, intercept=-1024.0):
+    """volume (slices, rows, columns) 의 저장값으로 DICOM 시리즈 생성 - 파일 순서는 위치와 반대"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    slices, rows, columns = volume.shape
+    for index in range(slices):
+        meta = FileMetaDataset()
+        meta.MediaStorageSOPClassUID = CTImageStorage
+        meta.MediaStorageSOPInstanceUID = generate_uid()
+        meta.TransferSyntaxUID = ExplicitVRLittleEndian
+
+        ds = Dataset()
+        ds.file_meta = meta
+        ds.SOPClassUID = CTImageStorage
+        ds.SOPInstanceUID = meta.MediaStorageSOPInstanceUID
+        ds.StudyInstanceUID = '1.2.826.0.1.3680043.8.498.2'
+        ds.SeriesInstanceUID = series_uid
+        ds.Modality = 'CT'
+        ds.StudyDate = '20250102'
+        ds.ImagePositionPatient = [0.0, 0.0, 2.5 * index]
+        ds.ImageOrientationPatient = [1, 0, 0, 0, 1, 0]
+        ds.PixelSpacing = [0.7, 0.7]
+        ds.Rows, ds.Columns = rows, columns
+        ds.SamplesPerPixel = 1
+        ds.PhotometricInterpretation = 'MONOCHROME2'
+        ds.BitsAllocated, ds.BitsStored, ds.HighBit = 16, 16, 15
+        ds.PixelRepresentation = 0
+        ds.RescaleSlope, ds.RescaleIntercept = slope, intercept
+        ds.PixelData = volume[index].astype(np.uint16).tobytes()
+        ds.save_as(directory / f'{slices - index:03d}.dcm', enforce_file_format=True)
+
+
+class CTVolumeTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        settings_override = override_settings(CT_VOLUME_DIR=f'{self.tmp}/volumes')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.patient = create_patient('P1', create_doctor())
+        self.stored = np.arange(4 * 6 * 5, dtype=np.uint16).reshape(4, 6, 5) + 1000
+        write_series(f'{self.tmp}/dicom', self.stored)
+
+    def _ingest(self, patient=None):
+        return ct_volume.ingest_dicom_series(patient or self.patient, f'{self.tmp}/dicom')
+
+    def test_ingest_sorts_slices_and_converts_to_hu(self):
+        study = self._ingest()
+        self.assertEqual((study.status, study.slice_count, study.rows, study.columns), ('ready', 4, 6, 5))
+        self.assertEqual(study.slice_spacing, 2.5)
+        volume = ct_volume.open_volume(study)
+        self.assertIsInstance(volume, np.memmap)
+        np.testing.assert_array_equal(volume, self.stored.astype(np.int16) - 1024)
+
+    def test_planes_are_views(self):
+        study = self._ingest()
+        volume = ct_volume.open_volume(study)
+        axial = ct_volume.get_slice(study, 'axial', 1)
+        coronal = ct_volume.get_slice(study, 'coronal', 2)
+        sagittal = ct_volume.get_slice(study, 'sagittal', 3)
+        self.assertEqual((axial.shape, coronal.shape, sagittal.shape), ((6, 5), (4, 5), (4, 6)))
+        for view in (axial, coronal, sagittal):
+            self.assertTrue(np.shares_memory(view, volume))
+        # coronal/sagittal 은 위쪽이 머리 방향
+        np.testing.assert_array_equal(coronal[0], volume[-1, 2, :])
+        self.assertEqual(ct_volume.get_region(study, z=(1, 3), x=(0, 2)).shape, (2, 6, 2))
+        with self.assertRaises(VolumeError):
+            ct_volume.get_slice(study, 'axial', 4)
+        with self.assertRaises(VolumeError):
+            ct_volume.get_slice(study, 'oblique', 0)
+
+    def test_reingest_remaps_new_file(self):
+        study = self._ingest()
+        self.assertIs(ct_volume.open_volume(study), ct_volume.open_volume(study))
+        write_series(f'{self.tmp}/dicom', self.stored, intercept=0)
+        study = self._ingest()
+        self.assertEqual(CTStudy.objects.count(), 1)
+        self.assertEqual(int(ct_volume.open_volume(study)[0, 0, 0]), 1000)
+
+    def test_series_of_other_patient_is_not_moved(self):
+        study = self._ingest()
+        other = create_patient('P2', create_doctor('doc2'))
+        with self.assertRaises(VolumeError):
+            self._ingest(other)
+        study.refresh_from_db()
+        self.assertEqual((study.patient_id, study.status), (self.patient.pk, 'ready'))
+
+    def test_missing_series(self):
+        with self.assertRaises(VolumeError):
+            ct_volume.ingest_dicom_series(self.patient, f'{self.tmp}/dicom', series_uid='1.2.3')
+        with self.assertRaises(VolumeError):
+            ct_volume.ingest_dicom_series(self.patient, f'{self.tmp}/empty')
@@ -0,0 +1,98 @@
+import datetime
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..archive import archive_patients
+from ..deletion import purge_patient, soft_delete_patients
+from ..models import ArchivedPatient, CTStudy, DrugInteraction, LabResult, Patient, TumorSuggestion
+from .utils import create_doctor, create_patient
+
+
+@override_settings(AUDIT_LOG_ASYNC=False)
+class SoftDeleteTests(TestCase):
+    def setUp(self):
+        self.doctor = create_doctor()
+        self.patient = create_patient('P1', self.doctor, tumor_size=2.0, tumor_count=1)
+        DrugInteraction.objects.create(
+            patient=self.patient, drug_name='약', risk_level='high', side_effect='부작용',
+            probability=90, color_code='red', action_plan='', monitoring='',
+        )
+        LabResult.objects.create(patient=self.patient, analyte='afp', measured_on=datetime.date(2024, 1, 1), value=10)
+        self.suggestion = TumorSuggestion.objects.create(
+            patient=self.patient, source='ct_image', model_name='real-model',
+            tumor_size=3.0, tumor_count=1, confidence=0.9,
+        )
+
+    def test_deleted_patient_is_hidden(self):
+        self.assertEqual(soft_delete_patients(Patient.objects.filter(pk=self.patient.pk)), [self.patient.pk])
+        self.assertFalse(Patient.objects.filter(pk=self.patient.pk).exists())
+        self.assertTrue(Patient.all_objects.filter(pk=self.patient.pk, deleted_at__isnull=False).exists())
+
+        self.client.post(reverse('doctor_login'), {'doctor_id': 'doc1', 'password': 'pw'})
+        self.assertEqual(self.client.get(reverse('api_patient_detail', args=['P1'])).status_code, 404)
+        response = self.client.post(
+            reverse('api_tumor_suggestion_review', args=[self.suggestion.pk]),
+            {'decision': 'accept'}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(Patient.all_objects.get(pk=self.patient.pk).tumor_size, 2.0)
+
+    def test_admin_hides_rows_of_deleted_patient(self):
+        other = create_patient('P2', self.doctor)
+        LabResult.objects.create(patient=other, analyte='afp', measured_on=datetime.date(2024, 1, 1), value=20)
+        CTStudy.objects.create(patient=self.patient, series_instance_uid='1.2.3', status='ready')
+        soft_delete_patients(Patient.objects.filter(pk=self.patient.pk))
+
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        self.client.force_login(admin, backend='django.contrib.auth.backends.ModelBackend')
+        for model in ['druginteraction', 'labresult', 'ctstudy', 'tumorsuggestion']:
+            with self.subTest(model=model):
+                response = self.client.get(reverse(f'admin:django_1pj_{model}_changelist'))
+                self.assertEqual(response.status_code, 200)
+                patients = {row.patient_id for row in response.context['cl'].result_list}
+                self.assertNotIn(self.patient.pk, patients)
+        response = self.client.get(reverse('admin:django_1pj_labresult_changelist'))
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+    def test_purge_removes_patient_and_related_rows(self):
+        soft_delete_patients(Patient.objects.filter(pk=self.patient.pk))
+        counts = purge_patient(self.patient.pk)
+        self.assertEqual(counts['django_1pj.Patient'], 1)
+        self.assertEqual(counts['django_1pj.DrugInteraction'], 1)
+        self.assertFalse(Patient.all_objects.filter(pk=self.patient.pk).exists())
+        self.assertFalse(DrugInteraction.objects.filter(patient_id=self.patient.pk).exists())
+        self.assertFalse(LabResult.objects.filter(patient_id=self.patient.pk).exists())
+        self.assertFalse(TumorSuggestion.objects.filter(patient_id=self.patient.pk).exists())
+
+    def test_purge_ignores_active_patient(self):
+        self.assertIsNone(purge_patient(self.patient.pk))
+        self.assertTrue(Patient.objects.filter(pk=self.patient.pk).exists())
+
+    def test_purge_keeps_image_shared_with_archived_patient(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        image = default_storage.save('ct_images/shared.png', ContentFile(b'png'))
+        Patient.objects.filter(pk=self.patient.pk).update(ct_image=image)
+        archived = create_patient('P2', self.doctor, ct_image=image)
+        archive_patients(Patient.objects.filter(pk=archived.pk), reason='manual')
+
+        soft_delete_patients(Patient.objects.filter(pk=self.patient.pk))
+        purge_patient(self.patient.pk)
+        self.assertTrue(default_storage.exists(image))
+
+        # 참조가 모두 없어지면 삭제
+        third = create_patient('P3', self.doctor, ct_image=image)
+        ArchivedPatient.objects.all().delete()
+        soft_delete_patients(Patient.objects.filter(pk=third.pk))
+        purge_patient(third.pk)
+        self.assertFalse(default_storage.exists(image))
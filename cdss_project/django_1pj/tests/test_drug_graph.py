@@ -0,0 +1,79 @@
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from ..drug_graph import DrugInteractionGraph, check_drug_names, check_regimen
+from ..models import Drug, DrugInteraction, PatientRiskSummary
+from .utils import create_doctor, create_patient, login
+
+
+DRUGS = [
+    ('SORA', '소라페닙', 'Sorafenib', 'LENVA | 주의 | CYP3A4 억제\nWARF | 금기 | 출혈 위험 증가'),
+    ('LENVA', '렌바티닙', 'Lenvatinib', ''),
+    ('WARF', '와파린', 'Warfarin', 'Lenvatinib 병용 시 중대한 출혈 가능'),
+    ('APAP', '아세트아미노펜', 'Acetaminophen', ''),
+]
+
+
+class DrugInteractionGraphTests(SimpleTestCase):
+    def setUp(self):
+        self.graph = DrugInteractionGraph(DRUGS)
+
+    def test_pipe_format(self):
+        edge = self.graph.check_pair('LENVA', 'SORA')
+        self.assertEqual((edge.severity, edge.mechanism), ('moderate', 'CYP3A4 억제'))
+        self.assertIs(self.graph.check_pair('SORA', 'LENVA'), edge)
+
+    def test_free_text_finds_mentions(self):
+        self.assertEqual(self.graph.check_pair('WARF', 'LENVA').severity, 'major')
+        self.assertIsNone(self.graph.check_pair('APAP', 'SORA'))
+
+    def test_regimen_sorted_by_severity(self):
+        conflicts = self.graph.check_regimen(['LENVA', 'SORA', 'WARF', 'APAP', 'SORA'])
+        self.assertEqual([edge.severity for edge in conflicts], ['contraindicated', 'major', 'moderate'])
+
+    def test_resolve_names(self):
+        self.assertEqual(self.graph.resolve_names(['소라페닙', ' warfarin ', '모름', '']), ['SORA', 'WARF'])
+
+
+def create_drugs():
+    for code, name_kr, name_en, interactions in DRUGS:
+        Drug.objects.create(drug_code=code, drug_name_kr=name_kr, drug_name_en=name_en,
+                            drug_category='항암제', interactions=interactions)
+
+
+@override_settings(AUDIT_LOG_ASYNC=False)
+class RegimenCheckTests(TestCase):
+    def setUp(self):
+        create_drugs()
+        self.patient = create_patient('P1', create_doctor())
+
+    def test_check_regimen_reads_database(self):
+        self.assertEqual([c['drug_b_name'] for c in check_regimen(['SORA', 'WARF'])], ['와파린'])
+        self.assertEqual(check_drug_names(['소라페닙', '렌바티닙'])[0]['severity_label'], '주의')
+
+    def test_api(self):
+        login(self.client)
+        response = self.client.get(reverse('api_drug_regimen_check'), {'codes': 'SORA,WARF'})
+        self.assertEqual(response.json()['conflicts'][0]['severity'], 'contraindicated')
+        self.assertEqual(self.client.get(reverse('api_drug_regimen_check')).status_code, 400)
+
+    def _add(self, drug_name):
+        DrugInteraction.objects.create(patient=self.patient, drug_name=drug_name, risk_level='low',
+                                       side_effect='x', probability=5, color_code='green')
+
+    def test_risk_summary_counts_conflicts(self):
+        self._add('소라페닙')
+        summary = PatientRiskSummary.objects.get(patient=self.patient)
+        self.assertEqual(summary.regimen_conflict_count, 0)
+        self._add('와파린')
+        self._add('렌바티닙')
+        summary.refresh_from_db()
+        self.assertEqual((summary.regimen_conflict_count, summary.regimen_top_severity), (3, 'contraindicated'))
+
+    def test_patient_detail_shows_conflicts(self):
+        self._add('소라페닙')
+        self._add('와파린')
+        login(self.client)
+        response = self.client.get(reverse('patient_detail', args=['P1']))
+        self.assertEqual(len(response.context['regimen_conflicts']), 1)
+        self.assertContains(response, '소라페닙 + 와파린 (병용금기)')
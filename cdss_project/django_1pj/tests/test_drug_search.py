@@ -0,0 +1,77 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from .. import drug_search
+from ..drug_search import DrugSearchIndex, search_drugs, tokenize
+from ..models import Drug
+from .. import versions
+
+
+class TokenizeTests(SimpleTestCase):
+    def test_hangul_bigrams_and_words(self):
+        self.assertEqual(tokenize('간성뇌증 Hand-Foot 5mg'), ['간성', '성뇌', '뇌증', 'hand', 'foot', '5mg'])
+        self.assertEqual(tokenize('간'), ['간'])
+        self.assertEqual(tokenize(None), [])
+
+    def test_particles_still_match(self):
+        index = DrugSearchIndex()
+        index.add_document('A', {'drug_name_kr': '가', 'precautions': '간성뇌증 환자에게 주의'})
+        index.add_document('B', {'drug_name_kr': '나', 'precautions': '신장 기능 저하'})
+        self.assertEqual([r['drug_code'] for r in index.search('간성뇌증이')], ['A'])
+        self.assertEqual(index.search('간성뇌증')[0]['matched_fields'], ['precautions'])
+
+    def test_replace_and_remove_keep_stats_consistent(self):
+        index = DrugSearchIndex()
+        index.add_document('A', {'efficacy': '간암 치료'})
+        index.add_document('A', {'efficacy': '신장암 치료'})
+        self.assertEqual(index.search('간암'), [])
+        index.remove_document('A')
+        self.assertEqual((len(index), index.postings, index.total_length), (0, {}, 0))
+
+
+def create_drug(code, name, **fields):
+    return Drug.objects.create(drug_code=code, drug_name_kr=name, drug_category='항암제', **fields)
+
+
+class SearchIndexSyncTests(TestCase):
+    def setUp(self):
+        # 테스트마다 DB 가 롤백되므로 프로세스 캐시도 초기화
+        drug_search._index = None
+        versions._checked.clear()
+        self.addCleanup(setattr, drug_search, '_index', None)
+        create_drug('SORA', '소라페닙', efficacy='간세포암 치료')
+        create_drug('LENVA', '렌바티닙', efficacy='갑상선암 치료')
+
+    def _bump(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            versions.bump(versions.DRUGS)
+
+    def test_search_ranks_matches(self):
+        self.assertEqual([r['drug_code'] for r in search_drugs('간세포암')], ['SORA'])
+
+    def test_other_process_changes_are_synced_without_full_rebuild(self):
+        search_drugs('간세포암')
+        # 다른 프로세스의 저장/삭제: 시그널 없이 DB 만 변경 + 공유 버전 증가
+        Drug.objects.filter(pk='LENVA').update(efficacy='간세포암 1차 치료', updated_at=timezone.now())
+        Drug.objects.filter(pk='SORA').delete()
+        self._bump()
+        with mock.patch.object(drug_search, 'build_search_index', wraps=drug_search.build_search_index) as build:
+            self.assertEqual([r['drug_code'] for r in search_drugs('간세포암')], ['LENVA'])
+        build.assert_not_called()
+
+    def test_local_save_updates_index_without_full_rebuild(self):
+        search_drugs('간세포암')
+        with mock.patch.object(drug_search, 'build_search_index', wraps=drug_search.build_search_index) as build:
+            with self.captureOnCommitCallbacks(execute=True):
+                create_drug('ATEZO', '아테졸리주맙', efficacy='간세포암 병용 요법')
+            codes = {r['drug_code'] for r in search_drugs('간세포암')}
+        self.assertEqual(codes, {'SORA', 'ATEZO'})
+        build.assert_not_called()
+
+    def test_rolled_back_save_is_not_indexed(self):
+        search_drugs('간세포암')
+        with self.captureOnCommitCallbacks(execute=False):
+            create_drug('ATEZO', '아테졸리주맙', efficacy='간세포암 병용 요법')
+        self.assertEqual([r['drug_code'] for r in search_drugs('간세포암')], ['SORA'])
@@ -0,0 +1,80 @@
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from .. import drug_typeahead, versions
+from ..drug_typeahead import TOP_K, DrugTypeahead, decompose, initials, is_initials_query, suggest_drugs
+from ..models import Drug
+from .utils import create_doctor, login
+
+
+DRUGS = [
+    ('SORA', '소라페닙', 'Sorafenib'),
+    ('SORA2', '소라페닙정200', 'Sorafenib 200mg'),
+    ('LENVA', '렌바티닙', 'Lenvatinib'),
+    ('REGO', '레고라페닙', 'Regorafenib'),
+]
+
+
+def codes(results):
+    return [result['drug_code'] for result in results]
+
+
+class JamoTests(SimpleTestCase):
+    def test_decompose(self):
+        self.assertEqual(decompose('간 암'), 'ㄱㅏㄴㅇㅏㅁ')
+        self.assertEqual(decompose('Sora'), 'sora')
+
+    def test_initials(self):
+        self.assertEqual(initials('소라페닙 200'), 'ㅅㄹㅍㄴ200')
+        self.assertTrue(is_initials_query('ㅅㄹ ㅍ'))
+        self.assertFalse(is_initials_query('ㅅ라'))
+
+
+class DrugTypeaheadTests(SimpleTestCase):
+    def setUp(self):
+        self.typeahead = DrugTypeahead(DRUGS)
+
+    def test_partial_syllable_matches(self):
+        # 마지막 글자를 입력 중인 상태 ("소랖" = 소라 + ㅍ)
+        self.assertEqual(codes(self.typeahead.suggest('소랖')), ['SORA', 'SORA2'])
+
+    def test_initials_query(self):
+        self.assertEqual(codes(self.typeahead.suggest('ㅅㄹㅍ')), ['SORA', 'SORA2'])
+        self.assertEqual(codes(self.typeahead.suggest('ㄹㄱ')), ['REGO'])
+
+    def test_english_and_code(self):
+        self.assertEqual(codes(self.typeahead.suggest('SORAF')), ['SORA', 'SORA2'])
+        self.assertEqual(codes(self.typeahead.suggest('len')), ['LENVA'])
+        self.assertEqual(codes(self.typeahead.suggest('rego')), ['REGO'])
+
+    def test_limit_and_empty(self):
+        self.assertEqual(len(self.typeahead.suggest('소', limit=1)), 1)
+        self.assertEqual(self.typeahead.suggest('  '), [])
+        self.assertEqual(self.typeahead.suggest('없는약'), [])
+
+    def test_top_k_keeps_shortest(self):
+        typeahead = DrugTypeahead([(f'D{i:02d}', '가' * (i + 1), '') for i in range(TOP_K + 5)])
+        self.assertEqual(codes(typeahead.suggest('가', limit=TOP_K + 5)), [f'D{i:02d}' for i in range(TOP_K)])
+
+
+class TypeaheadCacheTests(TestCase):
+    def setUp(self):
+        drug_typeahead._typeahead = None
+        versions._checked.clear()
+        self.addCleanup(setattr, drug_typeahead, '_typeahead', None)
+        Drug.objects.create(drug_code='SORA', drug_name_kr='소라페닙', drug_category='항암제')
+
+    def test_rebuilds_when_shared_version_changes(self):
+        self.assertEqual(codes(suggest_drugs('ㄹㅂ')), [])
+        # 다른 프로세스의 변경 (시그널 없이 DB 변경 + 공유 버전 증가)
+        Drug.objects.bulk_create([Drug(drug_code='LENVA', drug_name_kr='렌바티닙', drug_category='항암제')])
+        with self.captureOnCommitCallbacks(execute=True):
+            versions.bump(versions.DRUGS)
+        self.assertEqual(codes(suggest_drugs('ㄹㅂ')), ['LENVA'])
+
+    def test_api(self):
+        create_doctor()
+        login(self.client)
+        response = self.client.get(reverse('api_drug_autocomplete'), {'q': 'ㅅㄹ'})
+        self.assertEqual(codes(response.json()['results']), ['SORA'])
+        self.assertEqual(self.client.get(reverse('api_drug_autocomplete'), {'limit': 'x'}).status_code, 400)
@@ -0,0 +1,63 @@
+import datetime
+from itertools import product
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from .. import guidelines, tasks
+from ..guidelines import EVALUATION_COLUMNS, OUTCOMES, evaluate, evaluate_patient, evaluate_rows
+from ..models import BackgroundJob, Patient
+from .utils import create_patient
+
+
+class GuidelineTests(SimpleTestCase):
+    def test_batch_matches_single_evaluation(self):
+        stages = [None, '', '0', 'A', 'B', 'C', 'D', 'X']
+        child_pughs = [None, 'A', 'B', 'C']
+        tumors = [(None, None), (1.5, 1), (4.0, 1), (6.0, 1), (2.5, 3), (3.0, 4), (5.0, 5), (2.0, 0), (3.0, None)]
+        vascular = [False, True]
+        rows = [
+            (stage, child_pugh, size, count, invasion)
+            for stage, child_pugh, (size, count), invasion in product(stages, child_pughs, tumors, vascular)
+        ]
+        self.assertEqual(len(rows[0]), len(EVALUATION_COLUMNS))
+        batch = evaluate_rows(rows)
+        for row, outcome_id in zip(rows, batch.tolist()):
+            self.assertIs(OUTCOMES[outcome_id], evaluate(*row), row)
+
+    def test_missing_child_pugh_has_no_recommendation(self):
+        outcome = evaluate('A', None, 1.5, 1, False)
+        self.assertTrue(outcome['provisional'])
+        self.assertTrue(outcome['options'])
+        self.assertEqual({option['strength'] for option in outcome['options']}, {'alternative'})
+
+    def test_missing_child_pugh_is_not_discordant(self):
+        patient = Patient(bclc_stage='C', child_pugh=None, tumor_size=3, tumor_count=2,
+                          vascular_invasion=True, treatment_type='tace')
+        self.assertIsNone(evaluate_patient(patient)['current'])
+        patient.child_pugh = 'A'
+        self.assertIsNotNone(evaluate_patient(patient)['current'])
+
+
+@override_settings(AUDIT_LOG_ASYNC=False)
+class GuidelineEvaluationJobTests(TestCase):
+    def test_schedule_is_nightly_and_deduplicated(self):
+        first = guidelines.schedule_evaluation()
+        second = guidelines.schedule_evaluation()
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(first.name, guidelines.EVALUATION_JOB)
+        self.assertEqual(first.run_at.hour, guidelines.NIGHTLY_EVALUATION_HOUR)
+        self.assertGreater(first.run_at, datetime.datetime.now())
+
+    def test_job_counts_discordant_and_reschedules(self):
+        create_patient('P1', bclc_stage='C', child_pugh='A', tumor_size=3, tumor_count=2,
+                       vascular_invasion=True, treatment_type='resection')
+        create_patient('P2', bclc_stage='A', child_pugh=None, tumor_size=1.5, tumor_count=1)
+
+        summary = tasks.evaluate_guidelines_job()
+        self.assertEqual(summary['patients'], 2)
+        self.assertEqual(summary['discordant'], ['P1'])
+        self.assertEqual(summary['discordant_count'], 1)
+
+        job = BackgroundJob.objects.get(name=guidelines.EVALUATION_JOB, status='pending')
+        self.assertEqual(job.dedup_key, f'{guidelines.EVALUATION_JOB}:nightly')
+        self.assertEqual(job.run_at.hour, guidelines.NIGHTLY_EVALUATION_HOUR)
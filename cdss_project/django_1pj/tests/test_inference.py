@@ -0,0 +1,129 @@
+import time
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from ..inference import MODEL_INPUT_SIZE, DummyTumorModel, InferenceError, MicroBatcher, review_suggestion
+from ..models import TumorSuggestion
+from .utils import create_doctor, create_patient, login
+
+
+class RecordingModel(DummyTumorModel):
+    """배치 크기를 기록하는 테스트 모델"""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict_batch(self, images):
+        self.batch_sizes.append(images.shape[0])
+        return super().predict_batch(images)
+
+
+class MicroBatcherTests(SimpleTestCase):
+    def setUp(self):
+        self.model = RecordingModel()
+        self.model.load()
+        self.image = np.zeros((MODEL_INPUT_SIZE, MODEL_INPUT_SIZE), dtype=np.float32)
+
+    def test_concurrent_requests_share_a_batch(self):
+        batcher = MicroBatcher(self.model, max_batch_size=16, max_latency_ms=500, workers=1)
+        try:
+            results = batcher.predict([self.image] * 8, timeout=5)
+        finally:
+            batcher.close()
+        self.assertEqual(len(results), 8)
+        self.assertEqual(self.model.batch_sizes, [8])
+
+    def test_batch_size_is_capped(self):
+        batcher = MicroBatcher(self.model, max_batch_size=4, max_latency_ms=500, workers=1)
+        try:
+            batcher.predict([self.image] * 10, timeout=5)
+        finally:
+            batcher.close()
+        self.assertEqual(sum(self.model.batch_sizes), 10)
+        self.assertLessEqual(max(self.model.batch_sizes), 4)
+
+    def test_single_request_waits_at_most_the_latency_bound(self):
+        batcher = MicroBatcher(self.model, max_batch_size=16, max_latency_ms=50, workers=1)
+        try:
+            started = time.monotonic()
+            batcher.predict([self.image], timeout=5)
+            elapsed = time.monotonic() - started
+        finally:
+            batcher.close()
+        self.assertEqual(self.model.batch_sizes, [1])
+        # 배치가 차지 않아도 max_latency 뒤에 실행 (여유 시간 포함)
+        self.assertLess(elapsed, 1.0)
+
+    def test_model_error_fails_every_request_in_the_batch(self):
+        class FailingModel(DummyTumorModel):
+            def predict_batch(self, images):
+                raise RuntimeError('boom')
+
+        batcher = MicroBatcher(FailingModel(), max_batch_size=4, max_latency_ms=200, workers=1)
+        try:
+            futures = [batcher.submit(self.image) for _ in range(3)]
+            for future in futures:
+                with self.assertRaises(RuntimeError):
+                    future.result(timeout=5)
+        finally:
+            batcher.close()
+
+    def test_close_stops_every_worker(self):
+        batcher = MicroBatcher(self.model, workers=3)
+        started = time.monotonic()
+        batcher.close()
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertFalse(any(thread.is_alive() for thread in batcher._threads))
+
+    def test_dummy_model_marks_bright_region(self):
+        image = self.image.copy()
+        image[100:120, 100:120] = 1.0
+        result = self.model.predict_batch(image[None])[0]
+        self.assertEqual(result['count'], 1)
+        self.assertAlmostEqual(result['diameter_px'], 2 * np.sqrt(400 / np.pi), places=3)
+
+
+@override_settings(AUDIT_LOG_ASYNC=False)
+class ReviewSuggestionTests(TestCase):
+    def setUp(self):
+        self.doctor = create_doctor()
+        self.patient = create_patient('P1', self.doctor, tumor_size=2.0, tumor_count=1)
+
+    def _suggestion(self, model_name='real-model'):
+        return TumorSuggestion.objects.create(
+            patient=self.patient, source='ct_image', model_name=model_name,
+            tumor_size=3.5, tumor_count=2, confidence=0.9,
+        )
+
+    def test_accept_applies_to_patient(self):
+        suggestion = self._suggestion()
+        self.assertEqual(sorted(review_suggestion(suggestion, self.doctor, accept=True)), ['tumor_count', 'tumor_size'])
+        self.patient.refresh_from_db()
+        self.assertEqual((self.patient.tumor_size, self.patient.tumor_count), (3.5, 2))
+        suggestion.refresh_from_db()
+        self.assertEqual(suggestion.status, 'accepted')
+
+        with self.assertRaises(InferenceError):
+            review_suggestion(suggestion, self.doctor, accept=False)
+
+    def test_dummy_model_result_cannot_be_accepted(self):
+        suggestion = self._suggestion(model_name=DummyTumorModel.name)
+        with self.assertRaises(InferenceError):
+            review_suggestion(suggestion, self.doctor, accept=True)
+        self.patient.refresh_from_db()
+        self.assertEqual(self.patient.tumor_size, 2.0)
+
+    def test_review_api_reject(self):
+        suggestion = self._suggestion()
+        login(self.client)
+        response = self.client.post(
+            reverse('api_tumor_suggestion_review', args=[suggestion.pk]),
+            {'decision': 'reject'}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        suggestion.refresh_from_db()
+        self.assertEqual(suggestion.status, 'rejected')
+        self.patient.refresh_from_db()
+        self.assertEqual(self.patient.tumor_size, 2.0)
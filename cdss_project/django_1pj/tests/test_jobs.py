@@ -0,0 +1,115 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from .. import jobs
+from ..models import BackgroundJob
+
+
+calls = []
+
+
+@jobs.register('tests.record')
+def _record(value):
+    calls.append(value)
+    return {'value': value}
+
+
+@jobs.register('tests.fail')
+def _fail():
+    raise RuntimeError('boom')
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_unknown_job_is_rejected(self):
+        with self.assertRaises(jobs.JobError):
+            jobs.enqueue('tests.unknown')
+
+    def test_dedup_keeps_one_pending_job_and_raises_priority(self):
+        first = jobs.enqueue('tests.record', args=[1], dedup_key='k')
+        second = jobs.enqueue('tests.record', args=[2], priority=5, dedup_key='k')
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(BackgroundJob.objects.get().priority, 5)
+
+    def test_claim_order(self):
+        low = jobs.enqueue('tests.record', args=[1])
+        high = jobs.enqueue('tests.record', args=[2], priority=10)
+        jobs.enqueue('tests.record', args=[3], priority=20, delay=60)
+        self.assertEqual(jobs.claim_next('w1'), high.pk)
+        self.assertEqual(jobs.claim_next('w1'), low.pk)
+        # 예약 시각 전 작업은 가져가지 않음
+        self.assertIsNone(jobs.claim_next('w1'))
+
+        claimed = BackgroundJob.objects.get(pk=high.pk)
+        self.assertEqual((claimed.status, claimed.worker, claimed.attempts), ('running', 'w1', 1))
+        self.assertIsNotNone(claimed.heartbeat_at)
+
+    def test_execute_records_result(self):
+        job = jobs.enqueue('tests.record', args=['x'])
+        jobs.claim_next('w1')
+        self.assertEqual(jobs.execute_job(job.pk), 'succeeded')
+        job.refresh_from_db()
+        self.assertEqual(job.result, {'value': 'x'})
+        self.assertEqual(calls, ['x'])
+        self.assertIsNotNone(job.wait_ms)
+
+    def test_failure_is_retried_with_backoff_then_failed(self):
+        job = jobs.enqueue('tests.fail', max_attempts=2)
+        jobs.claim_next('w1')
+        with self.assertLogs(jobs.logger, 'WARNING'):
+            self.assertEqual(jobs.execute_job(job.pk), 'pending')
+        job.refresh_from_db()
+        self.assertIn('boom', job.last_error)
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=jobs.RETRY_BASE_SECONDS - 1))
+
+        BackgroundJob.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        jobs.claim_next('w1')
+        with self.assertLogs(jobs.logger, 'WARNING'):
+            self.assertEqual(jobs.execute_job(job.pk), 'failed')
+
+
+class StaleJobTests(TestCase):
+    def _running(self, started_ago, heartbeat_ago):
+        now = timezone.now()
+        job = jobs.enqueue('tests.record', args=[1])
+        BackgroundJob.objects.filter(pk=job.pk).update(
+            status='running', worker='w1',
+            started_at=now - timedelta(seconds=started_ago),
+            heartbeat_at=None if heartbeat_ago is None else now - timedelta(seconds=heartbeat_ago),
+        )
+        return job.pk
+
+    def test_long_running_job_with_heartbeat_is_kept(self):
+        alive = self._running(started_ago=6 * 3600, heartbeat_ago=5)
+        dead = self._running(started_ago=600, heartbeat_ago=jobs.STALE_JOB_SECONDS + 1)
+        legacy = self._running(started_ago=jobs.STALE_JOB_SECONDS + 1, heartbeat_ago=None)
+
+        self.assertEqual(jobs.recover_stale_jobs(), 2)
+        statuses = dict(BackgroundJob.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses, {alive: 'running', dead: 'pending', legacy: 'pending'})
+
+    def test_heartbeat_only_touches_own_jobs(self):
+        own = self._running(started_ago=600, heartbeat_ago=500)
+        self.assertEqual(jobs.send_heartbeat('w2', [own]), 0)
+        self.assertEqual(jobs.send_heartbeat('w1', [own]), 1)
+        self.assertEqual(jobs.recover_stale_jobs(), 0)
+
+
+class JobRunnerTests(TransactionTestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_run_once_processes_queue_and_sends_heartbeats(self):
+        for value in range(3):
+            jobs.enqueue('tests.record', args=[value])
+        runner = jobs.JobRunner(workers=2, poll_interval=0.05, worker_id='w1', heartbeat_interval=0)
+        with mock.patch.object(jobs, 'send_heartbeat', wraps=jobs.send_heartbeat) as heartbeat:
+            self.assertEqual(runner.run(once=True), 3)
+        self.assertTrue(heartbeat.called)
+        self.assertEqual(sorted(calls), [0, 1, 2])
+        self.assertEqual(set(BackgroundJob.objects.values_list('status', flat=True)), {'succeeded'})
@@ -0,0 +1,117 @@
+import datetime
+import gzip
+import json
+
+import numpy as np
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import lab_results
+from ..lab_results import LabResultError
+from ..models import LabResult
+from .utils import create_doctor, create_patient, login
+
+
+class LabSeriesTests(TestCase):
+    def setUp(self):
+        self.patient = create_patient('P1', create_doctor())
+
+    def test_record_and_range_query(self):
+        start = datetime.date(2024, 1, 1)
+        lab_results.record_results(self.patient, 'alt', [
+            (start + datetime.timedelta(days=30 * i), 20 + i) for i in range(6)
+        ])
+        dates, values = lab_results.get_series(self.patient.pk, 'alt', start='2024-02-01', end='2024-04-30')
+        self.assertEqual(dates.dtype, np.dtype('datetime64[D]'))
+        self.assertEqual(values.tolist(), [22.0, 23.0, 24.0])
+
+    def test_invalid_input(self):
+        with self.assertRaises(LabResultError):
+            lab_results.record_result(self.patient, 'unknown', 1)
+        with self.assertRaises(LabResultError):
+            lab_results.record_result(self.patient, 'afp', 'abc')
+        with self.assertRaises(LabResultError):
+            lab_results.record_result(self.patient, 'afp', 1, measured_on='2024-13-01')
+        self.assertFalse(LabResult.objects.exists())
+
+    def test_downsample_keeps_spike(self):
+        dates = np.arange('2020-01-01', '2022-09-27', dtype='datetime64[D]')
+        values = np.ones(len(dates))
+        values[500] = 1000.0
+        chart_dates, chart_values = lab_results.downsample(dates, values, max_points=50)
+        self.assertLessEqual(len(chart_values), 52)
+        self.assertIn(1000.0, chart_values.tolist())
+        self.assertEqual((chart_dates[0], chart_dates[-1]), (dates[0], dates[-1]))
+
+    def test_doubling_time(self):
+        dates = np.array(['2024-01-01', '2024-01-31', '2024-03-01'], dtype='datetime64[D]')
+        values = np.array([10.0, 20.0, 40.0])
+        stats = lab_results.trend_statistics(dates, values)
+        self.assertEqual(stats['doubling_days'], 30.0)
+        self.assertIsNone(stats['halving_days'])
+        self.assertEqual(stats['change_percent'], 300.0)
+        self.assertIsNone(lab_results.trend_statistics(dates[:1], values[:1]))
+
+    def test_same_day_results_have_no_slope(self):
+        dates = np.array(['2024-01-01', '2024-01-01'], dtype='datetime64[D]')
+        stats = lab_results.trend_statistics(dates, np.array([1.0, 2.0]))
+        self.assertIsNone(stats['slope_per_month'])
+
+
+class PatientAfpHistoryTests(TestCase):
+    def setUp(self):
+        self.patient = create_patient('P1', create_doctor(), afp_initial=100.0, afp_current=50.0)
+
+    def test_new_patient_records_initial_and_current(self):
+        lab_results.record_new_patient_afp(self.patient)
+        rows = list(LabResult.objects.values_list('measured_on', 'value'))
+        self.assertEqual(rows, [
+            (self.patient.diagnosis_date, 100.0),
+            (datetime.date.today(), 50.0),
+        ])
+
+    def test_update_records_only_changed_afp(self):
+        self.assertIsNone(lab_results.record_patient_afp(self.patient, ['tumor_size']))
+        self.assertIsNotNone(lab_results.record_patient_afp(self.patient, ['afp_current']))
+        # 같은 날 같은 값은 중복 기록하지 않음
+        self.assertIsNone(lab_results.record_patient_afp(self.patient, ['afp_current']))
+        self.assertEqual(LabResult.objects.count(), 1)
+
+
+@override_settings(AUDIT_LOG_ASYNC=False)
+class LabResultsApiTests(TestCase):
+    def setUp(self):
+        create_patient('P1', create_doctor())
+        create_patient('X1', create_doctor('doc2'))
+        self.url = reverse('api_patient_lab_results', args=['P1', 'afp'])
+
+    def _get(self, url, params=None):
+        response = self.client.get(url, params or {})
+        body = response.content
+        if response.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        return response.status_code, json.loads(body)
+
+    def test_requires_login(self):
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_post_then_trend(self):
+        login(self.client)
+        response = self.client.post(self.url, json.dumps({'results': [
+            {'date': '2024-01-01', 'value': 10},
+            {'date': '2024-01-31', 'value': 20},
+        ]}), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        status, data = self._get(self.url)
+        self.assertEqual(status, 200)
+        self.assertEqual([p['value'] for p in data['points']], [10.0, 20.0])
+        self.assertEqual(data['stats']['doubling_days'], 30.0)
+
+    def test_errors(self):
+        login(self.client)
+        bad = self.client.post(self.url, json.dumps({'results': [{'value': 1}]}), content_type='application/json')
+        self.assertEqual(bad.status_code, 400)
+        self.assertEqual(self._get(self.url, {'points': '1'})[0], 400)
+        self.assertEqual(self._get(reverse('api_patient_lab_results', args=['P1', 'xyz']))[0], 404)
+        # 다른 의사의 환자
+        self.assertEqual(self._get(reverse('api_patient_lab_results', args=['X1', 'afp']))[0], 404)
@@ -0,0 +1,75 @@
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from ..archive import archive_patients
+from ..deletion import soft_delete_patients
+from ..media_gc import collect_garbage
+from ..models import Patient
+from .utils import create_doctor, create_patient
+
+
+@override_settings(AUDIT_LOG_ASYNC=False)
+class MediaGarbageCollectionTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(
+            MEDIA_ROOT=self.media_root, MEDIA_QUARANTINE_DIR=Path(self.media_root) / 'quarantine',
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+        old = time.time() - 3 * 24 * 3600
+        for name in ['active', 'deleted', 'archived', 'orphan', 'recent']:
+            path = Path(self.media_root) / 'ct_images' / f'{name}.png'
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b'png')
+            if name != 'recent':
+                os.utime(path, (old, old))
+
+        doctor = create_doctor()
+        create_patient('P1', doctor, ct_image='ct_images/active.png')
+        deleted = create_patient('P2', doctor, ct_image='ct_images/deleted.png')
+        soft_delete_patients(Patient.objects.filter(pk=deleted.pk))
+        archived = create_patient('P3', doctor, ct_image='ct_images/archived.png')
+        archive_patients(Patient.objects.filter(pk=archived.pk), reason='manual')
+
+    def _remaining(self):
+        return sorted(os.listdir(Path(self.media_root) / 'ct_images'))
+
+    def test_removes_only_old_unreferenced_files(self):
+        report = collect_garbage(['ct_images'], grace_hours=24)
+        self.assertEqual(report['ct_images']['removed'], 1)
+        self.assertEqual(report['ct_images']['recent'], 1)
+        self.assertEqual(self._remaining(), ['active.png', 'archived.png', 'deleted.png', 'recent.png'])
+
+    def test_dry_run_keeps_files(self):
+        orphans = []
+        report = collect_garbage(['ct_images'], grace_hours=24, dry_run=True,
+                                 on_orphan=lambda name, size: orphans.append(name))
+        self.assertEqual(orphans, ['ct_images/orphan.png'])
+        self.assertEqual(report['ct_images']['removed'], 0)
+        self.assertEqual(len(self._remaining()), 5)
+
+    def test_grace_period_zero_includes_recent_files(self):
+        collect_garbage(['ct_images'], grace_hours=0)
+        self.assertEqual(self._remaining(), ['active.png', 'archived.png', 'deleted.png'])
+
+    def test_quarantine_moves_files(self):
+        report = collect_garbage(['ct_images'], grace_hours=24, quarantine=True)
+        self.assertEqual(report['ct_images']['reclaimed_bytes'], 3)
+        self.assertTrue((Path(self.media_root) / 'quarantine' / 'ct_images' / 'orphan.png').exists())
+        self.assertNotIn('orphan.png', self._remaining())
+
+    def test_command_dry_run_lists_orphans(self):
+        out = StringIO()
+        call_command('gc_media', '--dry-run', '--list', '--dir', 'ct_images', stdout=out)
+        self.assertIn('ct_images/orphan.png', out.getvalue())
+        self.assertEqual(len(self._remaining()), 5)
@@ -0,0 +1,103 @@
+import datetime
+import json
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Patient
+from ..patient_updates import (
+    PatientFormError, apply_patient_changes, parse_patient_post, save_patient_changes,
+)
+from .utils import create_doctor, create_patient, login
+
+
+FORM = {
+    'name': '홍길동', 'birth_date': '1960-01-01', 'gender': 'M',
+    'bclc_stage': 'B', 'child_pugh': 'A', 'tumor_size': '3.5', 'tumor_count': '2',
+    'treatment_type': 'tace', 'vascular_invasion': 'on',
+}
+
+
+class ParsePatientPostTests(SimpleTestCase):
+    def test_converts_types(self):
+        cleaned = parse_patient_post(FORM)
+        self.assertEqual(cleaned['birth_date'], datetime.date(1960, 1, 1))
+        self.assertEqual(cleaned['tumor_size'], 3.5)
+        self.assertEqual(cleaned['tumor_count'], 2)
+        self.assertIs(cleaned['vascular_invasion'], True)
+        # 빈 값 유지 필드는 결과에서 제외, 비우기 필드는 ''
+        self.assertNotIn('afp_initial', cleaned)
+        self.assertEqual(cleaned['phone'], '')
+
+    def test_required_field(self):
+        with self.assertRaises(PatientFormError):
+            parse_patient_post(dict(FORM, name=' '))
+
+    def test_partial_only_converts_given_fields(self):
+        self.assertEqual(parse_patient_post({'tumor_size': 4}, partial=True), {'tumor_size': 4.0})
+
+    def test_rejects_values_outside_choices(self):
+        for field, value in [('gender', 'X'), ('bclc_stage', 'E'), ('child_pugh', 'AB'),
+                             ('treatment_type', 'magic'), ('recurrence_risk', 'extreme')]:
+            with self.subTest(field=field), self.assertRaises(PatientFormError):
+                parse_patient_post(dict(FORM, **{field: value}))
+
+    def test_rejects_non_finite_numbers(self):
+        for value in ['nan', 'inf', '-Infinity', float('nan')]:
+            with self.subTest(value=value), self.assertRaises(PatientFormError):
+                parse_patient_post({'afp_current': value}, partial=True)
+
+    def test_rejects_bad_date(self):
+        with self.assertRaises(PatientFormError):
+            parse_patient_post({'next_ct_date': '2024-02-30'}, partial=True)
+
+
+@override_settings(AUDIT_LOG_ASYNC=False)
+class DirtyFieldSaveTests(TestCase):
+    def setUp(self):
+        self.doctor = create_doctor()
+        self.patient = create_patient('P1', self.doctor, tumor_size=2.0, bclc_stage='A', child_pugh='A')
+
+    def test_only_changed_columns_are_written(self):
+        changed = apply_patient_changes(self.patient, {'tumor_size': 2.0, 'bclc_stage': 'B', 'phone': ''})
+        self.assertEqual(changed, ['bclc_stage'])
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(save_patient_changes(self.patient, changed))
+        updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE') and 'django_1pj_patient' in q['sql']]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"bclc_stage"', updates[0])
+        self.assertNotIn('"tumor_size"', updates[0])
+        self.assertNotIn('"name"', updates[0])
+
+    def test_unchanged_save_runs_no_query(self):
+        with self.assertNumQueries(0):
+            self.assertFalse(save_patient_changes(self.patient, []))
+
+    def test_api_patch(self):
+        login(self.client)
+        url = reverse('api_patient_detail', args=['P1'])
+        response = self.client.patch(url, json.dumps({'tumor_size': 5, 'child_pugh': 'A'}),
+                                     content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['changed_fields'], ['tumor_size'])
+        self.assertEqual(Patient.objects.get(pk=self.patient.pk).tumor_size, 5.0)
+
+    def test_api_patch_rejects_invalid_values(self):
+        login(self.client)
+        url = reverse('api_patient_detail', args=['P1'])
+        for body in ['{"gender": "unknown"}', '{"afp_current": NaN}', '{"child_pugh": "Z"}']:
+            with self.subTest(body=body):
+                response = self.client.patch(url, body, content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+        self.patient.refresh_from_db()
+        self.assertEqual((self.patient.gender, self.patient.child_pugh), ('M', 'A'))
+
+    def test_edit_view_rejects_invalid_choice(self):
+        login(self.client)
+        post = dict(FORM, gender='Z')
+        response = self.client.post(reverse('patient_edit', args=['P1']), post)
+        self.assertEqual(response.status_code, 200)
+        self.patient.refresh_from_db()
+        self.assertEqual(self.patient.name, '환자')
@@ -0,0 +1,77 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from .. import presence, versions
+from ..models import DoctorProfile
+from ..presence import get_roster
+from .utils import create_doctor, login
+
+
+class RecordingBroker:
+    def __init__(self):
+        self.messages = []
+
+    def publish(self, message):
+        self.messages.append(message)
+
+
+class PresenceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        versions._checked.clear()
+        self.addCleanup(cache.clear)
+        self.broker = RecordingBroker()
+        patcher = mock.patch.object(presence, 'get_broker', return_value=self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.doctor = create_doctor(doctor_status='진료중')
+            create_doctor('doc2', doctor_status='휴무')
+
+    def test_roster_counts(self):
+        roster = get_roster()
+        self.assertEqual(roster['counts'], {'진료중': 1, '진료외': 0, '휴무': 1})
+        self.assertEqual(len(roster['doctors']), 2)
+
+    def test_status_change_is_published_after_commit(self):
+        self.broker.messages.clear()
+        get_roster()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.doctor.doctor_status = '휴무'
+            self.doctor.save(update_fields=['doctor_status'])
+            self.assertEqual(self.broker.messages, [])
+        self.assertEqual(len(self.broker.messages), 1)
+        message = self.broker.messages[0]
+        self.assertEqual((message['doctor_id'], message['status']), ('doc1', '휴무'))
+        self.assertEqual(message['counts'], {'진료중': 0, '진료외': 0, '휴무': 2})
+
+    def test_login_update_does_not_publish(self):
+        self.broker.messages.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.doctor.save(update_fields=['doctor_name'])
+        self.assertEqual(self.broker.messages, [])
+
+    def test_change_from_other_process_invalidates_local_cache(self):
+        get_roster()
+        DoctorProfile.objects.filter(pk='doc2').update(doctor_status='진료외')
+        versions._increment(versions.DOCTORS)
+        self.assertEqual(get_roster()['counts']['진료외'], 1)
+
+    def test_deleted_doctor_leaves_roster(self):
+        get_roster()
+        with self.captureOnCommitCallbacks(execute=True):
+            DoctorProfile.objects.get(pk='doc2').delete()
+        self.assertEqual([d['doctor_id'] for d in get_roster()['doctors']], ['doc1'])
+
+    def test_api_and_home_poll_on_load(self):
+        self.assertEqual(self.client.get(reverse('api_doctor_presence')).status_code, 401)
+        login(self.client)
+        self.assertEqual(self.client.get(reverse('api_doctor_presence')).json()['counts']['진료중'], 1)
+        # WSGI 에서는 스트림 대신 주기 조회 - 페이지 로드 시 바로 한 번 조회
+        response = self.client.get(reverse('home'))
+        content = response.content.decode()
+        self.assertRegex(content, r'pollPresence\(\);\s+setInterval\(pollPresence')
+        self.assertRegex(content, r'pollAnnouncements\(\);\s+setInterval\(pollAnnouncements')
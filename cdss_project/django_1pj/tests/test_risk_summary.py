@@ -0,0 +1,66 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import DrugInteraction, PatientRiskSummary
+from ..risk_summary import rebuild_risk_summaries
+from .. import versions
+from .utils import create_doctor, create_patient, login
+
+
+def add_interaction(patient, drug_name, risk_level, probability):
+    return DrugInteraction.objects.create(
+        patient=patient, drug_name=drug_name, risk_level=risk_level, side_effect=f'{drug_name} 부작용',
+        probability=probability, color_code='red',
+    )
+
+
+@override_settings(AUDIT_LOG_ASYNC=False)
+class RiskSummaryTests(TestCase):
+    def setUp(self):
+        self.doctor = create_doctor()
+        self.patient = create_patient('P1', self.doctor)
+
+    def test_summary_follows_saves_and_deletes(self):
+        add_interaction(self.patient, '소라페닙', 'high', 70)
+        low = add_interaction(self.patient, '아세트아미노펜', 'low', 10)
+        summary = PatientRiskSummary.objects.get(patient=self.patient)
+        self.assertEqual((summary.high_count, summary.low_count, summary.total_count), (1, 1, 2))
+        self.assertEqual((summary.top_drug_name, summary.top_probability), ('소라페닙', 70))
+
+        low.delete()
+        summary.refresh_from_db()
+        self.assertEqual(summary.total_count, 1)
+
+    def test_rebuild_after_bulk_create(self):
+        DrugInteraction.objects.bulk_create([
+            DrugInteraction(patient=self.patient, drug_name='A', risk_level='medium', side_effect='x',
+                            probability=40, color_code='yellow'),
+        ])
+        self.assertFalse(PatientRiskSummary.objects.filter(patient=self.patient).exists())
+        self.assertEqual(rebuild_risk_summaries(), 1)
+        self.assertEqual(PatientRiskSummary.objects.get(patient=self.patient).medium_count, 1)
+
+    def _detail_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('patient_detail', args=['P1']))
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    # 공유 버전 확인은 시간 간격으로 조회하므로 고정
+    @mock.patch.object(versions, 'current', return_value=0)
+    def test_detail_page_query_count_does_not_grow_with_interactions(self, current):
+        login(self.client)
+        add_interaction(self.patient, 'A', 'high', 80)
+        # 첫 요청은 프로세스 캐시(약물 그래프 등) 구성 포함
+        self._detail_queries()
+        _, single = self._detail_queries()
+        for i in range(10):
+            add_interaction(self.patient, f'B{i}', 'low', i)
+        response, many = self._detail_queries()
+        self.assertEqual(single, many)
+        self.assertContains(response, 'B9 부작용')
+        self.assertEqual(response.context['risk_summary'].total_count, 11)
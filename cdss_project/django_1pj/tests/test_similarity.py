@@ -0,0 +1,99 @@
+import datetime
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from .. import similarity
+from ..deletion import soft_delete_patient
+from ..models import Patient
+from ..similarity import SimilarityIndex
+from .utils import create_doctor, create_patient, login
+
+
+def _reference_distances(vectors, query):
+    """결측 규칙을 그대로 적용한 전체 거리 (검증용)"""
+    diff = vectors - query
+    one_missing = np.isnan(vectors) ^ np.isnan(query)
+    both_missing = np.isnan(vectors) & np.isnan(query)
+    diff = np.where(one_missing, similarity._MISSING, diff)
+    diff = np.where(both_missing, 0, diff)
+    return np.sqrt((diff.astype(np.float64) ** 2).sum(axis=1))
+
+
+class SimilarityIndexTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.vectors = (rng.random((500, len(similarity.FEATURE_WEIGHTS))) * similarity._WEIGHTS).astype(np.float32)
+        self.vectors[rng.random(self.vectors.shape) < 0.1] = np.nan
+        self.index = SimilarityIndex(capacity=16)
+        for pk, vector in enumerate(self.vectors, start=1):
+            self.index.upsert(pk, vector)
+
+    def test_blocked_search_matches_brute_force(self):
+        query = self.vectors[10].copy()
+        query[0] = np.nan
+        expected = _reference_distances(self.vectors, query)
+        expected[10] = np.inf
+        with mock.patch.object(similarity, 'SEARCH_BLOCK_SIZE', 64):
+            results = self.index.search(query, k=8, exclude=[11])
+        self.assertEqual([pk for pk, _ in results], list(np.argsort(expected, kind='stable')[:8] + 1))
+        np.testing.assert_allclose([d for _, d in results], np.sort(expected)[:8], rtol=1e-5)
+
+    def test_remove_and_compact(self):
+        for pk in range(1, 201):
+            self.index.remove(pk)
+        # 빈 칸 비율이 기준을 넘으면 압축되어 행 번호가 다시 매겨짐
+        self.assertLess(self.index.size, 500)
+        self.assertEqual(len(self.index), 300)
+        results = self.index.search(self.vectors[300], k=1)
+        self.assertEqual(results[0][0], 301)
+        self.assertAlmostEqual(results[0][1], 0.0, places=5)
+
+
+@override_settings(AUDIT_LOG_ASYNC=False)
+class SimilarPatientTests(TestCase):
+    def setUp(self):
+        similarity._index = None
+        self.addCleanup(setattr, similarity, '_index', None)
+        self.doctor = create_doctor()
+        other = create_doctor('doc2')
+        self.query = create_patient('Q', self.doctor, bclc_stage='B', tumor_size=5.0, tumor_count=2)
+        create_patient('MINE', self.doctor, bclc_stage='B', tumor_size=5.5, tumor_count=2)
+        create_patient(
+            'THEIRS', other, bclc_stage='B', tumor_size=4.5, tumor_count=2, treatment_type='tace',
+            death_date=datetime.date(2021, 1, 1),
+        )
+        create_patient('FAR', other, bclc_stage='D', tumor_size=14.0, tumor_count=6, vascular_invasion=True)
+
+    def test_nearest_patients_and_anonymization(self):
+        data = similarity.similar_patients(self.query, k=2, doctor=self.doctor)
+        results = data['results']
+        self.assertEqual(len(results), 2)
+        self.assertEqual({r['patient_id'] for r in results}, {'MINE', None})
+        other = next(r for r in results if r['patient_id'] is None)
+        self.assertIsNone(other['name'])
+        self.assertEqual((other['treatment_type'], other['deceased'], other['followup_days']), ('tace', True, 366))
+        self.assertGreater(min(r['similarity'] for r in results), 90)
+        self.assertEqual(sum(t['count'] for t in data['treatments']), 2)
+
+    def test_index_follows_saves_and_deletes(self):
+        similarity.get_similarity_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            create_patient('NEW', self.doctor, bclc_stage='B', tumor_size=5.0, tumor_count=2)
+        top = similarity.similar_patients(self.query, k=1, doctor=self.doctor)['results'][0]
+        self.assertEqual(top['patient_id'], 'NEW')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            soft_delete_patient(Patient.objects.get(patient_id='NEW'))
+        ids = [r['patient_id'] for r in similarity.similar_patients(self.query, k=3, doctor=self.doctor)['results']]
+        self.assertNotIn('NEW', ids)
+
+    def test_api(self):
+        url = reverse('api_patient_similar', args=['Q'])
+        self.assertEqual(self.client.get(url).status_code, 401)
+        login(self.client)
+        self.assertEqual(len(self.client.get(url, {'k': 100}).json()['results']), 3)
+        self.assertEqual(self.client.get(url, {'k': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('api_patient_similar', args=['THEIRS'])).status_code, 404)
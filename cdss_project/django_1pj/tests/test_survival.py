@@ -0,0 +1,93 @@
+import datetime
+
+import numpy as np
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from .. import versions
+from ..survival import compute_survival, kaplan_meier, logrank_test
+from .utils import create_doctor, create_patient, login
+
+
+# Freireich 등 (1963) 급성 백혈병 관해 유지 기간(주) - 6-MP 군과 위약 군
+GEHAN_6MP = (
+    [6, 6, 6, 6, 7, 9, 10, 10, 11, 13, 16, 17, 19, 20, 22, 23, 25, 32, 32, 34, 35],
+    [1, 1, 1, 0, 1, 0, 1, 0, 0, 1, 1, 0, 0, 0, 1, 1, 0, 0, 0, 0, 0],
+)
+GEHAN_PLACEBO = (
+    [1, 1, 2, 2, 3, 4, 4, 5, 5, 8, 8, 8, 8, 11, 11, 12, 12, 15, 17, 22, 23],
+    [1] * 21,
+)
+
+
+class KaplanMeierTests(SimpleTestCase):
+    def test_matches_published_estimates(self):
+        result = kaplan_meier(*GEHAN_6MP)
+        self.assertEqual(result['n'], 21)
+        self.assertEqual(result['events'], 9)
+        self.assertEqual(result['curve']['time'], [6, 7, 10, 13, 16, 22, 23])
+        np.testing.assert_allclose(
+            result['curve']['survival'], [0.8571, 0.8067, 0.7529, 0.6902, 0.6275, 0.5378, 0.4482], atol=1e-4,
+        )
+        self.assertEqual(result['curve']['at_risk'], [21, 17, 15, 12, 11, 7, 6])
+        self.assertEqual(result['median_days'], 23)
+
+    def test_unsorted_input(self):
+        durations, events = GEHAN_6MP
+        order = np.random.default_rng(1).permutation(len(durations))
+        shuffled = kaplan_meier(np.array(durations)[order], np.array(events)[order])
+        self.assertEqual(shuffled['curve'], kaplan_meier(durations, events)['curve'])
+
+    def test_empty_input(self):
+        self.assertIsNone(kaplan_meier([], []))
+
+    def test_logrank_matches_published_statistic(self):
+        durations = GEHAN_6MP[0] + GEHAN_PLACEBO[0]
+        events = GEHAN_6MP[1] + GEHAN_PLACEBO[1]
+        groups = [0] * 21 + [1] * 21
+        result = logrank_test(durations, events, groups)
+        self.assertEqual(result['df'], 1)
+        self.assertAlmostEqual(result['chi2'], 16.79, places=1)
+        self.assertEqual(result['observed'], [9, 21])
+        np.testing.assert_allclose(result['expected'], [19.25, 10.75], atol=0.01)
+        self.assertLess(result['p_value'], 1e-4)
+
+    def test_logrank_needs_two_groups(self):
+        self.assertIsNone(logrank_test(*GEHAN_6MP, [0] * 21))
+
+
+@override_settings(AUDIT_LOG_ASYNC=False)
+class CohortSurvivalTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        versions._checked.clear()
+        self.doctor = create_doctor()
+        diagnosis = datetime.date(2020, 1, 1)
+        for i, (days, died, stage) in enumerate([(100, True, 'A'), (400, False, 'A'), (50, True, 'C'), (80, True, 'C')]):
+            end = diagnosis + datetime.timedelta(days=days)
+            create_patient(
+                f'P{i}', self.doctor, diagnosis_date=diagnosis, bclc_stage=stage,
+                death_date=end if died else None, last_followup_date=None if died else end,
+            )
+
+    def test_grouped_curves(self):
+        result = compute_survival('bclc_stage')
+        self.assertEqual([group['key'] for group in result['groups']], ['A', 'C'])
+        self.assertEqual([group['n'] for group in result['groups']], [2, 2])
+        self.assertEqual(result['logrank']['df'], 1)
+        self.assertEqual(compute_survival(filters={'bclc_stage': 'C'})['groups'][0]['events'], 2)
+
+    def test_cohort_without_valid_rows(self):
+        # 추적일이 진단일보다 이른 잘못된 입력만 남은 코호트
+        create_patient(
+            'BAD', self.doctor, bclc_stage='D',
+            diagnosis_date=datetime.date(2021, 1, 1), last_followup_date=datetime.date(2020, 6, 1),
+        )
+        result = compute_survival(filters={'bclc_stage': 'D'})
+        self.assertEqual((result['groups'], result['logrank']), ([], None))
+
+        login(self.client)
+        response = self.client.get(reverse('api_survival'), {'bclc_stage': 'D'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(reverse('api_survival'), {'group_by': 'gender'}).status_code, 400)
@@ -0,0 +1,96 @@
+import datetime
+from unittest import mock
+
+import numpy as np
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from .. import jobs, survival_model, tasks
+from ..models import BackgroundJob, Patient
+from ..survival_model import fit_cox, save_model, stream_training_data
+from .utils import create_doctor, create_patient
+
+
+class CoxModelTests(SimpleTestCase):
+    def test_recovers_coefficients(self):
+        rng = np.random.default_rng(42)
+        n = 4000
+        true_beta = np.array([0.7, -0.5])
+        features = np.column_stack([rng.standard_normal(n), rng.integers(0, 2, n)]).astype(np.float64)
+        hazard = 0.01 * np.exp(features @ true_beta)
+        event_days = rng.exponential(1 / hazard)
+        censor_days = rng.exponential(150, n)
+        durations = np.ceil(np.minimum(event_days, censor_days))
+        events = event_days <= censor_days
+
+        result = fit_cox(features, durations, events, penalty=0)
+        self.assertTrue(result['converged'])
+        # 계수는 표준화 변수 기준 -> 원 단위로 환산
+        np.testing.assert_allclose(result['coefficients'] / result['scales'], true_beta, atol=0.1)
+        self.assertGreater(result['log_likelihood'], result['null_log_likelihood'])
+
+    def test_next_nightly_run(self):
+        evening = datetime.datetime(2025, 3, 1, 20, 0)
+        early = datetime.datetime(2025, 3, 1, 1, 0)
+        self.assertEqual(jobs.next_daily_run(survival_model.NIGHTLY_SCORE_HOUR, evening), datetime.datetime(2025, 3, 2, 3, 0))
+        self.assertEqual(jobs.next_daily_run(survival_model.NIGHTLY_SCORE_HOUR, early), datetime.datetime(2025, 3, 1, 3, 0))
+
+
+@override_settings(AUDIT_LOG_ASYNC=False)
+class SurvivalScoringTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.doctor = create_doctor()
+        diagnosis = datetime.date(2018, 1, 1)
+        rng = np.random.default_rng(0)
+        for i in range(60):
+            stage = 'A' if i % 2 else 'C'
+            days = int(rng.exponential(1500 if stage == 'A' else 300)) + 1
+            died = days < 1000
+            end = diagnosis + datetime.timedelta(days=min(days, 1000))
+            create_patient(
+                f'T{i}', self.doctor, diagnosis_date=diagnosis, bclc_stage=stage, tumor_size=float(i % 7 + 1),
+                death_date=end if died else None, last_followup_date=None if died else end,
+            )
+
+    def _activate_model(self):
+        result = fit_cox(*stream_training_data())
+        return save_model(result)
+
+    def test_no_model_means_no_prediction(self):
+        patient = create_patient('NEW', self.doctor, bclc_stage='A')
+        self.assertIsNone(survival_model.refresh_patient_survival(patient))
+        self.assertEqual(tasks.score_survival_job(), {'updated': 0})
+        self.assertFalse(BackgroundJob.objects.exists())
+
+    def test_patient_is_scored_on_save(self):
+        self._activate_model()
+        with self.captureOnCommitCallbacks(execute=True):
+            early = create_patient('EARLY', self.doctor, bclc_stage='A', tumor_size=1.0)
+        with self.captureOnCommitCallbacks(execute=True):
+            late = create_patient('LATE', self.doctor, bclc_stage='C', tumor_size=1.0)
+        early.refresh_from_db()
+        late.refresh_from_db()
+        self.assertIsNotNone(early.survival_1year)
+        self.assertGreater(early.survival_3year, late.survival_3year)
+        self.assertGreaterEqual(early.survival_1year, early.survival_5year)
+
+        # 예측 변수가 아닌 필드만 바꾸면 다시 계산하지 않음
+        with mock.patch.object(survival_model, 'predict_patient') as predict:
+            with self.captureOnCommitCallbacks(execute=True):
+                late.name = '다른 이름'
+                late.save(update_fields=['name'])
+            predict.assert_not_called()
+
+    def test_score_job_updates_all_and_reschedules_nightly(self):
+        model = self._activate_model()
+        result = tasks.score_survival_job()
+        self.assertEqual(result, {'updated': Patient.objects.count(), 'version': model.version})
+        self.assertFalse(Patient.objects.filter(survival_1year__isnull=True).exists())
+
+        job = BackgroundJob.objects.get(status='pending')
+        self.assertEqual(job.dedup_key, f'{survival_model.SCORE_JOB}:nightly')
+        self.assertEqual(job.run_at.hour, survival_model.NIGHTLY_SCORE_HOUR)
+        # 이미 예약되어 있으면 다시 만들지 않음
+        tasks.score_survival_job()
+        self.assertEqual(BackgroundJob.objects.count(), 1)
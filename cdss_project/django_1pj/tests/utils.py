@@ -0,0 +1,27 @@
+"""테스트 공용 데이터 생성"""
+import datetime
+
+from ..models import DoctorProfile, Patient
+
+
+def create_doctor(doctor_id='doc1', password='pw', **fields):
+    doctor = DoctorProfile(doctor_id=doctor_id, doctor_name='테스트', doctor_sex='M', **fields)
+    doctor.set_password(password)
+    doctor.save()
+    return doctor
+
+
+def create_patient(patient_id, doctor=None, **fields):
+    values = {
+        'name': '환자',
+        'birth_date': datetime.date(1960, 1, 1),
+        'gender': 'M',
+        'diagnosis_date': datetime.date(2020, 1, 1),
+    }
+    values.update(fields)
+    return Patient.objects.create(patient_id=patient_id, doctor=doctor, **values)
+
+
+def login(client, doctor_id='doc1', password='pw'):
+    """의사 세션 로그인"""
+    client.post('/', {'doctor_id': doctor_id, 'password': password})
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import views, api
 
 urlpatterns = [
     # 의사 로그인 (기본 URL)
@@ -9,8 +9,47 @@ urlpatterns = [
     # 의사 홈 및 환자 관리
     path('home/', views.home_view, name='home'),
     path('doctor/status/change/', views.doctor_status_change_view, name='doctor_status_change'),
+    path('dashboard/cohort/', views.cohort_dashboard_view, name='cohort_dashboard'),
     path('patient/add/', views.patient_add_view, name='patient_add'),
     path('patient/<str:patient_id>/', views.patient_detail_view, name='patient_detail'),
     path('patient/<str:patient_id>/edit/', views.patient_edit_view, name='patient_edit'),
     path('patient/<str:patient_id>/delete/', views.patient_delete_view, name='patient_delete'),
+    path('patient/<str:patient_id>/tumor-suggestions/<int:suggestion_id>/review/', views.tumor_suggestion_review_view, name='tumor_suggestion_review'),
+
+    # 보관 환자
+    path('archive/', views.archived_patient_list_view, name='archived_patient_list'),
+    path('archive/<str:patient_id>/', views.archived_patient_detail_view, name='archived_patient_detail'),
+    path('archive/<str:patient_id>/restore/', views.archived_patient_restore_view, name='archived_patient_restore'),
+
+    # JSON API
+    path('api/patients/', api.patient_list_api, name='api_patient_list'),
+    path('api/patients/bulk/', api.patient_bulk_update_api, name='api_patient_bulk_update'),
+    path('api/patients/export/', api.patient_export_api, name='api_patient_export'),
+    path('api/survival/', api.survival_api, name='api_survival'),
+    path('api/guidelines/', api.guideline_api, name='api_guidelines'),
+    path('api/patients/<str:patient_id>/', api.patient_detail_api, name='api_patient_detail'),
+    path('api/patients/<str:patient_id>/interactions/', api.patient_interactions_api, name='api_patient_interactions'),
+    path('api/patients/<str:patient_id>/labs/<str:analyte>/', api.patient_lab_results_api, name='api_patient_lab_results'),
+    path('api/patients/<str:patient_id>/audit/', api.patient_audit_api, name='api_patient_audit'),
+    path('api/patients/<str:patient_id>/ct-uploads/', api.ct_upload_start_api, name='api_ct_upload_start'),
+    path('api/ct-uploads/<uuid:upload_id>/', api.ct_upload_detail_api, name='api_ct_upload_detail'),
+    path('api/ct-uploads/<uuid:upload_id>/chunks/<int:index>/', api.ct_upload_chunk_api, name='api_ct_upload_chunk'),
+    path('api/ct-uploads/<uuid:upload_id>/complete/', api.ct_upload_complete_api, name='api_ct_upload_complete'),
+    path('api/patients/<str:patient_id>/ct-studies/', api.patient_ct_studies_api, name='api_patient_ct_studies'),
+    path('api/ct-studies/<int:study_id>/', api.ct_study_detail_api, name='api_ct_study_detail'),
+    path('api/ct-studies/<int:study_id>/<str:plane>/<int:index>/raw/', api.ct_slice_raw_api, name='api_ct_slice_raw'),
+    path('api/ct-studies/<int:study_id>/<str:plane>/<int:index>/image/', api.ct_slice_image_api, name='api_ct_slice_image'),
+    path('api/patients/<str:patient_id>/tumor-suggestions/', api.patient_tumor_suggestions_api, name='api_patient_tumor_suggestions'),
+    path('api/patients/<str:patient_id>/similar/', api.patient_similar_api, name='api_patient_similar'),
+    path('api/tumor-suggestions/<int:suggestion_id>/review/', api.tumor_suggestion_review_api, name='api_tumor_suggestion_review'),
+    path('api/drugs/regimen-check/', api.drug_regimen_check_api, name='api_drug_regimen_check'),
+    path('api/drugs/search/', api.drug_search_api, name='api_drug_search'),
+    path('api/drugs/autocomplete/', api.drug_autocomplete_api, name='api_drug_autocomplete'),
+    path('api/announcements/', api.announcement_feed_api, name='api_announcement_feed'),
+    path('api/announcements/stream/', api.announcement_stream_api, name='api_announcement_stream'),
+    path('api/doctors/presence/', api.doctor_presence_api, name='api_doctor_presence'),
+    path('api/doctors/presence/stream/', api.doctor_presence_stream_api, name='api_doctor_presence_stream'),
+    path('api/doctors/me/audit/', api.doctor_audit_api, name='api_doctor_audit'),
+    path('api/jobs/<int:job_id>/', api.job_status_api, name='api_job_status'),
+    path('api/jobs/<int:job_id>/download/', api.job_download_api, name='api_job_download'),
 ]
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""
+프로세스 간 공유 데이터 버전 (DataVersion 테이블의 카운터)
+프로세스별 메모리 캐시(약물 상호작용 그래프, 생존 분석 결과, 공지 피드 등)는 구성 시점의 버전을 함께 보관하고,
+사용할 때 current() 와 비교하여 다른 웹/작업 프로세스에서 바뀐 데이터를 반영
+
+- bump() 는 커밋 후 UPDATE ... SET version = version + 1 (동시 변경에도 증가 유실 없음,
+  롤백된 변경은 반영하지 않음)
+- current() 는 키마다 CHECK_INTERVAL 초에 한 번만 PK 로 조회 -> 다른 프로세스에는 최대 그만큼 늦게 반영
+- 같은 프로세스에서 bump 한 키는 바로 다시 조회
+"""
+import threading
+import time
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DataVersion
+
+
+# 약물 마스터 (상호작용 그래프, 전문 검색 색인, 자동완성)
+DRUGS = 'drugs'
+# 생존 분석 대상 데이터 (Kaplan-Meier 결과 캐시)
+SURVIVAL = 'survival'
+# 활성 공지사항 피드
+ANNOUNCEMENTS = 'announcements'
+# 의사 목록/상태 (실시간 현황 roster)
+DOCTORS = 'doctors'
+
+CHECK_INTERVAL = 2
+
+# 키 -> (확인 시각(monotonic), 버전)
+_checked = {}
+_checked_lock = threading.Lock()
+
+
+def _increment(key):
+    updated = DataVersion.objects.filter(key=key).update(version=F('version') + 1, updated_at=timezone.now())
+    if not updated:
+        try:
+            with transaction.atomic():
+                DataVersion.objects.create(key=key, version=1)
+        except IntegrityError:
+            # 다른 프로세스가 먼저 행을 만든 경우
+            DataVersion.objects.filter(key=key).update(version=F('version') + 1, updated_at=timezone.now())
+    with _checked_lock:
+        _checked.pop(key, None)
+
+
+def bump(key):
+    """데이터 변경 알림 - 트랜잭션 안이면 커밋 후 증가"""
+    transaction.on_commit(lambda: _increment(key))
+
+
+def current(key, max_age=CHECK_INTERVAL):
+    """현재 버전 (행이 없으면 0) - max_age 초 이내에 확인한 값은 다시 조회하지 않음"""
+    now = time.monotonic()
+    checked = _checked.get(key)
+    if checked is not None and now - checked[0] < max_age:
+        return checked[1]
+    version = DataVersion.objects.filter(key=key).values_list('version', flat=True).first() or 0
+    with _checked_lock:
+        _checked[key] = (now, version)
+    return version
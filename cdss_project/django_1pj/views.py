@@ -1,8 +1,23 @@
 from django.shortcuts import render, redirect
 from django.contrib import messages
-from django.db.models import Q
-from .models import Patient, DoctorProfile
+from django.db.models import Prefetch, Q
+from .models import Patient, ArchivedPatient, DoctorProfile, DrugInteraction, PatientRiskSummary, TumorSuggestion
 from .backends import DoctorAuthenticationBackend
+from .announcements import get_active_announcements
+from .presence import is_asgi_request
+from .lab_results import get_trend, record_new_patient_afp, record_patient_afp
+from . import audit
+from .ct_render import WINDOW_PRESETS, PRESET_LABELS, DEFAULT_PRESET
+from .inference import DummyTumorModel, InferenceError, review_suggestion
+from .cohort import dashboard_data
+from .similarity import similar_patients
+from .guidelines import evaluate_patient
+from .drug_graph import check_drug_names
+from .archive import RELATED_MODELS, ArchiveError, load_archived, restore_patient
+from .deletion import soft_delete_patient
+from .patient_updates import (
+    PatientFormError, parse_patient_post, apply_patient_changes, save_patient_changes,
+)
 
 
 # ============================================
@@ -72,21 +87,48 @@ def home_view(request):
 
     # 검색 기능
     search_query = request.GET.get('search', '')
+    archived_matches = 0
     if search_query:
-        patients = patients.filter(
-            Q(patient_id__icontains=search_query) |
-            Q(name__icontains=search_query)
-        )
+        search = Q(patient_id__icontains=search_query) | Q(name__icontains=search_query)
+        patients = patients.filter(search)
+        # 보관 환자는 목록에 섞지 않고 건수만 안내
+        archived_matches = ArchivedPatient.objects.filter(search, doctor=doctor_profile).count()
 
     context = {
         'doctor': doctor_profile,
         'patients': patients,
         'search_query': search_query,
+        'archived_matches': archived_matches,
+        'announcements': get_active_announcements(),  # 캐시에서 조회
+        'live_streams': is_asgi_request(request),  # WSGI 면 실시간 스트림 대신 주기 조회
     }
 
     return render(request, 'django_1pj/home.html', context)
 
 
+def cohort_dashboard_view(request):
+    """코호트 통계 대시보드 (요약 테이블만 조회)"""
+    # 의사 세션 확인
+    doctor_id = request.session.get('doctor_id')
+    if not doctor_id:
+        messages.error(request, '로그인이 필요합니다.')
+        return redirect('doctor_login')
+
+    try:
+        doctor_profile = DoctorProfile.objects.get(doctor_id=doctor_id)
+    except DoctorProfile.DoesNotExist:
+        messages.error(request, '의사 프로필이 없습니다.')
+        request.session.flush()
+        return redirect('doctor_login')
+
+    context = {
+        'doctor': doctor_profile,
+        'cohort': dashboard_data(),
+    }
+
+    return render(request, 'django_1pj/cohort_dashboard.html', context)
+
+
 def patient_detail_view(request, patient_id):
     """환자 상세 정보 조회 (읽기 전용)"""
     # 의사 세션 확인
@@ -102,15 +144,44 @@ def patient_detail_view(request, patient_id):
         request.session.flush()
         return redirect('doctor_login')
 
+    # 담당의/위험 요약은 JOIN, 약물 상호작용은 prefetch 한 번으로 조회
+    patients = (
+        Patient.objects
+        .select_related('doctor', 'risk_summary')
+        .prefetch_related(
+            Prefetch('drug_interactions', queryset=DrugInteraction.objects.order_by('-probability'))
+        )
+    )
     try:
-        patient = Patient.objects.get(patient_id=patient_id, doctor=doctor_profile)
+        patient = patients.get(patient_id=patient_id, doctor=doctor_profile)
     except Patient.DoesNotExist:
+        if ArchivedPatient.objects.filter(patient_id=patient_id, doctor=doctor_profile).exists():
+            return redirect('archived_patient_detail', patient_id=patient_id)
         messages.error(request, '해당 환자 정보를 찾을 수 없습니다.')
         return redirect('home')
 
+    try:
+        risk_summary = patient.risk_summary
+    except PatientRiskSummary.DoesNotExist:
+        risk_summary = None
+
+    drug_interactions = patient.drug_interactions.all()
+
     context = {
         'doctor': doctor_profile,
         'patient': patient,
+        'drug_interactions': drug_interactions,
+        'risk_summary': risk_summary,
+        # 복용 약물 간 상호작용 (메모리 그래프 조회, prefetch 한 목록 사용)
+        'regimen_conflicts': check_drug_names({item.drug_name for item in drug_interactions}),
+        'afp_trend': get_trend(patient.pk, 'afp'),
+        'ct_studies': patient.ct_studies.filter(status='ready'),
+        'window_presets': [(name, PRESET_LABELS[name]) for name in WINDOW_PRESETS],
+        'default_preset': DEFAULT_PRESET,
+        # 테스트용 모델 제안은 반영할 수 없으므로 표시하지 않음
+        'tumor_suggestion': patient.tumor_suggestions.filter(status='pending').exclude(model_name=DummyTumorModel.name).first(),
+        'similar': similar_patients(patient, doctor=doctor_profile),
+        'guideline': evaluate_patient(patient),
     }
 
     return render(request, 'django_1pj/patient_detail.html', context)
@@ -138,69 +209,83 @@ def patient_edit_view(request, patient_id):
         return redirect('home')
 
     if request.method == 'POST':
-        # 환자 정보 업데이트
-        patient.name = request.POST.get('name')
-        patient.birth_date = request.POST.get('birth_date')
-        patient.gender = request.POST.get('gender')
-        patient.phone = request.POST.get('phone', '')
-
-        # 진단 정보
-        diagnosis_date = request.POST.get('diagnosis_date')
-        if diagnosis_date:
-            patient.diagnosis_date = diagnosis_date
-
-        patient.bclc_stage = request.POST.get('bclc_stage', '')
-
-        tumor_size = request.POST.get('tumor_size')
-        if tumor_size:
-            patient.tumor_size = float(tumor_size)
-
-        tumor_count = request.POST.get('tumor_count')
-        if tumor_count:
-            patient.tumor_count = int(tumor_count)
-
-        patient.child_pugh = request.POST.get('child_pugh', '')
-        patient.vascular_invasion = request.POST.get('vascular_invasion') == 'on'
-
-        afp_initial = request.POST.get('afp_initial')
-        if afp_initial:
-            patient.afp_initial = float(afp_initial)
-
-        afp_current = request.POST.get('afp_current')
-        if afp_current:
-            patient.afp_current = float(afp_current)
+        try:
+            cleaned = parse_patient_post(request.POST)
+        except PatientFormError as e:
+            messages.error(request, str(e))
+        else:
+            # 변경된 컬럼만 저장 (변경 사항이 없으면 저장 생략)
+            before = audit.snapshot(patient)
+            changed_fields = apply_patient_changes(patient, cleaned)
+            if save_patient_changes(patient, changed_fields):
+                audit.record_update(doctor_id, patient, before, changed_fields)
+                # AFP 가 바뀌었으면 시계열에 기록 (추세 보존)
+                record_patient_afp(patient, changed_fields)
+                messages.success(request, '환자 정보가 수정되었습니다.')
+            else:
+                messages.info(request, '변경된 내용이 없습니다.')
+            return redirect('patient_detail', patient_id=patient.patient_id)
 
-        # 치료 정보
-        patient.treatment_type = request.POST.get('treatment_type', '')
+    context = {
+        'doctor': doctor_profile,
+        'patient': patient,
+    }
 
-        treatment_start_date = request.POST.get('treatment_start_date')
-        if treatment_start_date:
-            patient.treatment_start_date = treatment_start_date
+    return render(request, 'django_1pj/patient_form.html', context)
 
-        patient.recurrence_risk = request.POST.get('recurrence_risk', '')
 
-        next_ct_date = request.POST.get('next_ct_date')
-        if next_ct_date:
-            patient.next_ct_date = next_ct_date
+def patient_add_view(request):
+    """새 환자 추가"""
+    # 의사 세션 확인
+    doctor_id = request.session.get('doctor_id')
+    if not doctor_id:
+        messages.error(request, '로그인이 필요합니다.')
+        return redirect('doctor_login')
 
-        next_blood_test_date = request.POST.get('next_blood_test_date')
-        if next_blood_test_date:
-            patient.next_blood_test_date = next_blood_test_date
+    try:
+        doctor_profile = DoctorProfile.objects.get(doctor_id=doctor_id)
+    except DoctorProfile.DoesNotExist:
+        messages.error(request, '의사 프로필이 없습니다.')
+        request.session.flush()
+        return redirect('doctor_login')
 
-        patient.save()
-        messages.success(request, '환자 정보가 수정되었습니다.')
-        return redirect('patient_detail', patient_id=patient.patient_id)
+    if request.method == 'POST':
+        try:
+            cleaned = parse_patient_post(request.POST)
+            patient_id_input = (request.POST.get('patient_id') or '').strip()
+            if not patient_id_input:
+                raise PatientFormError('환자번호를 입력해주세요.')
+            if Patient.all_objects.filter(patient_id=patient_id_input, deleted_at__isnull=False).exists():
+                raise PatientFormError('삭제 처리 중인 환자번호입니다. 잠시 후 다시 시도해주세요.')
+            if ArchivedPatient.objects.filter(patient_id=patient_id_input).exists():
+                raise PatientFormError('보관된 환자번호입니다. 보관 환자 목록에서 복원해주세요.')
+        except PatientFormError as e:
+            messages.error(request, str(e))
+        else:
+            # 환자 생성
+            patient = Patient(patient_id=patient_id_input, doctor=doctor_profile)
+            apply_patient_changes(patient, cleaned)
+
+            try:
+                patient.save()
+                audit.record_create(doctor_id, patient)
+                # 초기/최근 AFP 를 시계열 첫 기록으로 추가
+                record_new_patient_afp(patient)
+                messages.success(request, '새 환자가 추가되었습니다.')
+                return redirect('patient_detail', patient_id=patient.patient_id)
+            except Exception as e:
+                messages.error(request, f'환자 추가 중 오류가 발생했습니다: {str(e)}')
 
     context = {
         'doctor': doctor_profile,
-        'patient': patient,
+        'patient': None,  # 새 환자이므로 None
     }
 
     return render(request, 'django_1pj/patient_form.html', context)
 
 
-def patient_add_view(request):
-    """새 환자 추가"""
+def patient_delete_view(request, patient_id):
+    """환자 삭제"""
     # 의사 세션 확인
     doctor_id = request.session.get('doctor_id')
     if not doctor_id:
@@ -215,75 +300,139 @@ def patient_add_view(request):
         return redirect('doctor_login')
 
     if request.method == 'POST':
-        # 환자 생성
-        patient = Patient()
-        patient.patient_id = request.POST.get('patient_id')
-        patient.name = request.POST.get('name')
-        patient.birth_date = request.POST.get('birth_date')
-        patient.gender = request.POST.get('gender')
-        patient.phone = request.POST.get('phone', '')
-        patient.doctor = doctor_profile
+        try:
+            patient = Patient.objects.get(patient_id=patient_id, doctor=doctor_profile)
+            # 즉시 숨기고 관련 기록/파일은 백그라운드에서 삭제
+            soft_delete_patient(patient)
+            audit.record_delete(doctor_id, patient)
+            messages.success(request, '환자가 삭제되었습니다.')
+        except Patient.DoesNotExist:
+            messages.error(request, '해당 환자를 찾을 수 없습니다.')
 
-        # 진단 정보
-        diagnosis_date = request.POST.get('diagnosis_date')
-        if diagnosis_date:
-            patient.diagnosis_date = diagnosis_date
+    return redirect('home')
 
-        patient.bclc_stage = request.POST.get('bclc_stage', '')
 
-        tumor_size = request.POST.get('tumor_size')
-        if tumor_size:
-            patient.tumor_size = float(tumor_size)
+# ============================================
+# 보관 환자
+# ============================================
 
-        tumor_count = request.POST.get('tumor_count')
-        if tumor_count:
-            patient.tumor_count = int(tumor_count)
+def archived_patient_list_view(request):
+    """보관 환자 목록"""
+    # 의사 세션 확인
+    doctor_id = request.session.get('doctor_id')
+    if not doctor_id:
+        messages.error(request, '로그인이 필요합니다.')
+        return redirect('doctor_login')
 
-        patient.child_pugh = request.POST.get('child_pugh', '')
-        patient.vascular_invasion = request.POST.get('vascular_invasion') == 'on'
+    try:
+        doctor_profile = DoctorProfile.objects.get(doctor_id=doctor_id)
+    except DoctorProfile.DoesNotExist:
+        messages.error(request, '의사 프로필이 없습니다.')
+        request.session.flush()
+        return redirect('doctor_login')
 
-        afp_initial = request.POST.get('afp_initial')
-        if afp_initial:
-            patient.afp_initial = float(afp_initial)
+    # payload 는 목록에서 읽지 않음
+    archived = ArchivedPatient.objects.filter(doctor=doctor_profile).defer('payload')
 
-        afp_current = request.POST.get('afp_current')
-        if afp_current:
-            patient.afp_current = float(afp_current)
+    search_query = request.GET.get('search', '')
+    if search_query:
+        archived = archived.filter(
+            Q(patient_id__icontains=search_query) |
+            Q(name__icontains=search_query)
+        )
 
-        # 치료 정보
-        patient.treatment_type = request.POST.get('treatment_type', '')
+    context = {
+        'doctor': doctor_profile,
+        'archived_patients': archived,
+        'search_query': search_query,
+    }
 
-        treatment_start_date = request.POST.get('treatment_start_date')
-        if treatment_start_date:
-            patient.treatment_start_date = treatment_start_date
+    return render(request, 'django_1pj/archived_patient_list.html', context)
 
-        patient.recurrence_risk = request.POST.get('recurrence_risk', '')
 
-        next_ct_date = request.POST.get('next_ct_date')
-        if next_ct_date:
-            patient.next_ct_date = next_ct_date
+def archived_patient_detail_view(request, patient_id):
+    """보관 환자 상세 정보 (읽기 전용, 보관 당시 기록)"""
+    # 의사 세션 확인
+    doctor_id = request.session.get('doctor_id')
+    if not doctor_id:
+        messages.error(request, '로그인이 필요합니다.')
+        return redirect('doctor_login')
 
-        next_blood_test_date = request.POST.get('next_blood_test_date')
-        if next_blood_test_date:
-            patient.next_blood_test_date = next_blood_test_date
+    try:
+        doctor_profile = DoctorProfile.objects.get(doctor_id=doctor_id)
+    except DoctorProfile.DoesNotExist:
+        messages.error(request, '의사 프로필이 없습니다.')
+        request.session.flush()
+        return redirect('doctor_login')
 
-        try:
-            patient.save()
-            messages.success(request, '새 환자가 추가되었습니다.')
-            return redirect('patient_detail', patient_id=patient.patient_id)
-        except Exception as e:
-            messages.error(request, f'환자 추가 중 오류가 발생했습니다: {str(e)}')
+    try:
+        archived = ArchivedPatient.objects.get(patient_id=patient_id, doctor=doctor_profile)
+    except ArchivedPatient.DoesNotExist:
+        messages.error(request, '해당 보관 환자 정보를 찾을 수 없습니다.')
+        return redirect('archived_patient_list')
+
+    # 보관 당시 환자 필드를 화면 표시용 (항목명, 값) 목록으로
+    values = load_archived(archived)['patient']
+    fields = []
+    for field in Patient._meta.concrete_fields:
+        if field.attname in ('id', 'doctor_id'):
+            continue
+        value = values.get(field.attname)
+        if value is not None and field.choices:
+            value = dict(field.flatchoices).get(value, value)
+        fields.append((field.verbose_name, value))
+
+    related_counts = [
+        (model._meta.verbose_name, archived.related_counts.get(model._meta.label, 0))
+        for model in RELATED_MODELS
+    ]
 
     context = {
         'doctor': doctor_profile,
-        'patient': None,  # 새 환자이므로 None
+        'archived': archived,
+        'fields': fields,
+        'related_counts': related_counts,
     }
 
-    return render(request, 'django_1pj/patient_form.html', context)
+    return render(request, 'django_1pj/archived_patient_detail.html', context)
 
 
-def patient_delete_view(request, patient_id):
-    """환자 삭제"""
+def archived_patient_restore_view(request, patient_id):
+    """보관 환자 복원"""
+    # 의사 세션 확인
+    doctor_id = request.session.get('doctor_id')
+    if not doctor_id:
+        messages.error(request, '로그인이 필요합니다.')
+        return redirect('doctor_login')
+
+    try:
+        doctor_profile = DoctorProfile.objects.get(doctor_id=doctor_id)
+    except DoctorProfile.DoesNotExist:
+        messages.error(request, '의사 프로필이 없습니다.')
+        request.session.flush()
+        return redirect('doctor_login')
+
+    if request.method != 'POST':
+        return redirect('archived_patient_detail', patient_id=patient_id)
+
+    try:
+        archived = ArchivedPatient.objects.get(patient_id=patient_id, doctor=doctor_profile)
+    except ArchivedPatient.DoesNotExist:
+        messages.error(request, '해당 보관 환자를 찾을 수 없습니다.')
+        return redirect('archived_patient_list')
+
+    try:
+        patient = restore_patient(archived, doctor_id=doctor_id)
+    except ArchiveError as e:
+        messages.error(request, str(e))
+        return redirect('archived_patient_detail', patient_id=patient_id)
+
+    messages.success(request, f'{patient.name} 환자가 복원되었습니다.')
+    return redirect('patient_detail', patient_id=patient.patient_id)
+
+
+def tumor_suggestion_review_view(request, patient_id, suggestion_id):
+    """CT 분석 제안 반영/반려"""
     # 의사 세션 확인
     doctor_id = request.session.get('doctor_id')
     if not doctor_id:
@@ -299,13 +448,19 @@ def patient_delete_view(request, patient_id):
 
     if request.method == 'POST':
         try:
-            patient = Patient.objects.get(patient_id=patient_id, doctor=doctor_profile)
-            patient.delete()
-            messages.success(request, '환자가 삭제되었습니다.')
-        except Patient.DoesNotExist:
-            messages.error(request, '해당 환자를 찾을 수 없습니다.')
+            suggestion = TumorSuggestion.objects.get(
+                pk=suggestion_id, patient__patient_id=patient_id, patient__doctor=doctor_profile,
+                patient__deleted_at__isnull=True,
+            )
+            accept = request.POST.get('decision') == 'accept'
+            review_suggestion(suggestion, doctor_profile, accept)
+            messages.success(request, '분석 결과가 반영되었습니다.' if accept else '분석 제안을 반려했습니다.')
+        except TumorSuggestion.DoesNotExist:
+            messages.error(request, '해당 분석 제안을 찾을 수 없습니다.')
+        except InferenceError as e:
+            messages.error(request, str(e))
 
-    return redirect('home')
+    return redirect('patient_detail', patient_id=patient_id)
 
 
 def doctor_status_change_view(request):
@@ -333,3 +488,4 @@ def doctor_status_change_view(request):
             messages.error(request, '유효하지 않은 상태입니다.')
 
     return redirect('home')
+
@@ -13,4 +13,25 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mysite.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Django 초기화 이후에 import (모델 사용)
+from django_1pj.presence import presence_websocket  # noqa: E402
+
+# WebSocket 경로 -> 처리 함수
+websocket_routes = {
+    "/ws/presence/": presence_websocket,
+}
+
+
+async def application(scope, receive, send):
+    """HTTP 는 Django, WebSocket 은 경로별 처리 함수로 전달"""
+    if scope["type"] == "websocket":
+        handler = websocket_routes.get(scope["path"])
+        if handler is None:
+            await send({"type": "websocket.close", "code": 4404})
+            return
+        await handler(scope, receive, send)
+        return
+
+    await django_application(scope, receive, send)
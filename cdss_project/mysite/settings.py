@@ -100,6 +100,59 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Cache
+# 공지사항 피드 등 캐시 - 여러 프로세스로 운영 시 Redis/Memcached 로 교체
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'cdss-default',
+    },
+    # CT 단면 렌더링 결과 (LRU - 가장 오래 조회되지 않은 이미지부터 제거)
+    # 여러 프로세스가 공유하는 캐시로 교체하면 DICOM 변환 직후 워커가 axial 전체를 미리 렌더링
+    'ct_renders': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'cdss-ct-renders',
+        'OPTIONS': {'MAX_ENTRIES': 5000, 'CULL_FREQUENCY': 10},
+    },
+}
+
+# 의사 현황 pub/sub 브로커 (여러 프로세스 운영 시 외부 브로커 백엔드로 교체)
+PRESENCE_BROKER_BACKEND = 'django_1pj.presence.InProcessBroker'
+
+# 관리자 대용량 모드 (추정 건수, 컬럼 제한 조회, 입력형 담당의 필터)
+ADMIN_SCALING_MODE = True
+
+# 감사 로그 비동기 저장 (False 이면 요청 중 즉시 저장)
+AUDIT_LOG_ASYNC = True
+
+# 감사 로그를 DB 에 저장하지 못했을 때 보관하는 파일 (replay_audit_spill 명령으로 복구)
+AUDIT_SPILL_FILE = BASE_DIR / 'audit_spill.jsonl'
+
+# CT 분할 업로드 임시 저장 위치 (MEDIA_ROOT 밖 - 웹으로 노출되지 않음)
+CT_UPLOAD_TEMP_DIR = BASE_DIR / 'upload_tmp'
+
+# CT 볼륨(.npy) 저장 위치 - 메모리 매핑을 위해 로컬 파일시스템 경로여야 함
+CT_VOLUME_DIR = BASE_DIR / 'ct_volumes'
+
+# gc_media --quarantine 이 참조 없는 미디어 파일을 옮기는 위치 (MEDIA_ROOT 밖)
+MEDIA_QUARANTINE_DIR = BASE_DIR / 'media_quarantine'
+
+# 환자 목록 CSV 내보내기 저장 위치 (MEDIA_ROOT 밖 - 예약한 의사만 api_job_download 로 다운로드)
+PATIENT_EXPORT_DIR = BASE_DIR / 'exports'
+
+# 종양 분석 모델 (load() / predict_batch() 를 구현한 클래스)
+# 검증된 모델 경로를 설정하기 전에는 CT 분석 비활성 (503)
+# django_1pj.inference.DummyTumorModel 은 테스트/benchmark_inference 전용이라 여기에 설정해도 거부됨
+TUMOR_MODEL_BACKEND = None
+
+# 환자 보관(cold) 기준 - archive_patients 명령 / patients.archive 작업
+# deceased_days: 사망 후 경과일, inactive_days: 최종 추적일(없으면 수정일) 이후 경과일 (예정된 검사가 없는 환자만)
+PATIENT_ARCHIVE_POLICY = {
+    'deceased_days': 365,
+    'inactive_days': 365 * 3,
+    'batch_size': 500,
+}
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 